@@ -0,0 +1,31 @@
+"""add_inspection_photo_derivatives
+
+Revision ID: a8e6f7b9c0d1
+Revises: f7d5e6a8b9c0
+Create Date: 2025-10-09 10:12:35.218406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e6f7b9c0d1'
+down_revision: Union[str, Sequence[str], None] = 'f7d5e6a8b9c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Thumbnail / preview object keys written by media.generate_photo_derivatives
+    op.add_column('inspection_photos', sa.Column('derivatives', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('inspection_photos') as batch_op:
+        batch_op.drop_column('derivatives')
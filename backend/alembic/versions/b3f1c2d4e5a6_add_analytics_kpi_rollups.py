@@ -0,0 +1,64 @@
+"""add_analytics_kpi_rollups
+
+Revision ID: b3f1c2d4e5a6
+Revises: cea61e0e08a6
+Create Date: 2025-10-06 09:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f1c2d4e5a6'
+down_revision: Union[str, Sequence[str], None] = 'cea61e0e08a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    
+    # Daily KPI rollups per organization and gate type
+    op.create_table(
+        'analytics_daily_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('org_id', sa.Integer(), nullable=False),
+        sa.Column('rollup_date', sa.Date(), nullable=False),
+        sa.Column('gate_type', sa.String(50), nullable=False),
+        sa.Column('inspections_total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('inspections_completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('inspections_open', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('work_orders_total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('work_orders_completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('work_orders_sla_breached', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('work_orders_resolution_hours', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('work_orders_sla_open', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('inspection_items_total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('inspection_items_failed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('org_id', 'rollup_date', 'gate_type', name='uq_analytics_rollup_org_date_gate_type')
+    )
+    op.create_index('ix_analytics_daily_rollups_id', 'analytics_daily_rollups', ['id'])
+    op.create_index('idx_analytics_rollup_org_date', 'analytics_daily_rollups', ['org_id', 'rollup_date'])
+    
+    # Rollup coverage / freshness per organization
+    op.create_table(
+        'analytics_rollup_state',
+        sa.Column('org_id', sa.Integer(), nullable=False),
+        sa.Column('coverage_start', sa.Date(), nullable=False),
+        sa.Column('coverage_end', sa.Date(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('org_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('analytics_rollup_state')
+    op.drop_index('idx_analytics_rollup_org_date', table_name='analytics_daily_rollups')
+    op.drop_index('ix_analytics_daily_rollups_id', table_name='analytics_daily_rollups')
+    op.drop_table('analytics_daily_rollups')
@@ -0,0 +1,55 @@
+"""add_stock_movement_numbering
+
+Revision ID: b9f7a8c0d1e2
+Revises: a8e6f7b9c0d1
+Create Date: 2025-10-10 09:41:17.503912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9f7a8c0d1e2'
+down_revision: Union[str, Sequence[str], None] = 'a8e6f7b9c0d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # Per-day counters (databases without sequences), seeded from existing MOV{YYYYMMDD}{seq} numbers
+    op.create_table(
+        'stock_movement_counters',
+        sa.Column('day', sa.String(8), nullable=False),
+        sa.Column('last_value', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day')
+    )
+    op.execute("""
+        INSERT INTO stock_movement_counters (day, last_value)
+        SELECT substr(movement_number, 4, 8), MAX(CAST(substr(movement_number, 12) AS INTEGER))
+        FROM stock_movements
+        WHERE movement_number LIKE 'MOV%' AND length(movement_number) = 15
+        GROUP BY substr(movement_number, 4, 8)
+    """)
+
+    # PostgreSQL: non-blocking sequence, started above every legacy daily number
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("CREATE SEQUENCE IF NOT EXISTS stock_movement_number_seq")
+        op.execute("""
+            SELECT setval(
+                'stock_movement_number_seq',
+                COALESCE((SELECT MAX(last_value) FROM stock_movement_counters), 0) + 1,
+                false
+            )
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP SEQUENCE IF EXISTS stock_movement_number_seq")
+    op.drop_table('stock_movement_counters')
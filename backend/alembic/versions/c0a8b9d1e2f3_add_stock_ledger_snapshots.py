@@ -0,0 +1,57 @@
+"""add_stock_ledger_snapshots
+
+Revision ID: c0a8b9d1e2f3
+Revises: b9f7a8c0d1e2
+Create Date: 2025-10-11 08:12:44.190265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c0a8b9d1e2f3'
+down_revision: Union[str, Sequence[str], None] = 'b9f7a8c0d1e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # Per item, per day closing balances (filled by maintenance.build_stock_ledger_snapshots)
+    op.create_table(
+        'stock_ledger_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('org_id', sa.Integer(), nullable=False),
+        sa.Column('inventory_item_id', sa.Integer(), nullable=False),
+        sa.Column('warehouse_id', sa.Integer(), nullable=False),
+        sa.Column('part_id', sa.Integer(), nullable=False),
+        sa.Column('period_end', sa.DateTime(), nullable=False),
+        sa.Column('closing_quantity', sa.Numeric(15, 3), nullable=False),
+        sa.Column('closing_value', sa.Numeric(15, 2), nullable=False),
+        sa.Column('total_debits', sa.Numeric(15, 3), nullable=False),
+        sa.Column('total_credits', sa.Numeric(15, 3), nullable=False),
+        sa.Column('movement_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['inventory_item_id'], ['inventory_items.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('inventory_item_id', 'period_end', name='uq_stock_ledger_snapshot_item_period')
+    )
+    op.create_index(op.f('ix_stock_ledger_snapshots_id'), 'stock_ledger_snapshots', ['id'], unique=False)
+    op.create_index(op.f('ix_stock_ledger_snapshots_org_id'), 'stock_ledger_snapshots', ['org_id'], unique=False)
+    op.create_index('idx_stock_ledger_snapshot_period_item', 'stock_ledger_snapshots', ['period_end', 'inventory_item_id'], unique=False)
+
+    # Keyset pagination of the movement report: ORDER BY movement_date DESC, id DESC
+    op.create_index('idx_stock_movement_date_id', 'stock_movements', ['movement_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_stock_movement_date_id', table_name='stock_movements')
+    op.drop_index('idx_stock_ledger_snapshot_period_item', table_name='stock_ledger_snapshots')
+    op.drop_index(op.f('ix_stock_ledger_snapshots_org_id'), table_name='stock_ledger_snapshots')
+    op.drop_index(op.f('ix_stock_ledger_snapshots_id'), table_name='stock_ledger_snapshots')
+    op.drop_table('stock_ledger_snapshots')
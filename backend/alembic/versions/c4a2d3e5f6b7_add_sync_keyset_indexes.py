@@ -0,0 +1,52 @@
+"""add_sync_keyset_indexes
+
+Revision ID: c4a2d3e5f6b7
+Revises: b3f1c2d4e5a6
+Create Date: 2025-10-06 14:37:08.915230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a2d3e5f6b7'
+down_revision: Union[str, Sequence[str], None] = 'b3f1c2d4e5a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Versioned (delta sync) tables and their keyset indexes
+SYNC_KEYSET_INDEXES = {
+    'gates': 'ix_gates_org_last_modified_id',
+    'inspections': 'ix_inspections_org_last_modified_id',
+    'inspection_items': 'ix_inspection_items_org_last_modified_id',
+}
+
+
+def _has_sync_columns(table_name: str) -> bool:
+    """Only tables carrying the VersionedMixin columns can be indexed."""
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table_name)}
+    return {'org_id', 'last_modified_at'} <= columns
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    
+    # Composite (org_id, last_modified_at, id) indexes serve the keyset sync pull
+    for table_name, index_name in SYNC_KEYSET_INDEXES.items():
+        if _has_sync_columns(table_name):
+            op.create_index(index_name, table_name, ['org_id', 'last_modified_at', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    existing = {}
+    for table_name in SYNC_KEYSET_INDEXES:
+        existing[table_name] = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table_name)}
+    
+    for table_name, index_name in SYNC_KEYSET_INDEXES.items():
+        if index_name in existing[table_name]:
+            op.drop_index(index_name, table_name=table_name)
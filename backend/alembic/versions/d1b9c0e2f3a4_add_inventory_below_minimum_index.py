@@ -0,0 +1,41 @@
+"""add_inventory_below_minimum_index
+
+Revision ID: d1b9c0e2f3a4
+Revises: c0a8b9d1e2f3
+Create Date: 2025-10-11 14:27:03.518840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1b9c0e2f3a4'
+down_revision: Union[str, Sequence[str], None] = 'c0a8b9d1e2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite only matches a partial index whose terms appear in the query as written (is_active = 1)
+BELOW_MINIMUM = "is_active AND minimum_stock > 0 AND quantity_available <= minimum_stock"
+BELOW_MINIMUM_SQLITE = "is_active = 1 AND minimum_stock > 0 AND quantity_available <= minimum_stock"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # Low stock alert scans read only the items below their minimum stock
+    op.create_index(
+        'idx_inventory_below_minimum',
+        'inventory_items',
+        ['org_id', 'warehouse_id'],
+        unique=False,
+        postgresql_where=sa.text(BELOW_MINIMUM),
+        sqlite_where=sa.text(BELOW_MINIMUM_SQLITE)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_inventory_below_minimum', table_name='inventory_items')
@@ -0,0 +1,43 @@
+"""add_sync_change_journal
+
+Revision ID: d5b3e4f6a7c8
+Revises: c4a2d3e5f6b7
+Create Date: 2025-10-07 10:05:52.660184
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b3e4f6a7c8'
+down_revision: Union[str, Sequence[str], None] = 'c4a2d3e5f6b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    
+    # Append-only change journal for delta sync
+    op.create_table(
+        'sync_change_journal',
+        sa.Column('seq', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+        sa.Column('entity_type', sa.String(50), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('org_id', sa.Integer(), nullable=True),
+        sa.Column('operation', sa.String(10), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index('idx_sync_journal_org_seq', 'sync_change_journal', ['org_id', 'seq'])
+    op.create_index('idx_sync_journal_entity_seq', 'sync_change_journal', ['entity_type', 'entity_id', 'seq'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_sync_journal_entity_seq', table_name='sync_change_journal')
+    op.drop_index('idx_sync_journal_org_seq', table_name='sync_change_journal')
+    op.drop_table('sync_change_journal')
@@ -0,0 +1,29 @@
+"""add_stock_movement_created_at_index
+
+Revision ID: e3c1d2f4a5b6
+Revises: d1b9c0e2f3a4
+Create Date: 2025-10-12 09:41:17.306128
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3c1d2f4a5b6'
+down_revision: Union[str, Sequence[str], None] = 'd1b9c0e2f3a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # Stock ledger snapshot builds look up movements booked since the last build
+    op.create_index('idx_stock_movement_created_at', 'stock_movements', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_stock_movement_created_at', table_name='stock_movements')
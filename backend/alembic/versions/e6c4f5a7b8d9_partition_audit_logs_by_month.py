@@ -0,0 +1,142 @@
+"""partition_audit_logs_by_month
+
+Revision ID: e6c4f5a7b8d9
+Revises: d5b3e4f6a7c8
+Create Date: 2025-10-08 09:21:40.318772
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6c4f5a7b8d9'
+down_revision: Union[str, Sequence[str], None] = 'd5b3e4f6a7c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Partitions created ahead of the current month at migration time;
+# afterwards maintenance.manage_audit_partitions keeps them coming
+MONTHS_AHEAD = 3
+
+# Single-column indexes already covered by a composite index (or useless
+# for the ILIKE search); dropped to cut insert cost and index bloat
+REDUNDANT_INDEXES = (
+    'ix_audit_logs_id',
+    'ix_audit_logs_timestamp',
+    'ix_audit_logs_action',
+    'ix_audit_logs_entity_type',
+    'ix_audit_logs_entity_id',
+    'ix_audit_logs_organization_id',
+    'ix_audit_logs_ip_address',
+    'ix_audit_logs_success',
+    'ix_audit_logs_risk_level',
+)
+
+# Indexes recreated on the partitioned parent (and thus on every partition)
+PARTITIONED_INDEXES = {
+    'idx_audit_timestamp_action': ['timestamp', 'action'],
+    'idx_audit_user_timestamp': ['user_id', 'timestamp'],
+    'idx_audit_entity': ['entity_type', 'entity_id'],
+    'idx_audit_organization_timestamp': ['organization_id', 'timestamp'],
+    'ix_audit_logs_session_id': ['session_id'],
+    'ix_audit_logs_request_id': ['request_id'],
+}
+
+
+def _add_months(value: date, months: int) -> date:
+    month_index = value.year * 12 + (value.month - 1) + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _create_monthly_partition(month_start: date) -> None:
+    month_end = _add_months(month_start, 1)
+    op.execute(
+        f"CREATE TABLE audit_logs_p{month_start.year:04d}{month_start.month:02d} "
+        f"PARTITION OF audit_logs FOR VALUES FROM ('{month_start.isoformat()}') TO ('{month_end.isoformat()}')"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    if bind.dialect.name != 'postgresql':
+        # Plain table elsewhere: only trim the redundant indexes
+        existing = {index['name'] for index in sa.inspect(bind).get_indexes('audit_logs')}
+        for index_name in REDUNDANT_INDEXES:
+            if index_name in existing:
+                op.drop_index(index_name, table_name='audit_logs')
+        return
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_legacy")
+
+    # Partitioned parent; the partition key must be part of the primary key
+    op.execute(
+        "CREATE TABLE audit_logs (LIKE audit_logs_legacy INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (timestamp)"
+    )
+    op.execute("ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey_partitioned PRIMARY KEY (id, timestamp)")
+    op.execute("ALTER TABLE audit_logs ADD FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.execute("ALTER TABLE audit_logs ADD FOREIGN KEY (organization_id) REFERENCES organizations (id)")
+
+    # One partition per month from the oldest row up to MONTHS_AHEAD, plus
+    # a default partition so inserts never fail if maintenance falls behind
+    oldest = bind.execute(sa.text("SELECT min(timestamp) FROM audit_logs_legacy")).scalar()
+    current = _add_months(datetime.utcnow().date(), 0)
+    month_start = _add_months(oldest.date(), 0) if oldest else current
+    while month_start <= _add_months(current, MONTHS_AHEAD):
+        _create_monthly_partition(month_start)
+        month_start = _add_months(month_start, 1)
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_legacy")
+
+    # Keep the id sequence when the legacy table goes away
+    op.execute(
+        "DO $$ DECLARE seq text := pg_get_serial_sequence('audit_logs_legacy', 'id'); "
+        "BEGIN IF seq IS NOT NULL THEN EXECUTE format('ALTER SEQUENCE %s OWNED BY audit_logs.id', seq); END IF; END $$"
+    )
+    op.execute("DROP TABLE audit_logs_legacy")
+    op.execute("ALTER TABLE audit_logs RENAME CONSTRAINT audit_logs_pkey_partitioned TO audit_logs_pkey")
+
+    for index_name, columns in PARTITIONED_INDEXES.items():
+        op.create_index(index_name, 'audit_logs', columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+
+    if bind.dialect.name != 'postgresql':
+        existing = {index['name'] for index in sa.inspect(bind).get_indexes('audit_logs')}
+        for index_name in REDUNDANT_INDEXES:
+            if index_name not in existing:
+                column = index_name[len('ix_audit_logs_'):]
+                op.create_index(index_name, 'audit_logs', [column])
+        return
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute("ALTER TABLE audit_logs_partitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_partitioned_pkey")
+    for index_name in PARTITIONED_INDEXES:
+        op.execute(f"ALTER INDEX {index_name} RENAME TO {index_name}_partitioned")
+
+    op.execute("CREATE TABLE audit_logs (LIKE audit_logs_partitioned INCLUDING DEFAULTS)")
+    op.execute("ALTER TABLE audit_logs ADD PRIMARY KEY (id)")
+    op.execute("ALTER TABLE audit_logs ADD FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.execute("ALTER TABLE audit_logs ADD FOREIGN KEY (organization_id) REFERENCES organizations (id)")
+    op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_partitioned")
+    op.execute(
+        "DO $$ DECLARE seq text := pg_get_serial_sequence('audit_logs_partitioned', 'id'); "
+        "BEGIN IF seq IS NOT NULL THEN EXECUTE format('ALTER SEQUENCE %s OWNED BY audit_logs.id', seq); END IF; END $$"
+    )
+    op.execute("DROP TABLE audit_logs_partitioned CASCADE")
+
+    for index_name, columns in PARTITIONED_INDEXES.items():
+        op.create_index(index_name, 'audit_logs', columns)
+    for index_name in REDUNDANT_INDEXES:
+        op.create_index(index_name, 'audit_logs', [index_name[len('ix_audit_logs_'):]])
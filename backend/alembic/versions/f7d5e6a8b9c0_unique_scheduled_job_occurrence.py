@@ -0,0 +1,54 @@
+"""unique_scheduled_job_occurrence
+
+Revision ID: f7d5e6a8b9c0
+Revises: e6c4f5a7b8d9
+Create Date: 2025-10-08 15:42:11.604925
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7d5e6a8b9c0'
+down_revision: Union[str, Sequence[str], None] = 'e6c4f5a7b8d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # Duplicate occurrences from concurrent generator runs: keep the oldest
+    # job and move its duplicates' notifications onto it
+    op.execute(
+        "UPDATE advanced_maintenance_notifications SET job_id = ("
+        "  SELECT min(keep.id) FROM advanced_scheduled_jobs keep"
+        "  JOIN advanced_scheduled_jobs dup"
+        "    ON dup.plan_id = keep.plan_id AND dup.plan_occurrence_id = keep.plan_occurrence_id"
+        "  WHERE dup.id = advanced_maintenance_notifications.job_id"
+        ") WHERE job_id IN ("
+        "  SELECT dup.id FROM advanced_scheduled_jobs dup"
+        "  JOIN advanced_scheduled_jobs keep"
+        "    ON dup.plan_id = keep.plan_id AND dup.plan_occurrence_id = keep.plan_occurrence_id AND keep.id < dup.id"
+        ")"
+    )
+    op.execute(
+        "DELETE FROM advanced_scheduled_jobs WHERE id IN ("
+        "  SELECT dup.id FROM advanced_scheduled_jobs dup"
+        "  JOIN advanced_scheduled_jobs keep"
+        "    ON dup.plan_id = keep.plan_id AND dup.plan_occurrence_id = keep.plan_occurrence_id AND keep.id < dup.id"
+        ")"
+    )
+
+    with op.batch_alter_table('advanced_scheduled_jobs') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_advanced_scheduled_jobs_plan_occurrence', ['plan_id', 'plan_occurrence_id']
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('advanced_scheduled_jobs') as batch_op:
+        batch_op.drop_constraint('uq_advanced_scheduled_jobs_plan_occurrence', type_='unique')
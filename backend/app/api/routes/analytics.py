@@ -5,13 +5,13 @@ Elemző és jelentéskészítő API végpontok
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import io
 
-from app.database import get_db
-from app.core.deps import get_current_active_user
+from app.database import get_async_db
+from app.core.deps import get_current_active_user_async
 from app.core.rbac import require_permission, PermissionActions, Resources
 from app.models.auth import User
 from app.services.analytics_service import AnalyticsService
@@ -24,19 +24,22 @@ router = APIRouter(prefix="/analytics", tags=["analytics"])
 async def get_dashboard_analytics(
     organization_id: Optional[int] = Query(None, description="Filter by organization"),
     days_back: int = Query(30, ge=1, le=365, description="Days back for analysis"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    bucket_size: str = Query("day", pattern="^(day|week|month)$", description="Chart bucket size"),
+    window_days: int = Query(30, ge=1, le=365, description="Chart window length in days"),
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Kombinált dashboard elemzések - Combined dashboard analytics
     Returns KPIs, charts and summary data for the main dashboard
     """
     try:
-        analytics_service = AnalyticsService(db)
-        dashboard_data = analytics_service.get_dashboard_analytics(
+        dashboard_data = await db.run_sync(lambda session: AnalyticsService(session).get_dashboard_analytics(
             organization_id=organization_id,
-            days_back=days_back
-        )
+            days_back=days_back,
+            bucket_size=bucket_size,
+            window_days=window_days
+        ))
         
         return {
             "status": "success",
@@ -55,19 +58,22 @@ async def get_dashboard_analytics(
 async def get_due_inspections_analytics(
     days_ahead: int = Query(30, ge=1, le=365, description="Days ahead to analyze"),
     organization_id: Optional[int] = Query(None, description="Filter by organization"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    bucket_size: str = Query("day", pattern="^(day|week|month)$", description="Chart bucket size"),
+    window_days: int = Query(30, ge=1, le=365, description="Chart window length in days"),
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Lejáró ellenőrzések elemzése - Due inspections analytics
     Provides comprehensive analysis of upcoming and overdue inspections
     """
     try:
-        analytics_service = AnalyticsService(db)
-        due_analytics = analytics_service.get_due_inspections_analytics(
+        due_analytics = await db.run_sync(lambda session: AnalyticsService(session).get_due_inspections_analytics(
             days_ahead=days_ahead,
-            organization_id=organization_id
-        )
+            organization_id=organization_id,
+            bucket_size=bucket_size,
+            window_days=window_days
+        ))
         
         return {
             "status": "success",
@@ -88,19 +94,22 @@ async def get_due_inspections_analytics(
 async def get_sla_analytics(
     days_back: int = Query(30, ge=1, le=365, description="Days back for SLA analysis"),
     organization_id: Optional[int] = Query(None, description="Filter by organization"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    bucket_size: str = Query("day", pattern="^(day|week|month)$", description="Chart bucket size"),
+    window_days: int = Query(30, ge=1, le=365, description="Chart window length in days"),
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     SLA teljesítmény elemzése - SLA performance analytics
     Provides detailed SLA compliance metrics and trends
     """
     try:
-        analytics_service = AnalyticsService(db)
-        sla_analytics = analytics_service.get_sla_analytics(
+        sla_analytics = await db.run_sync(lambda session: AnalyticsService(session).get_sla_analytics(
             days_back=days_back,
-            organization_id=organization_id
-        )
+            organization_id=organization_id,
+            bucket_size=bucket_size,
+            window_days=window_days
+        ))
         
         return {
             "status": "success",
@@ -121,19 +130,22 @@ async def get_sla_analytics(
 async def get_error_statistics(
     days_back: int = Query(30, ge=1, le=365, description="Days back for error analysis"),
     organization_id: Optional[int] = Query(None, description="Filter by organization"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    bucket_size: str = Query("day", pattern="^(day|week|month)$", description="Chart bucket size"),
+    window_days: int = Query(30, ge=1, le=365, description="Chart window length in days"),
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Hibastatisztika elemzése - Error statistics analysis
     Provides comprehensive error analysis and failure patterns
     """
     try:
-        analytics_service = AnalyticsService(db)
-        error_stats = analytics_service.get_error_statistics(
+        error_stats = await db.run_sync(lambda session: AnalyticsService(session).get_error_statistics(
             days_back=days_back,
-            organization_id=organization_id
-        )
+            organization_id=organization_id,
+            bucket_size=bucket_size,
+            window_days=window_days
+        ))
         
         return {
             "status": "success",
@@ -158,18 +170,17 @@ async def get_error_statistics(
 async def export_due_inspections_csv(
     days_ahead: int = Query(30, ge=1, le=365, description="Days ahead to export"),
     organization_id: Optional[int] = Query(None, description="Filter by organization"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Lejáró ellenőrzések CSV export - Export due inspections to CSV
     """
     try:
-        analytics_service = AnalyticsService(db)
-        csv_data = analytics_service.export_due_inspections_csv(
+        csv_data = await db.run_sync(lambda session: AnalyticsService(session).export_due_inspections_csv(
             days_ahead=days_ahead,
             organization_id=organization_id
-        )
+        ))
         
         # Create filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -190,18 +201,17 @@ async def export_due_inspections_csv(
 async def export_sla_report_excel(
     days_back: int = Query(30, ge=1, le=365, description="Days back for SLA export"),
     organization_id: Optional[int] = Query(None, description="Filter by organization"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     SLA jelentés Excel export - Export SLA report to Excel
     """
     try:
-        analytics_service = AnalyticsService(db)
-        excel_data = analytics_service.export_sla_report_excel(
+        excel_data = await db.run_sync(lambda session: AnalyticsService(session).export_sla_report_excel(
             days_back=days_back,
             organization_id=organization_id
-        )
+        ))
         
         # Create filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -222,18 +232,17 @@ async def export_sla_report_excel(
 async def export_error_statistics_csv(
     days_back: int = Query(30, ge=1, le=365, description="Days back for error export"),
     organization_id: Optional[int] = Query(None, description="Filter by organization"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Hibastatisztika CSV export - Export error statistics to CSV
     """
     try:
-        analytics_service = AnalyticsService(db)
-        csv_data = analytics_service.export_error_statistics_csv(
+        csv_data = await db.run_sync(lambda session: AnalyticsService(session).export_error_statistics_csv(
             days_back=days_back,
             organization_id=organization_id
-        )
+        ))
         
         # Create filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -254,20 +263,18 @@ async def export_error_statistics_csv(
 async def export_dashboard_excel(
     days_back: int = Query(30, ge=1, le=365, description="Days back for dashboard export"),
     organization_id: Optional[int] = Query(None, description="Filter by organization"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Teljes dashboard Excel export - Export complete dashboard to Excel
     """
     try:
-        analytics_service = AnalyticsService(db)
-        
         # Get all analytics data
-        dashboard_data = analytics_service.get_dashboard_analytics(
+        dashboard_data = await db.run_sync(lambda session: AnalyticsService(session).get_dashboard_analytics(
             organization_id=organization_id,
             days_back=days_back
-        )
+        ))
         
         # Create comprehensive Excel report
         output = io.BytesIO()
@@ -347,20 +354,18 @@ async def export_dashboard_excel(
 async def get_key_kpis(
     organization_id: Optional[int] = Query(None, description="Filter by organization"),
     days_back: int = Query(30, ge=1, le=90, description="Days back for KPI calculation"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Kulcs KPI-k lekérdezése - Get key KPIs only
     Returns the 3 main KPIs for quick dashboard display
     """
     try:
-        analytics_service = AnalyticsService(db)
-        
         # Get analytics for KPIs
-        due_inspections = analytics_service.get_due_inspections_analytics(30, organization_id)
-        sla_analytics = analytics_service.get_sla_analytics(days_back, organization_id)
-        error_stats = analytics_service.get_error_statistics(days_back, organization_id)
+        due_inspections = await db.run_sync(lambda session: AnalyticsService(session).get_due_inspections_analytics(30, organization_id))
+        sla_analytics = await db.run_sync(lambda session: AnalyticsService(session).get_sla_analytics(days_back, organization_id))
+        error_stats = await db.run_sync(lambda session: AnalyticsService(session).get_error_statistics(days_back, organization_id))
         
         # Select the 3 most important KPIs
         key_kpis = [
@@ -392,19 +397,22 @@ async def get_key_kpis(
 async def get_combined_chart_data(
     organization_id: Optional[int] = Query(None, description="Filter by organization"),
     days_back: int = Query(30, ge=7, le=90, description="Days back for chart data"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    bucket_size: str = Query("day", pattern="^(day|week|month)$", description="Chart bucket size"),
+    window_days: int = Query(30, ge=1, le=365, description="Chart window length in days"),
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Kombinált grafikon adatok - Combined chart data
     Returns chart data for all three main metrics in one call
     """
     try:
-        analytics_service = AnalyticsService(db)
-        dashboard_data = analytics_service.get_dashboard_analytics(
+        dashboard_data = await db.run_sync(lambda session: AnalyticsService(session).get_dashboard_analytics(
             organization_id=organization_id,
-            days_back=days_back
-        )
+            days_back=days_back,
+            bucket_size=bucket_size,
+            window_days=window_days
+        ))
         
         return {
             "status": "success",
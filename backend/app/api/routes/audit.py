@@ -8,7 +8,6 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
-import io
 
 from app.database import get_db
 from app.core.deps import get_current_active_user
@@ -165,16 +164,19 @@ async def export_audit_logs_csv(
     user_id: Optional[int] = Query(None, description="Filter by user"),
     resource_type: Optional[str] = Query(None, description="Filter by resource type"),
     action: Optional[str] = Query(None, description="Filter by action"),
-    category: Optional[str] = Query(None, description="Filter by category"),
-    severity: Optional[str] = Query(None, description="Filter by severity"),
+    risk_level: Optional[str] = Query(None, description="Filter by risk level"),
+    success: Optional[bool] = Query(None, description="Filter by success status"),
     start_date: Optional[datetime] = Query(None, description="Start date filter"),
     end_date: Optional[datetime] = Query(None, description="End date filter"),
+    compress: bool = Query(False, description="Gzip-compress the CSV on the fly"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Audit logok CSV exportálása
     Export audit logs as CSV
+    
+    The file is streamed row by row with no row limit.
     """
     try:
         audit_service = AuditService(db)
@@ -183,24 +185,29 @@ async def export_audit_logs_csv(
         if not current_user.is_superuser:
             organization_id = current_user.organization_id
         
-        csv_data = audit_service.export_audit_logs_csv(
+        csv_stream = audit_service.iter_audit_logs_csv(
             organization_id=organization_id,
             user_id=user_id,
-            resource_type=resource_type,
+            entity_type=resource_type,
             action=action,
-            category=category,
-            severity=severity,
+            risk_level=risk_level,
+            success=success,
             start_date=start_date,
-            end_date=end_date
+            end_date=end_date,
+            compress=compress
         )
         
         # Create filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"audit_logs_{timestamp}.csv"
+        media_type = "text/csv"
+        if compress:
+            filename += ".gz"
+            media_type = "application/gzip"
         
         return StreamingResponse(
-            io.BytesIO(csv_data),
-            media_type="text/csv",
+            csv_stream,
+            media_type=media_type,
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
         
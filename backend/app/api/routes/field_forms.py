@@ -3,6 +3,8 @@
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -17,10 +19,22 @@ from app.schemas.field_forms import (
     InspectionListResponse,
     PhotoUploadRequest,
     PhotoUploadResponse,
-    PhotoResponse
+    PhotoResponse,
+    PhotoMetadata,
+    BulkPhotoUploadRequest,
+    BulkPhotoUploadResponse,
+    BulkPhotoUploadTarget,
+    BulkPhotoConfirmRequest,
+    BulkPhotoConfirmResponse,
+    BulkPhotoConfirmFailure
 )
 from app.services.field_form_service import FieldFormService
-from app.services.s3_photo_service import S3PhotoService, PhotoValidationService
+from app.services.s3_photo_service import get_s3_photo_service, PhotoValidationService
+from app.services.photo_derivative_service import (
+    DERIVATIVE_FORMATS,
+    derivative_keys,
+    schedule_photo_derivatives
+)
 
 router = APIRouter(tags=["Field Forms"])
 
@@ -179,7 +193,7 @@ async def list_inspections(
     
     # Build query
     query = db.query(Inspection).filter(
-        Inspection.org_id == current_user.org_id,
+        Inspection.org_id == current_user.organization_id,
         Inspection.is_active == True
     )
     
@@ -220,6 +234,40 @@ async def list_inspections(
 
 # Photo Documentation APIs
 
+def _photo_record_values(
+    current_user: User,
+    inspection_id: int,
+    inspection_item_id: Optional[int],
+    metadata: PhotoMetadata,
+    s3_bucket: str,
+    s3_key: str
+) -> Dict[str, Any]:
+    """Column values of a new, pending photo record."""
+    return dict(
+        org_id=current_user.organization_id,
+        inspection_id=inspection_id,
+        inspection_item_id=inspection_item_id,
+        category=metadata.category,
+        title=metadata.title,
+        description=metadata.description,
+        s3_bucket=s3_bucket,
+        s3_key=s3_key,
+        original_filename=metadata.original_filename,
+        file_size_bytes=metadata.file_size_bytes,
+        mime_type=metadata.mime_type,
+        width_pixels=metadata.width_pixels,
+        height_pixels=metadata.height_pixels,
+        gps_latitude=metadata.gps_latitude,
+        gps_longitude=metadata.gps_longitude,
+        location_accuracy_meters=metadata.location_accuracy_meters,
+        captured_at=metadata.captured_at or datetime.utcnow(),
+        captured_by_id=current_user.id,
+        device_info=metadata.device_info,
+        upload_status='pending',
+        is_required=metadata.is_required
+    )
+
+
 @router.post("/inspections/{inspection_id}/photos/upload", response_model=PhotoUploadResponse)
 async def request_photo_upload(
     inspection_id: int,
@@ -238,7 +286,7 @@ async def request_photo_upload(
     # Validate inspection exists
     inspection = db.query(Inspection).filter(
         Inspection.id == inspection_id,
-        Inspection.org_id == current_user.org_id,
+        Inspection.org_id == current_user.organization_id,
         Inspection.is_active == True
     ).first()
     
@@ -246,33 +294,18 @@ async def request_photo_upload(
         raise HTTPException(status_code=404, detail="Inspection not found")
     
     # Generate S3 upload URL
-    s3_service = S3PhotoService()
+    s3_service = get_s3_photo_service()
     upload_response = s3_service.generate_upload_url(photo_request)
     
     # Create photo record in database
-    photo = InspectionPhoto(
-        org_id=current_user.org_id,
-        inspection_id=inspection_id,
-        inspection_item_id=photo_request.inspection_item_id,
-        category=photo_request.metadata.category,
-        title=photo_request.metadata.title,
-        description=photo_request.metadata.description,
+    photo = InspectionPhoto(**_photo_record_values(
+        current_user,
+        inspection_id,
+        photo_request.inspection_item_id,
+        photo_request.metadata,
         s3_bucket=s3_service.bucket_name or 'local',
-        s3_key=upload_response.s3_key,
-        original_filename=photo_request.metadata.original_filename,
-        file_size_bytes=photo_request.metadata.file_size_bytes,
-        mime_type=photo_request.metadata.mime_type,
-        width_pixels=photo_request.metadata.width_pixels,
-        height_pixels=photo_request.metadata.height_pixels,
-        gps_latitude=photo_request.metadata.gps_latitude,
-        gps_longitude=photo_request.metadata.gps_longitude,
-        location_accuracy_meters=photo_request.metadata.location_accuracy_meters,
-        captured_at=photo_request.metadata.captured_at or datetime.utcnow(),
-        captured_by_id=current_user.id,
-        device_info=photo_request.metadata.device_info,
-        upload_status='pending',
-        is_required=photo_request.metadata.is_required
-    )
+        s3_key=upload_response.s3_key
+    ))
     
     db.add(photo)
     db.commit()
@@ -303,14 +336,14 @@ async def confirm_photo_upload(
     photo = db.query(InspectionPhoto).filter(
         InspectionPhoto.id == photo_id,
         InspectionPhoto.inspection_id == inspection_id,
-        InspectionPhoto.org_id == current_user.org_id
+        InspectionPhoto.org_id == current_user.organization_id
     ).first()
     
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
     
     # Validate upload in S3
-    s3_service = S3PhotoService()
+    s3_service = get_s3_photo_service()
     validation_result = s3_service.validate_upload_completion(photo.s3_key)
     
     if validation_result.get('exists'):
@@ -324,6 +357,10 @@ async def confirm_photo_upload(
         
         db.commit()
         
+        # Thumbnails are rendered in the background
+        if s3_service.s3_client:
+            schedule_photo_derivatives(photo.id)
+        
         return {"status": "confirmed", "photo_id": photo_id}
     else:
         # Upload failed
@@ -337,6 +374,151 @@ async def confirm_photo_upload(
         )
 
 
+@router.post("/inspections/{inspection_id}/photos/bulk-upload", response_model=BulkPhotoUploadResponse)
+async def request_bulk_photo_upload(
+    inspection_id: int,
+    bulk_request: BulkPhotoUploadRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Request upload URLs for several photos at once.
+    
+    Creates all photo records with one bulk insert and returns a pre-signed
+    PUT URL per photo, or one URL per part for large files (S3 multipart
+    upload). Confirm with POST /inspections/{inspection_id}/photos/bulk-confirm.
+    """
+    require_permission("inspection:write", current_user)
+    
+    # Validate inspection exists
+    inspection = db.query(Inspection).filter(
+        Inspection.id == inspection_id,
+        Inspection.org_id == current_user.organization_id,
+        Inspection.is_active == True
+    ).first()
+    
+    if not inspection:
+        raise HTTPException(status_code=404, detail="Inspection not found")
+    
+    # Pre-sign every upload; signing is local, only multipart starts call S3
+    s3_service = get_s3_photo_service()
+    s3_bucket = s3_service.bucket_name or 'local'
+    targets = []
+    rows = []
+    for item in bulk_request.photos:
+        photo_request = PhotoUploadRequest(
+            inspection_id=inspection_id,
+            inspection_item_id=item.inspection_item_id,
+            metadata=item.metadata
+        )
+        target = s3_service.generate_upload_target(photo_request)
+        targets.append(target)
+        rows.append(_photo_record_values(
+            current_user,
+            inspection_id,
+            item.inspection_item_id,
+            item.metadata,
+            s3_bucket=s3_bucket,
+            s3_key=target['s3_key']
+        ))
+    
+    # Create all photo records in one statement
+    photo_ids = db.scalars(
+        insert(InspectionPhoto).returning(InspectionPhoto.id, sort_by_parameter_order=True),
+        rows
+    ).all()
+    db.commit()
+    
+    return BulkPhotoUploadResponse(
+        inspection_id=inspection_id,
+        uploads=[
+            BulkPhotoUploadTarget(
+                photo_id=photo_id,
+                client_ref=item.client_ref,
+                s3_key=target['s3_key'],
+                upload_url=target.get('upload_url'),
+                multipart_upload_id=target.get('upload_id'),
+                part_size_bytes=target.get('part_size_bytes'),
+                parts=target.get('parts', []),
+                expires_at=target['expires_at']
+            )
+            for photo_id, item, target in zip(photo_ids, bulk_request.photos, targets)
+        ]
+    )
+
+
+@router.post("/inspections/{inspection_id}/photos/bulk-confirm", response_model=BulkPhotoConfirmResponse)
+async def confirm_bulk_photo_upload(
+    inspection_id: int,
+    confirm_request: BulkPhotoConfirmRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Confirm several photo uploads at once.
+    
+    Completes multipart uploads and checks every object in S3 concurrently,
+    then updates all photo records in one transaction. Photos that were
+    already confirmed are reported as confirmed again, so the call can be
+    retried safely.
+    """
+    require_permission("inspection:write", current_user)
+    
+    requested = {item.photo_id: item for item in confirm_request.photos}
+    photos = db.query(InspectionPhoto).filter(
+        InspectionPhoto.id.in_(requested),
+        InspectionPhoto.inspection_id == inspection_id,
+        InspectionPhoto.org_id == current_user.organization_id
+    ).all()
+    
+    found = {photo.id for photo in photos}
+    failed = [
+        BulkPhotoConfirmFailure(photo_id=photo_id, error="Photo not found")
+        for photo_id in requested if photo_id not in found
+    ]
+    confirmed = [photo.id for photo in photos if photo.upload_status == 'completed']
+    pending = [photo for photo in photos if photo.upload_status != 'completed']
+    
+    # Validate uploads in S3 (parallel head_object checks off the event loop)
+    s3_service = get_s3_photo_service()
+    results = await run_in_threadpool(s3_service.finalize_uploads, [
+        {
+            "s3_key": photo.s3_key,
+            "upload_id": requested[photo.id].multipart_upload_id,
+            "parts": [part.model_dump() for part in requested[photo.id].parts]
+        }
+        for photo in pending
+    ])
+    
+    download_urls = s3_service.generate_download_urls(
+        photo.s3_key for photo in pending if results[photo.s3_key].get('exists')
+    )
+    
+    uploaded_at = datetime.utcnow()
+    newly_confirmed = []
+    for photo in pending:
+        result = results[photo.s3_key]
+        if result.get('exists'):
+            photo.upload_status = 'completed'
+            photo.uploaded_at = uploaded_at
+            photo.file_size_bytes = result.get('size', photo.file_size_bytes)
+            photo.s3_url = download_urls[photo.s3_key]
+            newly_confirmed.append(photo.id)
+        else:
+            photo.upload_status = 'failed'
+            photo.upload_error = result.get('error') or "File not found in S3 after upload"
+            failed.append(BulkPhotoConfirmFailure(photo_id=photo.id, error=photo.upload_error))
+    
+    db.commit()
+    
+    # Thumbnails are rendered in the background
+    if s3_service.s3_client:
+        for photo_id in newly_confirmed:
+            schedule_photo_derivatives(photo_id)
+    
+    return BulkPhotoConfirmResponse(confirmed=confirmed + newly_confirmed, failed=failed)
+
+
 @router.get("/inspections/{inspection_id}/photos", response_model=List[PhotoResponse])
 async def list_inspection_photos(
     inspection_id: int,
@@ -355,7 +537,7 @@ async def list_inspection_photos(
     # Validate inspection access
     inspection = db.query(Inspection).filter(
         Inspection.id == inspection_id,
-        Inspection.org_id == current_user.org_id
+        Inspection.org_id == current_user.organization_id
     ).first()
     
     if not inspection:
@@ -372,13 +554,25 @@ async def list_inspection_photos(
     
     photos = query.all()
     
-    # Generate fresh download URLs
-    s3_service = S3PhotoService()
-    for photo in photos:
-        if photo.upload_status == 'completed':
-            photo.s3_url = s3_service.generate_download_url(photo.s3_key)
+    # Download URLs for all completed photos and their derivatives in one batch (cached per key)
+    s3_service = get_s3_photo_service()
+    completed = [photo for photo in photos if photo.upload_status == 'completed']
+    download_urls = s3_service.generate_download_urls(
+        key for photo in completed for key in [photo.s3_key, *derivative_keys(photo)]
+    )
     
-    return [PhotoResponse(**photo.__dict__) for photo in photos]
+    responses = []
+    for photo in photos:
+        derivative_urls = {}
+        if photo.s3_key in download_urls:
+            photo.s3_url = download_urls[photo.s3_key]
+            derivative_urls = {
+                size: {fmt: download_urls[rendition[fmt]] for fmt in DERIVATIVE_FORMATS if rendition.get(fmt)}
+                for size, rendition in (photo.derivatives or {}).items()
+            }
+        responses.append(PhotoResponse(**photo.__dict__, derivative_urls=derivative_urls))
+    
+    return responses
 
 
 @router.delete("/inspections/{inspection_id}/photos/{photo_id}")
@@ -399,15 +593,17 @@ async def delete_inspection_photo(
     photo = db.query(InspectionPhoto).filter(
         InspectionPhoto.id == photo_id,
         InspectionPhoto.inspection_id == inspection_id,
-        InspectionPhoto.org_id == current_user.org_id
+        InspectionPhoto.org_id == current_user.organization_id
     ).first()
     
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
     
     # Delete from S3
-    s3_service = S3PhotoService()
+    s3_service = get_s3_photo_service()
     s3_deleted = s3_service.delete_photo(photo.s3_key)
+    for key in derivative_keys(photo):
+        s3_service.delete_photo(key)
     
     # Soft delete from database
     photo.is_active = False
@@ -439,7 +635,7 @@ async def resolve_inspection_conflict(
     # Get inspection with conflict
     inspection = db.query(Inspection).filter(
         Inspection.id == inspection_id,
-        Inspection.org_id == current_user.org_id,
+        Inspection.org_id == current_user.organization_id,
         Inspection.sync_status == 'conflict'
     ).first()
     
@@ -115,11 +115,17 @@ async def detailed_health_check(db: Session = Depends(get_db)):
             "error": str(e)
         }
     
+    # Argon2 pool saturation (login storms)
+    from app.core.password_pool import get_password_hash_pool
+    password_pool = get_password_hash_pool().snapshot()
+    password_pool["status"] = "degraded" if password_pool["queue_depth"] >= password_pool["max_queue"] else "healthy"
+    
     # Determine overall status
     checks = {
         "database": db_health,
         "redis": redis_health,
-        "system": system_health
+        "system": system_health,
+        "password_hashing": password_pool
     }
     
     overall_status = "healthy"
@@ -3,19 +3,23 @@ Inventory management API endpoints
 Raktárkezelési API végpontok
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime, timedelta
 from decimal import Decimal
 from pydantic import BaseModel, Field
 
-from app.database import get_db
-from app.core.deps import get_current_active_user
+from app.database import get_async_db, get_db
+from app.core.deps import get_current_active_user, get_current_active_user_async
 from app.core.rbac import require_permission, PermissionActions, Resources
 from app.models.auth import User
 from app.models.inventory import InventoryItem, Warehouse, StockMovement, StockAlert, StockTake
 from app.services.inventory_service import InventoryService
+from app.services.stock_posting import StockPosting
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
 
@@ -46,6 +50,40 @@ class StockAdjustmentRequest(BaseModel):
     notes: Optional[str] = None
 
 
+class StockPostingLine(BaseModel):
+    inventory_item_id: int
+    movement_type: Literal["receipt", "issue", "adjustment"]
+    quantity: Decimal = Field(..., ge=0, description="Received/issued quantity, or counted quantity for adjustments")
+    unit_cost: Optional[Decimal] = Field(None, ge=0)
+    work_order_id: Optional[int] = None
+    reason: Optional[str] = None
+    reference_type: Optional[str] = None
+    reference_id: Optional[int] = None
+    notes: Optional[str] = None
+
+
+class StockPostingBatchRequest(BaseModel):
+    lines: List[StockPostingLine] = Field(..., min_length=1, max_length=200)
+
+
+class StockBulkLine(BaseModel):
+    inventory_item_id: int
+    movement_type: Literal["receipt", "issue"]
+    quantity: Decimal = Field(..., gt=0)
+    unit_cost: Optional[Decimal] = Field(None, ge=0)
+    work_order_id: Optional[int] = None
+    reason: Optional[str] = None
+    reference_type: Optional[str] = None
+    reference_id: Optional[int] = None
+    document_number: Optional[str] = Field(None, max_length=100)
+    notes: Optional[str] = None
+
+
+class StockBulkRequest(BaseModel):
+    lines: List[StockBulkLine] = Field(..., min_length=1, max_length=10000)
+    atomic: bool = Field(False, description="Reject the whole feed if any line is invalid")
+
+
 class StockBalanceResponse(BaseModel):
     warehouse_code: str
     warehouse_name: str
@@ -88,15 +126,14 @@ class StockMovementResponse(BaseModel):
 @require_permission(Resources.GATE, PermissionActions.UPDATE)
 async def receive_stock(
     request: StockReceiptRequest,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Bevételezés - Receive stock into inventory
     """
     try:
-        inventory_service = InventoryService(db)
-        movement = inventory_service.receive_stock(
+        movement = await db.run_sync(lambda session: InventoryService(session).receive_stock(
             inventory_item_id=request.inventory_item_id,
             quantity=request.quantity,
             unit_cost=request.unit_cost,
@@ -104,7 +141,7 @@ async def receive_stock(
             reference_id=request.reference_id,
             notes=request.notes,
             user_id=current_user.id
-        )
+        ))
         
         return {
             "status": "success",
@@ -122,15 +159,14 @@ async def receive_stock(
 @require_permission(Resources.GATE, PermissionActions.UPDATE)
 async def issue_stock(
     request: StockIssueRequest,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Kiadás - Issue stock from inventory
     """
     try:
-        inventory_service = InventoryService(db)
-        movement, part_usage = inventory_service.issue_stock(
+        movement, part_usage = await db.run_sync(lambda session: InventoryService(session).issue_stock(
             inventory_item_id=request.inventory_item_id,
             quantity=request.quantity,
             work_order_id=request.work_order_id,
@@ -138,7 +174,7 @@ async def issue_stock(
             reference_id=request.reference_id,
             notes=request.notes,
             user_id=current_user.id
-        )
+        ))
         
         response = {
             "status": "success",
@@ -162,21 +198,20 @@ async def issue_stock(
 @require_permission(Resources.GATE, PermissionActions.UPDATE)
 async def adjust_stock(
     request: StockAdjustmentRequest,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Leltári korrekció - Adjust stock levels
     """
     try:
-        inventory_service = InventoryService(db)
-        movement = inventory_service.adjust_stock(
+        movement = await db.run_sync(lambda session: InventoryService(session).adjust_stock(
             inventory_item_id=request.inventory_item_id,
             new_quantity=request.new_quantity,
             reason=request.reason,
             notes=request.notes,
             user_id=current_user.id
-        )
+        ))
         
         if not movement:
             return {
@@ -196,25 +231,120 @@ async def adjust_stock(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.post("/postings")
+@require_permission(Resources.GATE, PermissionActions.UPDATE)
+async def post_stock_movements(
+    request: StockPostingBatchRequest,
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
+) -> Dict[str, Any]:
+    """
+    Tömeges könyvelés - Post several receipts/issues/adjustments in one transaction
+    
+    Either every line is posted or none (e.g. a work order consuming 30 parts).
+    """
+    postings = [
+        StockPosting(
+            inventory_item_id=line.inventory_item_id,
+            movement_type=line.movement_type,
+            quantity=line.quantity,
+            unit_cost=line.unit_cost,
+            work_order_id=line.work_order_id,
+            movement_reason=line.reason,
+            reference_type=line.reference_type,
+            reference_id=line.reference_id,
+            notes=line.notes
+        )
+        for line in request.lines
+    ]
+    
+    try:
+        result = await db.run_sync(lambda session: InventoryService(session).post_movements(
+            postings,
+            user_id=current_user.id
+        ))
+        
+        return {
+            "status": "success",
+            "movement_numbers": [movement.movement_number if movement else None for movement in result.movements],
+            "part_usage_ids": [usage.id if usage else None for usage in result.part_usages],
+            "message": f"Successfully posted {sum(1 for m in result.movements if m)} movements"
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/bulk")
+@require_permission(Resources.GATE, PermissionActions.UPDATE)
+async def bulk_post_stock_movements(
+    request: StockBulkRequest,
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
+) -> Dict[str, Any]:
+    """
+    Tömeges bevételezés / kiadás - Bulk receipts and issues (warehouse receipts, ERP feeds)
+    
+    Lines are posted in order; invalid lines are reported in ``rejected``
+    unless ``atomic`` is set, in which case nothing is posted.
+    """
+    postings = [
+        StockPosting(
+            inventory_item_id=line.inventory_item_id,
+            movement_type=line.movement_type,
+            quantity=line.quantity,
+            unit_cost=line.unit_cost,
+            work_order_id=line.work_order_id,
+            movement_reason=line.reason,
+            reference_type=line.reference_type,
+            reference_id=line.reference_id,
+            document_number=line.document_number,
+            notes=line.notes
+        )
+        for line in request.lines
+    ]
+    
+    try:
+        result = await db.run_sync(lambda session: InventoryService(session).bulk_post_movements(
+            postings,
+            user_id=current_user.id,
+            atomic=request.atomic
+        ))
+        
+        return {
+            "status": "success" if not result.rejected else "partial",
+            "posted": result.posted,
+            "movement_numbers": result.movement_numbers,
+            "rejected": [{"line": index, "error": error} for index, error in result.rejected],
+            "message": f"Posted {result.posted} of {len(postings)} lines"
+        }
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/balance", response_model=List[StockBalanceResponse])
 @require_permission(Resources.GATE, PermissionActions.READ)
 async def get_stock_balance_report(
     warehouse_id: Optional[int] = Query(None, description="Filter by warehouse"),
     part_id: Optional[int] = Query(None, description="Filter by part"),
     include_zero_stock: bool = Query(False, description="Include zero stock items"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> List[Dict[str, Any]]:
     """
     Készletegyenleg riport - Stock balance report
     """
     try:
-        inventory_service = InventoryService(db)
-        report = inventory_service.get_stock_balance_report(
+        report = await db.run_sync(lambda session: InventoryService(session).get_stock_balance_report(
             warehouse_id=warehouse_id,
             part_id=part_id,
             include_zero_stock=include_zero_stock
-        )
+        ))
         
         return report
         
@@ -222,36 +352,104 @@ async def get_stock_balance_report(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/balance/as-of")
+@require_permission(Resources.GATE, PermissionActions.READ)
+async def get_stock_balance_as_of(
+    as_of: datetime = Query(..., description="Point in time"),
+    warehouse_id: Optional[int] = Query(None, description="Filter by warehouse"),
+    part_id: Optional[int] = Query(None, description="Filter by part"),
+    include_zero_stock: bool = Query(False, description="Include zero stock items"),
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
+) -> List[Dict[str, Any]]:
+    """
+    Készletegyenleg adott időpontban - Stock balance as of a date (from ledger snapshots)
+    """
+    try:
+        return await db.run_sync(lambda session: InventoryService(session).get_stock_balance_as_of(
+            as_of=as_of,
+            warehouse_id=warehouse_id,
+            part_id=part_id,
+            include_zero_stock=include_zero_stock
+        ))
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/movements", response_model=List[StockMovementResponse])
 @require_permission(Resources.GATE, PermissionActions.READ)
 async def get_stock_movement_report(
+    response: Response,
     start_date: datetime = Query(..., description="Start date"),
     end_date: datetime = Query(..., description="End date"),
     warehouse_id: Optional[int] = Query(None, description="Filter by warehouse"),
     part_id: Optional[int] = Query(None, description="Filter by part"),
     movement_type: Optional[str] = Query(None, description="Filter by movement type"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(500, ge=1, le=5000, description="Page size"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> List[Dict[str, Any]]:
     """
     Készletmozgás riport - Stock movement report
+    
+    Keyset paginated, newest first: while the X-Next-Cursor response header
+    is present, pass it back as ``cursor`` to get the next page.
     """
     try:
-        inventory_service = InventoryService(db)
-        report = inventory_service.get_stock_movement_report(
+        report = await db.run_sync(lambda session: InventoryService(session).get_stock_movement_report(
             start_date=start_date,
             end_date=end_date,
             warehouse_id=warehouse_id,
             part_id=part_id,
-            movement_type=movement_type
-        )
+            movement_type=movement_type,
+            limit=limit,
+            cursor=cursor
+        ))
+        
+        next_cursor = InventoryService.next_movement_cursor(report, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         
         return report
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/movements/export")
+@require_permission(Resources.GATE, PermissionActions.READ)
+async def export_stock_movement_report(
+    start_date: datetime = Query(..., description="Start date"),
+    end_date: datetime = Query(..., description="End date"),
+    warehouse_id: Optional[int] = Query(None, description="Filter by warehouse"),
+    part_id: Optional[int] = Query(None, description="Filter by part"),
+    movement_type: Optional[str] = Query(None, description="Filter by movement type"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Készletmozgás riport CSV export - Stream the whole movement report as CSV
+    """
+    csv_stream = InventoryService(db).iter_stock_movement_report_csv(
+        start_date=start_date,
+        end_date=end_date,
+        warehouse_id=warehouse_id,
+        part_id=part_id,
+        movement_type=movement_type
+    )
+    
+    filename = f"stock_movements_{start_date:%Y%m%d}_{end_date:%Y%m%d}.csv"
+    return StreamingResponse(
+        csv_stream,
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
 @router.get("/alerts")
 @require_permission(Resources.GATE, PermissionActions.READ)
 async def get_stock_alerts(
@@ -260,14 +458,14 @@ async def get_stock_alerts(
     severity: Optional[str] = Query(None, description="Filter by severity"),
     warehouse_id: Optional[int] = Query(None, description="Filter by warehouse"),
     limit: int = Query(50, le=100, description="Maximum number of alerts"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> List[Dict[str, Any]]:
     """
     Készletriasztások - Get stock alerts
     """
-    try:
-        query = db.query(StockAlert)\
+    def _load_alerts(session: Session) -> List[Dict[str, Any]]:
+        query = session.query(StockAlert)\
             .join(InventoryItem)\
             .join(InventoryItem.part)\
             .join(InventoryItem.warehouse)
@@ -308,6 +506,33 @@ async def get_stock_alerts(
             })
         
         return result
+    
+    try:
+        return await db.run_sync(_load_alerts)
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get("/alerts/stock-levels")
+@require_permission(Resources.GATE, PermissionActions.READ)
+async def get_stock_level_alerts(
+    warehouse_id: Optional[int] = Query(None, description="Filter by warehouse"),
+    limit: int = Query(50, ge=1, le=500, description="Items per alert list"),
+    offset: int = Query(0, ge=0, description="Items to skip in each list"),
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
+) -> Dict[str, Any]:
+    """
+    Készletszint riasztások - Low stock, overstock and slow-moving items (sorted pages)
+    """
+    try:
+        return await db.run_sync(lambda session: InventoryService(session).generate_stock_alerts(
+            org_id=current_user.organization_id,
+            warehouse_id=warehouse_id,
+            limit=limit,
+            offset=offset
+        ))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -317,14 +542,14 @@ async def get_stock_alerts(
 @require_permission(Resources.GATE, PermissionActions.UPDATE)
 async def acknowledge_alert(
     alert_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Riasztás nyugtázása - Acknowledge stock alert
     """
     try:
-        alert = db.query(StockAlert).get(alert_id)
+        alert = await db.get(StockAlert, alert_id)
         if not alert:
             raise HTTPException(status_code=404, detail="Alert not found")
         
@@ -332,7 +557,7 @@ async def acknowledge_alert(
         alert.acknowledged_at = datetime.utcnow()
         alert.acknowledged_by = current_user.id
         
-        db.commit()
+        await db.commit()
         
         return {
             "status": "success",
@@ -346,15 +571,14 @@ async def acknowledge_alert(
 @router.get("/validation")
 @require_permission(Resources.GATE, PermissionActions.READ)
 async def validate_double_entry_balance(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Kettős könyvelés egyenleg ellenőrzése - Validate double-entry balance
     """
     try:
-        inventory_service = InventoryService(db)
-        validation_result = inventory_service.validate_double_entry_balance()
+        validation_result = await db.run_sync(lambda session: InventoryService(session).validate_double_entry_balance())
         
         return {
             "status": "success",
@@ -369,19 +593,19 @@ async def validate_double_entry_balance(
 @require_permission(Resources.GATE, PermissionActions.READ)
 async def get_warehouses(
     is_active: bool = Query(True, description="Filter by active status"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> List[Dict[str, Any]]:
     """
     Raktárak listája - Get warehouses list
     """
     try:
-        query = db.query(Warehouse)
+        query = select(Warehouse)
         
         if is_active is not None:
-            query = query.filter(Warehouse.is_active == is_active)
+            query = query.where(Warehouse.is_active == is_active)
         
-        warehouses = query.order_by(Warehouse.name).all()
+        warehouses = (await db.execute(query.order_by(Warehouse.name))).scalars().all()
         
         result = []
         for warehouse in warehouses:
@@ -420,14 +644,14 @@ async def get_inventory_items(
     part_id: Optional[int] = Query(None, description="Filter by part"),
     low_stock_only: bool = Query(False, description="Show only low stock items"),
     limit: int = Query(100, le=500, description="Maximum number of items"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ) -> List[Dict[str, Any]]:
     """
     Készlet tételek listája - Get inventory items list
     """
-    try:
-        query = db.query(InventoryItem)\
+    def _load_items(session: Session) -> List[Dict[str, Any]]:
+        query = session.query(InventoryItem)\
             .join(InventoryItem.part)\
             .join(InventoryItem.warehouse)
         
@@ -485,6 +709,9 @@ async def get_inventory_items(
             })
         
         return result
+    
+    try:
+        return await db.run_sync(_load_items)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
\ No newline at end of file
@@ -3,6 +3,7 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import io
 
@@ -77,7 +78,9 @@ async def get_qr_code_info(
     
     try:
         # Generate token
-        token = label_service.generate_field_token(
+        # Token state lookup may reach Redis / the database - keep it off the event loop
+        token = await run_in_threadpool(
+            label_service.generate_field_token,
             gate_id=gate_id,
             org_id=current_user.organization_id,
             expires_hours=expires_hours
@@ -222,7 +225,7 @@ async def generate_label_image(
                 templates["zebra_zpl"] = create_zebra_zpl_template(
                     gate.name,
                     gate.gate_code or f"G{gate.id:04d}",
-                    "QR_DATA_PLACEHOLDER"  # Would need actual ZPL QR encoding
+                    label_service.generate_field_url(gate)
                 )
             
             if request.label_type in ["brother", "standard"]:
@@ -246,28 +249,40 @@ async def download_label_image(
     label_type: str = Query("standard", description="Label type"),
     width: int = Query(400, ge=200, le=1200),
     height: int = Query(300, ge=150, le=900),
+    format: str = Query("png", pattern="^(png|pdf)$", description="png for previews, pdf (vector) for printing"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
-    Download printable label image as PNG file.
+    Download printable label as PNG image or vector PDF (width/height in points).
     """
     label_service = LabelService(db)
     
     try:
-        label_data = label_service.generate_label_image(
-            gate_id=gate_id,
-            org_id=current_user.organization_id,
-            label_type=label_type,
-            width=width,
-            height=height
-        )
+        if format == "pdf":
+            label_data = label_service.generate_label_pdf(
+                gate_id=gate_id,
+                org_id=current_user.organization_id,
+                label_type=label_type,
+                width=width,
+                height=height
+            )
+            media_type = "application/pdf"
+        else:
+            label_data = label_service.generate_label_image(
+                gate_id=gate_id,
+                org_id=current_user.organization_id,
+                label_type=label_type,
+                width=width,
+                height=height
+            )
+            media_type = "image/png"
         
         return Response(
             content=label_data,
-            media_type="image/png",
+            media_type=media_type,
             headers={
-                "Content-Disposition": f"attachment; filename=gate_{gate_id}_label_{label_type}.png"
+                "Content-Disposition": f"attachment; filename=gate_{gate_id}_label_{label_type}.{format}"
             }
         )
         
@@ -291,7 +306,7 @@ async def access_gate_by_token(
     
     try:
         # Verify token and get payload
-        payload = label_service.verify_field_token(token)
+        payload = await run_in_threadpool(label_service.verify_field_token, token)
         
         gate_id = payload["gate_id"]
         org_id = payload["org_id"]
@@ -2,8 +2,10 @@
 QR címkék API endpoints
 """
 import io
+import uuid
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
@@ -11,7 +13,12 @@ from pydantic import BaseModel
 from app.core.deps import get_db, get_current_active_user
 from app.core.rbac import require_permission, RBACPermission, Resources, PermissionActions
 from app.models.auth import User
+from app.core.celery_app import celery_app
+from app.core.config import settings
 from app.services.qr_labels import QRLabelService
+from app.services.qr_label_renderer import (
+    label_job_owner, open_label_job_pdf, record_label_job_owner, render_bulk_labels_pdf
+)
 from app.models.organization import Gate
 
 router = APIRouter(prefix="/qr-labels", tags=["qr-labels"])
@@ -28,6 +35,16 @@ class BulkLabelRequest(BaseModel):
     labels_per_page: int = 9
 
 
+class BulkLabelJobResponse(BaseModel):
+    """Háttérben futó címke PDF feladat állapota"""
+    job_id: str
+    status: str
+    done: int = 0
+    total: int = 0
+    download_url: Optional[str] = None
+    error: Optional[str] = None
+
+
 class FactoryQRImportResult(BaseModel):
     """Gyári QR import eredmény"""
     success_count: int
@@ -43,7 +60,7 @@ class QRMappingRequest(BaseModel):
 
 
 @router.post("/bulk-pdf", response_class=Response)
-@require_permission(Resource.GATES, Permission.READ)
+@require_permission(Resources.GATE, PermissionActions.READ)
 async def generate_bulk_labels_pdf(
     request: BulkLabelRequest,
     db: Session = Depends(get_db),
@@ -61,7 +78,8 @@ async def generate_bulk_labels_pdf(
         building_ids=request.building_ids,
         site_ids=request.site_ids,
         client_ids=request.client_ids,
-        include_inactive=request.include_inactive
+        include_inactive=request.include_inactive,
+        org_id=current_user.organization_id
     )
     
     if not gates:
@@ -70,6 +88,16 @@ async def generate_bulk_labels_pdf(
             detail="Nem találhatók kapuk a megadott szűrőkkel"
         )
     
+    # Nagy tételek csak háttérfeladatként
+    if len(gates) > settings.LABEL_SYNC_MAX_GATES:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"{len(gates)} kapu túl sok egy kéréshez (max. {settings.LABEL_SYNC_MAX_GATES}), "
+                "használja a POST /qr-labels/bulk-pdf/jobs végpontot"
+            )
+        )
+    
     # PDF generálása
     pdf_data = qr_service.create_bulk_labels_pdf(
         gates=gates,
@@ -86,8 +114,120 @@ async def generate_bulk_labels_pdf(
     )
 
 
+@router.post("/bulk-pdf/jobs", response_model=BulkLabelJobResponse, status_code=202)
+@require_permission(Resources.GATE, PermissionActions.READ)
+async def create_bulk_labels_pdf_job(
+    request: BulkLabelRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Tömeges QR címke PDF generálása háttérfeladatként
+    
+    Nagy tételekhez (pl. több ezer kapus telephely): a címkék párhuzamosan
+    renderelődnek, az állapot a GET /bulk-pdf/jobs/{job_id} végponton követhető.
+    """
+    qr_service = QRLabelService()
+    
+    gates = qr_service.get_gates_for_labels(
+        db=db,
+        gate_ids=request.gate_ids,
+        building_ids=request.building_ids,
+        site_ids=request.site_ids,
+        client_ids=request.client_ids,
+        include_inactive=request.include_inactive,
+        org_id=current_user.organization_id
+    )
+    
+    if not gates:
+        raise HTTPException(
+            status_code=404,
+            detail="Nem találhatók kapuk a megadott szűrőkkel"
+        )
+    
+    job_id = str(uuid.uuid4())
+    record_label_job_owner(job_id, current_user.organization_id)
+    render_bulk_labels_pdf.apply_async(
+        args=[[gate.id for gate in gates]],
+        kwargs={
+            'labels_per_row': request.labels_per_row,
+            'labels_per_page': request.labels_per_page,
+            'org_id': current_user.organization_id
+        },
+        task_id=job_id
+    )
+    
+    return BulkLabelJobResponse(job_id=job_id, status="PENDING", total=len(gates))
+
+
+@router.get("/bulk-pdf/jobs/{job_id}", response_model=BulkLabelJobResponse)
+@require_permission(Resources.GATE, PermissionActions.READ)
+async def get_bulk_labels_pdf_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Címke PDF feladat állapota és haladása
+    """
+    result = celery_app.AsyncResult(_validate_job_id(job_id, current_user))
+    info = result.info if isinstance(result.info, dict) else {}
+    
+    response = BulkLabelJobResponse(
+        job_id=job_id,
+        status=result.state,
+        done=info.get('done', 0),
+        total=info.get('total', 0)
+    )
+    
+    if result.state == 'SUCCESS':
+        response.download_url = f"{settings.API_V1_STR}/qr-labels/bulk-pdf/jobs/{job_id}/download"
+    elif result.state == 'FAILURE':
+        response.error = str(result.info)
+    
+    return response
+
+
+@router.get("/bulk-pdf/jobs/{job_id}/download", response_class=StreamingResponse)
+@require_permission(Resources.GATE, PermissionActions.READ)
+async def download_bulk_labels_pdf_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Elkészült címke PDF letöltése (a közös tárolóból, amelybe a worker írta)
+    """
+    job_id = _validate_job_id(job_id, current_user)
+    chunks = await run_in_threadpool(open_label_job_pdf, job_id)
+    
+    if chunks is None:
+        raise HTTPException(
+            status_code=404,
+            detail="A PDF még nem készült el vagy már lejárt"
+        )
+    
+    return StreamingResponse(
+        chunks,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename=qr_labels_{job_id}.pdf"}
+    )
+
+
+def _validate_job_id(job_id: str, current_user: User) -> str:
+    """Feladat azonosító ellenőrzése (Celery task UUID, a felhasználó szervezetéé)"""
+    try:
+        job_id = str(uuid.UUID(job_id))
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Ismeretlen feladat")
+    
+    # Más szervezet feladata ugyanúgy ismeretlen, mint a nem létező
+    owner = label_job_owner(job_id)
+    if owner is None or owner.get('org_id') != current_user.organization_id:
+        raise HTTPException(status_code=404, detail="Ismeretlen feladat")
+    return job_id
+
+
 @router.get("/sample-pdf", response_class=Response)
-@require_permission(Resource.GATES, Permission.READ)
+@require_permission(Resources.GATE, PermissionActions.READ)
 async def generate_sample_labels(
     count: int = Query(6, ge=1, le=20),
     db: Session = Depends(get_db),
@@ -110,7 +250,7 @@ async def generate_sample_labels(
 
 
 @router.post("/factory-qr/import", response_model=FactoryQRImportResult)
-@require_permission(Resource.GATES, Permission.UPDATE)
+@require_permission(Resources.GATE, PermissionActions.UPDATE)
 async def import_factory_qr_csv(
     file: UploadFile = File(...),
     batch_name: Optional[str] = Form(None),
@@ -161,7 +301,7 @@ async def import_factory_qr_csv(
 
 
 @router.post("/factory-qr/generate-mapping")
-@require_permission(Resource.GATES, Permission.CREATE)  
+@require_permission(Resources.GATE, PermissionActions.CREATE)  
 async def generate_factory_qr_mapping(
     request: QRMappingRequest,
     current_user: User = Depends(get_current_active_user)
@@ -192,7 +332,7 @@ async def generate_factory_qr_mapping(
 
 
 @router.get("/gates/eligible")
-@require_permission(Resource.GATES, Permission.READ)
+@require_permission(Resources.GATE, PermissionActions.READ)
 async def get_eligible_gates(
     building_id: Optional[int] = Query(None),
     site_id: Optional[int] = Query(None),
@@ -246,7 +386,7 @@ async def get_eligible_gates(
 
 
 @router.get("/factory-qr/stats")
-@require_permission(Resource.GATES, Permission.READ)
+@require_permission(Resources.GATE, PermissionActions.READ)
 async def get_factory_qr_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -2,11 +2,11 @@
 
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.core.rbac import require_permissions, RBACPermission
-from app.core.rbac import get_current_active_user
+from app.core.deps import get_current_active_user_async
 from app.models.auth import User
 from app.services.structure import ClientService, SiteService, BuildingService, GateService
 from app.schemas.structure import (
@@ -30,29 +30,27 @@ router = APIRouter(prefix="/api/v1/structure", tags=["structure"])
 @require_permissions([RBACPermission.MANAGE_CLIENTS])
 async def create_client(
     client_data: ClientCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new client."""
-    service = ClientService(db)
-    return service.create_client(current_user.organization_id, client_data)
+    return await db.run_sync(lambda session: ClientService(session).create_client(current_user.organization_id, client_data))
 
 
 @router.get("/clients/{client_id}", response_model=ClientWithStats)
 @require_permissions([RBACPermission.VIEW_CLIENTS])
 async def get_client(
     client_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get client by ID with statistics."""
-    service = ClientService(db)
-    client = service.get_client(current_user.organization_id, client_id)
+    client = await db.run_sync(lambda session: ClientService(session).get_client(current_user.organization_id, client_id))
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     
     # Add statistics
-    stats = service.get_client_stats(current_user.organization_id, client_id)
+    stats = await db.run_sync(lambda session: ClientService(session).get_client_stats(current_user.organization_id, client_id))
     client_dict = client.__dict__.copy()
     client_dict.update(stats)
     
@@ -70,8 +68,8 @@ async def get_clients(
     # Pagination parameters
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Page size"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get clients with search and pagination."""
     search_params = ClientSearchParams(
@@ -79,10 +77,9 @@ async def get_clients(
     )
     pagination_params = PaginationParams(page=page, size=size)
     
-    service = ClientService(db)
-    clients, total = service.get_clients(
+    clients, total = await db.run_sync(lambda session: ClientService(session).get_clients(
         current_user.organization_id, search_params, pagination_params
-    )
+    ))
     
     pages = (total + size - 1) // size
     
@@ -100,12 +97,11 @@ async def get_clients(
 async def update_client(
     client_id: int,
     client_data: ClientUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update client."""
-    service = ClientService(db)
-    client = service.update_client(current_user.organization_id, client_id, client_data)
+    client = await db.run_sync(lambda session: ClientService(session).update_client(current_user.organization_id, client_id, client_data))
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     return client
@@ -115,12 +111,11 @@ async def update_client(
 @require_permissions([RBACPermission.MANAGE_CLIENTS])
 async def delete_client(
     client_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete client (soft delete)."""
-    service = ClientService(db)
-    success = service.delete_client(current_user.organization_id, client_id)
+    success = await db.run_sync(lambda session: ClientService(session).delete_client(current_user.organization_id, client_id))
     if not success:
         raise HTTPException(status_code=404, detail="Client not found")
     return {"message": "Client deleted successfully"}
@@ -131,29 +126,27 @@ async def delete_client(
 @require_permissions([RBACPermission.MANAGE_SITES])
 async def create_site(
     site_data: SiteCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new site."""
-    service = SiteService(db)
-    return service.create_site(current_user.organization_id, site_data)
+    return await db.run_sync(lambda session: SiteService(session).create_site(current_user.organization_id, site_data))
 
 
 @router.get("/sites/{site_id}", response_model=SiteWithStats)
 @require_permissions([RBACPermission.VIEW_SITES])
 async def get_site(
     site_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get site by ID with statistics."""
-    service = SiteService(db)
-    site = service.get_site(current_user.organization_id, site_id)
+    site = await db.run_sync(lambda session: SiteService(session).get_site(current_user.organization_id, site_id))
     if not site:
         raise HTTPException(status_code=404, detail="Site not found")
     
     # Add statistics
-    stats = service.get_site_stats(current_user.organization_id, site_id)
+    stats = await db.run_sync(lambda session: SiteService(session).get_site_stats(current_user.organization_id, site_id))
     site_dict = site.__dict__.copy()
     site_dict.update(stats)
     
@@ -171,8 +164,8 @@ async def get_sites(
     # Pagination parameters
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Page size"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get sites with search and pagination."""
     search_params = SiteSearchParams(
@@ -180,10 +173,9 @@ async def get_sites(
     )
     pagination_params = PaginationParams(page=page, size=size)
     
-    service = SiteService(db)
-    sites, total = service.get_sites(
+    sites, total = await db.run_sync(lambda session: SiteService(session).get_sites(
         current_user.organization_id, search_params, pagination_params
-    )
+    ))
     
     pages = (total + size - 1) // size
     
@@ -201,12 +193,11 @@ async def get_sites(
 async def update_site(
     site_id: int,
     site_data: SiteUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update site."""
-    service = SiteService(db)
-    site = service.update_site(current_user.organization_id, site_id, site_data)
+    site = await db.run_sync(lambda session: SiteService(session).update_site(current_user.organization_id, site_id, site_data))
     if not site:
         raise HTTPException(status_code=404, detail="Site not found")
     return site
@@ -216,12 +207,11 @@ async def update_site(
 @require_permissions([RBACPermission.MANAGE_SITES])
 async def delete_site(
     site_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete site (soft delete)."""
-    service = SiteService(db)
-    success = service.delete_site(current_user.organization_id, site_id)
+    success = await db.run_sync(lambda session: SiteService(session).delete_site(current_user.organization_id, site_id))
     if not success:
         raise HTTPException(status_code=404, detail="Site not found")
     return {"message": "Site deleted successfully"}
@@ -232,29 +222,27 @@ async def delete_site(
 @require_permissions([RBACPermission.MANAGE_BUILDINGS])
 async def create_building(
     building_data: BuildingCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new building."""
-    service = BuildingService(db)
-    return service.create_building(current_user.organization_id, building_data)
+    return await db.run_sync(lambda session: BuildingService(session).create_building(current_user.organization_id, building_data))
 
 
 @router.get("/buildings/{building_id}", response_model=BuildingWithStats)
 @require_permissions([RBACPermission.VIEW_BUILDINGS])
 async def get_building(
     building_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get building by ID with statistics."""
-    service = BuildingService(db)
-    building = service.get_building(current_user.organization_id, building_id)
+    building = await db.run_sync(lambda session: BuildingService(session).get_building(current_user.organization_id, building_id))
     if not building:
         raise HTTPException(status_code=404, detail="Building not found")
     
     # Add statistics
-    stats = service.get_building_stats(current_user.organization_id, building_id)
+    stats = await db.run_sync(lambda session: BuildingService(session).get_building_stats(current_user.organization_id, building_id))
     building_dict = building.__dict__.copy()
     building_dict.update(stats)
     
@@ -272,8 +260,8 @@ async def get_buildings(
     # Pagination parameters
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Page size"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get buildings with search and pagination."""
     search_params = BuildingSearchParams(
@@ -281,10 +269,9 @@ async def get_buildings(
     )
     pagination_params = PaginationParams(page=page, size=size)
     
-    service = BuildingService(db)
-    buildings, total = service.get_buildings(
+    buildings, total = await db.run_sync(lambda session: BuildingService(session).get_buildings(
         current_user.organization_id, search_params, pagination_params
-    )
+    ))
     
     pages = (total + size - 1) // size
     
@@ -302,12 +289,11 @@ async def get_buildings(
 async def update_building(
     building_id: int,
     building_data: BuildingUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update building."""
-    service = BuildingService(db)
-    building = service.update_building(current_user.organization_id, building_id, building_data)
+    building = await db.run_sync(lambda session: BuildingService(session).update_building(current_user.organization_id, building_id, building_data))
     if not building:
         raise HTTPException(status_code=404, detail="Building not found")
     return building
@@ -317,12 +303,11 @@ async def update_building(
 @require_permissions([RBACPermission.MANAGE_BUILDINGS])
 async def delete_building(
     building_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete building (soft delete)."""
-    service = BuildingService(db)
-    success = service.delete_building(current_user.organization_id, building_id)
+    success = await db.run_sync(lambda session: BuildingService(session).delete_building(current_user.organization_id, building_id))
     if not success:
         raise HTTPException(status_code=404, detail="Building not found")
     return {"message": "Building deleted successfully"}
@@ -333,24 +318,22 @@ async def delete_building(
 @require_permissions([RBACPermission.MANAGE_GATES])
 async def create_gate(
     gate_data: GateCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new gate."""
-    service = GateService(db)
-    return service.create_gate(current_user.organization_id, gate_data)
+    return await db.run_sync(lambda session: GateService(session).create_gate(current_user.organization_id, gate_data))
 
 
 @router.get("/gates/{gate_id}", response_model=GateResponse)
 @require_permissions([RBACPermission.VIEW_GATES])
 async def get_gate(
     gate_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get gate by ID."""
-    service = GateService(db)
-    gate = service.get_gate(current_user.organization_id, gate_id)
+    gate = await db.run_sync(lambda session: GateService(session).get_gate(current_user.organization_id, gate_id))
     if not gate:
         raise HTTPException(status_code=404, detail="Gate not found")
     return gate
@@ -369,8 +352,8 @@ async def get_gates(
     # Pagination parameters
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Page size"),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get gates with search and pagination."""
     search_params = GateSearchParams(
@@ -383,10 +366,9 @@ async def get_gates(
     )
     pagination_params = PaginationParams(page=page, size=size)
     
-    service = GateService(db)
-    gates, total = service.get_gates(
+    gates, total = await db.run_sync(lambda session: GateService(session).get_gates(
         current_user.organization_id, search_params, pagination_params
-    )
+    ))
     
     pages = (total + size - 1) // size
     
@@ -404,12 +386,11 @@ async def get_gates(
 async def update_gate(
     gate_id: int,
     gate_data: GateUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update gate."""
-    service = GateService(db)
-    gate = service.update_gate(current_user.organization_id, gate_id, gate_data)
+    gate = await db.run_sync(lambda session: GateService(session).update_gate(current_user.organization_id, gate_id, gate_data))
     if not gate:
         raise HTTPException(status_code=404, detail="Gate not found")
     return gate
@@ -419,12 +400,11 @@ async def update_gate(
 @require_permissions([RBACPermission.MANAGE_GATES])
 async def delete_gate(
     gate_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete gate (soft delete)."""
-    service = GateService(db)
-    success = service.delete_gate(current_user.organization_id, gate_id)
+    success = await db.run_sync(lambda session: GateService(session).delete_gate(current_user.organization_id, gate_id))
     if not success:
         raise HTTPException(status_code=404, detail="Gate not found")
     return {"message": "Gate deleted successfully"}
\ No newline at end of file
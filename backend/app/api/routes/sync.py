@@ -1,12 +1,13 @@
 """
 API endpoints for delta-based synchronization
 """
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, Header, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db, get_current_active_user
+from app.core.deps import get_async_db, get_current_active_user_async
 from app.core.rbac import require_permission, PermissionActions, Resources
 from app.models.auth import User
 from app.core.sync.service import SyncService, RetryableSync
@@ -22,8 +23,8 @@ router = APIRouter(prefix="/sync", tags=["synchronization"])
 @require_permission(Resources.SYNC, PermissionActions.READ)
 async def pull_changes(
     request: SyncPullRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async),
     user_agent: Optional[str] = Header(None)
 ):
     """
@@ -31,7 +32,7 @@ async def pull_changes(
     
     Supports:
     - Delta-based incremental sync
-    - Batch operations with pagination
+    - Keyset pagination: pass next_cursor back as cursor to resume
     - Conflict detection
     - Entity type filtering
     - Soft delete handling
@@ -43,7 +44,7 @@ async def pull_changes(
         # Add user context to request
         request.client_id = f"{current_user.id}_{request.client_id}"
         
-        response = await retryable_sync.pull_with_retry(request)
+        response = await retryable_sync.pull_with_retry(request, current_user.organization_id)
         
         # Log sync activity
         await _log_sync_activity(
@@ -54,6 +55,11 @@ async def pull_changes(
         
         return response
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -65,8 +71,8 @@ async def pull_changes(
 @require_permission(Resources.SYNC, PermissionActions.UPDATE)
 async def push_changes(
     request: SyncPushRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async),
     user_agent: Optional[str] = Header(None)
 ):
     """
@@ -107,8 +113,8 @@ async def push_changes(
 @require_permission(Resources.SYNC, PermissionActions.UPDATE)
 async def resolve_conflict(
     resolution: ConflictResolution,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
 ):
     """
     Manually resolve a sync conflict
@@ -126,9 +132,9 @@ async def resolve_conflict(
                 detail=f"Unknown entity type: {resolution.entity_type}"
             )
         
-        entity = db.query(model_class).filter(
-            model_class.id == int(resolution.entity_id)
-        ).first()
+        entity = (await db.execute(
+            select(model_class).where(model_class.id == int(resolution.entity_id))
+        )).scalars().first()
         
         if not entity:
             raise HTTPException(
@@ -151,7 +157,7 @@ async def resolve_conflict(
         )
         
         if result['status'] == 'accepted':
-            db.commit()
+            await db.commit()
             return {"message": "Conflict resolved successfully"}
         else:
             raise HTTPException(
@@ -162,7 +168,7 @@ async def resolve_conflict(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Conflict resolution failed: {str(e)}"
@@ -173,8 +179,8 @@ async def resolve_conflict(
 @require_permission(Resources.SYNC, PermissionActions.READ)
 async def get_sync_status(
     entity_type: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
 ):
     """
     Get sync status and statistics
@@ -196,13 +202,19 @@ async def get_sync_status(
         if entity_type:
             model_class = sync_service.ENTITY_MODELS.get(entity_type)
             if model_class:
-                total_entities = db.query(model_class).count()
-                pending_sync = db.query(model_class).filter(
-                    model_class.sync_status == 'pending'
-                ).count()
-                conflicts = db.query(model_class).filter(
-                    model_class.conflict_data.isnot(None)
-                ).count()
+                total_entities = await db.scalar(
+                    select(func.count()).select_from(model_class)
+                )
+                pending_sync = await db.scalar(
+                    select(func.count()).select_from(model_class).where(
+                        model_class.sync_status == 'pending'
+                    )
+                )
+                conflicts = await db.scalar(
+                    select(func.count()).select_from(model_class).where(
+                        model_class.conflict_data.isnot(None)
+                    )
+                )
                 
                 stats["entity_stats"] = {
                     "entity_type": entity_type,
@@ -226,8 +238,8 @@ async def get_conflicts(
     entity_type: Optional[str] = None,
     limit: int = 50,
     offset: int = 0,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
 ):
     """
     Get list of unresolved conflicts
@@ -241,9 +253,11 @@ async def get_conflicts(
             if entity_type and entity_type != entity_type_key:
                 continue
             
-            conflicted_entities = db.query(model_class).filter(
-                model_class.conflict_data.isnot(None)
-            ).offset(offset).limit(limit).all()
+            conflicted_entities = (await db.execute(
+                select(model_class).where(
+                    model_class.conflict_data.isnot(None)
+                ).offset(offset).limit(limit)
+            )).scalars().all()
             
             for entity in conflicted_entities:
                 conflict_info = {
@@ -274,8 +288,8 @@ async def get_conflicts(
 @require_permission(Resources.SYNC, PermissionActions.READ)
 async def batch_pull_changes(
     requests: List[SyncPullRequest],
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
 ):
     """
     Batch pull multiple entity types or time ranges
@@ -288,7 +302,7 @@ async def batch_pull_changes(
     for request in requests:
         try:
             request.client_id = f"{current_user.id}_{request.client_id}"
-            response = await retryable_sync.pull_with_retry(request)
+            response = await retryable_sync.pull_with_retry(request, current_user.organization_id)
             responses.append(response)
         except Exception as e:
             # Continue with other requests even if one fails
@@ -307,8 +321,8 @@ async def batch_pull_changes(
 @require_permission(Resources.SYNC, PermissionActions.UPDATE)
 async def batch_push_changes(
     requests: List[SyncPushRequest],
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
 ):
     """
     Batch push multiple change sets
@@ -345,8 +359,8 @@ async def batch_push_changes(
 async def get_sync_metrics(
     client_id: Optional[str] = None,
     since_hours: int = 24,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
 ):
     """
     Get sync performance metrics
@@ -368,7 +382,7 @@ async def get_sync_metrics(
 
 
 async def _log_sync_activity(
-    db: Session,
+    db: AsyncSession,
     user_id: int,
     operation: str,
     delta_count: int,
@@ -388,34 +402,38 @@ async def _log_sync_activity(
 async def cleanup_tombstones(
     background_tasks: BackgroundTasks,
     older_than_days: int = 30,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user_async)
 ):
     """
     Clean up old tombstone records (soft deleted items)
     
     Removes records that have been soft deleted for more than specified days
+    and compacts the change journal; the latest journal row of every entity
+    is kept, so clients still learn about purged tombstones.
     """
-    def cleanup_task():
+    async def cleanup_task():
         sync_service = SyncService(db)
         
-        cutoff_date = datetime.now().replace(
-            day=datetime.now().day - older_than_days
-        )
+        cutoff_date = datetime.now() - timedelta(days=older_than_days)
         
         total_cleaned = 0
         
         for entity_type, model_class in sync_service.ENTITY_MODELS.items():
-            deleted_count = db.query(model_class).filter(
-                model_class.is_deleted == True,
-                model_class.last_modified_at < cutoff_date
-            ).delete()
+            result = await db.execute(
+                delete(model_class).where(
+                    model_class.is_deleted == True,
+                    model_class.last_modified_at < cutoff_date
+                )
+            )
             
-            total_cleaned += deleted_count
+            total_cleaned += result.rowcount
+        
+        compacted = await sync_service.compact_journal(cutoff_date)
         
-        db.commit()
+        await db.commit()
         
-        return {"cleaned_records": total_cleaned}
+        return {"cleaned_records": total_cleaned, "compacted_journal_entries": compacted}
     
     background_tasks.add_task(cleanup_task)
     
@@ -21,6 +21,7 @@ from app.schemas.tickets import (
     SLAMetrics, TicketComment, CommentCreate
 )
 from app.services.ticket_service import TicketService, WorkOrderService
+from app.services.ticket_summary_service import TicketSummaryService
 from app.services.pdf_service import WorkOrderPDFController
 from app.core.exceptions import ValidationError, NotFoundError, BusinessLogicError
 
@@ -85,6 +86,41 @@ def get_tickets(
         raise HTTPException(status_code=500, detail=f"Error retrieving tickets: {str(e)}")
 
 
+@router.get("/tickets/summary", response_model=TicketSummary)
+def get_ticket_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get ticket summary statistics.
+    
+    Ticket összesítő statisztikák lekérése.
+    """
+    try:
+        return TicketSummaryService(db).ticket_summary(current_user.org_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving ticket summary: {str(e)}")
+
+
+@router.get("/tickets/sla-metrics", response_model=List[SLAMetrics])
+def get_sla_metrics(
+    days_back: int = Query(30, ge=1, le=365),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get SLA performance metrics.
+    
+    SLA teljesítmény metrikák lekérése.
+    """
+    try:
+        ticket_service = TicketService(db)
+        metrics = ticket_service.get_sla_metrics(current_user.org_id, days_back)
+        return metrics
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving SLA metrics: {str(e)}")
+
+
 @router.get("/tickets/{ticket_id}", response_model=TicketResponse)
 def get_ticket(
     ticket_id: int,
@@ -183,25 +219,6 @@ def add_ticket_comment(
         raise HTTPException(status_code=500, detail=f"Error adding comment: {str(e)}")
 
 
-@router.get("/tickets/sla-metrics", response_model=List[SLAMetrics])
-def get_sla_metrics(
-    days_back: int = Query(30, ge=1, le=365),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """
-    Get SLA performance metrics.
-    
-    SLA teljesítmény metrikák lekérése.
-    """
-    try:
-        ticket_service = TicketService(db)
-        metrics = ticket_service.get_sla_metrics(current_user.org_id, days_back)
-        return metrics
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving SLA metrics: {str(e)}")
-
-
 # Work Order Endpoints
 @router.post("/work-orders", response_model=WorkOrderResponse, status_code=status.HTTP_201_CREATED)
 def create_work_order(
@@ -279,6 +296,22 @@ def get_work_orders(
         raise HTTPException(status_code=500, detail=f"Error retrieving work orders: {str(e)}")
 
 
+@router.get("/work-orders/summary", response_model=WorkOrderSummary)
+def get_work_order_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get work order summary statistics.
+    
+    Munkarendelés összesítő statisztikák lekérése.
+    """
+    try:
+        return TicketSummaryService(db).work_order_summary(current_user.org_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving work order summary: {str(e)}")
+
+
 @router.get("/work-orders/{work_order_id}", response_model=WorkOrderResponse)
 def get_work_order(
     work_order_id: int,
@@ -402,143 +435,6 @@ def add_time_log(
         raise HTTPException(status_code=500, detail=f"Error adding time log: {str(e)}")
 
 
-# Summary and Reporting Endpoints
-@router.get("/tickets/summary", response_model=TicketSummary)
-def get_ticket_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """
-    Get ticket summary statistics.
-    
-    Ticket összesítő statisztikák lekérése.
-    """
-    try:
-        ticket_service = TicketService(db)
-        
-        # Get various ticket counts
-        from sqlalchemy import func
-        from app.models.tickets import Ticket
-        
-        # Total tickets
-        total_tickets = db.query(func.count(Ticket.id)).filter(
-            Ticket.org_id == current_user.org_id,
-            Ticket.is_active == True
-        ).scalar()
-        
-        # Open tickets  
-        open_tickets = db.query(func.count(Ticket.id)).filter(
-            Ticket.org_id == current_user.org_id,
-            Ticket.status == TicketStatus.OPEN,
-            Ticket.is_active == True
-        ).scalar()
-        
-        # In progress tickets
-        in_progress_tickets = db.query(func.count(Ticket.id)).filter(
-            Ticket.org_id == current_user.org_id,
-            Ticket.status == TicketStatus.IN_PROGRESS,
-            Ticket.is_active == True
-        ).scalar()
-        
-        # Overdue tickets (SLA breached)
-        from datetime import datetime
-        now = datetime.utcnow()
-        
-        overdue_tickets = db.query(func.count(Ticket.id)).filter(
-            Ticket.org_id == current_user.org_id,
-            Ticket.is_active == True,
-            (
-                (Ticket.sla_response_by < now) & (Ticket.acknowledged_at.is_(None)) |
-                (Ticket.sla_resolution_by < now) & (Ticket.resolved_at.is_(None))
-            )
-        ).scalar()
-        
-        # High priority tickets
-        high_priority_tickets = db.query(func.count(Ticket.id)).filter(
-            Ticket.org_id == current_user.org_id,
-            Ticket.priority.in_([TicketPriority.CRITICAL, TicketPriority.HIGH]),
-            Ticket.status.in_([TicketStatus.OPEN, TicketStatus.IN_PROGRESS, TicketStatus.WAITING_PARTS]),
-            Ticket.is_active == True
-        ).scalar()
-        
-        return TicketSummary(
-            total_tickets=total_tickets,
-            open_tickets=open_tickets,
-            in_progress_tickets=in_progress_tickets,
-            overdue_tickets=overdue_tickets,
-            high_priority_tickets=high_priority_tickets
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving ticket summary: {str(e)}")
-
-
-@router.get("/work-orders/summary", response_model=WorkOrderSummary)
-def get_work_order_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """
-    Get work order summary statistics.
-    
-    Munkarendelés összesítő statisztikák lekérése.
-    """
-    try:
-        from sqlalchemy import func
-        from app.models.tickets import WorkOrder
-        
-        # Total work orders
-        total_work_orders = db.query(func.count(WorkOrder.id)).filter(
-            WorkOrder.org_id == current_user.org_id,
-            WorkOrder.is_active == True
-        ).scalar()
-        
-        # Active work orders
-        active_work_orders = db.query(func.count(WorkOrder.id)).filter(
-            WorkOrder.org_id == current_user.org_id,
-            WorkOrder.status.in_([WorkOrderStatus.SCHEDULED, WorkOrderStatus.IN_PROGRESS, WorkOrderStatus.WAITING_PARTS]),
-            WorkOrder.is_active == True
-        ).scalar()
-        
-        # Completed work orders
-        completed_work_orders = db.query(func.count(WorkOrder.id)).filter(
-            WorkOrder.org_id == current_user.org_id,
-            WorkOrder.status == WorkOrderStatus.COMPLETED,
-            WorkOrder.is_active == True
-        ).scalar()
-        
-        # Calculate total cost for completed work orders
-        from app.models.tickets import PartUsage, WorkOrderTimeLog
-        
-        parts_cost = db.query(func.coalesce(func.sum(PartUsage.total_cost), 0)).join(WorkOrder).filter(
-            WorkOrder.org_id == current_user.org_id,
-            WorkOrder.status == WorkOrderStatus.COMPLETED,
-            WorkOrder.is_active == True,
-            PartUsage.is_active == True
-        ).scalar() or 0
-        
-        labor_cost = db.query(func.coalesce(func.sum(WorkOrderTimeLog.total_cost), 0)).join(WorkOrder).filter(
-            WorkOrder.org_id == current_user.org_id,
-            WorkOrder.status == WorkOrderStatus.COMPLETED,
-            WorkOrder.is_active == True,
-            WorkOrderTimeLog.is_active == True
-        ).scalar() or 0
-        
-        total_cost = float(parts_cost) + float(labor_cost)
-        
-        return WorkOrderSummary(
-            total_work_orders=total_work_orders,
-            active_work_orders=active_work_orders,
-            completed_work_orders=completed_work_orders,
-            total_parts_cost=float(parts_cost),
-            total_labor_cost=float(labor_cost),
-            total_cost=total_cost
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving work order summary: {str(e)}")
-
-
 # PDF Report Generation Endpoints
 @router.get("/work-orders/{work_order_id}/completion-report")
 def generate_work_order_completion_report(
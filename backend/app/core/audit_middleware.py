@@ -12,10 +12,10 @@ import json
 import time
 from datetime import datetime
 
-from app.database import get_db
 from app.services.audit_service import AuditService
+from app.core.audit_writer import get_audit_writer
+from app.core.security import decode_jwt_token
 from app.models.audit_logs import AuditAction, AuditCategory, AuditSeverity, AuditResourceType
-from app.core.deps import get_current_user_optional
 
 
 class AuditMiddleware(BaseHTTPMiddleware):
@@ -70,7 +70,10 @@ class AuditMiddleware(BaseHTTPMiddleware):
         # Log audit entry if needed
         if should_audit and response.status_code < 400:
             try:
-                await self._log_audit_entry(request, response, original_body)
+                await self._log_audit_entry(
+                    request, response, original_body,
+                    duration_ms=int((time.time() - start_time) * 1000)
+                )
             except Exception as e:
                 # Don't let audit logging break the main request
                 print(f"Audit logging failed: {e}")
@@ -103,18 +106,21 @@ class AuditMiddleware(BaseHTTPMiddleware):
         self, 
         request: Request, 
         response: Response, 
-        request_body: Optional[Dict[str, Any]]
+        request_body: Optional[Dict[str, Any]],
+        duration_ms: Optional[int] = None
     ):
-        """Log an audit entry for the request"""
+        """
+        Queue an audit entry for the request
         
-        # Get database session
-        db = next(get_db())
-        audit_service = AuditService(db)
+        The row is handed to the buffered audit writer and the user comes
+        from the token claims, so the request pays for neither an INSERT +
+        commit nor a blocking user lookup on the event loop.
+        """
+        
+        # Extract user info from the access token (no database round trip)
+        user_info = self._get_user_info(request)
         
         try:
-            # Extract user info
-            user_info = await self._get_user_info(request, db)
-            
             # Determine resource type and action
             resource_type = self._get_resource_type(request.url.path)
             action = self.audit_methods.get(request.method, "UNKNOWN")
@@ -129,41 +135,40 @@ class AuditMiddleware(BaseHTTPMiddleware):
             category = self._determine_category(request.url.path, action)
             severity = self._determine_severity(action, response.status_code)
             
-            # Log the audit entry
-            audit_service.log_action(
+            # Queue the audit entry
+            record = AuditService.build_audit_record(
                 action=action,
-                resource_type=resource_type,
+                entity_type=resource_type,
+                entity_id=resource_id,
                 user_id=user_info.get("id"),
-                user_email=user_info.get("email"),
-                user_name=user_info.get("name"),
-                resource_id=resource_id,
+                username=user_info.get("email"),
                 description=description,
                 new_values=request_body,
                 organization_id=user_info.get("organization_id"),
-                severity=severity,
-                category=category,
+                risk_level=self._severity_to_risk_level(severity),
+                duration_ms=duration_ms,
                 request=request
             )
+            record["compliance_flags"] = {"category": category}
+            
+            await get_audit_writer().submit(record)
             
         except Exception as e:
             print(f"Failed to log audit entry: {e}")
-        
-        finally:
-            db.close()
     
-    async def _get_user_info(self, request: Request, db: Session) -> Dict[str, Any]:
-        """Extract user information from request"""
-        try:
-            user = await get_current_user_optional(request, db)
-            if user:
+    def _get_user_info(self, request: Request) -> Dict[str, Any]:
+        """Extract user information from the bearer token claims"""
+        authorization = request.headers.get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            payload = decode_jwt_token(token)
+            if payload and payload.get("type") == "access" and str(payload.get("sub", "")).isdigit():
                 return {
-                    "id": user.id,
-                    "email": user.email,
-                    "name": user.full_name,
-                    "organization_id": user.organization_id
+                    "id": int(payload["sub"]),
+                    "email": payload.get("username"),
+                    "name": payload.get("username"),
+                    "organization_id": payload.get("org_id")
                 }
-        except:
-            pass
         
         return {
             "id": None,
@@ -226,6 +231,14 @@ class AuditMiddleware(BaseHTTPMiddleware):
         else:
             return AuditCategory.BUSINESS
     
+    def _severity_to_risk_level(self, severity: str) -> str:
+        """Map audit severity to the risk_level column"""
+        return {
+            AuditSeverity.WARNING: "MEDIUM",
+            AuditSeverity.ERROR: "HIGH",
+            AuditSeverity.CRITICAL: "CRITICAL",
+        }.get(severity, "LOW")
+    
     def _determine_severity(self, action: str, status_code: int) -> str:
         """Determine severity based on action and response"""
         if status_code >= 500:
@@ -0,0 +1,305 @@
+"""
+Buffered audit log writer
+Pufferelt audit napló író
+
+Request handlers hand audit rows to an in-process bounded queue instead of
+committing them synchronously. A background task drains the queue and writes
+every AUDIT_BATCH_SIZE rows (or every AUDIT_FLUSH_INTERVAL_MS) with a single
+multi-row INSERT. When the queue is full the producer waits up to
+AUDIT_ENQUEUE_TIMEOUT_MS (backpressure); rows that still do not fit, and
+batches that cannot be written because the database is unavailable, are
+appended to a JSONL spill file (at most AUDIT_SPILL_MAX_BYTES) that is
+replayed in batch-sized chunks on the next flush.
+
+A batch the database rejects (e.g. one row violating a constraint) is
+retried row by row; rows that fail on their own are moved to the
+quarantine file and never replayed, so one bad row cannot block the rest.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+from sqlalchemy import insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.audit_logs import AuditLog
+
+logger = structlog.get_logger(__name__)
+
+# Datetime columns restored when replaying the spill file
+_DATETIME_FIELDS = ('timestamp',)
+
+# Errors meaning the database is unreachable rather than the rows invalid
+_UNAVAILABLE_ERRORS = (OperationalError, InterfaceError)
+
+
+class AuditLogWriter:
+    """Bounded in-process queue with a background multi-row INSERT flusher."""
+
+    def __init__(
+        self,
+        max_queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        enqueue_timeout_ms: Optional[int] = None,
+        spill_path: Optional[str] = None,
+        spill_max_bytes: Optional[int] = None,
+        quarantine_path: Optional[str] = None,
+        session_factory: Optional[Callable[[], Session]] = None
+    ):
+        self.max_queue_size = max_queue_size or settings.AUDIT_QUEUE_MAX_SIZE
+        self.batch_size = batch_size or settings.AUDIT_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.AUDIT_FLUSH_INTERVAL_MS) / 1000
+        self.enqueue_timeout = (enqueue_timeout_ms or settings.AUDIT_ENQUEUE_TIMEOUT_MS) / 1000
+        self.spill_path = spill_path or settings.AUDIT_SPILL_PATH
+        self.spill_max_bytes = spill_max_bytes or settings.AUDIT_SPILL_MAX_BYTES
+        self.quarantine_path = quarantine_path or settings.AUDIT_QUARANTINE_PATH
+        self._session_factory = session_factory
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._spill_lock = threading.Lock()
+
+        self.stats = {
+            'written': 0, 'batches': 0, 'spilled': 0, 'replayed': 0, 'quarantined': 0,
+            'dropped': 0, 'backpressure_waits': 0
+        }
+
+    # =========================================================================
+    # PRODUCER - BEÍRÁS A SORBA
+    # =========================================================================
+
+    def _ensure_started(self) -> None:
+        """Start (or restart) the flusher on the running event loop, keeping queued rows."""
+        if self._task is not None and not self._task.done():
+            return
+        if self._task is not None and not self._task.cancelled() and self._task.exception():
+            logger.error("Audit flusher stopped unexpectedly, restarting", error=str(self._task.exception()))
+
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, record: Dict[str, Any]) -> None:
+        """
+        Queue one audit row (AuditLog column values)
+
+        Never raises and never drops a row: a full queue first applies
+        backpressure, then spills the row to disk.
+        """
+        self._ensure_started()
+
+        try:
+            self._queue.put_nowait(record)
+            return
+        except asyncio.QueueFull:
+            self.stats['backpressure_waits'] += 1
+
+        try:
+            await asyncio.wait_for(self._queue.put(record), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Audit queue full, spilling record to disk", queue_size=self._queue.qsize())
+            await asyncio.to_thread(self._spill, [record])
+
+    # =========================================================================
+    # CONSUMER - HÁTTÉR ÍRÁS
+    # =========================================================================
+
+    async def _run(self) -> None:
+        """Drain the queue in batches until cancelled."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await asyncio.to_thread(self._flush, batch)
+            except Exception as e:
+                # _flush spills what it cannot write; this only keeps the loop alive
+                logger.error("Audit flush failed, spilling batch", rows=len(batch), error=str(e))
+                await asyncio.to_thread(self._spill, batch)
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        """Write the batch, then replay spilled rows in batch-sized chunks."""
+        if self._session_factory is None:
+            from app.database import SessionLocal
+            self._session_factory = SessionLocal
+
+        spilled = self._take_spill()
+        chunks = [batch] if batch else []
+        chunks += [spilled[i:i + self.batch_size] for i in range(0, len(spilled), self.batch_size)]
+
+        db = None
+        index = 0
+        try:
+            db = self._session_factory()
+            for index, rows in enumerate(chunks):
+                written = self._write_batch(db, rows)
+                if written < 0:
+                    # Database unavailable - keep the remaining chunks for the next flush
+                    self._spill([row for chunk in chunks[index + 1:] for row in chunk])
+                    break
+                if rows is not batch:
+                    self.stats['replayed'] += written
+        except Exception as e:
+            logger.error("Audit flush failed, spilling unwritten rows", error=str(e))
+            self._spill([row for chunk in chunks[index:] for row in chunk])
+        finally:
+            if db is not None:
+                db.close()
+
+    def _write_batch(self, db: Session, rows: List[Dict[str, Any]]) -> int:
+        """
+        Write rows with one multi-row INSERT, falling back to row by row
+
+        Returns the number of rows written, or -1 if the database is
+        unavailable (unwritten rows are spilled).
+        """
+        try:
+            db.execute(insert(AuditLog), rows)
+            db.commit()
+            self.stats['written'] += len(rows)
+            self.stats['batches'] += 1
+            return len(rows)
+        except _UNAVAILABLE_ERRORS as e:
+            db.rollback()
+            logger.error("Audit batch write failed, spilling to disk", rows=len(rows), error=str(e))
+            self._spill(rows)
+            return -1
+        except Exception as e:
+            db.rollback()
+            logger.warning("Audit batch rejected, retrying row by row", rows=len(rows), error=str(e))
+
+        written = 0
+        for index, row in enumerate(rows):
+            try:
+                db.execute(insert(AuditLog), [row])
+                db.commit()
+                written += 1
+            except _UNAVAILABLE_ERRORS as e:
+                db.rollback()
+                logger.error("Audit row write failed, spilling to disk", rows=len(rows) - index, error=str(e))
+                self._spill(rows[index:])
+                return -1
+            except Exception as e:
+                db.rollback()
+                logger.error("Audit row rejected, quarantining", error=str(e))
+                self._quarantine(row)
+
+        self.stats['written'] += written
+        return written
+
+    async def stop(self) -> None:
+        """Cancel the flusher and write whatever is still queued."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        if remaining or os.path.exists(self.spill_path):
+            await asyncio.to_thread(self._flush, remaining)
+
+    # =========================================================================
+    # SPILL FILE - LEMEZRE ÍRÁS
+    # =========================================================================
+
+    def _spill(self, rows: List[Dict[str, Any]]) -> None:
+        """Append rows to the JSONL spill file, dropping what exceeds the size cap."""
+        if not rows:
+            return
+        with self._spill_lock:
+            try:
+                appended = _append_jsonl(self.spill_path, rows, self.spill_max_bytes)
+            except OSError as e:
+                logger.error("Audit spill file not writable", path=self.spill_path, error=str(e))
+                appended = 0
+            self.stats['spilled'] += appended
+
+        if appended < len(rows):
+            self.stats['dropped'] += len(rows) - appended
+            logger.error("Audit spill file full, dropping records",
+                         dropped=len(rows) - appended, max_bytes=self.spill_max_bytes)
+
+    def _quarantine(self, row: Dict[str, Any]) -> None:
+        """Move a row the database rejects to the quarantine file (never replayed)."""
+        with self._spill_lock:
+            try:
+                quarantined = _append_jsonl(self.quarantine_path, [row], self.spill_max_bytes)
+            except OSError as e:
+                logger.error("Audit quarantine file not writable", path=self.quarantine_path, error=str(e))
+                quarantined = 0
+            if quarantined:
+                self.stats['quarantined'] += 1
+            else:
+                self.stats['dropped'] += 1
+
+    def _take_spill(self) -> List[Dict[str, Any]]:
+        """Read and remove the spill file; rows are re-spilled if the write fails."""
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                return []
+            with open(self.spill_path, 'r', encoding='utf-8') as spill_file:
+                rows = [json.loads(line) for line in spill_file if line.strip()]
+            os.remove(self.spill_path)
+
+        for row in rows:
+            for field in _DATETIME_FIELDS:
+                if isinstance(row.get(field), str):
+                    row[field] = datetime.fromisoformat(row[field])
+        return rows
+
+
+def _append_jsonl(path: str, rows: List[Dict[str, Any]], max_bytes: int) -> int:
+    """Append rows as JSON lines while the file stays within max_bytes; returns rows appended."""
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    appended = 0
+    with open(path, 'a', encoding='utf-8') as jsonl_file:
+        for row in rows:
+            line = json.dumps(row, default=_json_default) + '\n'
+            size += len(line.encode('utf-8'))
+            if size > max_bytes:
+                break
+            jsonl_file.write(line)
+            appended += 1
+    return appended
+
+
+def _json_default(value: Any) -> Any:
+    """JSON encoder for values that may appear in audit rows."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+# Process-wide writer used by the audit middleware
+audit_writer = AuditLogWriter()
+
+
+def get_audit_writer() -> AuditLogWriter:
+    """Get the process-wide audit writer."""
+    return audit_writer
@@ -14,6 +14,11 @@ celery_app = Celery(
     include=[
         "app.services.maintenance_scheduler",
         "app.services.notification_service",
+        "app.services.analytics_rollup_service",
+        "app.services.audit_partition_service",
+        "app.services.photo_derivative_service",
+        "app.services.qr_label_renderer",
+        "app.services.stock_ledger",
     ]
 )
 
@@ -38,6 +43,12 @@ celery_app.conf.update(
     task_routes={
         "app.services.maintenance_scheduler.generate_scheduled_jobs": {"queue": "maintenance"},
         "app.services.maintenance_scheduler.check_overdue_jobs": {"queue": "maintenance"},
+        "maintenance.refresh_analytics_rollups": {"queue": "maintenance"},
+        "maintenance.refresh_analytics_rollup_days": {"queue": "maintenance"},
+        "maintenance.manage_audit_partitions": {"queue": "maintenance"},
+        "maintenance.build_stock_ledger_snapshots": {"queue": "maintenance"},
+        "media.generate_photo_derivatives": {"queue": "media"},
+        "media.render_bulk_labels_pdf": {"queue": "media"},
         "app.services.notification_service.send_maintenance_reminder": {"queue": "notifications"},
         "app.services.notification_service.send_overdue_notification": {"queue": "notifications"},
         "app.services.notification_service.generate_calendar_feed": {"queue": "calendar"},
@@ -64,6 +75,27 @@ celery_app.conf.update(
             "options": {"queue": "maintenance"}
         },
         
+        # Refresh analytics KPI rollups every 10 minutes
+        "refresh-analytics-rollups": {
+            "task": "maintenance.refresh_analytics_rollups",
+            "schedule": timedelta(minutes=10),
+            "options": {"queue": "maintenance"}
+        },
+        
+        # Pre-create and archive audit log partitions daily at 1 AM
+        "manage-audit-partitions": {
+            "task": "maintenance.manage_audit_partitions",
+            "schedule": crontab(hour=1, minute=0),
+            "options": {"queue": "maintenance"}
+        },
+        
+        # Close finished stock ledger days and re-close backdated ones hourly
+        "build-stock-ledger-snapshots": {
+            "task": "maintenance.build_stock_ledger_snapshots",
+            "schedule": crontab(minute=30),
+            "options": {"queue": "maintenance"}
+        },
+        
         # Send daily reminders at 9 AM
         "send-daily-reminders": {
             "task": "app.services.notification_service.send_daily_reminders",
@@ -140,6 +172,19 @@ def notification_task(name=None, **kwargs):
     return decorator
 
 
+def media_task(name=None, **kwargs):
+    """Decorator for image processing tasks."""
+    def decorator(func):
+        return celery_app.task(
+            name=name or f"media.{func.__name__}",
+            bind=True,
+            autoretry_for=(Exception,),
+            retry_kwargs={"max_retries": 3, "countdown": 30},
+            **kwargs
+        )(func)
+    return decorator
+
+
 # Health check task
 @celery_app.task(bind=True)
 def health_check(self):
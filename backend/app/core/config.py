@@ -53,6 +53,9 @@ class Settings(BaseSettings):
     ARGON2_TIME_COST: int = Field(default=3, description="3 iterations")
     ARGON2_PARALLELISM: int = Field(default=4, description="4 threads")
     ARGON2_HASH_LENGTH: int = Field(default=32, description="32 bytes output")
+    PASSWORD_HASH_WORKERS: int = Field(default=4, description="Concurrent Argon2 hashes (each uses ARGON2_MEMORY_COST)")
+    PASSWORD_HASH_MAX_QUEUE: int = Field(default=100, description="Callers allowed to wait for a hashing slot")
+    PASSWORD_HASH_QUEUE_TIMEOUT_MS: int = Field(default=5000)
     
     # Rate limiting
     RATE_LIMIT_ENABLED: bool = Field(default=True)
@@ -84,11 +87,68 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = Field(default="redis://localhost:6379/0")
     
+    # Buffered audit log writer
+    AUDIT_QUEUE_MAX_SIZE: int = Field(default=10000)
+    AUDIT_BATCH_SIZE: int = Field(default=200)
+    AUDIT_FLUSH_INTERVAL_MS: int = Field(default=500)
+    AUDIT_ENQUEUE_TIMEOUT_MS: int = Field(default=50)
+    AUDIT_SPILL_PATH: str = Field(default="./audit_spill.jsonl")
+    AUDIT_SPILL_MAX_BYTES: int = Field(default=50 * 1024 * 1024)
+    AUDIT_QUARANTINE_PATH: str = Field(default="./audit_quarantine.jsonl")
+    
+    # Audit log partitioning and retention (PostgreSQL)
+    AUDIT_RETENTION_MONTHS: int = Field(default=12)
+    AUDIT_PARTITION_MONTHS_AHEAD: int = Field(default=3)
+    AUDIT_ARCHIVE_DIR: str = Field(default="./audit_archive")
+    
+    # RBAC permission cache
+    PERMISSION_CACHE_SIZE: int = Field(default=10000)
+    PERMISSION_CACHE_TTL_SECONDS: int = Field(default=300)
+    PERMISSION_INVALIDATION_CHANNEL: str = Field(default="rbac:permission-epoch")
+    
+    # QR/NFC field token gate state cache
+    GATE_TOKEN_CACHE_SIZE: int = Field(default=50000)
+    GATE_TOKEN_CACHE_TTL_SECONDS: int = Field(default=300)
+    GATE_TOKEN_REDIS_TTL_SECONDS: int = Field(default=86400)
+    GATE_TOKEN_INVALIDATION_CHANNEL: str = Field(default="labels:gate-token-state")
+    
+    # Bulk QR label rendering
+    LABEL_VECTOR_QR: bool = Field(default=True, description="Draw labels as vector graphics instead of cached PNGs")
+    LABEL_RENDER_WORKERS: int = Field(default=0, description="Label render processes (0 = CPU count)")
+    LABEL_CACHE_DIR: str = Field(default="./label_cache")
+    LABEL_CACHE_MAX_AGE_DAYS: int = Field(default=30)
+    LABEL_JOB_DIR: str = Field(default="./label_jobs", description="Worker scratch space; holds job PDFs only when S3 is not configured")
+    LABEL_JOB_RETENTION_HOURS: int = Field(default=24)
+    LABEL_JOB_S3_PREFIX: str = Field(default="label-jobs/", description="S3 key prefix of bulk label job PDFs")
+    LABEL_SYNC_MAX_GATES: int = Field(default=300, description="Larger batches must use the background job")
+    LABEL_FONT_PATH: str = Field(default="/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf")
+    LABEL_FONT_BOLD_PATH: str = Field(default="/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf")
+    
+    # Stock ledger snapshots
+    STOCK_LEDGER_CLOSE_LAG_MINUTES: int = Field(default=60, description="A day is closed only this long after it ended")
+    
+    # Analytics KPI rollups
+    ANALYTICS_ROLLUPS_ENABLED: bool = Field(default=True)
+    ANALYTICS_ROLLUP_MAX_AGE_MINUTES: int = Field(default=15)
+    ANALYTICS_ROLLUP_WINDOW_DAYS: int = Field(default=60)
+    
+    # Ticket / work order dashboard summaries
+    TICKET_SUMMARY_CACHE_SIZE: int = Field(default=5000)
+    TICKET_SUMMARY_CACHE_TTL_SECONDS: int = Field(default=30)
+    
     # AWS S3 Configuration
     AWS_ACCESS_KEY_ID: Optional[str] = Field(default=None, description="AWS Access Key ID")
     AWS_SECRET_ACCESS_KEY: Optional[str] = Field(default=None, description="AWS Secret Access Key")
     AWS_REGION: str = Field(default="us-east-1", description="AWS Region")
     S3_PHOTOS_BUCKET: str = Field(default="garagereg-inspection-photos", description="S3 bucket for inspection photos")
+    S3_ENDPOINT_URL: Optional[str] = Field(default=None, description="S3-compatible endpoint (e.g. local MinIO)")
+    S3_MAX_POOL_CONNECTIONS: int = Field(default=50, description="Connection pool size of the shared S3 client")
+    S3_PRESIGN_CACHE_TTL_SECONDS: int = Field(default=300, description="How long a presigned download URL is reused")
+    S3_PRESIGN_CACHE_SIZE: int = Field(default=20000, description="Maximum number of cached presigned URLs")
+    S3_MULTIPART_THRESHOLD_BYTES: int = Field(default=16 * 1024 * 1024, description="Photos above this size are uploaded in parts")
+    S3_MULTIPART_PART_SIZE_BYTES: int = Field(default=8 * 1024 * 1024, description="Multipart part size (S3 minimum is 5 MiB)")
+    S3_CONFIRM_CONCURRENCY: int = Field(default=16, description="Parallel S3 checks when confirming a bulk upload")
+    PHOTO_DERIVATIVES_ENABLED: bool = Field(default=True, description="Generate thumbnails after photo upload")
     
     # Environment detection
     @property
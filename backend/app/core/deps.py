@@ -5,11 +5,13 @@ from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.security import decode_jwt_token
-from app.database import SessionLocal
+from app.database import SessionLocal, get_async_db  # noqa: F401 - re-exported for routes
 from app.models.auth import User
 
 
@@ -25,35 +27,42 @@ def get_db() -> Generator:
         db.close()
 
 
-def get_current_user(
-    db: Session = Depends(get_db), 
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> User:
-    """Get current authenticated user"""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def _token_user_id(credentials: HTTPAuthorizationCredentials) -> int:
+    """Decode the bearer token and return its user ID"""
     try:
         # Decode JWT token
         payload = decode_jwt_token(credentials.credentials)
         if payload is None:
-            raise credentials_exception
+            raise _credentials_exception()
             
         user_id_str = payload.get("sub")
         if user_id_str is None:
-            raise credentials_exception
-        user_id = int(user_id_str)
+            raise _credentials_exception()
+        return int(user_id_str)
             
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+
+
+def get_current_user(
+    db: Session = Depends(get_db), 
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> User:
+    """Get current authenticated user"""
+    user_id = _token_user_id(credentials)
     
     # Get user from database
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
         
     return user
 
@@ -67,6 +76,31 @@ def get_current_active_user(
     return current_user
 
 
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> User:
+    """Get current authenticated user over the async session (for get_async_db routes)"""
+    user_id = _token_user_id(credentials)
+    
+    # Same request-scoped session as the route, so the user stays attached to it
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is None:
+        raise _credentials_exception()
+        
+    return user
+
+
+async def get_current_active_user_async(
+    current_user: User = Depends(get_current_user_async)
+) -> User:
+    """Get current authenticated and active user over the async session"""
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+
 def get_current_superuser(
     current_user: User = Depends(get_current_active_user)
 ) -> User:
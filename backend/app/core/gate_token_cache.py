@@ -0,0 +1,325 @@
+"""
+Gate revocation state cache for QR/NFC field token verification.
+
+Field tokens carry the gate's ``token_version`` (claim ``tv``). Verifying a
+scan only needs the gate's current ``(org_id, token_version, is_active)``,
+which is looked up in three tiers:
+
+- an in-process LRU (GATE_TOKEN_CACHE_TTL_SECONDS)
+- a Redis key per gate shared by all workers (GATE_TOKEN_REDIS_TTL_SECONDS)
+- the database, only when neither tier has the gate
+
+When a gate's token_version or is_active changes, the committed state is
+written to Redis and the change is published over pub/sub so every worker
+drops its local entry: rotation and deactivation take effect immediately.
+A deleted gate leaves a tombstone rather than no key, so a lookup that read
+the database before the delete committed cannot re-create it (fills are NX).
+Redis writes run on a single background thread, in commit order, so
+committing a session on the event loop never waits on Redis.
+"""
+
+import calendar
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import redis
+import structlog
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = structlog.get_logger(__name__)
+
+_PENDING_KEY = 'gate_token_state_pending'
+_REDIS_KEY = 'gate_token_state:{gate_id}'
+_TOMBSTONE = 'deleted'
+
+# get_state: Redis has no entry for the gate
+_MISSING = object()
+
+
+class GateTokenState(NamedTuple):
+    """What a field token is checked against."""
+    org_id: int
+    token_version: int
+    is_active: bool
+    # Last rotation (epoch seconds, UTC) - tokens without "tv" issued before it are revoked
+    rotated_at: Optional[int] = None
+
+    def encode(self) -> str:
+        rotated_at = '' if self.rotated_at is None else self.rotated_at
+        return f"{self.org_id}:{self.token_version}:{int(self.is_active)}:{rotated_at}"
+
+    @classmethod
+    def decode(cls, value: str) -> 'GateTokenState':
+        org_id, token_version, is_active, *rest = value.split(':')
+        rotated_at = int(rest[0]) if rest and rest[0] else None
+        return cls(int(org_id), int(token_version), is_active == '1', rotated_at)
+
+    @classmethod
+    def of(cls, org_id: int, token_version: Optional[int], is_active: Any,
+           last_token_rotation: Optional[datetime]) -> 'GateTokenState':
+        """State from Gate column values."""
+        rotated_at = calendar.timegm(last_token_rotation.utctimetuple()) if last_token_rotation else None
+        return cls(org_id, token_version or 1, bool(is_active), rotated_at)
+
+
+class GateTokenCache:
+    """Thread-safe LRU of gate token state backed by Redis."""
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[int] = None, channel: Optional[str] = None):
+        self.max_size = max_size or settings.GATE_TOKEN_CACHE_SIZE
+        self.ttl_seconds = ttl_seconds or settings.GATE_TOKEN_CACHE_TTL_SECONDS
+        self.channel = channel or settings.GATE_TOKEN_INVALIDATION_CHANNEL
+
+        self._entries: "OrderedDict[int, Tuple[float, GateTokenState]]" = OrderedDict()
+        # Bumped on every invalidation so loads racing with a change are discarded
+        self._generations: Dict[int, int] = {}
+        self._global_generation = 0
+        # Gates with a Redis write still queued: Redis may hold the old state
+        self._pending_writes: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+        # Identifies this process' own invalidation messages
+        self._origin = uuid.uuid4().hex
+        self._redis: Optional[redis.Redis] = None
+        self._listener: Optional[threading.Thread] = None
+        # One thread keeps Redis writes in commit order
+        self._writes = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gate-token-cache")
+
+        self.stats = {'local_hits': 0, 'redis_hits': 0, 'db_loads': 0, 'invalidations': 0}
+
+    # =========================================================================
+    # LOOKUP
+    # =========================================================================
+
+    def get_state(self, db: Session, gate_id: int) -> Optional[GateTokenState]:
+        """Current state of a gate, or None if the gate does not exist."""
+        with self._lock:
+            generation = (self._global_generation, self._generations.get(gate_id, 0))
+            write_pending = gate_id in self._pending_writes
+            entry = self._entries.get(gate_id)
+            if entry is not None:
+                loaded_at, state = entry
+                if time.monotonic() - loaded_at < self.ttl_seconds:
+                    self._entries.move_to_end(gate_id)
+                    self.stats['local_hits'] += 1
+                    return state
+                del self._entries[gate_id]
+
+        if write_pending:
+            # Committed state is only certain in the database until the write lands
+            self.stats['db_loads'] += 1
+            return self._load(db, gate_id)
+
+        state = self._redis_get(gate_id)
+        if state is not _MISSING:
+            self.stats['redis_hits'] += 1
+            if state is None:
+                # Tombstone of a deleted gate
+                return None
+        else:
+            state = self._load(db, gate_id)
+            self.stats['db_loads'] += 1
+            if state is None:
+                return None
+            # NX: never overwrite state written by a concurrent invalidation
+            self._redis_set(gate_id, state, only_if_missing=True)
+
+        self._put(gate_id, state, generation)
+        return state
+
+    def _load(self, db: Session, gate_id: int) -> Optional[GateTokenState]:
+        from app.models.organization import Gate
+
+        row = db.query(
+            Gate.org_id, Gate.token_version, Gate.is_active, Gate.last_token_rotation
+        ).filter(Gate.id == gate_id).first()
+        if row is None:
+            return None
+        return GateTokenState.of(row.org_id, row.token_version, row.is_active, row.last_token_rotation)
+
+    def _put(self, gate_id: int, state: GateTokenState, generation: Tuple[int, int]) -> None:
+        with self._lock:
+            if generation != (self._global_generation, self._generations.get(gate_id, 0)):
+                return
+            self._entries[gate_id] = (time.monotonic(), state)
+            self._entries.move_to_end(gate_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    # =========================================================================
+    # INVALIDATION
+    # =========================================================================
+
+    def invalidate(self, gate_id: int, state: Optional[GateTokenState] = None, publish: bool = True) -> None:
+        """Apply a committed change to a gate (rotation, (de)activation, delete)."""
+        with self._lock:
+            self._generations[gate_id] = self._generations.get(gate_id, 0) + 1
+            self._entries.pop(gate_id, None)
+            self.stats['invalidations'] += 1
+            if publish:
+                self._pending_writes[gate_id] = self._pending_writes.get(gate_id, 0) + 1
+        if publish:
+            self._writes.submit(self._write_through, gate_id, state)
+
+    def _write_through(self, gate_id: int, state: Optional[GateTokenState]) -> None:
+        """Store the committed state (or a tombstone) and notify the other workers."""
+        try:
+            self._redis_set(gate_id, state)
+            self._publish({'gate_id': gate_id})
+        finally:
+            with self._lock:
+                remaining = self._pending_writes.pop(gate_id) - 1
+                if remaining:
+                    self._pending_writes[gate_id] = remaining
+
+    def wait_for_writes(self, timeout: Optional[float] = None) -> None:
+        """Block until every queued Redis write has been sent."""
+        self._writes.submit(lambda: None).result(timeout)
+
+    def _get_redis(self) -> Optional[redis.Redis]:
+        """Shared client; short timeouts so scans fall back to the DB quickly."""
+        if self._redis is None:
+            try:
+                self._redis = redis.from_url(
+                    settings.REDIS_URL,
+                    decode_responses=True,
+                    socket_connect_timeout=1,
+                    socket_timeout=1
+                )
+            except Exception as e:
+                logger.warning("Gate token Redis unavailable", error=str(e))
+        return self._redis
+
+    def _redis_get(self, gate_id: int) -> Any:
+        """Shared state, None for a tombstone, _MISSING if Redis has nothing."""
+        client = self._get_redis()
+        if client is None:
+            return _MISSING
+        try:
+            value = client.get(_REDIS_KEY.format(gate_id=gate_id))
+            if not value:
+                return _MISSING
+            return None if value == _TOMBSTONE else GateTokenState.decode(value)
+        except Exception as e:
+            logger.warning("Failed to read gate token state", gate_id=gate_id, error=str(e))
+            return _MISSING
+
+    def _redis_set(self, gate_id: int, state: Optional[GateTokenState], only_if_missing: bool = False) -> None:
+        """Store a state, or a tombstone for a deleted gate (state None)."""
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            client.set(
+                _REDIS_KEY.format(gate_id=gate_id),
+                _TOMBSTONE if state is None else state.encode(),
+                ex=settings.GATE_TOKEN_REDIS_TTL_SECONDS,
+                nx=only_if_missing
+            )
+        except Exception as e:
+            logger.warning("Failed to store gate token state", gate_id=gate_id, error=str(e))
+
+    def _publish(self, message: Dict[str, Any]) -> None:
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            client.publish(self.channel, json.dumps({**message, 'origin': self._origin}))
+        except Exception as e:
+            logger.warning("Failed to publish gate token invalidation", error=str(e), **message)
+
+    def handle_message(self, data: str) -> None:
+        """Apply an invalidation published by another worker."""
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if message.get('origin') == self._origin or message.get('gate_id') is None:
+            return
+        self.invalidate(int(message['gate_id']), publish=False)
+
+    def clear(self) -> None:
+        """Drop every local entry."""
+        with self._lock:
+            self._global_generation += 1
+            self._entries.clear()
+
+    def start_listener(self) -> None:
+        """Subscribe to invalidations from other workers in a daemon thread."""
+        if self._listener is not None and self._listener.is_alive():
+            return
+        self._listener = threading.Thread(target=self._listen, name="gate-token-cache-listener", daemon=True)
+        self._listener.start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Messages missed while disconnected are unknown: start clean
+                self.clear()
+                for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        self.handle_message(message.get('data'))
+            except Exception as e:
+                logger.warning("Gate token invalidation listener disconnected", error=str(e))
+                time.sleep(5)
+
+
+# =============================================================================
+# WRITE HOOKS
+# =============================================================================
+
+def _collect_gate_changes(session: Session, flush_context) -> None:
+    """after_flush: remember gates whose token version or active flag changed."""
+    from app.models.organization import Gate
+
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for obj in session.dirty:
+        if not isinstance(obj, Gate):
+            continue
+        state = inspect(obj)
+        if state.attrs.token_version.history.has_changes() or state.attrs.is_active.history.has_changes():
+            pending[obj.id] = GateTokenState.of(obj.org_id, obj.token_version, obj.is_active, obj.last_token_rotation)
+    for obj in session.deleted:
+        if isinstance(obj, Gate):
+            pending[obj.id] = None
+
+
+def _apply_gate_changes(session: Session) -> None:
+    """after_commit: publish the committed gate states."""
+    pending = session.info.pop(_PENDING_KEY, None)
+    for gate_id, state in (pending or {}).items():
+        gate_token_cache.invalidate(gate_id, state)
+
+
+def _discard_gate_changes(session: Session) -> None:
+    """after_rollback: drop changes that were never committed."""
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_gate_token_hooks() -> None:
+    """Invalidate cached gate state whenever a rotation or deactivation is committed."""
+    if not event.contains(Session, 'after_flush', _collect_gate_changes):
+        event.listen(Session, 'after_flush', _collect_gate_changes)
+        event.listen(Session, 'after_commit', _apply_gate_changes)
+        event.listen(Session, 'after_rollback', _discard_gate_changes)
+
+
+# Process-wide cache used by app.services.label_service
+gate_token_cache = GateTokenCache()
+
+
+def get_gate_token_cache() -> GateTokenCache:
+    """Get the process-wide gate token cache."""
+    return gate_token_cache
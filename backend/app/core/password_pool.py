@@ -0,0 +1,164 @@
+"""
+Bounded worker pool for Argon2 password hashing
+Korlátos munkakészlet az Argon2 jelszó hasheléshez
+
+Argon2id with the handbook parameters costs 64 MiB and tens of milliseconds
+of CPU per hash. Async handlers hand hashing and verification to a small
+dedicated thread pool (argon2-cffi releases the GIL while hashing), so the
+event loop keeps serving other requests.
+
+Admission control keeps a login burst from exhausting memory: at most
+PASSWORD_HASH_WORKERS hashes run at once (PASSWORD_HASH_WORKERS x 64 MiB),
+at most PASSWORD_HASH_MAX_QUEUE callers wait for a slot, and a caller that
+does not get one within PASSWORD_HASH_QUEUE_TIMEOUT_MS is rejected with
+PasswordHashBusy instead of piling up.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar('T')
+
+
+class PasswordHashBusy(Exception):
+    """No hashing slot became available in time; the caller should retry later."""
+
+    def __init__(self, reason: str, retry_after: int = 1):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class PasswordHashPool:
+    """Thread pool with a concurrency limit, a bounded wait queue and latency stats."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout_ms: Optional[int] = None
+    ):
+        self.workers = workers or settings.PASSWORD_HASH_WORKERS
+        self.max_queue = max_queue if max_queue is not None else settings.PASSWORD_HASH_MAX_QUEUE
+        self.queue_timeout = (queue_timeout_ms or settings.PASSWORD_HASH_QUEUE_TIMEOUT_MS) / 1000
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiting = 0
+        self._running = 0
+
+        self.stats = {
+            'completed': 0,
+            'rejected_queue_full': 0,
+            'rejected_timeout': 0,
+            'hash_ms_total': 0.0,
+            'hash_ms_max': 0.0,
+            'wait_ms_max': 0.0,
+        }
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="argon2")
+        if self._loop is not loop:
+            # asyncio primitives belong to one event loop
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.workers)
+            self._waiting = 0
+            self._running = 0
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run ``func(*args)`` on the pool once a slot is free
+
+        Raises:
+            PasswordHashBusy: If the wait queue is full or no slot frees up in time
+        """
+        self._ensure_started()
+
+        queued_at = time.perf_counter()
+        if not self._slots.locked():
+            # Free slot: acquire() returns without waiting
+            await self._slots.acquire()
+        else:
+            if self._waiting >= self.max_queue:
+                self.stats['rejected_queue_full'] += 1
+                logger.warning("Password hashing queue full", waiting=self._waiting, running=self._running)
+                raise PasswordHashBusy("queue_full")
+
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.stats['rejected_timeout'] += 1
+                logger.warning("Password hashing slot timeout", waiting=self._waiting, running=self._running)
+                raise PasswordHashBusy("timeout")
+            finally:
+                self._waiting -= 1
+
+        started_at = time.perf_counter()
+        self.stats['wait_ms_max'] = max(self.stats['wait_ms_max'], (started_at - queued_at) * 1000)
+        self._running += 1
+        loop, slots = self._loop, self._slots
+
+        def finished(_) -> None:
+            elapsed_ms = (time.perf_counter() - started_at) * 1000
+            self.stats['completed'] += 1
+            self.stats['hash_ms_total'] += elapsed_ms
+            self.stats['hash_ms_max'] = max(self.stats['hash_ms_max'], elapsed_ms)
+            self._running -= 1
+            slots.release()
+
+        # The slot is freed when the hash finishes, even if the request was cancelled
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._running -= 1
+            slots.release()
+            raise
+
+        def notify(done) -> None:
+            try:
+                loop.call_soon_threadsafe(finished, done)
+            except RuntimeError:
+                pass  # event loop already closed
+
+        future.add_done_callback(notify)
+        return await asyncio.wrap_future(future)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current queue depth and latency figures for health checks."""
+        completed = self.stats['completed']
+        return {
+            'workers': self.workers,
+            'running': self._running,
+            'queue_depth': self._waiting,
+            'max_queue': self.max_queue,
+            'hash_ms_avg': round(self.stats['hash_ms_total'] / completed, 2) if completed else 0.0,
+            **{key: round(value, 2) if isinstance(value, float) else value for key, value in self.stats.items()},
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads (application shutdown)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._loop = None
+
+
+# Process-wide pool used by app.core.security
+password_hash_pool = PasswordHashPool()
+
+
+def get_password_hash_pool() -> PasswordHashPool:
+    """Get the process-wide password hashing pool."""
+    return password_hash_pool
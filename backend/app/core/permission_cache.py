@@ -0,0 +1,278 @@
+"""
+Compiled, versioned permission cache for RBAC checks.
+
+A user's permission codenames are compiled once into a bitset (one bit per
+resource x action pair of the permission grid) and kept in an in-process LRU.
+Every entry is tagged with the permission epoch it was loaded under:
+
+- the user epoch is bumped when one of the user's role assignments changes
+- the global epoch is bumped when a role's permission set changes
+
+Bumps are published over Redis pub/sub so every worker drops the stale entry;
+if Redis is unreachable entries still expire after PERMISSION_CACHE_TTL_SECONDS.
+Publishing runs on a background thread, so a commit on the event loop never
+waits on Redis.
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import redis
+import structlog
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = structlog.get_logger(__name__)
+
+_PENDING_KEY = 'rbac_permission_epoch_pending'
+
+
+class CompiledPermissions:
+    """A user's permissions as a bitset plus codenames outside the grid."""
+
+    __slots__ = ('mask', 'extra', '_bits')
+
+    def __init__(self, mask: int, extra: FrozenSet[str], bits: Dict[str, int]):
+        self.mask = mask
+        self.extra = extra
+        self._bits = bits
+
+    def has(self, codename: str) -> bool:
+        """Check one permission codename."""
+        bit = self._bits.get(codename)
+        if bit is not None:
+            return bool(self.mask >> bit & 1)
+        return codename in self.extra
+
+    def has_all(self, codenames: Iterable[str]) -> bool:
+        """Check that every codename is granted."""
+        return all(self.has(codename) for codename in codenames)
+
+    def codenames(self) -> List[str]:
+        """Expand back to codenames (for token payloads and profiles)."""
+        granted = [codename for codename, bit in self._bits.items() if self.mask >> bit & 1]
+        return granted + sorted(self.extra)
+
+
+class PermissionCompiler:
+    """Maps permission codenames of a fixed grid to bit positions."""
+
+    def __init__(self, grid_codenames: Iterable[str]):
+        self.bits: Dict[str, int] = {}
+        for codename in grid_codenames:
+            self.bits.setdefault(codename, len(self.bits))
+
+    def compile(self, codenames: Iterable[str]) -> CompiledPermissions:
+        """Compile a user's codenames into a bitset."""
+        mask = 0
+        extra: Set[str] = set()
+        for codename in codenames:
+            bit = self.bits.get(codename)
+            if bit is None:
+                extra.add(codename)
+            else:
+                mask |= 1 << bit
+        return CompiledPermissions(mask, frozenset(extra), self.bits)
+
+    def bit(self, codename: str) -> Optional[int]:
+        """Bit position of a grid codename."""
+        return self.bits.get(codename)
+
+
+class PermissionCache:
+    """Thread-safe LRU of compiled permissions guarded by permission epochs."""
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[int] = None, channel: Optional[str] = None):
+        self.max_size = max_size or settings.PERMISSION_CACHE_SIZE
+        self.ttl_seconds = ttl_seconds or settings.PERMISSION_CACHE_TTL_SECONDS
+        self.channel = channel or settings.PERMISSION_INVALIDATION_CHANNEL
+
+        self._entries: "OrderedDict[int, Tuple[Tuple[int, int], float, CompiledPermissions]]" = OrderedDict()
+        self._user_epochs: Dict[int, int] = {}
+        self._global_epoch = 0
+        self._lock = threading.Lock()
+
+        # Identifies this process' own invalidation messages
+        self._origin = uuid.uuid4().hex
+        self._redis: Optional[redis.Redis] = None
+        self._listener: Optional[threading.Thread] = None
+        # One thread keeps invalidations in bump order
+        self._publishes = ThreadPoolExecutor(max_workers=1, thread_name_prefix="permission-cache")
+
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    # =========================================================================
+    # LOOKUP
+    # =========================================================================
+
+    def epoch(self, user_id: int) -> Tuple[int, int]:
+        """Current (global, user) epoch; take it before loading from the DB."""
+        with self._lock:
+            return self._global_epoch, self._user_epochs.get(user_id, 0)
+
+    def get(self, user_id: int) -> Optional[CompiledPermissions]:
+        """Cached permissions if loaded under the current epoch and not expired."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                epoch, loaded_at, compiled = entry
+                current = (self._global_epoch, self._user_epochs.get(user_id, 0))
+                if epoch == current and time.monotonic() - loaded_at < self.ttl_seconds:
+                    self._entries.move_to_end(user_id)
+                    self.stats['hits'] += 1
+                    return compiled
+                del self._entries[user_id]
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, user_id: int, compiled: CompiledPermissions, epoch: Tuple[int, int]) -> None:
+        """Store permissions unless the epoch moved while they were loading."""
+        with self._lock:
+            if epoch != (self._global_epoch, self._user_epochs.get(user_id, 0)):
+                return
+            self._entries[user_id] = (epoch, time.monotonic(), compiled)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    # =========================================================================
+    # INVALIDATION
+    # =========================================================================
+
+    def bump_user(self, user_id: int, publish: bool = True) -> None:
+        """Invalidate one user's permissions (role assigned or revoked)."""
+        with self._lock:
+            self._user_epochs[user_id] = self._user_epochs.get(user_id, 0) + 1
+            self._entries.pop(user_id, None)
+            self.stats['invalidations'] += 1
+        if publish:
+            self._publishes.submit(self._publish, {'user_id': user_id})
+
+    def bump_all(self, publish: bool = True) -> None:
+        """Invalidate every user's permissions (role permission set changed)."""
+        with self._lock:
+            self._global_epoch += 1
+            self._entries.clear()
+            self.stats['invalidations'] += 1
+        if publish:
+            self._publishes.submit(self._publish, {'all': True})
+
+    def wait_for_publishes(self, timeout: Optional[float] = None) -> None:
+        """Block until every queued invalidation has been published."""
+        self._publishes.submit(lambda: None).result(timeout)
+
+    def _get_redis(self) -> Optional[redis.Redis]:
+        """Publisher client; short timeouts so commits never wait on Redis."""
+        if self._redis is None:
+            try:
+                self._redis = redis.from_url(
+                    settings.REDIS_URL,
+                    decode_responses=True,
+                    socket_connect_timeout=1,
+                    socket_timeout=1
+                )
+            except Exception as e:
+                logger.warning("Permission invalidation Redis unavailable", error=str(e))
+        return self._redis
+
+    def _publish(self, message: Dict[str, Any]) -> None:
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            client.publish(self.channel, json.dumps({**message, 'origin': self._origin}))
+        except Exception as e:
+            logger.warning("Failed to publish permission invalidation", error=str(e), **message)
+
+    def handle_message(self, data: str) -> None:
+        """Apply an invalidation published by another worker."""
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if message.get('origin') == self._origin:
+            return
+        if message.get('all'):
+            self.bump_all(publish=False)
+        elif message.get('user_id') is not None:
+            self.bump_user(int(message['user_id']), publish=False)
+
+    def start_listener(self) -> None:
+        """Subscribe to invalidations from other workers in a daemon thread."""
+        if self._listener is not None and self._listener.is_alive():
+            return
+        self._listener = threading.Thread(target=self._listen, name="permission-cache-listener", daemon=True)
+        self._listener.start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Messages missed while disconnected are unknown: start clean
+                self.bump_all(publish=False)
+                for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        self.handle_message(message.get('data'))
+            except Exception as e:
+                logger.warning("Permission invalidation listener disconnected", error=str(e))
+                time.sleep(5)
+
+
+# =============================================================================
+# WRITE HOOKS
+# =============================================================================
+
+def _collect_permission_changes(session: Session, flush_context) -> None:
+    """after_flush: remember users / roles whose permissions changed."""
+    from app.models.auth import Permission, Role, RoleAssignment
+
+    pending = session.info.setdefault(_PENDING_KEY, {'users': set(), 'all': False})
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, RoleAssignment):
+            if obj.user_id is not None:
+                pending['users'].add(obj.user_id)
+        elif isinstance(obj, (Role, Permission)):
+            pending['all'] = True
+
+
+def _apply_permission_changes(session: Session) -> None:
+    """after_commit: bump the epochs collected during the transaction."""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    if pending['all']:
+        permission_cache.bump_all()
+        return
+    for user_id in pending['users']:
+        permission_cache.bump_user(user_id)
+
+
+def _discard_permission_changes(session: Session) -> None:
+    """after_rollback: drop changes that were never committed."""
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_permission_hooks() -> None:
+    """Bump permission epochs whenever role assignments or roles are committed."""
+    if not event.contains(Session, 'after_flush', _collect_permission_changes):
+        event.listen(Session, 'after_flush', _collect_permission_changes)
+        event.listen(Session, 'after_commit', _apply_permission_changes)
+        event.listen(Session, 'after_rollback', _discard_permission_changes)
+
+
+# Process-wide cache used by app.core.rbac
+permission_cache = PermissionCache()
+
+
+def get_permission_cache() -> PermissionCache:
+    """Get the process-wide permission cache."""
+    return permission_cache
@@ -1,18 +1,21 @@
 """Role-Based Access Control (RBAC) system with permission decorators."""
 
+import asyncio
 from functools import wraps
 from typing import List, Optional, Union, Callable, Any
 from enum import Enum
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 import structlog
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.models.auth import User, Role, Permission, RoleAssignment
 from app.schemas.auth import TokenData
 from app.core.security import verify_token
+from app.core.permission_cache import CompiledPermissions, PermissionCompiler, permission_cache, register_permission_hooks
 
 logger = structlog.get_logger(__name__)
 
@@ -159,6 +162,14 @@ class Resources(str, Enum):
     SYNC = "sync"
 
 
+# One bit per resource x action pair
+permission_compiler = PermissionCompiler(
+    f"{resource.value}:{action.value}"
+    for resource in Resources
+    for action in PermissionActions
+)
+
+
 def permission_required(
     resource: Resources,
     action: PermissionActions,
@@ -200,14 +211,17 @@ def permission_required(
                     detail="Authentication required"
                 )
             
-            # Check permission
+            # Check permission against the compiled bitset (loaded and cached on a miss,
+            # never the token's list, so revocations apply on the next request)
             permission_name = f"{resource.value}:{action.value}"
-            if permission_name not in current_user.permissions:
+            db = next((value for value in kwargs.values() if isinstance(value, (Session, AsyncSession))), None)
+            compiled = await get_compiled_permissions(db, current_user.user_id)
+            if not compiled.has(permission_name):
                 logger.warning(
                     "Permission denied",
                     user_id=current_user.user_id,
                     required_permission=permission_name,
-                    user_permissions=current_user.permissions
+                    user_permissions=compiled.codenames()
                 )
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -440,17 +454,58 @@ async def get_user_roles(db: Session, user_id: int) -> List[str]:
     return [role.name for role in roles]
 
 
-async def get_user_permissions(db: Session, user_id: int) -> List[str]:
+async def get_user_permissions(db: Union[Session, AsyncSession], user_id: int) -> List[str]:
     """
     Get all permissions for a user through their roles.
     
     Args:
-        db: Database session
+        db: Database session (sync or async)
         user_id: User ID
         
     Returns:
         List of permission codenames
     """
+    compiled = await get_compiled_permissions(db, user_id)
+    return compiled.codenames()
+
+
+async def get_compiled_permissions(db: Optional[Union[Session, AsyncSession]], user_id: int) -> CompiledPermissions:
+    """
+    Get a user's permissions as a compiled bitset, from cache when current.
+    
+    Args:
+        db: Database session (sync or async); None loads with a new session off the event loop
+        user_id: User ID
+        
+    Returns:
+        Compiled permissions
+    """
+    compiled = permission_cache.get(user_id)
+    if compiled is not None:
+        return compiled
+    
+    # Epoch taken before loading: a concurrent role change discards this result
+    epoch = permission_cache.epoch(user_id)
+    if isinstance(db, AsyncSession):
+        codenames = await db.run_sync(_query_user_permissions, user_id)
+    elif db is None:
+        codenames = await asyncio.to_thread(_load_user_permissions, user_id)
+    else:
+        codenames = _query_user_permissions(db, user_id)
+    
+    compiled = permission_compiler.compile(codenames)
+    permission_cache.put(user_id, compiled, epoch)
+    return compiled
+
+
+def _load_user_permissions(user_id: int) -> List[str]:
+    """Load permission codenames for a user with a session of its own."""
+    with SessionLocal() as db:
+        return _query_user_permissions(db, user_id)
+
+
+def _query_user_permissions(db: Session, user_id: int) -> List[str]:
+    """Load permission codenames for a user with a synchronous session."""
     permissions = db.query(Permission.codename).join(
         Role.permissions
     ).join(
@@ -488,11 +543,10 @@ async def has_permission(
     Returns:
         True if user has permission
     """
-    permission_name = f"{resource.value}:{action.value}"
-    user_permissions = await get_user_permissions(db, user_id)
+    compiled = await get_compiled_permissions(db, user_id)
     
     # Basic permission check
-    if permission_name not in user_permissions:
+    if not compiled.has(f"{resource.value}:{action.value}"):
         return False
     
     # TODO: Implement scope-based permission checking
@@ -534,13 +588,13 @@ def require_permissions(required_permissions: List[RBACPermission]):
                 )
             
             # Get user permissions
-            user_permissions = await get_user_permissions(db, current_user.id)
+            compiled = await get_compiled_permissions(db, current_user.id)
             
             # Check if user has all required permissions
-            missing_permissions = []
-            for perm in required_permissions:
-                if perm.value not in user_permissions:
-                    missing_permissions.append(perm.value)
+            missing_permissions = [
+                perm.value for perm in required_permissions
+                if not compiled.has(perm.value)
+            ]
             
             if missing_permissions:
                 logger.warning(
@@ -548,7 +602,7 @@ def require_permissions(required_permissions: List[RBACPermission]):
                     user_id=current_user.id,
                     required_permissions=[p.value for p in required_permissions],
                     missing_permissions=missing_permissions,
-                    user_permissions=user_permissions
+                    user_permissions=compiled.codenames()
                 )
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -742,4 +796,6 @@ def require_permission(permission_string: str, current_user, db=None):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"Insufficient permissions: {permission_string} required"
-        )
\ No newline at end of file
+        )
+
+register_permission_hooks()
@@ -1,7 +1,7 @@
 """Security utilities for authentication, authorization, and password hashing."""
 
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional, List
+from typing import Any, Union, Optional, List, Tuple
 import secrets
 import hashlib
 import hmac
@@ -12,6 +12,7 @@ from argon2.exceptions import VerifyMismatchError, HashingError
 import structlog
 
 from app.core.config import settings
+from app.core.password_pool import password_hash_pool
 
 logger = structlog.get_logger(__name__)
 
@@ -22,11 +23,11 @@ class PasswordHandler:
     def __init__(self):
         """Initialize Argon2 password hasher with secure parameters from handbook."""
         self.hasher = PasswordHasher(
-            memory_cost=65536,      # 64 MiB (from handbook)
-            time_cost=3,            # 3 iterations
-            parallelism=4,          # 4 threads
-            hash_len=32,            # 32 bytes output
-            salt_len=16,            # 16 bytes salt
+            memory_cost=settings.ARGON2_MEMORY_COST,    # 64 MiB (from handbook)
+            time_cost=settings.ARGON2_TIME_COST,        # 3 iterations
+            parallelism=settings.ARGON2_PARALLELISM,    # 4 threads
+            hash_len=settings.ARGON2_HASH_LENGTH,       # 32 bytes output
+            salt_len=16,                                # 16 bytes salt
             encoding='utf-8'
         )
         
@@ -34,10 +35,10 @@ class PasswordHandler:
         self.pwd_context = CryptContext(
             schemes=["argon2"],
             deprecated="auto",
-            argon2__memory_cost=65536,
-            argon2__time_cost=3,
-            argon2__parallelism=4,
-            argon2__hash_len=32,
+            argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+            argon2__time_cost=settings.ARGON2_TIME_COST,
+            argon2__parallelism=settings.ARGON2_PARALLELISM,
+            argon2__hash_len=settings.ARGON2_HASH_LENGTH,
         )
     
     def hash_password(self, password: str) -> str:
@@ -97,6 +98,28 @@ class PasswordHandler:
             return self.hasher.check_needs_rehash(hashed_password)
         except Exception:
             return True  # If we can't check, assume it needs update
+    
+    def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and rehash it if the stored parameters are outdated.
+        
+        Args:
+            password: Plain text password
+            hashed_password: Stored hash
+            
+        Returns:
+            (valid, new_hash); new_hash is None unless the password is valid
+            and the stored hash should be replaced
+        """
+        if not self.verify_password(password, hashed_password):
+            return False, None
+        if not self.needs_update(hashed_password):
+            return True, None
+        try:
+            return True, self.hash_password(password)
+        except HashingError:
+            # The login itself succeeded; keep the old hash
+            return True, None
 
 
 # Global password handler
@@ -369,6 +392,29 @@ def verify_password(password: str, hashed_password: str) -> bool:
     return password_handler.verify_password(password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the bounded Argon2 pool without blocking the event loop.
+    
+    Raises:
+        PasswordHashBusy: If the hashing pool is saturated
+    """
+    return await password_hash_pool.run(password_handler.hash_password, password)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the bounded Argon2 pool, rehashing outdated hashes.
+    
+    Returns:
+        (valid, new_hash) as PasswordHandler.verify_and_update
+        
+    Raises:
+        PasswordHashBusy: If the hashing pool is saturated
+    """
+    return await password_hash_pool.run(password_handler.verify_and_update, password, hashed_password)
+
+
 def get_cors_origins() -> List[str]:
     """Get CORS origins from settings."""
     return settings.CORS_ORIGINS.split(",")
@@ -0,0 +1,112 @@
+"""
+Append-only change journal for delta sync
+
+Every change of a versioned entity appends a (seq, entity_type, entity_id,
+org_id, operation) row in the same transaction. Pull sync then reads the
+journal as an index range scan on (org_id, seq) instead of scanning every
+entity table on last_modified_at, and hard deletes stay visible to clients
+after tombstones are purged.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, event, exists, insert, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, aliased
+
+from app.models.sync_journal import SyncJournalEntry
+from .models import SyncOperation
+
+_JOURNALED_TYPES: Dict[type, str] = {}
+
+# pg_advisory_xact_lock(key, org_id) namespace of the per-organization journal locks ("sync")
+JOURNAL_LOCK_KEY = 0x73796E63
+
+
+def journal_entries(entity_type: str, changes: Iterable[Tuple[int, Optional[int], str]]) -> List[Dict[str, Any]]:
+    """Build journal rows from (entity_id, org_id, operation) tuples."""
+    now = datetime.utcnow()
+    return [
+        {
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'org_id': org_id,
+            'operation': operation,
+            'changed_at': now,
+        }
+        for entity_id, org_id, operation in changes
+    ]
+
+
+def write_journal(connection: Connection, rows: List[Dict[str, Any]]) -> None:
+    """
+    Append journal rows in the connection's transaction
+
+    On PostgreSQL the writer first takes the journal lock of every
+    organization it writes for, held until commit, so no reader of an
+    organization can see its seq N+1 while its seq N is still uncommitted.
+    Writers of different organizations do not wait for each other; pulls are
+    always scoped to one organization. Locks are taken in org_id order.
+    """
+    if not rows:
+        return
+    if connection.dialect.name == 'postgresql':
+        for org_id in sorted({row['org_id'] or 0 for row in rows}):
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(:key, :org_id)"),
+                {'key': JOURNAL_LOCK_KEY, 'org_id': org_id}
+            )
+    connection.execute(insert(SyncJournalEntry), rows)
+
+
+def _journal_flushed_changes(session: Session, flush_context) -> None:
+    """after_flush hook: journal ORM changes of versioned entities."""
+    if not _JOURNALED_TYPES:
+        return
+
+    rows = []
+    for obj in session.new:
+        entity_type = _JOURNALED_TYPES.get(type(obj))
+        if entity_type:
+            rows += journal_entries(entity_type, [(obj.id, getattr(obj, 'org_id', None), SyncOperation.CREATE.value)])
+
+    for obj in session.dirty:
+        entity_type = _JOURNALED_TYPES.get(type(obj))
+        if entity_type and session.is_modified(obj, include_collections=False):
+            operation = SyncOperation.DELETE if getattr(obj, 'is_deleted', False) else SyncOperation.UPDATE
+            rows += journal_entries(entity_type, [(obj.id, getattr(obj, 'org_id', None), operation.value)])
+
+    for obj in session.deleted:
+        entity_type = _JOURNALED_TYPES.get(type(obj))
+        if entity_type:
+            rows += journal_entries(entity_type, [(obj.id, getattr(obj, 'org_id', None), SyncOperation.DELETE.value)])
+
+    write_journal(session.connection(), rows)
+
+
+def register_journal_hooks(entity_models: Dict[str, type]) -> None:
+    """Journal ORM flushes of the given entity models (idempotent)."""
+    for entity_type, model_class in entity_models.items():
+        _JOURNALED_TYPES[model_class] = entity_type
+
+    if not event.contains(Session, "after_flush", _journal_flushed_changes):
+        event.listen(Session, "after_flush", _journal_flushed_changes)
+
+
+def compact_journal_statement(cutoff: datetime):
+    """
+    DELETE statement dropping superseded journal rows older than cutoff
+
+    Only rows that have a newer entry for the same entity are removed, so a
+    client pulling from any watermark still sees the latest operation of
+    every entity - including deletes of purged tombstones.
+    """
+    newer = aliased(SyncJournalEntry)
+    return delete(SyncJournalEntry).where(
+        SyncJournalEntry.changed_at < cutoff,
+        exists().where(and_(
+            newer.entity_type == SyncJournalEntry.entity_type,
+            newer.entity_id == SyncJournalEntry.entity_id,
+            newer.seq > SyncJournalEntry.seq
+        ))
+    )
@@ -1,10 +1,12 @@
 """
 Delta-based bidirectional sync system with conflict resolution
 """
+import base64
+import json
 from datetime import datetime, timezone
 from enum import Enum
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy import Column, String, DateTime, Integer, Text, Boolean
 from sqlalchemy.ext.declarative import declared_attr
 
@@ -93,14 +95,51 @@ class SyncDelta(BaseModel):
     client_id: Optional[str] = None
 
 
+class SyncCursor(BaseModel):
+    """
+    Keyset position in the merged change stream
+    
+    Changes are ordered by (last_modified_at, entity_type, entity_id); the
+    cursor is the key of the last delta a client has received.
+    """
+    last_modified_at: datetime
+    entity_type: str
+    entity_id: int
+    
+    def encode(self) -> str:
+        """Opaque URL-safe token handed to clients as next_cursor"""
+        payload = json.dumps({
+            't': self.last_modified_at.isoformat(),
+            'e': self.entity_type,
+            'i': self.entity_id
+        }, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+    
+    @classmethod
+    def decode(cls, token: str) -> 'SyncCursor':
+        """Parse a token produced by encode(); raises ValueError if malformed"""
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return cls(
+                last_modified_at=datetime.fromisoformat(payload['t']),
+                entity_type=payload['e'],
+                entity_id=int(payload['i'])
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Invalid sync cursor: {token}") from e
+
+
 class SyncPullRequest(BaseModel):
     """
     Client request for pulling changes from server
     """
     client_id: str
     last_sync_timestamp: Optional[datetime] = None
+    cursor: Optional[str] = None  # next_cursor of the previous page; takes precedence over last_sync_timestamp
+    since_sequence: Optional[int] = None  # Change journal watermark; takes precedence over last_sync_timestamp
     entity_types: Optional[List[str]] = None  # Filter specific entities
-    batch_size: int = 100
+    batch_size: int = Field(default=100, ge=1, le=1000)
     include_deleted: bool = True
 
 
@@ -112,6 +151,7 @@ class SyncPullResponse(BaseModel):
     server_timestamp: datetime
     has_more: bool = False
     next_cursor: Optional[str] = None
+    sequence_watermark: Optional[int] = None  # Send back as since_sequence on the next pull
     conflicts: List[SyncDelta] = []
 
 
@@ -133,6 +173,7 @@ class SyncPushResponse(BaseModel):
     rejected_deltas: List[Dict[str, Any]]  # ETags with rejection reasons
     conflicts: List[SyncDelta]  # Server versions that conflict
     server_timestamp: datetime
+    phase_timings: Dict[str, float] = {}  # Milliseconds spent per push phase
 
 
 class ConflictResolution(BaseModel):
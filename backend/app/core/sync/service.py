@@ -1,23 +1,27 @@
 """
 Delta-based synchronization service with conflict resolution
 """
+import heapq
 import json
+import time
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, text, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, text, desc, func, select, insert, update, bindparam
 import asyncio
 import logging
 
 from .models import (
-    SyncDelta, SyncPullRequest, SyncPullResponse, SyncPushRequest, SyncPushResponse,
+    SyncDelta, SyncCursor, SyncPullRequest, SyncPullResponse, SyncPushRequest, SyncPushResponse,
     ConflictResolution, SyncConflictPolicy, SyncOperation, OperationalTransform,
     SyncMetrics
 )
+from .journal import journal_entries, register_journal_hooks, compact_journal_statement, write_journal
 from ...models.organization import Gate
 from ...models.inspections import Inspection, InspectionItem
 from ...models.auth import User
+from ...models.sync_journal import SyncJournalEntry
 
 logger = logging.getLogger(__name__)
 
@@ -41,37 +45,69 @@ class SyncService:
         'inspection_item': InspectionItem,
     }
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.retry_delays = [1, 2, 4, 8, 16, 30]  # Exponential backoff seconds
     
-    async def pull_changes(self, request: SyncPullRequest) -> SyncPullResponse:
+    async def pull_changes(self, request: SyncPullRequest, org_id: Optional[int] = None) -> SyncPullResponse:
         """
         Pull changes from server since last sync
         
-        Returns deltas with conflict detection
+        Returns one page of the merged change stream with conflict detection.
+        Pass the returned next_cursor back as request.cursor to resume
+        exactly after the last delta of this page. Once a pull completes,
+        sequence_watermark can be sent as since_sequence to read further
+        changes from the change journal instead.
         """
         start_time = datetime.now()
         
         try:
-            # Get changes since last sync timestamp
-            deltas = await self._get_changes_since(
-                request.last_sync_timestamp,
-                request.entity_types,
-                request.batch_size,
-                request.include_deleted
-            )
+            cursor = SyncCursor.decode(request.cursor) if request.cursor else None
+            
+            journal_pull = request.since_sequence is not None and cursor is None
+            
+            if journal_pull:
+                # Journal-based pull - index range scan on the change journal
+                deltas, sequence_watermark, has_more = await self._get_journal_changes(
+                    request.since_sequence,
+                    request.entity_types,
+                    request.batch_size,
+                    request.include_deleted,
+                    org_id=org_id
+                )
+            else:
+                # Journal head read first so no change is lost when the client
+                # switches from timestamps to sequence watermarks
+                sequence_watermark = await self._journal_head(org_id)
+                
+                # Fetch one extra delta to know whether another page exists
+                deltas = await self._get_changes_since(
+                    request.last_sync_timestamp,
+                    request.entity_types,
+                    request.batch_size + 1,
+                    request.include_deleted,
+                    cursor=cursor,
+                    org_id=org_id
+                )
+                
+                has_more = len(deltas) > request.batch_size
+                deltas = deltas[:request.batch_size]
+                if has_more:
+                    sequence_watermark = None
             
             # Detect potential conflicts
             conflicts = await self._detect_pull_conflicts(deltas, request.client_id)
             
             server_timestamp = datetime.now(timezone.utc)
             
-            # Check if there are more changes
-            has_more = len(deltas) >= request.batch_size
             next_cursor = None
-            if has_more and deltas:
-                next_cursor = f"{deltas[-1].last_modified_at.isoformat()}_{deltas[-1].entity_id}"
+            if has_more and not journal_pull:
+                last = deltas[-1]
+                next_cursor = SyncCursor(
+                    last_modified_at=last.last_modified_at,
+                    entity_type=last.entity_type,
+                    entity_id=int(last.entity_id)
+                ).encode()
             
             logger.info(
                 f"Pull sync completed: {len(deltas)} deltas, {len(conflicts)} conflicts",
@@ -88,6 +124,7 @@ class SyncService:
                 server_timestamp=server_timestamp,
                 has_more=has_more,
                 next_cursor=next_cursor,
+                sequence_watermark=sequence_watermark,
                 conflicts=conflicts
             )
             
@@ -98,41 +135,138 @@ class SyncService:
     async def push_changes(self, request: SyncPushRequest) -> SyncPushResponse:
         """
         Push client changes to server with conflict resolution
+        
+        Deltas are applied in batches per entity type:
+        1. group deltas by entity type
+        2. prefetch every target row with one IN query
+        3. check ETags in memory and plan creates / updates / soft deletes
+        4. write creates with one bulk INSERT and updates with one executemany
+           UPDATE, each inside a savepoint; if a bulk statement fails the
+           deltas are replayed one by one in their own savepoints so only the
+           bad ones are rejected; updates only match the row_version seen at
+           prefetch, rows another push changed in between match nothing
+        5. ETag conflicts, updates that matched nothing and repeated deltas
+           for the same entity go through the per-delta path after the bulk
+           writes
         """
         start_time = datetime.now()
+        timings = {}
         accepted_deltas = []
         rejected_deltas = []
         conflicts = []
         
+        def record(delta: SyncDelta, result: Dict[str, Any]):
+            if result['status'] == 'accepted':
+                accepted_deltas.append(delta.etag)
+            elif result['status'] == 'conflict':
+                conflicts.append(result['server_delta'])
+            else:
+                rejected_deltas.append({
+                    'etag': delta.etag,
+                    'reason': result.get('reason', 'processing_error'),
+                    'details': result.get('details')
+                })
+        
         try:
+            phase_start = time.perf_counter()
+            groups: Dict[str, List[SyncDelta]] = {}
             for delta in request.deltas:
-                try:
-                    result = await self._process_push_delta(delta, request.client_id)
-                    
+                if delta.entity_type not in self.ENTITY_MODELS:
+                    record(delta, {
+                        'status': 'rejected',
+                        'reason': 'unknown_entity_type',
+                        'details': f'Entity type {delta.entity_type} not supported'
+                    })
+                    continue
+                groups.setdefault(delta.entity_type, []).append(delta)
+            timings['group_ms'] = (time.perf_counter() - phase_start) * 1000
+            
+            phase_start = time.perf_counter()
+            existing_by_type = {}
+            for entity_type, deltas in groups.items():
+                existing_by_type[entity_type] = await self._prefetch_entities(
+                    self.ENTITY_MODELS[entity_type], deltas
+                )
+            timings['prefetch_ms'] = (time.perf_counter() - phase_start) * 1000
+            
+            phase_start = time.perf_counter()
+            plans = {}
+            deferred: List[SyncDelta] = []
+            for entity_type, deltas in groups.items():
+                plans[entity_type] = self._plan_push_batch(
+                    deltas,
+                    self.ENTITY_MODELS[entity_type],
+                    existing_by_type[entity_type],
+                    request.client_id,
+                    record,
+                    deferred
+                )
+            timings['plan_ms'] = (time.perf_counter() - phase_start) * 1000
+            
+            phase_start = time.perf_counter()
+            for entity_type, plan in plans.items():
+                model_class = self.ENTITY_MODELS[entity_type]
+                existing = existing_by_type[entity_type]
+                changes = []
+                
+                create_statement = insert(model_class).returning(
+                    model_class.id, model_class.org_id, sort_by_parameter_order=True
+                )
+                for delta, row, result, created in await self._execute_batch(create_statement, plan['creates']):
+                    record(delta, result)
+                    if created is not None:
+                        changes.append((created.id, created.org_id, SyncOperation.CREATE.value))
+                
+                update_statement = update(model_class).where(
+                    model_class.row_version == bindparam('expected_version')
+                ).execution_options(synchronize_session=None)
+                updated = await self._execute_batch(update_statement, plan['updates'])
+                written = await self._written_etags(model_class, [
+                    row['id'] for _, row, result, _ in updated if result['status'] == 'accepted'
+                ])
+                stale = []
+                for delta, row, result, _ in updated:
+                    if result['status'] == 'accepted' and written.get(row['id']) != row['etag']:
+                        # Changed by a concurrent push since the prefetch - resolve as a conflict
+                        stale.append(delta)
+                        continue
+                    record(delta, result)
                     if result['status'] == 'accepted':
-                        accepted_deltas.append(delta.etag)
-                    elif result['status'] == 'rejected':
-                        rejected_deltas.append({
-                            'etag': delta.etag,
-                            'reason': result['reason'],
-                            'details': result.get('details')
-                        })
-                    elif result['status'] == 'conflict':
-                        conflicts.append(result['server_delta'])
-                        
+                        operation = SyncOperation.DELETE if row.get('is_deleted') else SyncOperation.UPDATE
+                        changes.append((row['id'], existing[row['id']].org_id, operation.value))
+                
+                # Bulk statements bypass the ORM flush - journal them explicitly
+                if changes:
+                    rows = journal_entries(entity_type, changes)
+                    await self.db.run_sync(lambda session: write_journal(session.connection(), rows))
+                
+                # Bulk statements bypass the identity map - reload on next access
+                for entity in existing.values():
+                    self.db.expire(entity)
+                # Ahead of later deltas for the same entity
+                deferred[:0] = stale
+            timings['write_ms'] = (time.perf_counter() - phase_start) * 1000
+            
+            phase_start = time.perf_counter()
+            for delta in deferred:
+                try:
+                    async with self.db.begin_nested():
+                        result = await self._process_push_delta(delta, request.client_id)
+                        if result['status'] == 'accepted':
+                            await self.db.flush()
+                    record(delta, result)
                 except Exception as e:
                     logger.error(
                         f"Failed to process delta {delta.etag}: {str(e)}",
                         extra={'client_id': request.client_id, 'delta_etag': delta.etag}
                     )
-                    rejected_deltas.append({
-                        'etag': delta.etag,
-                        'reason': 'processing_error',
-                        'details': str(e)
-                    })
+                    record(delta, {'status': 'rejected', 'reason': 'processing_error', 'details': str(e)})
+            timings['deferred_ms'] = (time.perf_counter() - phase_start) * 1000
             
             # Commit all accepted changes
-            self.db.commit()
+            phase_start = time.perf_counter()
+            await self.db.commit()
+            timings['commit_ms'] = (time.perf_counter() - phase_start) * 1000
             
             server_timestamp = datetime.now(timezone.utc)
             
@@ -144,7 +278,8 @@ class SyncService:
                     'accepted_count': len(accepted_deltas),
                     'rejected_count': len(rejected_deltas),
                     'conflict_count': len(conflicts),
-                    'duration_ms': (datetime.now() - start_time).total_seconds() * 1000
+                    'duration_ms': (datetime.now() - start_time).total_seconds() * 1000,
+                    'phase_timings': timings
                 }
             )
             
@@ -152,76 +287,367 @@ class SyncService:
                 accepted_deltas=accepted_deltas,
                 rejected_deltas=rejected_deltas,
                 conflicts=conflicts,
-                server_timestamp=server_timestamp
+                server_timestamp=server_timestamp,
+                phase_timings={phase: round(ms, 2) for phase, ms in timings.items()}
             )
             
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error(f"Push sync failed: {str(e)}", extra={'client_id': request.client_id})
             raise
     
+    async def _prefetch_entities(self, model_class, deltas: List[SyncDelta]) -> Dict[int, Any]:
+        """Load every entity targeted by a delta group with a single IN query"""
+        ids = set()
+        for delta in deltas:
+            try:
+                ids.add(int(delta.entity_id))
+            except (TypeError, ValueError):
+                continue
+        
+        if not ids:
+            return {}
+        
+        entities = (await self.db.execute(
+            select(model_class).where(model_class.id.in_(ids))
+        )).scalars().all()
+        return {entity.id: entity for entity in entities}
+    
+    async def _written_etags(self, model_class, ids: List[int]) -> Dict[int, str]:
+        """Current ETag per row, to tell which versioned updates matched"""
+        if not ids:
+            return {}
+        
+        rows = (await self.db.execute(
+            select(model_class.id, model_class.etag).where(model_class.id.in_(ids))
+        )).all()
+        return {row.id: row.etag for row in rows}
+    
+    def _plan_push_batch(
+        self,
+        deltas: List[SyncDelta],
+        model_class,
+        existing: Dict[int, Any],
+        client_id: str,
+        record,
+        deferred: List[SyncDelta]
+    ) -> Dict[str, List[Tuple[SyncDelta, Dict[str, Any]]]]:
+        """
+        Check ETags in memory and turn deltas into bulk INSERT / UPDATE rows
+        
+        Deltas that need the ORM (conflict resolution) or that touch an entity
+        already changed earlier in the same batch are appended to deferred.
+        """
+        columns = set(model_class.__table__.columns.keys())
+        modified_by = f'client_{client_id}'
+        creates = []
+        updates = []
+        touched = set()
+        
+        for delta in deltas:
+            try:
+                entity_id = int(delta.entity_id)
+            except (TypeError, ValueError):
+                entity_id = None
+            
+            if entity_id is not None and entity_id in touched:
+                deferred.append(delta)
+                continue
+            if entity_id is not None:
+                touched.add(entity_id)
+            
+            entity = existing.get(entity_id)
+            sync_metadata = {
+                'etag': str(uuid.uuid4()),
+                'last_modified_at': datetime.now(timezone.utc),
+                'last_modified_by': modified_by,
+                'sync_status': 'synced',
+            }
+            
+            if delta.operation == SyncOperation.CREATE:
+                if entity is not None and not entity.is_deleted:
+                    record(delta, {
+                        'status': 'conflict',
+                        'server_delta': self._create_server_delta(entity, delta.entity_type),
+                        'reason': 'entity_already_exists'
+                    })
+                    continue
+                
+                unknown = set(delta.data or {}) - columns
+                if unknown:
+                    record(delta, {
+                        'status': 'rejected',
+                        'reason': 'create_failed',
+                        'details': f"Unknown fields: {', '.join(sorted(unknown))}"
+                    })
+                    continue
+                
+                row = dict(delta.data or {})
+                row.update(sync_metadata, row_version=1, is_deleted=False)
+                creates.append((delta, row))
+            
+            elif delta.operation == SyncOperation.UPDATE:
+                if entity is None or entity.is_deleted:
+                    record(delta, {
+                        'status': 'rejected',
+                        'reason': 'entity_not_found',
+                        'details': f'Entity {delta.entity_id} not found or deleted'
+                    })
+                    continue
+                
+                if entity.etag != delta.etag:
+                    # ETag mismatch - resolved through the per-delta path
+                    deferred.append(delta)
+                    continue
+                
+                row = {
+                    key: value for key, value in (delta.data or {}).items()
+                    if key in columns and key not in ('id', 'etag', 'row_version')
+                }
+                row.update(
+                    sync_metadata, id=entity.id,
+                    row_version=entity.row_version + 1, expected_version=entity.row_version
+                )
+                updates.append((delta, row))
+            
+            elif delta.operation == SyncOperation.DELETE:
+                if entity is None or entity.is_deleted:
+                    # Already deleted or never existed
+                    record(delta, {'status': 'accepted'})
+                    continue
+                
+                if entity.etag != delta.etag:
+                    record(delta, {
+                        'status': 'conflict',
+                        'server_delta': self._create_server_delta(entity, delta.entity_type),
+                        'reason': 'etag_mismatch'
+                    })
+                    continue
+                
+                row = dict(
+                    sync_metadata, id=entity.id, row_version=entity.row_version + 1,
+                    expected_version=entity.row_version, is_deleted=True
+                )
+                updates.append((delta, row))
+            
+            else:
+                record(delta, {
+                    'status': 'rejected',
+                    'reason': 'unknown_operation',
+                    'details': f'Operation {delta.operation} not supported'
+                })
+        
+        return {'creates': creates, 'updates': updates}
+    
+    async def _execute_batch(
+        self,
+        statement,
+        batch: List[Tuple[SyncDelta, Dict[str, Any]]]
+    ) -> List[Tuple[SyncDelta, Dict[str, Any], Dict[str, Any], Any]]:
+        """
+        Run one bulk statement for the whole batch inside a savepoint
+        
+        If the bulk statement fails, each row is retried in its own savepoint
+        so a single bad delta is rejected without failing the others.
+        Returns (delta, row, result, returned_row) per delta; returned_row is
+        the RETURNING row for statements that have one.
+        """
+        if not batch:
+            return []
+        
+        returning = bool(getattr(statement, '_returning', None))
+        
+        try:
+            async with self.db.begin_nested():
+                result = await self.db.execute(statement, [row for _, row in batch])
+                returned = result.all() if returning else [None] * len(batch)
+            return [
+                (delta, row, {'status': 'accepted'}, returned_row)
+                for (delta, row), returned_row in zip(batch, returned)
+            ]
+        except Exception as e:
+            logger.warning(f"Bulk sync write failed, falling back to per-delta savepoints: {str(e)}")
+        
+        results = []
+        for delta, row in batch:
+            try:
+                async with self.db.begin_nested():
+                    result = await self.db.execute(statement, [row])
+                    returned_row = result.all()[0] if returning else None
+                results.append((delta, row, {'status': 'accepted'}, returned_row))
+            except Exception as e:
+                results.append((delta, row, {
+                    'status': 'rejected',
+                    'reason': 'write_failed',
+                    'details': str(e)
+                }, None))
+        return results
+    
     async def _get_changes_since(
         self,
         since_timestamp: Optional[datetime],
         entity_types: Optional[List[str]],
         batch_size: int,
-        include_deleted: bool
+        include_deleted: bool,
+        cursor: Optional[SyncCursor] = None,
+        org_id: Optional[int] = None
     ) -> List[SyncDelta]:
         """
-        Get entity changes since timestamp
+        Get entity changes after a keyset cursor (or since a timestamp)
+        
+        Every entity stream is read in (last_modified_at, id) order starting
+        strictly after the cursor and limited to batch_size; the streams are
+        then merged on (last_modified_at, entity_type, id) and the first
+        batch_size deltas are returned, so the limit applies to the whole
+        batch and rows sharing a timestamp are neither skipped nor repeated.
         """
-        deltas = []
+        # Default to 1 hour ago if neither cursor nor timestamp provided
+        if cursor is None and since_timestamp is None:
+            since_timestamp = datetime.now(timezone.utc) - timedelta(hours=1)
         
-        # Default to 1 hour ago if no timestamp provided
-        if since_timestamp is None:
-            since_timestamp = datetime.now(timezone.utc).replace(hour=datetime.now().hour - 1)
+        streams = []
         
-        for entity_type, model_class in self.ENTITY_MODELS.items():
+        for entity_type in sorted(self.ENTITY_MODELS):
             if entity_types and entity_type not in entity_types:
                 continue
             
+            model_class = self.ENTITY_MODELS[entity_type]
+            
             # Build query conditions
-            conditions = [model_class.last_modified_at > since_timestamp]
+            conditions = [self._keyset_condition(model_class, entity_type, since_timestamp, cursor)]
+            
+            if org_id is not None:
+                conditions.append(model_class.org_id == org_id)
             
             if not include_deleted:
                 conditions.append(model_class.is_deleted == False)
             
             # Query entities with changes
             query = (
-                self.db.query(model_class)
-                .filter(and_(*conditions))
+                select(model_class)
+                .where(and_(*conditions))
                 .order_by(model_class.last_modified_at, model_class.id)
                 .limit(batch_size)
             )
             
-            entities = query.all()
+            entities = (await self.db.execute(query)).scalars().all()
+            streams.append([(entity.last_modified_at, entity_type, entity.id, entity) for entity in entities])
+        
+        deltas = []
+        for _, entity_type, _, entity in heapq.merge(*streams, key=lambda row: row[:3]):
+            deltas.append(self._create_server_delta(entity, entity_type))
             
-            for entity in entities:
-                operation = SyncOperation.DELETE if entity.is_deleted else (
-                    SyncOperation.CREATE if entity.row_version == 1 else SyncOperation.UPDATE
-                )
-                
+            if len(deltas) >= batch_size:
+                break
+        
+        return deltas
+    
+    @staticmethod
+    def _keyset_condition(model_class, entity_type: str, since_timestamp: Optional[datetime], cursor: Optional[SyncCursor]):
+        """
+        WHERE clause selecting rows of one entity stream after the cursor
+        
+        The entity type is constant within a stream, so the tuple comparison
+        (last_modified_at, entity_type, id) > cursor reduces to a plain
+        (last_modified_at, id) range that the composite index can serve.
+        """
+        if cursor is None:
+            return model_class.last_modified_at > since_timestamp
+        
+        if entity_type < cursor.entity_type:
+            return model_class.last_modified_at > cursor.last_modified_at
+        
+        if entity_type > cursor.entity_type:
+            return model_class.last_modified_at >= cursor.last_modified_at
+        
+        return or_(
+            model_class.last_modified_at > cursor.last_modified_at,
+            and_(
+                model_class.last_modified_at == cursor.last_modified_at,
+                model_class.id > cursor.entity_id
+            )
+        )
+    
+    async def _journal_head(self, org_id: Optional[int]) -> int:
+        """Highest change journal sequence number visible to the organization"""
+        query = select(func.max(SyncJournalEntry.seq))
+        if org_id is not None:
+            query = query.where(SyncJournalEntry.org_id == org_id)
+        return (await self.db.scalar(query)) or 0
+    
+    async def _get_journal_changes(
+        self,
+        since_sequence: int,
+        entity_types: Optional[List[str]],
+        batch_size: int,
+        include_deleted: bool,
+        org_id: Optional[int] = None
+    ) -> Tuple[List[SyncDelta], int, bool]:
+        """
+        Get entity changes after a change journal sequence number
+        
+        Reads one page of journal rows, collapses repeated changes of the same
+        entity to its latest entry and loads the current entity state with one
+        IN query per entity type. Entities that no longer exist (purged
+        tombstones) are returned as DELETE deltas. Journal writers of an
+        organization commit in seq order (see journal.write_journal), so no
+        row of that organization below the returned watermark can become
+        visible later.
+        
+        Returns (deltas, sequence_watermark, has_more).
+        """
+        conditions = [SyncJournalEntry.seq > since_sequence]
+        if org_id is not None:
+            conditions.append(SyncJournalEntry.org_id == org_id)
+        if entity_types:
+            conditions.append(SyncJournalEntry.entity_type.in_(entity_types))
+        
+        entries = (await self.db.execute(
+            select(SyncJournalEntry)
+            .where(and_(*conditions))
+            .order_by(SyncJournalEntry.seq)
+            .limit(batch_size + 1)
+        )).scalars().all()
+        
+        has_more = len(entries) > batch_size
+        entries = entries[:batch_size]
+        if not entries:
+            return [], since_sequence, False
+        
+        latest = {}
+        for entry in entries:
+            latest[(entry.entity_type, entry.entity_id)] = entry
+        
+        loaded = {}
+        for entity_type in {entity_type for entity_type, _ in latest}:
+            model_class = self.ENTITY_MODELS.get(entity_type)
+            if model_class is None:
+                continue
+            ids = [entity_id for journal_type, entity_id in latest if journal_type == entity_type]
+            entities = (await self.db.execute(
+                select(model_class).where(model_class.id.in_(ids))
+            )).scalars().all()
+            loaded.update({(entity_type, entity.id): entity for entity in entities})
+        
+        deltas = []
+        for key, entry in sorted(latest.items(), key=lambda item: item[1].seq):
+            entity = loaded.get(key)
+            
+            if entity is None:
                 delta = SyncDelta(
-                    entity_type=entity_type,
-                    entity_id=str(entity.id),
-                    operation=operation,
-                    etag=entity.etag,
-                    row_version=entity.row_version,
-                    last_modified_at=entity.last_modified_at,
-                    last_modified_by=entity.last_modified_by,
-                    data=self._serialize_entity(entity) if not entity.is_deleted else None,
-                    conflict_data=json.loads(entity.conflict_data) if entity.conflict_data else None
+                    entity_type=entry.entity_type,
+                    entity_id=str(entry.entity_id),
+                    operation=SyncOperation.DELETE,
+                    last_modified_at=entry.changed_at
                 )
-                
-                deltas.append(delta)
-                
-                if len(deltas) >= batch_size:
-                    break
+            else:
+                delta = self._create_server_delta(entity, entry.entity_type)
             
-            if len(deltas) >= batch_size:
-                break
+            if delta.operation == SyncOperation.DELETE and not include_deleted:
+                continue
+            deltas.append(delta)
         
-        return sorted(deltas, key=lambda d: (d.last_modified_at, d.entity_id))
+        return deltas, entries[-1].seq, has_more
     
     async def _detect_pull_conflicts(self, deltas: List[SyncDelta], client_id: str) -> List[SyncDelta]:
         """
@@ -251,9 +677,9 @@ class SyncService:
         
         try:
             # Find existing entity
-            existing_entity = self.db.query(model_class).filter(
-                model_class.id == int(delta.entity_id)
-            ).first()
+            existing_entity = (await self.db.execute(
+                select(model_class).where(model_class.id == int(delta.entity_id))
+            )).scalars().first()
             
             if delta.operation == SyncOperation.CREATE:
                 return await self._process_create_delta(delta, model_class, existing_entity, client_id)
@@ -308,7 +734,7 @@ class SyncService:
             
             new_entity = model_class(**entity_data)
             self.db.add(new_entity)
-            self.db.flush()  # Get ID without committing
+            await self.db.flush()  # Get ID without committing
             
             return {'status': 'accepted'}
             
@@ -571,6 +997,14 @@ class SyncService:
         
         return data
     
+    async def compact_journal(self, cutoff: datetime) -> int:
+        """
+        Drop change journal rows older than cutoff that a newer row of the
+        same entity supersedes; the latest row per entity is always kept.
+        """
+        result = await self.db.execute(compact_journal_statement(cutoff))
+        return result.rowcount
+    
     async def get_sync_metrics(self, client_id: str, since: datetime) -> SyncMetrics:
         """Get sync operation metrics"""
         
@@ -597,15 +1031,18 @@ class RetryableSync:
         self.max_delay = 300.0  # Max delay in seconds
         self.backoff_multiplier = 2.0
     
-    async def pull_with_retry(self, request: SyncPullRequest) -> SyncPullResponse:
+    async def pull_with_retry(self, request: SyncPullRequest, org_id: Optional[int] = None) -> SyncPullResponse:
         """Pull changes with exponential backoff retry"""
         
         last_exception = None
         
         for attempt in range(self.max_retries + 1):
             try:
-                return await self.sync_service.pull_changes(request)
+                return await self.sync_service.pull_changes(request, org_id)
                 
+            except ValueError:
+                # Malformed cursor - retrying cannot help
+                raise
             except Exception as e:
                 last_exception = e
                 
@@ -668,4 +1105,8 @@ class RetryableSync:
         return min(
             self.base_delay * (self.backoff_multiplier ** attempt),
             self.max_delay
-        )
\ No newline at end of file
+        )
+
+
+# Journal ORM changes of every synced entity type
+register_journal_hooks(SyncService.ENTITY_MODELS)
@@ -1,6 +1,9 @@
 """Database configuration and connection management."""
 
+from typing import AsyncGenerator
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 import structlog
@@ -32,6 +35,46 @@ else:
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def get_async_database_url(url: str) -> str:
+    """Map a sync database URL onto its async driver (asyncpg / aiosqlite)."""
+    if url.startswith("postgresql+asyncpg://") or url.startswith("sqlite+aiosqlite://"):
+        return url
+    if url.startswith("postgresql://") or url.startswith("postgres://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("postgresql+psycopg2://"):
+        return url.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+# Create async database engine (used by async route handlers; Celery tasks keep the sync engine)
+if settings.DATABASE_URL.startswith("sqlite"):
+    async_engine = create_async_engine(
+        get_async_database_url(settings.DATABASE_URL),
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        echo=settings.DEBUG
+    )
+else:
+    async_engine = create_async_engine(
+        get_async_database_url(settings.DATABASE_URL),
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20
+    )
+
+# Create async session factory
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
 def get_db() -> Session:
     """Dependency to get database session."""
     db = SessionLocal()
@@ -45,6 +88,21 @@ def get_db() -> Session:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency to get an async database session.
+
+    Synchronous ORM services can be run against it without blocking the
+    event loop via ``await db.run_sync(lambda session: Service(session).method())``.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error("Async database session error", error=str(e))
+            await db.rollback()
+            raise
+
+
 def create_tables():
     """Create all database tables."""
     from app.models import Base
@@ -82,6 +82,14 @@ async def lifespan(app: FastAPI):
         log_level=settings.LOG_LEVEL
     )
     
+    # Receive RBAC permission invalidations from other workers
+    from app.core.permission_cache import get_permission_cache
+    get_permission_cache().start_listener()
+    
+    # Receive QR/NFC gate token rotations from other workers
+    from app.core.gate_token_cache import get_gate_token_cache
+    get_gate_token_cache().start_listener()
+    
     # Initialize services here if needed
     # Example: await initialize_database()
     # Example: await initialize_s3_client()
@@ -90,6 +98,13 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down GarageReg API")
+    
+    # Flush buffered audit rows
+    from app.core.audit_writer import get_audit_writer
+    await get_audit_writer().stop()
+    
+    from app.core.password_pool import get_password_hash_pool
+    get_password_hash_pool().shutdown()
     # Cleanup resources here if needed
 
 
@@ -58,6 +58,8 @@ from app.models.auth import User, Role, Permission, RoleAssignment, WebAuthnCred
 from app.models.documents import Document, MediaObject, Integration, Webhook
 from app.models.inventory import Warehouse, InventoryItem, StockMovement, StockAlert, StockTake, StockTakeLine, Event
 from app.models.audit_logs import AuditLog
+from app.models.analytics import AnalyticsDailyRollup, AnalyticsRollupState
+from app.models.sync_journal import SyncJournalEntry
 
 # Export all models
 __all__ = [
@@ -78,4 +80,6 @@ __all__ = [
     'Document', 'MediaObject', 'Integration', 'Webhook',
     # Inventory and audit
     'Warehouse', 'InventoryItem', 'StockMovement', 'StockAlert', 'StockTake', 'StockTakeLine', 'AuditLog', 'Event',
+    # Analytics rollups and sync journal
+    'AnalyticsDailyRollup', 'AnalyticsRollupState', 'SyncJournalEntry',
 ]
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""
+Analytics rollup models
+Előre aggregált KPI táblák a dashboard-hoz
+"""
+
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, Index, UniqueConstraint
+from datetime import datetime
+
+from app.models import Base
+
+
+class AnalyticsDailyRollup(Base):
+    """
+    Per-organization, per-day, per-gate-type KPI counters
+    Szervezetenkénti, napi, kaputípusonkénti KPI számlálók
+
+    Each counter is bucketed on the date column noted next to it, so one row
+    answers "what happened on this day" for every dashboard metric.
+    """
+    __tablename__ = "analytics_daily_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Dimenziók - Dimensions
+    org_id = Column(Integer, nullable=False)
+    rollup_date = Column(Date, nullable=False)
+    gate_type = Column(String(50), nullable=False, default='unknown')
+
+    # Ellenőrzések (ellenőrzés dátuma szerint) - Inspections by inspection date
+    inspections_total = Column(Integer, nullable=False, default=0)
+    inspections_completed = Column(Integer, nullable=False, default=0)
+    inspections_open = Column(Integer, nullable=False, default=0)  # draft / started / in_progress
+
+    # Munkalapok (létrehozás dátuma szerint) - Work orders by creation date
+    work_orders_total = Column(Integer, nullable=False, default=0)
+    work_orders_completed = Column(Integer, nullable=False, default=0)
+    work_orders_sla_breached = Column(Integer, nullable=False, default=0)
+    work_orders_resolution_hours = Column(Float, nullable=False, default=0.0)
+
+    # Nyitott munkalapok SLA határidő szerint - Open work orders by SLA due date
+    work_orders_sla_open = Column(Integer, nullable=False, default=0)
+
+    # Ellenőrzési tételek (befejezés dátuma szerint) - Items by inspection completion date
+    inspection_items_total = Column(Integer, nullable=False, default=0)
+    inspection_items_failed = Column(Integer, nullable=False, default=0)
+
+    refreshed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('org_id', 'rollup_date', 'gate_type', name='uq_analytics_rollup_org_date_gate_type'),
+        Index('idx_analytics_rollup_org_date', 'org_id', 'rollup_date'),
+    )
+
+    def __repr__(self):
+        return f"<AnalyticsDailyRollup(org_id={self.org_id}, date={self.rollup_date}, gate_type='{self.gate_type}')>"
+
+
+class AnalyticsRollupState(Base):
+    """
+    Rollup coverage and freshness per organization
+    Rollup lefedettség és frissesség szervezetenként
+    """
+    __tablename__ = "analytics_rollup_state"
+
+    org_id = Column(Integer, primary_key=True)
+
+    # Lefedett időszak - Covered date range (inclusive)
+    coverage_start = Column(Date, nullable=False)
+    coverage_end = Column(Date, nullable=False)
+
+    # Utolsó teljes ablak frissítés - Last full window refresh
+    refreshed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<AnalyticsRollupState(org_id={self.org_id}, refreshed_at={self.refreshed_at})>"
@@ -20,7 +20,7 @@ class AuditLog(Base):
     """
     __tablename__ = "audit_logs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     
     # Base model fields
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -33,15 +33,15 @@ class AuditLog(Base):
     username = Column(String(100), nullable=True)   # Username at time of action
     
     # Mikor történt - When it happened
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Mit csinált - What was done
-    action = Column(String(50), nullable=False, index=True)  # CREATE, UPDATE, DELETE, LOGIN, etc.
+    action = Column(String(50), nullable=False)  # CREATE, UPDATE, DELETE, LOGIN, etc.
     action_description = Column(String(500), nullable=True)  # Human-readable description
     
     # Mit érintett - What was affected
-    entity_type = Column(String(100), nullable=False, index=True)  # Gate, User, Maintenance, etc.
-    entity_id = Column(Integer, nullable=False, index=True)  # ID of affected resource
+    entity_type = Column(String(100), nullable=False)  # Gate, User, Maintenance, etc.
+    entity_id = Column(Integer, nullable=False)  # ID of affected resource
     
     # Előtte/utána adatok - Before/After data
     old_values = Column(JSON, nullable=True)  # Data before change
@@ -49,7 +49,7 @@ class AuditLog(Base):
     changed_fields = Column(JSON, nullable=True)  # List of changed field names
     
     # Technikai részletek - Technical details
-    ip_address = Column(String(45), nullable=True, index=True)  # IPv4/IPv6
+    ip_address = Column(String(45), nullable=True)  # IPv4/IPv6
     user_agent = Column(Text, nullable=True)  # Browser/Client info
     session_id = Column(String(100), nullable=True, index=True)  # Session identifier
     request_method = Column(String(10), nullable=True)  # GET, POST, PUT, DELETE
@@ -57,15 +57,15 @@ class AuditLog(Base):
     request_id = Column(String(100), nullable=True, index=True)  # Unique request ID
     
     # Szervezet - Organization context
-    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True)
     
     # Művelet eredménye - Operation result
-    success = Column(Boolean, nullable=False, default=True, index=True)
+    success = Column(Boolean, nullable=False, default=True)
     error_message = Column(Text, nullable=True)
     duration_ms = Column(Integer, nullable=True)  # Operation duration in milliseconds
     
     # Üzleti logika - Business context
-    risk_level = Column(String(20), default="LOW", nullable=False, index=True)  # LOW, MEDIUM, HIGH, CRITICAL
+    risk_level = Column(String(20), default="LOW", nullable=False)  # LOW, MEDIUM, HIGH, CRITICAL
     compliance_flags = Column(JSON, nullable=True)  # Compliance-related flags
     
     # Kapcsolatok - Relationships
@@ -73,6 +73,9 @@ class AuditLog(Base):
     organization = relationship("Organization")
     
     # Indexek - Database indexes
+    # PostgreSQL-en havi partíciók a timestamp alapján - monthly range
+    # partitions on timestamp (PK is (id, timestamp) there), see
+    # app/services/audit_partition_service.py
     __table_args__ = (
         Index('idx_audit_timestamp_action', 'timestamp', 'action'),
         Index('idx_audit_user_timestamp', 'user_id', 'timestamp'),
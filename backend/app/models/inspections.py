@@ -422,6 +422,7 @@ class InspectionPhoto(TenantModel):
     s3_bucket = Column(String(100), nullable=False)
     s3_key = Column(String(500), nullable=False)  # Full S3 object key
     s3_url = Column(String(1000), nullable=True)  # Pre-signed URL (temporary)
+    derivatives = Column(JSONB, nullable=True)  # {size: {width, height, webp: key, jpeg: key}}
     
     # File metadata
     original_filename = Column(String(255), nullable=True)
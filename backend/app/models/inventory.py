@@ -1,12 +1,12 @@
 """Inventory management and audit logging models."""
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Numeric, Index
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Numeric, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship, validates
 from sqlalchemy.dialects.postgresql import JSONB, INET
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
-from app.models import TenantModel, BaseModel
+from app.models import Base, TenantModel, BaseModel
 
 
 class Warehouse(TenantModel):
@@ -140,6 +140,12 @@ class InventoryItem(TenantModel):
         Index("idx_inventory_status", "stock_status"),
         Index("idx_inventory_reorder", "reorder_point"),
         Index("idx_inventory_cycle_count", "next_cycle_count_date"),
+        # Minimumkészlet alatti tételek - only the rows low stock alert scans read
+        Index(
+            "idx_inventory_below_minimum", "org_id", "warehouse_id",
+            postgresql_where=text("is_active AND minimum_stock > 0 AND quantity_available <= minimum_stock"),
+            sqlite_where=text("is_active = 1 AND minimum_stock > 0 AND quantity_available <= minimum_stock")
+        ),
     )
     
     @validates("stock_status")
@@ -241,9 +247,11 @@ class StockMovement(TenantModel):
         Index("idx_stock_movement_part", "part_id"),
         Index("idx_stock_movement_type", "movement_type"),
         Index("idx_stock_movement_date", "movement_date"),
+        Index("idx_stock_movement_date_id", "movement_date", "id"),
         Index("idx_stock_movement_reference", "reference_type", "reference_id"),
         Index("idx_stock_movement_document", "document_number"),
         Index("idx_stock_movement_status", "status"),
+        Index("idx_stock_movement_created_at", "created_at"),
     )
     
     @validates("movement_type")
@@ -261,6 +269,54 @@ class StockMovement(TenantModel):
         return value
 
 
+class StockMovementCounter(Base):
+    """
+    Napi mozgásszám számláló - per-day movement number counter
+    
+    Used to allocate MOV{date}{seq} numbers on databases without sequences
+    (SQLite); PostgreSQL uses the stock_movement_number_seq sequence.
+    """
+    __tablename__ = "stock_movement_counters"
+    
+    day = Column(String(8), primary_key=True)  # YYYYMMDD
+    last_value = Column(Integer, nullable=False, default=0)
+
+
+class StockLedgerSnapshot(Base):
+    """
+    Napi záró készlet tételenként - per item closing balance of a day
+    
+    Built incrementally by maintenance.build_stock_ledger_snapshots: a row
+    exists for every item that moved on a day and covers all movements with
+    movement_date < period_end. Balance validation and balance-as-of-date
+    queries start from the latest snapshot and only scan later movements.
+    """
+    __tablename__ = "stock_ledger_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    org_id = Column(Integer, nullable=False, index=True)
+    inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"), nullable=False)
+    warehouse_id = Column(Integer, nullable=False)
+    part_id = Column(Integer, nullable=False)
+    period_end = Column(DateTime, nullable=False)  # exclusive upper bound of movement_date
+    
+    # Záró egyenleg - closing balance
+    closing_quantity = Column(Numeric(15, 3), nullable=False, default=0)
+    closing_value = Column(Numeric(15, 2), nullable=False, default=0)
+    
+    # Halmozott főkönyvi forgalom - cumulative debits / credits up to period_end
+    total_debits = Column(Numeric(15, 3), nullable=False, default=0)
+    total_credits = Column(Numeric(15, 3), nullable=False, default=0)
+    movement_count = Column(Integer, nullable=False, default=0)  # movements within the period
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('inventory_item_id', 'period_end', name='uq_stock_ledger_snapshot_item_period'),
+        Index('idx_stock_ledger_snapshot_period_item', 'period_end', 'inventory_item_id'),
+    )
+
+
 class InventoryAuditLog(BaseModel):
     """
     Inventory Audit Logs - audit trail for inventory-specific changes.
@@ -2,7 +2,7 @@
 
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from dateutil.rrule import rrule, DAILY, WEEKLY, MONTHLY, YEARLY
 
@@ -201,6 +201,11 @@ class ScheduledMaintenanceJob(Base):
     gate = relationship("Gate")
     assigned_to = relationship("User")
     
+    __table_args__ = (
+        # One job per plan occurrence; lets job generation insert with ON CONFLICT DO NOTHING
+        UniqueConstraint('plan_id', 'plan_occurrence_id', name='uq_advanced_scheduled_jobs_plan_occurrence'),
+    )
+    
     @property
     def effective_priority(self) -> str:
         """Get the effective priority (override or plan priority)."""
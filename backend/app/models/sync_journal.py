@@ -0,0 +1,43 @@
+"""
+Sync change journal
+Szinkronizációs változásnapló - append-only
+"""
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Index
+from datetime import datetime
+
+from app.models import Base
+
+
+class SyncJournalEntry(Base):
+    """
+    One row per change of a versioned (delta sync) entity
+    Verziózott entitások minden változásáról egy sor
+
+    Rows are written in the same transaction as the change itself, and
+    writers of the same organization serialize on its journal lock until
+    commit, so within an organization the sequence number is a
+    gap-tolerant, monotonic watermark for pull sync.
+    """
+    __tablename__ = "sync_change_journal"
+
+    # Monoton sorszám - Monotonic sequence number
+    seq = Column(BigInteger().with_variant(Integer, 'sqlite'), primary_key=True, autoincrement=True)
+
+    # Érintett entitás - Affected entity
+    entity_type = Column(String(50), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    org_id = Column(Integer, nullable=True)
+
+    # Művelet - Operation: create, update, delete
+    operation = Column(String(10), nullable=False)
+
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index('idx_sync_journal_org_seq', 'org_id', 'seq'),
+        Index('idx_sync_journal_entity_seq', 'entity_type', 'entity_id', 'seq'),
+    )
+
+    def __repr__(self):
+        return f"<SyncJournalEntry(seq={self.seq}, {self.entity_type}:{self.entity_id} {self.operation})>"
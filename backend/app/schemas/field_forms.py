@@ -88,6 +88,73 @@ class PhotoUploadResponse(BaseModel):
         from_attributes = True
 
 
+# Bulk photo upload schemas
+class BulkPhotoUploadItem(BaseModel):
+    """One photo of a bulk upload request."""
+    client_ref: Optional[str] = Field(None, max_length=100, description="Client-side reference echoed back")
+    inspection_item_id: Optional[int] = Field(None, gt=0)
+    metadata: PhotoMetadata
+
+
+class BulkPhotoUploadRequest(BaseModel):
+    """Reserve upload slots for several photos at once."""
+    photos: List[BulkPhotoUploadItem] = Field(..., min_length=1, max_length=200)
+
+
+class MultipartUploadPart(BaseModel):
+    """Pre-signed URL for one part of a multipart upload."""
+    part_number: int = Field(..., ge=1, le=10000)
+    upload_url: str
+
+
+class BulkPhotoUploadTarget(BaseModel):
+    """Where and how to upload one reserved photo."""
+    photo_id: int = Field(..., description="Created photo record ID")
+    client_ref: Optional[str] = None
+    s3_key: str = Field(..., description="S3 object key")
+    upload_url: Optional[str] = Field(None, description="Pre-signed PUT URL (single-part uploads)")
+    multipart_upload_id: Optional[str] = Field(None, description="S3 multipart upload ID (large files)")
+    part_size_bytes: Optional[int] = Field(None, description="Size of every part except the last")
+    parts: List[MultipartUploadPart] = Field(default_factory=list)
+    expires_at: datetime = Field(..., description="Upload URL expiration")
+
+
+class BulkPhotoUploadResponse(BaseModel):
+    """Upload targets in request order."""
+    inspection_id: int
+    uploads: List[BulkPhotoUploadTarget]
+
+
+class UploadedPart(BaseModel):
+    """ETag returned by S3 for an uploaded part."""
+    part_number: int = Field(..., ge=1, le=10000)
+    etag: str = Field(..., min_length=1)
+
+
+class BulkPhotoConfirmItem(BaseModel):
+    """Completion report for one uploaded photo."""
+    photo_id: int = Field(..., gt=0)
+    multipart_upload_id: Optional[str] = None
+    parts: List[UploadedPart] = Field(default_factory=list)
+
+
+class BulkPhotoConfirmRequest(BaseModel):
+    """Confirm several uploads at once."""
+    photos: List[BulkPhotoConfirmItem] = Field(..., min_length=1, max_length=200)
+
+
+class BulkPhotoConfirmFailure(BaseModel):
+    """Photo that could not be confirmed."""
+    photo_id: int
+    error: str
+
+
+class BulkPhotoConfirmResponse(BaseModel):
+    """Outcome of a bulk confirmation."""
+    confirmed: List[int] = Field(default_factory=list)
+    failed: List[BulkPhotoConfirmFailure] = Field(default_factory=list)
+
+
 class PhotoResponse(BaseModel):
     """Photo information response."""
     id: int
@@ -99,6 +166,10 @@ class PhotoResponse(BaseModel):
     s3_bucket: str
     s3_key: str
     s3_url: Optional[str]
+    derivative_urls: Dict[str, Dict[str, str]] = Field(
+        default_factory=dict,
+        description="Downscaled renditions by size ('thumb', 'medium', 'large') and format ('webp', 'jpeg')"
+    )
     original_filename: Optional[str]
     file_size_bytes: Optional[int]
     mime_type: Optional[str]
@@ -11,6 +11,7 @@ from typing import Dict, List, Optional, Any, Set, Union
 from dataclasses import dataclass, field, asdict
 import hashlib
 import ipaddress
+import uuid
 from urllib.parse import urlparse
 
 import redis.asyncio as redis
@@ -23,6 +24,73 @@ from email.mime.multipart import MimeMultipart
 
 logger = structlog.get_logger(__name__)
 
+# Retention of event bodies and indexes (seconds)
+EVENT_TTL = 86400 * 30
+TIME_INDEX_TTL = 86400 * 7
+TYPE_INDEX_TTL = 86400 * 30
+USER_INDEX_TTL = 86400 * 90
+
+# Atomic event ingest: store the event, update its indexes and the sliding
+# window of every candidate alert rule in one round trip.
+#
+# KEYS: event, time index, type index, user index ("" when no user),
+#       then per rule: window key, cooldown key
+# ARGV: event json, event id, score, event ttl, time ttl, type ttl, user ttl,
+#       then per rule: window seconds, threshold
+# Returns: flat list of (rule position, window count) for rules that reached
+#          their threshold and are not in cooldown
+INGEST_EVENT_SCRIPT = """
+local event_id = ARGV[2]
+local score = tonumber(ARGV[3])
+
+redis.call('SETEX', KEYS[1], ARGV[4], ARGV[1])
+redis.call('ZADD', KEYS[2], score, event_id)
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+redis.call('ZADD', KEYS[3], score, event_id)
+redis.call('EXPIRE', KEYS[3], ARGV[6])
+if KEYS[4] ~= '' then
+    redis.call('ZADD', KEYS[4], score, event_id)
+    redis.call('EXPIRE', KEYS[4], ARGV[7])
+end
+
+local triggered = {}
+local rule_count = (#KEYS - 4) / 2
+for i = 1, rule_count do
+    local window_key = KEYS[4 + 2 * i - 1]
+    local cooldown_key = KEYS[4 + 2 * i]
+    local window = tonumber(ARGV[7 + 2 * i - 1])
+    local threshold = tonumber(ARGV[7 + 2 * i])
+
+    redis.call('ZADD', window_key, score, event_id)
+    redis.call('ZREMRANGEBYSCORE', window_key, '-inf', '(' .. (score - window))
+    redis.call('EXPIRE', window_key, math.max(window, 1))
+    local count = redis.call('ZCARD', window_key)
+
+    if count >= threshold and redis.call('EXISTS', cooldown_key) == 0 then
+        table.insert(triggered, i)
+        table.insert(triggered, count)
+    end
+end
+return triggered
+"""
+
+# Sorted-set index of alert ids scored by alert timestamp
+ALERT_INDEX_KEY = "security_alerts_index"
+ALERT_TTL = 86400 * 30
+
+# Event bodies fetched per MGET when reading query results
+EVENT_FETCH_CHUNK = 500
+
+# Lifetime of temporary query result sets (seconds)
+QUERY_RESULT_TTL = 60
+
+# Rule conditions and the event attribute each one partitions the window by
+RULE_CONDITION_FIELDS = (
+    ("same_ip", "source_ip"),
+    ("same_user", "user_id"),
+    ("same_endpoint", "endpoint"),
+)
+
 class SecurityEventType(Enum):
     """Security event types for audit logging"""
     
@@ -87,6 +155,15 @@ class SecurityEventSeverity(Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
+# Severity order for alert rule thresholds
+SEVERITY_RANK = {
+    SecurityEventSeverity.INFO: 0,
+    SecurityEventSeverity.LOW: 1,
+    SecurityEventSeverity.MEDIUM: 2,
+    SecurityEventSeverity.HIGH: 3,
+    SecurityEventSeverity.CRITICAL: 4,
+}
+
 class AlertChannel(Enum):
     """Alert notification channels"""
     
@@ -243,6 +320,7 @@ class SecurityAuditor:
         self.threat_intel = ThreatIntelligence()
         self.alert_rules: Dict[str, AlertRule] = {}
         self.running_tasks: Set[asyncio.Task] = set()
+        self._ingest_script = self.redis.register_script(INGEST_EVENT_SCRIPT)
         
         # Initialize default alert rules
         self._initialize_default_rules()
@@ -314,27 +392,11 @@ class SecurityAuditor:
             # Enhance event with threat intelligence
             await self._enhance_event_with_threat_intel(event)
             
-            # Store event in Redis
-            event_key = f"security_event:{event.event_id}"
-            event_data = asdict(event)
-            
-            # Convert datetime to ISO string for JSON serialization
-            event_data['timestamp'] = event.timestamp.isoformat()
-            
-            # Store event (expires after 30 days)
-            await self.redis.setex(
-                event_key, 
-                86400 * 30,  # 30 days
-                json.dumps(event_data, default=str)
-            )
-            
-            # Add to time-series index for queries
-            await self._index_event_by_time(event)
-            await self._index_event_by_type(event)
-            await self._index_event_by_user(event)
+            # Store, index and evaluate alert windows in one round trip
+            triggered = await self._ingest_event(event)
             
-            # Check alert rules
-            await self._check_alert_rules(event)
+            for rule, event_count in triggered:
+                await self._trigger_alert(rule, event, event_count)
             
             # Log structured event
             logger.info(
@@ -387,110 +449,66 @@ class SecurityAuditor:
         # Cap risk score at 100
         event.risk_score = min(risk_score, 100)
     
-    async def _index_event_by_time(self, event: SecurityEvent):
-        """Index event by timestamp for time-based queries"""
-        time_key = f"events_by_time:{event.timestamp.strftime('%Y-%m-%d:%H')}"
-        await self.redis.zadd(
-            time_key, 
-            {event.event_id: event.timestamp.timestamp()}
-        )
-        # Expire hourly indexes after 7 days
-        await self.redis.expire(time_key, 86400 * 7)
-    
-    async def _index_event_by_type(self, event: SecurityEvent):
-        """Index event by type for filtering"""
-        type_key = f"events_by_type:{event.event_type.value}"
-        await self.redis.zadd(
-            type_key,
-            {event.event_id: event.timestamp.timestamp()}
-        )
-        # Expire type indexes after 30 days
-        await self.redis.expire(type_key, 86400 * 30)
-    
-    async def _index_event_by_user(self, event: SecurityEvent):
-        """Index event by user for user-specific queries"""
-        if event.user_id:
-            user_key = f"events_by_user:{event.user_id}"
-            await self.redis.zadd(
-                user_key,
-                {event.event_id: event.timestamp.timestamp()}
-            )
-            # Expire user indexes after 90 days
-            await self.redis.expire(user_key, 86400 * 90)
-    
-    async def _check_alert_rules(self, event: SecurityEvent):
-        """Check if event triggers any alert rules"""
-        for rule in self.alert_rules.values():
-            if not rule.enabled:
-                continue
-            
-            if event.event_type not in rule.event_types:
-                continue
-            
-            if event.severity.value not in [s.value for s in SecurityEventSeverity if s.name >= rule.severity_threshold.name]:
-                continue
-            
-            # Check if we're in cooldown period
-            cooldown_key = f"alert_cooldown:{rule.rule_id}"
-            if await self.redis.exists(cooldown_key):
-                continue
-            
-            # Count matching events in time window
-            matching_events = await self._count_matching_events(event, rule)
-            
-            if matching_events >= rule.threshold_count:
-                await self._trigger_alert(rule, event, matching_events)
-    
-    async def _count_matching_events(self, event: SecurityEvent, rule: AlertRule) -> int:
-        """Count events matching alert rule criteria in time window"""
-        end_time = event.timestamp.timestamp()
-        start_time = end_time - rule.time_window
+    async def _ingest_event(self, event: SecurityEvent) -> List[tuple]:
+        """Run the ingest script; returns (rule, window count) pairs to alert on"""
+        event_data = asdict(event)
         
-        count = 0
+        # Convert datetime and enums for JSON serialization
+        event_data['timestamp'] = event.timestamp.isoformat()
+        event_data['event_type'] = event.event_type.value
+        event_data['severity'] = event.severity.value
         
-        for event_type in rule.event_types:
-            type_key = f"events_by_type:{event_type.value}"
-            
-            # Get events in time window
-            event_ids = await self.redis.zrangebyscore(
-                type_key, start_time, end_time
-            )
-            
-            # Apply additional conditions
-            for event_id in event_ids:
-                if await self._event_matches_conditions(event_id.decode(), event, rule):
-                    count += 1
+        rules = self._candidate_rules(event)
+        
+        keys = [
+            f"security_event:{event.event_id}",
+            f"events_by_time:{event.timestamp.strftime('%Y-%m-%d:%H')}",
+            f"events_by_type:{event.event_type.value}",
+            f"events_by_user:{event.user_id}" if event.user_id else "",
+        ]
+        args = [
+            json.dumps(event_data, default=str),
+            event.event_id,
+            event.timestamp.timestamp(),
+            EVENT_TTL,
+            TIME_INDEX_TTL,
+            TYPE_INDEX_TTL,
+            USER_INDEX_TTL,
+        ]
+        for rule in rules:
+            keys.extend([self._rule_window_key(rule, event), f"alert_cooldown:{rule.rule_id}"])
+            args.extend([rule.time_window, rule.threshold_count])
         
-        return count
+        result = await self._ingest_script(keys=keys, args=args)
+        
+        return [
+            (rules[int(result[i]) - 1], int(result[i + 1]))
+            for i in range(0, len(result), 2)
+        ]
     
-    async def _event_matches_conditions(self, event_id: str, trigger_event: SecurityEvent, rule: AlertRule) -> bool:
-        """Check if stored event matches rule conditions"""
-        try:
-            event_key = f"security_event:{event_id}"
-            event_data = await self.redis.get(event_key)
-            
-            if not event_data:
-                return False
-            
-            stored_event_data = json.loads(event_data)
-            
-            # Apply rule conditions
-            conditions = rule.conditions
-            
-            if conditions.get("same_ip") and stored_event_data.get("source_ip") != trigger_event.source_ip:
-                return False
-            
-            if conditions.get("same_user") and stored_event_data.get("user_id") != trigger_event.user_id:
-                return False
-            
-            if conditions.get("same_endpoint") and stored_event_data.get("endpoint") != trigger_event.endpoint:
-                return False
-            
-            return True
-            
-        except Exception as e:
-            logger.error("Error checking event conditions", event_id=event_id, error=str(e))
-            return False
+    def _candidate_rules(self, event: SecurityEvent) -> List[AlertRule]:
+        """Enabled rules whose event types and severity threshold match the event"""
+        event_rank = SEVERITY_RANK[event.severity]
+        return [
+            rule for rule in self.alert_rules.values()
+            if rule.enabled
+            and event.event_type in rule.event_types
+            and event_rank >= SEVERITY_RANK[rule.severity_threshold]
+        ]
+    
+    def _rule_window_key(self, rule: AlertRule, event: SecurityEvent) -> str:
+        """
+        Sliding window key of a rule
+        
+        Rule conditions (same_ip, same_user, same_endpoint) partition the
+        window by the event's attribute, so the window only ever holds
+        matching events and its size is the match count.
+        """
+        parts = [f"alert_window:{rule.rule_id}"]
+        for condition, attribute in RULE_CONDITION_FIELDS:
+            if rule.conditions.get(condition):
+                parts.append(f"{condition}={getattr(event, attribute) or ''}")
+        return ":".join(parts)
     
     async def _trigger_alert(self, rule: AlertRule, trigger_event: SecurityEvent, event_count: int):
         """Trigger security alert"""
@@ -509,13 +527,14 @@ class SecurityAuditor:
                 "message": f"{rule.description} - {event_count} events in {rule.time_window}s"
             }
             
-            # Store alert
+            # Store alert and index it by time (kept for 30 days)
             alert_key = f"security_alert:{alert_id}"
-            await self.redis.setex(
-                alert_key,
-                86400 * 30,  # Keep alerts for 30 days
-                json.dumps(alert_data)
-            )
+            alert_score = trigger_event.timestamp.timestamp()
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.setex(alert_key, ALERT_TTL, json.dumps(alert_data))
+                pipe.zadd(ALERT_INDEX_KEY, {alert_id: alert_score})
+                pipe.zremrangebyscore(ALERT_INDEX_KEY, "-inf", f"({alert_score - ALERT_TTL}")
+                await pipe.execute()
             
             # Send notifications
             await self._send_alert_notifications(rule, alert_data, trigger_event)
@@ -570,6 +589,64 @@ class SecurityAuditor:
         # In production, make HTTP POST to configured webhook
         pass
     
+    @staticmethod
+    def _time_bucket_keys(start_time: datetime, end_time: datetime) -> List[str]:
+        """Hourly index keys covering [start_time, end_time]"""
+        keys = []
+        bucket = start_time.replace(minute=0, second=0, microsecond=0)
+        while bucket <= end_time:
+            keys.append(f"events_by_time:{bucket.strftime('%Y-%m-%d:%H')}")
+            bucket += timedelta(hours=1)
+        return keys
+    
+    async def _build_event_query(self,
+                                 start_time: datetime,
+                                 end_time: datetime,
+                                 event_types: Optional[List[SecurityEventType]] = None,
+                                 user_id: Optional[str] = None) -> str:
+        """
+        Materialize the ids of matching events into a temporary sorted set
+        
+        The hourly buckets of the range are unioned server-side and
+        intersected with the type / user indexes, so only matching ids ever
+        leave Redis. The caller deletes the returned key (it also expires).
+        """
+        result_key = f"security_query:{uuid.uuid4().hex}"
+        scratch_key = f"{result_key}:filter"
+        
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zunionstore(result_key, self._time_bucket_keys(start_time, end_time), aggregate="MAX")
+            pipe.zremrangebyscore(result_key, "-inf", f"({start_time.timestamp()}")
+            pipe.zremrangebyscore(result_key, f"({end_time.timestamp()}", "+inf")
+            
+            if event_types:
+                pipe.zunionstore(scratch_key, [f"events_by_type:{et.value}" for et in event_types], aggregate="MAX")
+                pipe.zinterstore(result_key, [result_key, scratch_key], aggregate="MAX")
+                pipe.delete(scratch_key)
+            
+            if user_id:
+                pipe.zinterstore(result_key, [result_key, f"events_by_user:{user_id}"], aggregate="MAX")
+            
+            pipe.expire(result_key, QUERY_RESULT_TTL)
+            await pipe.execute()
+        
+        return result_key
+    
+    async def _iter_query_events(self, result_key: str):
+        """Yield event bodies of a query result set, newest first, in MGET chunks"""
+        offset = 0
+        while True:
+            event_ids = await self.redis.zrevrange(result_key, offset, offset + EVENT_FETCH_CHUNK - 1)
+            if not event_ids:
+                return
+            offset += len(event_ids)
+            
+            bodies = await self.redis.mget([f"security_event:{_as_str(event_id)}" for event_id in event_ids])
+            for body in bodies:
+                # Bodies expire before the (longer lived) indexes
+                if body:
+                    yield json.loads(body)
+    
     async def get_security_events(self, 
                                  start_time: Optional[datetime] = None,
                                  end_time: Optional[datetime] = None,
@@ -587,60 +664,55 @@ class SecurityAuditor:
             if not start_time:
                 start_time = end_time - timedelta(days=1)
             
-            # Query by time range
-            time_key = f"events_by_time:{start_time.strftime('%Y-%m-%d:%H')}"
-            event_ids = await self.redis.zrangebyscore(
-                time_key,
-                start_time.timestamp(),
-                end_time.timestamp()
-            )
-            
-            # Retrieve and filter events
-            for event_id in event_ids[:limit]:
-                event_key = f"security_event:{event_id.decode()}"
-                event_data = await self.redis.get(event_key)
+            result_key = await self._build_event_query(start_time, end_time, event_types, user_id)
+            try:
+                min_rank = SEVERITY_RANK[severity_min] if severity_min else None
                 
-                if event_data:
-                    event_dict = json.loads(event_data)
-                    
-                    # Apply filters
-                    if event_types:
-                        if event_dict.get("event_type") not in [et.value for et in event_types]:
-                            continue
-                    
-                    if user_id and event_dict.get("user_id") != user_id:
-                        continue
-                    
-                    if severity_min:
-                        event_severity = SecurityEventSeverity(event_dict.get("severity"))
-                        if event_severity.name < severity_min.name:
+                async for event_dict in self._iter_query_events(result_key):
+                    if min_rank is not None:
+                        severity = _stored_severity(event_dict.get("severity"))
+                        if severity is None or SEVERITY_RANK[severity] < min_rank:
                             continue
                     
                     events.append(event_dict)
+                    if len(events) >= limit:
+                        break
+            finally:
+                await self.redis.delete(result_key)
             
-            # Sort by timestamp (newest first)
-            events.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-            
-            return events[:limit]
+            # Newest first (result set is already ordered by timestamp)
+            return events
             
         except Exception as e:
             logger.error("Failed to get security events", error=str(e))
             return []
     
-    async def get_security_alerts(self, limit: int = 50) -> List[Dict]:
+    async def get_security_alerts(self, limit: int = 50, since: Optional[datetime] = None) -> List[Dict]:
         """Get recent security alerts"""
         try:
-            # Get all alert keys (simplified - in production use proper indexing)
-            alert_keys = await self.redis.keys("security_alert:*")
-            alerts = []
+            if since:
+                alert_ids = await self.redis.zrevrangebyscore(
+                    ALERT_INDEX_KEY, "+inf", since.timestamp(), start=0, num=limit
+                )
+            else:
+                alert_ids = await self.redis.zrevrange(ALERT_INDEX_KEY, 0, limit - 1)
             
-            for alert_key in alert_keys[:limit]:
-                alert_data = await self.redis.get(alert_key)
-                if alert_data:
-                    alerts.append(json.loads(alert_data))
+            if not alert_ids:
+                return []
+            
+            alert_ids = [_as_str(alert_id) for alert_id in alert_ids]
+            bodies = await self.redis.mget([f"security_alert:{alert_id}" for alert_id in alert_ids])
+            
+            alerts = []
+            expired = []
+            for alert_id, body in zip(alert_ids, bodies):
+                if body:
+                    alerts.append(json.loads(body))
+                else:
+                    expired.append(alert_id)
             
-            # Sort by timestamp
-            alerts.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+            if expired:
+                await self.redis.zrem(ALERT_INDEX_KEY, *expired)
             
             return alerts
             
@@ -654,44 +726,47 @@ class SecurityAuditor:
             end_time = datetime.utcnow()
             start_time = end_time - timedelta(hours=time_range)
             
-            # Get events in time range
-            events = await self.get_security_events(start_time, end_time, limit=1000)
-            
-            # Calculate metrics
-            total_events = len(events)
-            
-            # Count by severity
-            severity_counts = {}
-            for severity in SecurityEventSeverity:
-                severity_counts[severity.value] = sum(
-                    1 for event in events if event.get("severity") == severity.value
-                )
-            
-            # Count by event type
+            # Stream every event in the range (not just the first hourly bucket)
+            severity_counts = {severity.value: 0 for severity in SecurityEventSeverity}
             event_type_counts = {}
-            for event in events:
-                event_type = event.get("event_type", "unknown")
-                event_type_counts[event_type] = event_type_counts.get(event_type, 0) + 1
-            
-            # Top source IPs
             ip_counts = {}
-            for event in events:
-                source_ip = event.get("source_ip")
-                if source_ip:
-                    ip_counts[source_ip] = ip_counts.get(source_ip, 0) + 1
+            risk_total = 0
+            risk_count = 0
+            total_events = 0
             
+            result_key = await self._build_event_query(start_time, end_time)
+            try:
+                async for event in self._iter_query_events(result_key):
+                    total_events += 1
+                    
+                    # Count by severity
+                    severity = _stored_severity(event.get("severity"))
+                    if severity is not None:
+                        severity_counts[severity.value] += 1
+                    
+                    # Count by event type
+                    event_type = event.get("event_type", "unknown")
+                    event_type_counts[event_type] = event_type_counts.get(event_type, 0) + 1
+                    
+                    # Source IPs
+                    source_ip = event.get("source_ip")
+                    if source_ip:
+                        ip_counts[source_ip] = ip_counts.get(source_ip, 0) + 1
+                    
+                    if event.get("risk_score"):
+                        risk_total += event["risk_score"]
+                        risk_count += 1
+            finally:
+                await self.redis.delete(result_key)
+            
+            # Top source IPs
             top_ips = sorted(ip_counts.items(), key=lambda x: x[1], reverse=True)[:10]
             
             # Average risk score
-            risk_scores = [event.get("risk_score", 0) for event in events if event.get("risk_score")]
-            avg_risk_score = sum(risk_scores) / len(risk_scores) if risk_scores else 0
+            avg_risk_score = risk_total / risk_count if risk_count else 0
             
             # Recent alerts count
-            alerts = await self.get_security_alerts(limit=100)
-            recent_alerts = sum(
-                1 for alert in alerts 
-                if datetime.fromisoformat(alert.get("timestamp", "1970-01-01")) >= start_time
-            )
+            recent_alerts = await self.redis.zcount(ALERT_INDEX_KEY, start_time.timestamp(), "+inf")
             
             return {
                 "time_range_hours": time_range,
@@ -708,6 +783,20 @@ class SecurityAuditor:
             logger.error("Failed to calculate security metrics", error=str(e))
             return {}
 
+def _as_str(value: Union[str, bytes]) -> str:
+    """Decode Redis replies from clients created without decode_responses"""
+    return value.decode() if isinstance(value, bytes) else value
+
+def _stored_severity(value: Optional[str]) -> Optional[SecurityEventSeverity]:
+    """Parse a stored severity; older bodies hold the enum repr ("SecurityEventSeverity.HIGH")"""
+    if not value:
+        return None
+    try:
+        return SecurityEventSeverity(value)
+    except ValueError:
+        member = value.rsplit(".", 1)[-1]
+        return SecurityEventSeverity.__members__.get(member)
+
 def create_security_event_from_request(
     event_type: SecurityEventType,
     request: Request,
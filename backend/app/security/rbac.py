@@ -556,6 +556,7 @@ class RBACManager:
             success = await self.store_user_permissions(user_permissions)
             
             if success:
+                _bump_permission_epoch(user_id)
                 logger.info("Role assigned successfully", 
                            user_id=user_id, 
                            role=role, 
@@ -602,6 +603,7 @@ class RBACManager:
             success = await self.store_user_permissions(user_permissions)
             
             if success:
+                _bump_permission_epoch(user_id)
                 logger.info("Role revoked successfully", 
                            user_id=user_id, 
                            role=role, 
@@ -616,6 +618,14 @@ class RBACManager:
                         error=str(e))
             return False
 
+def _bump_permission_epoch(user_id: str) -> None:
+    """Invalidate the compiled permissions of a user in every worker."""
+    from app.core.permission_cache import get_permission_cache
+    
+    if str(user_id).isdigit():
+        get_permission_cache().bump_user(int(user_id))
+
+
 # Global RBAC manager instance
 _rbac_manager: Optional[RBACManager] = None
 
@@ -0,0 +1,426 @@
+"""
+Analytics KPI rollup maintenance
+Előre aggregált napi KPI táblák karbantartása
+
+Dashboard KPIs are answered from analytics_daily_rollups instead of scanning
+inspections, work orders and inspection items on every request. Rollups are
+kept current in two ways:
+
+- write hooks: committed changes to Inspection / InspectionItem / WorkOrder
+  enqueue an incremental refresh of the affected (org, day) pairs
+- periodic refresh: a beat task recomputes the recent window for every
+  active organization and bumps the freshness timestamp
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import structlog
+from sqlalchemy import and_, case, delete, event, func, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from app.core.celery_app import maintenance_task
+from app.core.config import settings
+from app.models.analytics import AnalyticsDailyRollup, AnalyticsRollupState
+from app.models.inspections import Inspection, InspectionItem
+from app.models.organization import Gate
+from app.models.tickets import WorkOrder
+
+logger = structlog.get_logger(__name__)
+
+# Counter columns maintained per (org, day, gate type)
+ROLLUP_COUNTERS = (
+    'inspections_total',
+    'inspections_completed',
+    'inspections_open',
+    'work_orders_total',
+    'work_orders_completed',
+    'work_orders_sla_breached',
+    'work_orders_resolution_hours',
+    'work_orders_sla_open',
+    'inspection_items_total',
+    'inspection_items_failed',
+)
+
+OPEN_INSPECTION_STATUSES = ('draft', 'started', 'in_progress')
+OPEN_WORK_ORDER_STATUSES = ('draft', 'scheduled', 'in_progress', 'waiting_parts')
+
+_PENDING_KEY = 'analytics_rollup_pending'
+
+
+class AnalyticsRollupService:
+    """Service for building and reading daily KPI rollups."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # =========================================================================
+    # REFRESH - FRISSÍTÉS
+    # =========================================================================
+
+    def _day_expression(self, column):
+        """SQL expression truncating a timestamp column to its calendar day."""
+        return func.date(column)
+
+    def _hours_between(self, start_column, end_column):
+        """SQL expression for the number of hours between two timestamps."""
+        if self.db.get_bind().dialect.name == 'postgresql':
+            return func.extract('epoch', end_column - start_column) / 3600.0
+        return (func.julianday(end_column) - func.julianday(start_column)) * 24.0
+
+    @staticmethod
+    def _as_date(value) -> Optional[date]:
+        """Normalize a day value returned by the database to a date."""
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return date.fromisoformat(str(value)[:10])
+
+    def _grouped_counts(self, query, date_column, start: date, end: date, aggregates: Dict[str, Any]):
+        """
+        Run one GROUP BY (day, gate type) query over [start, end].
+
+        Returns {(day, gate_type): {counter_name: value}}.
+        """
+        day_expr = self._day_expression(date_column)
+        window_start = datetime.combine(start, datetime.min.time())
+        window_end = datetime.combine(end + timedelta(days=1), datetime.min.time())
+
+        rows = query.with_entities(
+            day_expr,
+            Gate.gate_type,
+            *[expr.label(name) for name, expr in aggregates.items()]
+        ).filter(
+            date_column >= window_start,
+            date_column < window_end
+        ).group_by(day_expr, Gate.gate_type).all()
+
+        result = {}
+        for row in rows:
+            key = (self._as_date(row[0]), row[1] or 'unknown')
+            result[key] = {name: row[index + 2] or 0 for index, name in enumerate(aggregates)}
+        return result
+
+    def _compute_rows(self, org_id: int, start: date, end: date) -> List[Dict[str, Any]]:
+        """Compute rollup rows for one organization and date range."""
+        computed: Dict[Tuple[date, str], Dict[str, Any]] = {}
+
+        def merge(counts):
+            for key, values in counts.items():
+                computed.setdefault(key, {}).update(values)
+
+        inspection_query = self.db.query(Inspection).join(Gate).filter(Inspection.org_id == org_id)
+        merge(self._grouped_counts(inspection_query, Inspection.inspection_date, start, end, {
+            'inspections_total': func.count(Inspection.id),
+            'inspections_completed': func.count(case((Inspection.state == 'completed', 1))),
+            'inspections_open': func.count(case((Inspection.state.in_(OPEN_INSPECTION_STATUSES), 1))),
+        }))
+
+        # A work order is completed at actual_end and due at scheduled_end
+        wo_query = self.db.query(WorkOrder).join(Gate).filter(WorkOrder.org_id == org_id)
+        merge(self._grouped_counts(wo_query, WorkOrder.created_at, start, end, {
+            'work_orders_total': func.count(WorkOrder.id),
+            'work_orders_completed': func.count(WorkOrder.actual_end),
+            'work_orders_sla_breached': func.count(case((and_(
+                WorkOrder.scheduled_end.isnot(None),
+                WorkOrder.actual_end.isnot(None),
+                WorkOrder.actual_end > WorkOrder.scheduled_end
+            ), 1))),
+            'work_orders_resolution_hours': func.sum(case((
+                WorkOrder.actual_end.isnot(None),
+                self._hours_between(WorkOrder.created_at, WorkOrder.actual_end)
+            ))),
+        }))
+        merge(self._grouped_counts(
+            wo_query.filter(WorkOrder.status.in_(OPEN_WORK_ORDER_STATUSES)),
+            WorkOrder.scheduled_end, start, end,
+            {'work_orders_sla_open': func.count(WorkOrder.id)}
+        ))
+
+        item_query = self.db.query(InspectionItem).join(Inspection).join(Gate)\
+            .filter(Inspection.org_id == org_id)
+        merge(self._grouped_counts(item_query, Inspection.completed_at, start, end, {
+            'inspection_items_total': func.count(InspectionItem.id),
+            'inspection_items_failed': func.count(case((InspectionItem.result == 'fail', 1))),
+        }))
+
+        now = datetime.utcnow()
+        rows = []
+        for (rollup_date, gate_type), values in computed.items():
+            row = {name: values.get(name, 0) for name in ROLLUP_COUNTERS}
+            row['work_orders_resolution_hours'] = float(row['work_orders_resolution_hours'] or 0)
+            row.update(org_id=org_id, rollup_date=rollup_date, gate_type=gate_type, refreshed_at=now)
+            rows.append(row)
+        return rows
+
+    def refresh_range(self, org_id: int, start: date, end: date) -> int:
+        """
+        Recompute every rollup row of an organization in [start, end].
+
+        Existing rows in the range are replaced, so the refresh is idempotent.
+        Returns the number of rows written.
+        """
+        rows = self._compute_rows(org_id, start, end)
+
+        self.db.execute(delete(AnalyticsDailyRollup).where(
+            AnalyticsDailyRollup.org_id == org_id,
+            AnalyticsDailyRollup.rollup_date >= start,
+            AnalyticsDailyRollup.rollup_date <= end
+        ))
+        if rows:
+            self.db.bulk_insert_mappings(AnalyticsDailyRollup, rows)
+
+        return len(rows)
+
+    def refresh_days(self, org_id: int, days: Iterable[date]) -> int:
+        """Incrementally refresh the given days, grouping consecutive days into ranges."""
+        written = 0
+        for start, end in _contiguous_ranges(sorted(set(days))):
+            written += self.refresh_range(org_id, start, end)
+        self.db.commit()
+        return written
+
+    def refresh_window(
+        self,
+        org_id: int,
+        days_back: Optional[int] = None,
+        days_ahead: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Refresh the rolling window around today and mark the organization fresh.
+
+        The first refresh of an organization backfills its whole history so the
+        all-time counters (e.g. overdue inspections) can be read from rollups.
+        """
+        today = datetime.utcnow().date()
+        days_back = settings.ANALYTICS_ROLLUP_WINDOW_DAYS if days_back is None else days_back
+        days_ahead = settings.ANALYTICS_ROLLUP_WINDOW_DAYS if days_ahead is None else days_ahead
+
+        state = self.db.query(AnalyticsRollupState).filter(AnalyticsRollupState.org_id == org_id).first()
+        start = today - timedelta(days=days_back)
+        end = today + timedelta(days=days_ahead)
+
+        if state is None:
+            start = min(start, self._earliest_activity(org_id) or start)
+            state = AnalyticsRollupState(org_id=org_id, coverage_start=start, coverage_end=end)
+            self.db.add(state)
+
+        written = self.refresh_range(org_id, start, end)
+
+        state.coverage_start = min(state.coverage_start, start)
+        state.coverage_end = max(state.coverage_end, end)
+        state.refreshed_at = datetime.utcnow()
+        self.db.commit()
+
+        logger.info("Analytics rollups refreshed", org_id=org_id, start=str(start), end=str(end), rows=written)
+        return {"org_id": org_id, "start": start.isoformat(), "end": end.isoformat(), "rows": written}
+
+    def _earliest_activity(self, org_id: int) -> Optional[date]:
+        """Earliest day any rolled-up metric has data for this organization."""
+        candidates = [
+            self.db.query(func.min(Inspection.inspection_date)).filter(Inspection.org_id == org_id).scalar(),
+            self.db.query(func.min(WorkOrder.created_at)).filter(WorkOrder.org_id == org_id).scalar(),
+        ]
+        days = [self._as_date(value) for value in candidates if value is not None]
+        return min(days) if days else None
+
+    # =========================================================================
+    # READ - OLVASÁS
+    # =========================================================================
+
+    def get_fresh_state(self, org_id: Optional[int], needed_until: date) -> Optional[AnalyticsRollupState]:
+        """
+        Return the rollup state if rollups can answer a query for this organization.
+
+        Rollups are used only for a single organization whose window refresh is
+        newer than ANALYTICS_ROLLUP_MAX_AGE_MINUTES and covers needed_until.
+        """
+        if not settings.ANALYTICS_ROLLUPS_ENABLED or not org_id:
+            return None
+
+        state = self.db.query(AnalyticsRollupState).filter(AnalyticsRollupState.org_id == org_id).first()
+        if state is None:
+            return None
+
+        max_age = timedelta(minutes=settings.ANALYTICS_ROLLUP_MAX_AGE_MINUTES)
+        if state.refreshed_at < datetime.utcnow() - max_age or state.coverage_end < needed_until:
+            return None
+        return state
+
+    def sum_counters(
+        self,
+        org_id: int,
+        counters: Iterable[str],
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        group_by_gate_type: bool = False
+    ):
+        """
+        SUM the given counters over [start, end] (open-ended when None).
+
+        Returns a dict of totals, or {gate_type: totals} when grouped.
+        """
+        counters = list(counters)
+        columns = [func.coalesce(func.sum(getattr(AnalyticsDailyRollup, name)), 0) for name in counters]
+        query = self.db.query(*columns).filter(AnalyticsDailyRollup.org_id == org_id)
+        if start is not None:
+            query = query.filter(AnalyticsDailyRollup.rollup_date >= start)
+        if end is not None:
+            query = query.filter(AnalyticsDailyRollup.rollup_date <= end)
+
+        if not group_by_gate_type:
+            return dict(zip(counters, query.one()))
+
+        rows = query.add_columns(AnalyticsDailyRollup.gate_type)\
+            .group_by(AnalyticsDailyRollup.gate_type).all()
+        return {row[-1]: dict(zip(counters, row[:-1])) for row in rows}
+
+    def daily_counters(self, org_id: int, counters: Iterable[str], start: date, end: date) -> Dict[date, Dict[str, Any]]:
+        """Per-day counter totals (summed over gate types) for [start, end]."""
+        counters = list(counters)
+        rows = self.db.query(
+            AnalyticsDailyRollup.rollup_date,
+            *[func.sum(getattr(AnalyticsDailyRollup, name)) for name in counters]
+        ).filter(
+            AnalyticsDailyRollup.org_id == org_id,
+            AnalyticsDailyRollup.rollup_date >= start,
+            AnalyticsDailyRollup.rollup_date <= end
+        ).group_by(AnalyticsDailyRollup.rollup_date).all()
+
+        return {
+            self._as_date(row[0]): {name: row[index + 1] or 0 for index, name in enumerate(counters)}
+            for row in rows
+        }
+
+
+def _contiguous_ranges(days: List[date]) -> List[Tuple[date, date]]:
+    """Collapse sorted days into inclusive (start, end) ranges."""
+    ranges = []
+    for day in days:
+        if ranges and day - ranges[-1][1] <= timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+# =============================================================================
+# WRITE HOOKS - ÍRÁSI HOOK-OK
+# =============================================================================
+
+def _history_days(obj, attribute: str) -> Set[date]:
+    """Current and previous day values of a timestamp attribute."""
+    days = set()
+    try:
+        history = sa_inspect(obj).attrs[attribute].history
+    except (KeyError, AttributeError):
+        return days
+    for value in list(history.added) + list(history.unchanged) + list(history.deleted):
+        day = AnalyticsRollupService._as_date(value)
+        if day is not None:
+            days.add(day)
+    return days
+
+
+def _collect_rollup_changes(session: Session, flush_context) -> None:
+    """after_flush hook: remember which (org, day) pairs need a rollup refresh."""
+    pending = session.info.setdefault(_PENDING_KEY, {})
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Inspection):
+            days = _history_days(obj, 'inspection_date') | _history_days(obj, 'completed_at')
+        elif isinstance(obj, WorkOrder):
+            days = _history_days(obj, 'created_at') | _history_days(obj, 'scheduled_end')
+        elif isinstance(obj, InspectionItem):
+            inspection = obj.__dict__.get('inspection')
+            if inspection is not None:
+                days = _history_days(inspection, 'completed_at')
+            else:
+                days = {datetime.utcnow().date()}
+        else:
+            continue
+
+        org_id = getattr(obj, 'org_id', None)
+        if org_id and days:
+            pending.setdefault(org_id, set()).update(days)
+
+
+def _enqueue_rollup_refresh(session: Session) -> None:
+    """after_commit hook: hand the collected days to the maintenance queue."""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+
+    for org_id, days in pending.items():
+        try:
+            refresh_analytics_rollup_days.apply_async(
+                args=[org_id, sorted(day.isoformat() for day in days)],
+                queue="maintenance",
+                retry=False
+            )
+        except Exception as e:
+            # The periodic window refresh catches up if the broker is unavailable
+            logger.warning("Failed to enqueue analytics rollup refresh", org_id=org_id, error=str(e))
+
+
+def _discard_rollup_changes(session: Session) -> None:
+    """after_rollback hook: changes never reached the database."""
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_rollup_hooks() -> None:
+    """Attach the rollup write hooks to every ORM session (idempotent)."""
+    if not settings.ANALYTICS_ROLLUPS_ENABLED:
+        return
+    if event.contains(Session, "after_flush", _collect_rollup_changes):
+        return
+    event.listen(Session, "after_flush", _collect_rollup_changes)
+    event.listen(Session, "after_commit", _enqueue_rollup_refresh)
+    event.listen(Session, "after_rollback", _discard_rollup_changes)
+
+
+# =============================================================================
+# CELERY TASKS - HÁTTÉRFELADATOK
+# =============================================================================
+
+@maintenance_task(name="maintenance.refresh_analytics_rollup_days")
+def refresh_analytics_rollup_days(self, org_id: int, days: List[str]):
+    """Celery task to incrementally refresh rollups for changed days."""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        written = AnalyticsRollupService(db).refresh_days(org_id, [date.fromisoformat(day) for day in days])
+        return {"org_id": org_id, "days": len(days), "rows": written}
+    finally:
+        db.close()
+
+
+@maintenance_task(name="maintenance.refresh_analytics_rollups")
+def refresh_analytics_rollups(self):
+    """Celery task to refresh the rolling rollup window of every active organization."""
+    from app.database import SessionLocal
+    from app.models.organization import Organization
+
+    db = SessionLocal()
+    try:
+        service = AnalyticsRollupService(db)
+        orgs = db.query(Organization.id).filter(Organization.is_active == True).all()
+
+        results = []
+        for (org_id,) in orgs:
+            try:
+                results.append(service.refresh_window(org_id))
+            except Exception as e:
+                db.rollback()
+                logger.error("Failed to refresh analytics rollups", org_id=org_id, error=str(e))
+
+        return {"organizations_processed": len(orgs), "results": results}
+    finally:
+        db.close()
+
+
+register_rollup_hooks()
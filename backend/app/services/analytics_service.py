@@ -18,6 +18,9 @@ from app.models.organization import Gate
 from app.models.tickets import WorkOrder, Ticket
 from app.models.maintenance import MaintenanceJob
 from app.database import get_db
+from app.services.analytics_rollup_service import (
+    AnalyticsRollupService, OPEN_INSPECTION_STATUSES, OPEN_WORK_ORDER_STATUSES
+)
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +53,16 @@ class ExportData:
     title: str
 
 
+# Supported chart bucket sizes - támogatott grafikon időegységek
+CHART_BUCKET_SIZES = ('day', 'week', 'month')
+
+CHART_BUCKET_LABELS = {
+    'day': "%m-%d",
+    'week': "%m-%d",
+    'month': "%Y-%m",
+}
+
+
 class AnalyticsService:
     """
     Main analytics service for generating KPIs, charts and reports
@@ -58,6 +71,144 @@ class AnalyticsService:
     
     def __init__(self, db: Session):
         self.db = db
+        self.rollups = AnalyticsRollupService(db)
+    
+    # =============================================================================
+    # TIME BUCKETING - IDŐ SZERINTI CSOPORTOSÍTÁS
+    # =============================================================================
+    
+    def _bucket_expression(self, column, bucket_size: str):
+        """
+        SQL expression truncating a timestamp column to its bucket start.
+        Uses date_trunc on PostgreSQL and date()/strftime() on SQLite.
+        """
+        if self.db.get_bind().dialect.name == 'postgresql':
+            return func.date_trunc(bucket_size, column)
+        
+        # SQLite fallback - weeks start on Monday like date_trunc('week')
+        if bucket_size == 'week':
+            return func.date(column, 'weekday 0', '-6 days')
+        if bucket_size == 'month':
+            return func.strftime('%Y-%m-01', column)
+        return func.date(column)
+    
+    def _hours_between(self, start_column, end_column):
+        """SQL expression for the number of hours between two timestamps"""
+        if self.db.get_bind().dialect.name == 'postgresql':
+            return func.extract('epoch', end_column - start_column) / 3600.0
+        return (func.julianday(end_column) - func.julianday(start_column)) * 24.0
+    
+    @staticmethod
+    def _bucket_start(moment: datetime, bucket_size: str) -> datetime:
+        """Truncate a datetime to the start of its bucket (Python side)"""
+        start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        if bucket_size == 'week':
+            return start - timedelta(days=start.weekday())
+        if bucket_size == 'month':
+            return start.replace(day=1)
+        return start
+    
+    @staticmethod
+    def _next_bucket(bucket_start: datetime, bucket_size: str) -> datetime:
+        """Return the start of the bucket following bucket_start"""
+        if bucket_size == 'week':
+            return bucket_start + timedelta(days=7)
+        if bucket_size == 'month':
+            if bucket_start.month == 12:
+                return bucket_start.replace(year=bucket_start.year + 1, month=1)
+            return bucket_start.replace(month=bucket_start.month + 1)
+        return bucket_start + timedelta(days=1)
+    
+    @staticmethod
+    def _bucket_key(value) -> Optional[str]:
+        """Normalize a bucket value returned by the database to YYYY-MM-DD"""
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            return value.strftime('%Y-%m-%d')
+        return str(value)[:10]
+    
+    def _bucketed_counts(
+        self,
+        query,
+        date_column,
+        window_start: datetime,
+        window_days: int,
+        bucket_size: str = 'day',
+        conditions: Tuple = ()
+    ) -> List[Tuple[datetime, Tuple[int, ...]]]:
+        """
+        Count rows per time bucket in a single GROUP BY query.
+        
+        Returns one entry per bucket in the window (gaps filled with zeros):
+        (bucket_start, (total, count_matching_condition_1, ...)).
+        
+        Args:
+            query: Base query (joins and filters already applied)
+            date_column: Timestamp column to bucket on
+            window_start: Start of the window
+            window_days: Window length in days
+            bucket_size: 'day', 'week' or 'month'
+            conditions: Extra conditions counted per bucket with COUNT(CASE ...)
+        """
+        if bucket_size not in CHART_BUCKET_SIZES:
+            raise ValueError(f"Unsupported bucket size: {bucket_size}")
+        
+        window_end = window_start.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=window_days)
+        bucket_expr = self._bucket_expression(date_column, bucket_size)
+        
+        aggregates = [func.count()] + [func.count(case((condition, 1))) for condition in conditions]
+        rows = query.with_entities(bucket_expr, *aggregates).filter(
+            date_column >= window_start,
+            date_column < window_end
+        ).group_by(bucket_expr).all()
+        
+        counts = {self._bucket_key(row[0]): tuple(row[1:]) for row in rows}
+        empty = (0,) * len(aggregates)
+        
+        series = []
+        bucket = self._bucket_start(window_start, bucket_size)
+        while bucket < window_end:
+            series.append((bucket, counts.get(bucket.strftime('%Y-%m-%d'), empty)))
+            bucket = self._next_bucket(bucket, bucket_size)
+        
+        return series
+    
+    def _rollup_bucketed_counts(
+        self,
+        organization_id: int,
+        counters: Tuple[str, ...],
+        window_start: datetime,
+        window_days: int,
+        bucket_size: str = 'day'
+    ) -> List[Tuple[datetime, Tuple[int, ...]]]:
+        """
+        Same output as _bucketed_counts, summed from the daily rollup table.
+        """
+        if bucket_size not in CHART_BUCKET_SIZES:
+            raise ValueError(f"Unsupported bucket size: {bucket_size}")
+        
+        window_end = window_start.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=window_days)
+        daily = self.rollups.daily_counters(
+            organization_id, counters,
+            window_start.date(), (window_end - timedelta(days=1)).date()
+        )
+        
+        totals: Dict[datetime, List[int]] = {}
+        for day, values in daily.items():
+            bucket = self._bucket_start(datetime.combine(day, datetime.min.time()), bucket_size)
+            bucket_totals = totals.setdefault(bucket, [0] * len(counters))
+            for index, name in enumerate(counters):
+                bucket_totals[index] += values[name]
+        
+        empty = (0,) * len(counters)
+        series = []
+        bucket = self._bucket_start(window_start, bucket_size)
+        while bucket < window_end:
+            series.append((bucket, tuple(totals.get(bucket, empty))))
+            bucket = self._next_bucket(bucket, bucket_size)
+        
+        return series
     
     # =============================================================================
     # INSPECTION ANALYTICS - ELLENŐRZÉSI ELEMZÉSEK
@@ -66,7 +217,9 @@ class AnalyticsService:
     def get_due_inspections_analytics(
         self,
         days_ahead: int = 30,
-        organization_id: Optional[int] = None
+        organization_id: Optional[int] = None,
+        bucket_size: str = 'day',
+        window_days: int = 30
     ) -> Dict[str, Any]:
         """
         Lejáró ellenőrzések elemzése - Due inspections analytics
@@ -74,77 +227,37 @@ class AnalyticsService:
         Args:
             days_ahead: Hány napra előre nézzünk
             organization_id: Szűrés szervezetre
+            bucket_size: Grafikon időegység (day, week, month)
+            window_days: Grafikon ablak hossza napokban
         """
         
         cutoff_date = datetime.now() + timedelta(days=days_ahead)
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        # Előre aggregált adatok, ha frissek - Rollups when fresh, raw queries otherwise
+        needed_until = max(cutoff_date, today + timedelta(days=window_days)).date()
+        if self.rollups.get_fresh_state(organization_id, needed_until) is not None:
+            counts = self._due_inspection_counts_from_rollups(
+                organization_id, cutoff_date, today, bucket_size, window_days
+            )
+        else:
+            counts = self._due_inspection_counts(
+                organization_id, cutoff_date, today, bucket_size, window_days
+            )
         
-        # Base query
-        query = self.db.query(Inspection).join(Gate)
-        
-        if organization_id:
-            query = query.filter(Gate.organization_id == organization_id)
-        
-        # Overdue inspections (lejárt ellenőrzések)
-        overdue_count = query.filter(
-            Inspection.scheduled_date < datetime.now(),
-            Inspection.status.in_(['scheduled', 'in_progress'])
-        ).count()
-        
-        # Due this week (ez a héten esedékes)
-        week_end = datetime.now() + timedelta(days=7)
-        due_this_week = query.filter(
-            Inspection.scheduled_date >= datetime.now(),
-            Inspection.scheduled_date <= week_end,
-            Inspection.status.in_(['scheduled', 'in_progress'])
-        ).count()
-        
-        # Due next 30 days (következő 30 napban esedékes)
-        due_30_days = query.filter(
-            Inspection.scheduled_date >= datetime.now(),
-            Inspection.scheduled_date <= cutoff_date,
-            Inspection.status.in_(['scheduled', 'in_progress'])
-        ).count()
-        
-        # Completion rate calculation (befejezési arány számítása)
-        last_30_days = datetime.now() - timedelta(days=30)
-        
-        total_inspections = query.filter(
-            Inspection.scheduled_date >= last_30_days
-        ).count()
-        
-        completed_inspections = query.filter(
-            Inspection.scheduled_date >= last_30_days,
-            Inspection.status == 'completed'
-        ).count()
+        (overdue_count, due_this_week, due_30_days, total_inspections,
+         completed_inspections, due_buckets, gate_type_stats) = counts
         
         completion_rate = (completed_inspections / total_inspections * 100) if total_inspections > 0 else 0
         
-        # Daily due inspections for chart (napi lejáró ellenőrzések grafikonhoz)
-        daily_due = []
-        for i in range(30):
-            day = datetime.now() + timedelta(days=i)
-            day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day.replace(hour=23, minute=59, second=59, microsecond=999999)
-            
-            daily_count = query.filter(
-                Inspection.scheduled_date >= day_start,
-                Inspection.scheduled_date <= day_end,
-                Inspection.status.in_(['scheduled', 'in_progress'])
-            ).count()
-            
-            daily_due.append(ChartDataPoint(
-                label=day.strftime("%m-%d"),
-                value=daily_count,
-                date=day_start
-            ))
-        
-        # By gate type analysis (kaputípus szerinti elemzés)
-        gate_type_stats = self.db.query(
-            Gate.gate_type,
-            func.count(Inspection.id).label('total_inspections'),
-            func.count(case((Inspection.status == 'completed', 1))).label('completed'),
-            func.count(case((Inspection.scheduled_date < datetime.now(), 1))).label('overdue')
-        ).join(Gate).group_by(Gate.gate_type).all()
+        daily_due = [
+            ChartDataPoint(
+                label=bucket_start.strftime(CHART_BUCKET_LABELS[bucket_size]),
+                value=total,
+                date=bucket_start
+            )
+            for bucket_start, (total,) in due_buckets
+        ]
         
         gate_analysis = []
         for gate_type, total, completed, overdue in gate_type_stats:
@@ -192,6 +305,127 @@ class AnalyticsService:
             ]
         }
     
+    def _due_inspection_counts(
+        self,
+        organization_id: Optional[int],
+        cutoff_date: datetime,
+        today: datetime,
+        bucket_size: str,
+        window_days: int
+    ) -> Tuple:
+        """
+        Due inspection counters from the raw inspection table.
+        
+        Same day-granular definitions as the rollups: an inspection is due on
+        its inspection_date, open while its state is in OPEN_INSPECTION_STATUSES
+        and overdue when it is open and due before today.
+        """
+        
+        # Base query
+        query = self.db.query(Inspection).join(Gate)
+        
+        if organization_id:
+            query = query.filter(Inspection.org_id == organization_id)
+        
+        is_open = Inspection.state.in_(OPEN_INSPECTION_STATUSES)
+        is_overdue = and_(is_open, Inspection.inspection_date < today)
+        
+        def due_until(last_day: datetime):
+            # Open inspections due from today through last_day (inclusive)
+            return func.count(case((and_(
+                is_open,
+                Inspection.inspection_date >= today,
+                Inspection.inspection_date < last_day.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+            ), 1)))
+        
+        # Overdue (lejárt), due this week (ez a héten) and until the cutoff (következő napokban)
+        overdue_count, due_this_week, due_30_days = query.with_entities(
+            func.count(case((is_overdue, 1))),
+            due_until(datetime.now() + timedelta(days=7)),
+            due_until(cutoff_date)
+        ).one()
+        
+        # Completion rate calculation (befejezési arány számítása)
+        last_30_days = (datetime.now() - timedelta(days=30)).replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        total_inspections, completed_inspections = query.filter(
+            Inspection.inspection_date >= last_30_days
+        ).with_entities(
+            func.count(Inspection.id),
+            func.count(case((Inspection.state == 'completed', 1)))
+        ).one()
+        
+        # Due inspections per bucket for chart (lejáró ellenőrzések grafikonhoz)
+        due_buckets = self._bucketed_counts(
+            query.filter(is_open),
+            Inspection.inspection_date,
+            today,
+            window_days,
+            bucket_size
+        )
+        
+        # By gate type analysis (kaputípus szerinti elemzés)
+        gate_type = func.coalesce(Gate.gate_type, 'unknown')
+        gate_type_stats = query.with_entities(
+            gate_type,
+            func.count(Inspection.id).label('total_inspections'),
+            func.count(case((Inspection.state == 'completed', 1))).label('completed'),
+            func.count(case((is_overdue, 1))).label('overdue')
+        ).group_by(gate_type).all()
+        
+        return (overdue_count, due_this_week, due_30_days, total_inspections,
+                completed_inspections, due_buckets, gate_type_stats)
+    
+    def _due_inspection_counts_from_rollups(
+        self,
+        organization_id: int,
+        cutoff_date: datetime,
+        today: datetime,
+        bucket_size: str,
+        window_days: int
+    ) -> Tuple:
+        """Due inspection counters summed from the daily rollup table (day granularity)"""
+        
+        yesterday = (today - timedelta(days=1)).date()
+        
+        overdue = self.rollups.sum_counters(organization_id, ['inspections_open'], end=yesterday)
+        this_week = self.rollups.sum_counters(
+            organization_id, ['inspections_open'],
+            start=today.date(), end=(datetime.now() + timedelta(days=7)).date()
+        )
+        until_cutoff = self.rollups.sum_counters(
+            organization_id, ['inspections_open'], start=today.date(), end=cutoff_date.date()
+        )
+        last_30_days = self.rollups.sum_counters(
+            organization_id, ['inspections_total', 'inspections_completed'],
+            start=(datetime.now() - timedelta(days=30)).date()
+        )
+        
+        due_buckets = self._rollup_bucketed_counts(
+            organization_id, ('inspections_open',), today, window_days, bucket_size
+        )
+        
+        by_gate_type = self.rollups.sum_counters(
+            organization_id, ['inspections_total', 'inspections_completed'], group_by_gate_type=True
+        )
+        overdue_by_gate_type = self.rollups.sum_counters(
+            organization_id, ['inspections_open'], end=yesterday, group_by_gate_type=True
+        )
+        gate_type_stats = [
+            (
+                gate_type,
+                values['inspections_total'],
+                values['inspections_completed'],
+                overdue_by_gate_type.get(gate_type, {}).get('inspections_open', 0)
+            )
+            for gate_type, values in by_gate_type.items()
+            if values['inspections_total']
+        ]
+        
+        return (overdue['inspections_open'], this_week['inspections_open'], until_cutoff['inspections_open'],
+                last_30_days['inspections_total'], last_30_days['inspections_completed'],
+                due_buckets, gate_type_stats)
+    
     # =============================================================================
     # SLA ANALYTICS - SLA ELEMZÉSEK
     # =============================================================================
@@ -199,7 +433,9 @@ class AnalyticsService:
     def get_sla_analytics(
         self,
         days_back: int = 30,
-        organization_id: Optional[int] = None
+        organization_id: Optional[int] = None,
+        bucket_size: str = 'day',
+        window_days: int = 30
     ) -> Dict[str, Any]:
         """
         SLA teljesítmény elemzése - SLA performance analytics
@@ -207,90 +443,43 @@ class AnalyticsService:
         Args:
             days_back: Hány napra visszamenőleg
             organization_id: Szűrés szervezetre
+            bucket_size: Grafikon időegység (day, week, month)
+            window_days: Grafikon ablak hossza napokban
         """
         
-        start_date = datetime.now() - timedelta(days=days_back)
+        # Whole days, so raw queries and daily rollups cover the same rows
+        start_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days_back)
         
-        # Work Orders SLA Analysis
-        wo_query = self.db.query(WorkOrder).join(Gate)
-        
-        if organization_id:
-            wo_query = wo_query.filter(Gate.organization_id == organization_id)
-        
-        wo_query = wo_query.filter(WorkOrder.created_at >= start_date)
-        
-        # Calculate SLA metrics
-        total_work_orders = wo_query.count()
-        
-        # SLA breached (SLA túllépés)
-        sla_breached = wo_query.filter(
-            WorkOrder.sla_due_date.isnot(None),
-            WorkOrder.completed_at.isnot(None),
-            WorkOrder.completed_at > WorkOrder.sla_due_date
-        ).count()
-        
-        # SLA at risk (SLA veszélyben - 80% of time used)
-        sla_at_risk = wo_query.filter(
-            WorkOrder.sla_due_date.isnot(None),
-            WorkOrder.status.in_(['open', 'in_progress']),
-            WorkOrder.sla_due_date < datetime.now() + timedelta(hours=24)
-        ).count()
-        
-        # Average resolution time
-        completed_orders = wo_query.filter(
-            WorkOrder.completed_at.isnot(None)
-        ).all()
-        
-        if completed_orders:
-            total_resolution_hours = sum([
-                (wo.completed_at - wo.created_at).total_seconds() / 3600
-                for wo in completed_orders
-            ])
-            avg_resolution_time = total_resolution_hours / len(completed_orders)
+        # Előre aggregált adatok, ha frissek - Rollups when fresh, raw queries otherwise
+        needed_until = max(datetime.now() + timedelta(hours=24), start_date + timedelta(days=window_days)).date()
+        if self.rollups.get_fresh_state(organization_id, needed_until) is not None:
+            counts = self._sla_counts_from_rollups(organization_id, start_date, bucket_size, window_days)
         else:
-            avg_resolution_time = 0
+            counts = self._sla_counts(organization_id, start_date, bucket_size, window_days)
+        
+        total_work_orders, sla_breached, sla_at_risk, avg_resolution_time, sla_buckets = counts
         
         sla_compliance_rate = ((total_work_orders - sla_breached) / total_work_orders * 100) if total_work_orders > 0 else 0
         
-        # Daily SLA performance for chart
         daily_sla_performance = []
-        for i in range(30):
-            day = start_date + timedelta(days=i)
-            day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day.replace(hour=23, minute=59, second=59, microsecond=999999)
-            
-            day_total = wo_query.filter(
-                WorkOrder.created_at >= day_start,
-                WorkOrder.created_at <= day_end
-            ).count()
-            
-            day_breached = wo_query.filter(
-                WorkOrder.created_at >= day_start,
-                WorkOrder.created_at <= day_end,
-                WorkOrder.sla_due_date.isnot(None),
-                WorkOrder.completed_at.isnot(None),
-                WorkOrder.completed_at > WorkOrder.sla_due_date
-            ).count()
-            
-            day_compliance = ((day_total - day_breached) / day_total * 100) if day_total > 0 else 100
+        for bucket_start, (bucket_total, bucket_breached) in sla_buckets:
+            bucket_compliance = ((bucket_total - bucket_breached) / bucket_total * 100) if bucket_total > 0 else 100
             
             daily_sla_performance.append(ChartDataPoint(
-                label=day.strftime("%m-%d"),
-                value=round(day_compliance, 1),
-                date=day_start
+                label=bucket_start.strftime(CHART_BUCKET_LABELS[bucket_size]),
+                value=round(bucket_compliance, 1),
+                date=bucket_start
             ))
         
         # Priority breakdown
-        priority_stats = self.db.query(
+        priority_query = self.db.query(WorkOrder).filter(WorkOrder.created_at >= start_date)
+        if organization_id:
+            priority_query = priority_query.filter(WorkOrder.org_id == organization_id)
+        priority_stats = priority_query.with_entities(
             WorkOrder.priority,
             func.count(WorkOrder.id).label('total'),
-            func.count(case((
-                and_(WorkOrder.sla_due_date.isnot(None),
-                     WorkOrder.completed_at.isnot(None),
-                     WorkOrder.completed_at > WorkOrder.sla_due_date), 1
-            ))).label('breached')
-        ).filter(WorkOrder.created_at >= start_date)\
-         .group_by(WorkOrder.priority).all()
+            func.count(case((self._sla_breached(), 1))).label('breached')
+        ).group_by(WorkOrder.priority).all()
         
         priority_analysis = []
         for priority, total, breached in priority_stats:
@@ -339,6 +528,94 @@ class AnalyticsService:
             ]
         }
     
+    def _sla_counts(
+        self,
+        organization_id: Optional[int],
+        start_date: datetime,
+        bucket_size: str,
+        window_days: int
+    ) -> Tuple:
+        """SLA counters from the raw work order table"""
+        
+        # Work Orders SLA Analysis
+        base_query = self.db.query(WorkOrder).join(Gate)
+        
+        if organization_id:
+            base_query = base_query.filter(WorkOrder.org_id == organization_id)
+        
+        wo_query = base_query.filter(WorkOrder.created_at >= start_date)
+        
+        # Totals, SLA breaches (SLA túllépés) and resolution time in one query
+        total_work_orders, sla_breached, completed, resolution_hours = wo_query.with_entities(
+            func.count(WorkOrder.id),
+            func.count(case((self._sla_breached(), 1))),
+            func.count(WorkOrder.actual_end),
+            func.sum(case((
+                WorkOrder.actual_end.isnot(None),
+                self._hours_between(WorkOrder.created_at, WorkOrder.actual_end)
+            )))
+        ).one()
+        
+        avg_resolution_time = float(resolution_hours or 0) / completed if completed else 0
+        
+        # SLA at risk (SLA veszélyben - still open and due by the day 24 hours from now)
+        at_risk_until = (datetime.now() + timedelta(hours=24)).replace(hour=0, minute=0, second=0, microsecond=0)
+        sla_at_risk = base_query.filter(
+            WorkOrder.scheduled_end.isnot(None),
+            WorkOrder.status.in_(OPEN_WORK_ORDER_STATUSES),
+            WorkOrder.scheduled_end < at_risk_until + timedelta(days=1)
+        ).count()
+        
+        # SLA performance per bucket for chart
+        sla_buckets = self._bucketed_counts(
+            wo_query,
+            WorkOrder.created_at,
+            start_date,
+            window_days,
+            bucket_size,
+            conditions=(self._sla_breached(),)
+        )
+        
+        return total_work_orders, sla_breached, sla_at_risk, avg_resolution_time, sla_buckets
+    
+    @staticmethod
+    def _sla_breached():
+        """A work order breaches its SLA when it ends after its scheduled end"""
+        return and_(
+            WorkOrder.scheduled_end.isnot(None),
+            WorkOrder.actual_end.isnot(None),
+            WorkOrder.actual_end > WorkOrder.scheduled_end
+        )
+    
+    def _sla_counts_from_rollups(
+        self,
+        organization_id: int,
+        start_date: datetime,
+        bucket_size: str,
+        window_days: int
+    ) -> Tuple:
+        """SLA counters summed from the daily rollup table (day granularity)"""
+        
+        totals = self.rollups.sum_counters(
+            organization_id,
+            ['work_orders_total', 'work_orders_sla_breached', 'work_orders_completed', 'work_orders_resolution_hours'],
+            start=start_date.date()
+        )
+        at_risk = self.rollups.sum_counters(
+            organization_id, ['work_orders_sla_open'], end=(datetime.now() + timedelta(hours=24)).date()
+        )
+        
+        completed = totals['work_orders_completed']
+        avg_resolution_time = float(totals['work_orders_resolution_hours']) / completed if completed else 0
+        
+        sla_buckets = self._rollup_bucketed_counts(
+            organization_id, ('work_orders_total', 'work_orders_sla_breached'),
+            start_date, window_days, bucket_size
+        )
+        
+        return (totals['work_orders_total'], totals['work_orders_sla_breached'],
+                at_risk['work_orders_sla_open'], avg_resolution_time, sla_buckets)
+    
     # =============================================================================
     # ERROR STATISTICS - HIBASTATISZTIKÁK
     # =============================================================================
@@ -346,7 +623,9 @@ class AnalyticsService:
     def get_error_statistics(
         self,
         days_back: int = 30,
-        organization_id: Optional[int] = None
+        organization_id: Optional[int] = None,
+        bucket_size: str = 'day',
+        window_days: int = 30
     ) -> Dict[str, Any]:
         """
         Hibastatisztika elemzése - Error statistics analysis
@@ -354,52 +633,36 @@ class AnalyticsService:
         Args:
             days_back: Hány napra visszamenőleg
             organization_id: Szűrés szervezetre
+            bucket_size: Grafikon időegység (day, week, month)
+            window_days: Grafikon ablak hossza napokban
         """
         
-        start_date = datetime.now() - timedelta(days=days_back)
-        
-        # Base query for inspections with issues
-        inspection_query = self.db.query(InspectionItem)\
-            .join(Inspection)\
-            .join(Gate)
-        
-        if organization_id:
-            inspection_query = inspection_query.filter(Gate.organization_id == organization_id)
-        
-        inspection_query = inspection_query.filter(Inspection.completed_at >= start_date)
+        # Whole days, so raw queries and daily rollups cover the same rows
+        start_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days_back)
         
-        # Failed inspection items (sikertelen ellenőrzési tételek)
-        failed_items = inspection_query.filter(InspectionItem.status == 'failed').count()
+        # Előre aggregált adatok, ha frissek - Rollups when fresh, raw queries otherwise
+        needed_until = max(datetime.now(), start_date + timedelta(days=window_days)).date()
+        if self.rollups.get_fresh_state(organization_id, needed_until) is not None:
+            counts = self._error_counts_from_rollups(organization_id, start_date, bucket_size, window_days)
+        else:
+            counts = self._error_counts(organization_id, start_date, bucket_size, window_days)
         
-        # Total inspection items
-        total_items = inspection_query.count()
+        total_items, failed_items, gate_failure_stats, error_buckets = counts
         
         # Failure rate
         failure_rate = (failed_items / total_items * 100) if total_items > 0 else 0
         
         # Most common failure reasons
-        failure_reasons = self.db.query(
+        failure_reasons = self._inspection_item_query(organization_id, start_date).filter(
+            InspectionItem.result == 'fail',
+            InspectionItem.notes.isnot(None)
+        ).with_entities(
             InspectionItem.notes,
             func.count(InspectionItem.id).label('count')
-        ).filter(
-            InspectionItem.status == 'failed',
-            InspectionItem.notes.isnot(None)
-        ).join(Inspection)\
-         .filter(Inspection.completed_at >= start_date)\
-         .group_by(InspectionItem.notes)\
+        ).group_by(InspectionItem.notes)\
          .order_by(desc('count'))\
          .limit(10).all()
         
-        # Gate type failure analysis
-        gate_failure_stats = self.db.query(
-            Gate.gate_type,
-            func.count(InspectionItem.id).label('total_items'),
-            func.count(case((InspectionItem.status == 'failed', 1))).label('failed_items')
-        ).join(Inspection)\
-         .join(Gate)\
-         .filter(Inspection.completed_at >= start_date)\
-         .group_by(Gate.gate_type).all()
-        
         gate_failure_analysis = []
         for gate_type, total, failed in gate_failure_stats:
             failure_pct = (failed / total * 100) if total > 0 else 0
@@ -410,47 +673,30 @@ class AnalyticsService:
                 'failure_rate': round(failure_pct, 1)
             })
         
-        # Daily error trend
         daily_errors = []
-        for i in range(30):
-            day = start_date + timedelta(days=i)
-            day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day.replace(hour=23, minute=59, second=59, microsecond=999999)
-            
-            day_failed = inspection_query.filter(
-                Inspection.completed_at >= day_start,
-                Inspection.completed_at <= day_end,
-                InspectionItem.status == 'failed'
-            ).count()
-            
-            day_total = inspection_query.filter(
-                Inspection.completed_at >= day_start,
-                Inspection.completed_at <= day_end
-            ).count()
-            
-            day_failure_rate = (day_failed / day_total * 100) if day_total > 0 else 0
+        for bucket_start, (bucket_total, bucket_failed) in error_buckets:
+            bucket_failure_rate = (bucket_failed / bucket_total * 100) if bucket_total > 0 else 0
             
             daily_errors.append(ChartDataPoint(
-                label=day.strftime("%m-%d"),
-                value=round(day_failure_rate, 1),
-                date=day_start
+                label=bucket_start.strftime(CHART_BUCKET_LABELS[bucket_size]),
+                value=round(bucket_failure_rate, 1),
+                date=bucket_start
             ))
         
         # Work order correlation (munkalapcorrelation)
         # Find gates with high failure rates and work orders
-        problematic_gates = self.db.query(
+        failed_item_ids = func.count(func.distinct(case((InspectionItem.result == 'fail', InspectionItem.id))))
+        problematic_gates = self._inspection_item_query(organization_id, start_date)\
+         .outerjoin(WorkOrder, Gate.id == WorkOrder.gate_id)\
+         .with_entities(
             Gate.id,
             Gate.name,
             Gate.gate_type,
-            func.count(InspectionItem.id).label('total_items'),
-            func.count(case((InspectionItem.status == 'failed', 1))).label('failed_items'),
-            func.count(WorkOrder.id).label('work_orders')
-        ).join(Inspection)\
-         .join(InspectionItem)\
-         .outerjoin(WorkOrder, Gate.id == WorkOrder.gate_id)\
-         .filter(Inspection.completed_at >= start_date)\
-         .group_by(Gate.id, Gate.name, Gate.gate_type)\
-         .having(func.count(case((InspectionItem.status == 'failed', 1))) > 0)\
+            func.count(func.distinct(InspectionItem.id)).label('total_items'),
+            failed_item_ids.label('failed_items'),
+            func.count(func.distinct(WorkOrder.id)).label('work_orders')
+        ).group_by(Gate.id, Gate.name, Gate.gate_type)\
+         .having(failed_item_ids > 0)\
          .order_by(desc('failed_items'))\
          .limit(10).all()
         
@@ -505,6 +751,83 @@ class AnalyticsService:
             ]
         }
     
+    def _error_counts(
+        self,
+        organization_id: Optional[int],
+        start_date: datetime,
+        bucket_size: str,
+        window_days: int
+    ) -> Tuple:
+        """Inspection item failure counters from the raw tables"""
+        
+        # Base query for inspection items of completed inspections
+        inspection_query = self._inspection_item_query(organization_id, start_date)
+        is_failed = InspectionItem.result == 'fail'
+        
+        # Total and failed inspection items (sikertelen ellenőrzési tételek)
+        total_items, failed_items = inspection_query.with_entities(
+            func.count(InspectionItem.id),
+            func.count(case((is_failed, 1)))
+        ).one()
+        
+        # Gate type failure analysis
+        gate_type = func.coalesce(Gate.gate_type, 'unknown')
+        gate_failure_stats = inspection_query.with_entities(
+            gate_type,
+            func.count(InspectionItem.id).label('total_items'),
+            func.count(case((is_failed, 1))).label('failed_items')
+        ).group_by(gate_type).all()
+        
+        # Error trend per bucket
+        error_buckets = self._bucketed_counts(
+            inspection_query,
+            Inspection.completed_at,
+            start_date,
+            window_days,
+            bucket_size,
+            conditions=(is_failed,)
+        )
+        
+        return total_items, failed_items, gate_failure_stats, error_buckets
+    
+    def _inspection_item_query(self, organization_id: Optional[int], start_date: datetime):
+        """Inspection items of inspections completed since start_date"""
+        query = self.db.query(InspectionItem)\
+            .join(Inspection, InspectionItem.inspection_id == Inspection.id)\
+            .join(Gate, Inspection.gate_id == Gate.id)\
+            .filter(Inspection.completed_at >= start_date)
+        
+        if organization_id:
+            query = query.filter(Inspection.org_id == organization_id)
+        
+        return query
+    
+    def _error_counts_from_rollups(
+        self,
+        organization_id: int,
+        start_date: datetime,
+        bucket_size: str,
+        window_days: int
+    ) -> Tuple:
+        """Inspection item failure counters summed from the daily rollup table (day granularity)"""
+        
+        counters = ['inspection_items_total', 'inspection_items_failed']
+        totals = self.rollups.sum_counters(organization_id, counters, start=start_date.date())
+        by_gate_type = self.rollups.sum_counters(
+            organization_id, counters, start=start_date.date(), group_by_gate_type=True
+        )
+        gate_failure_stats = [
+            (gate_type, values['inspection_items_total'], values['inspection_items_failed'])
+            for gate_type, values in by_gate_type.items()
+            if values['inspection_items_total']
+        ]
+        
+        error_buckets = self._rollup_bucketed_counts(
+            organization_id, tuple(counters), start_date, window_days, bucket_size
+        )
+        
+        return totals['inspection_items_total'], totals['inspection_items_failed'], gate_failure_stats, error_buckets
+    
     # =============================================================================
     # EXPORT FUNCTIONS - EXPORT FUNKCIÓK
     # =============================================================================
@@ -681,7 +1004,9 @@ class AnalyticsService:
     def get_dashboard_analytics(
         self,
         organization_id: Optional[int] = None,
-        days_back: int = 30
+        days_back: int = 30,
+        bucket_size: str = 'day',
+        window_days: int = 30
     ) -> Dict[str, Any]:
         """
         Get combined analytics data for dashboard
@@ -689,9 +1014,9 @@ class AnalyticsService:
         """
         
         # Get all analytics
-        due_inspections = self.get_due_inspections_analytics(30, organization_id)
-        sla_analytics = self.get_sla_analytics(days_back, organization_id)
-        error_stats = self.get_error_statistics(days_back, organization_id)
+        due_inspections = self.get_due_inspections_analytics(30, organization_id, bucket_size, window_days)
+        sla_analytics = self.get_sla_analytics(days_back, organization_id, bucket_size, window_days)
+        error_stats = self.get_error_statistics(days_back, organization_id, bucket_size, window_days)
         
         # Combine KPIs
         all_kpis = (
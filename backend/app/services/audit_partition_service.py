@@ -0,0 +1,244 @@
+"""
+Audit log partition maintenance
+Audit napló havi partíciók karbantartása
+
+On PostgreSQL audit_logs is range-partitioned by month on ``timestamp``
+(see migration e6c4f5a7b8d9). A beat task keeps the partition set in shape:
+
+- pre-creates the partitions for the current month and the next
+  AUDIT_PARTITION_MONTHS_AHEAD months, moving any matching rows out of the
+  default partition first
+- detaches partitions older than AUDIT_RETENTION_MONTHS, archives their rows
+  to gzip-compressed JSONL under AUDIT_ARCHIVE_DIR and drops them
+
+On other databases audit_logs is a plain table and the task is a no-op.
+"""
+
+import gzip
+import json
+import os
+import re
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.celery_app import maintenance_task
+from app.core.config import settings
+
+logger = structlog.get_logger(__name__)
+
+AUDIT_TABLE = 'audit_logs'
+DEFAULT_PARTITION = 'audit_logs_default'
+
+# Monthly partitions are named audit_logs_pYYYYMM
+_PARTITION_NAME = re.compile(r'^audit_logs_p(\d{4})(\d{2})$')
+
+
+def add_months(value: date, months: int) -> date:
+    """First day of the month ``months`` away from ``value``'s month."""
+    month_index = value.year * 12 + (value.month - 1) + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month_start: date) -> str:
+    """Partition table name for the month starting at ``month_start``."""
+    return f"audit_logs_p{month_start.year:04d}{month_start.month:02d}"
+
+
+def retention_cutoff(today: Optional[date] = None) -> datetime:
+    """
+    Oldest timestamp still kept online
+    Legrégebbi, még online tárolt időpont
+
+    Partitions entirely before this instant are archived, so audit queries
+    use it as their default lower bound.
+    """
+    today = today or datetime.utcnow().date()
+    cutoff = add_months(today, -settings.AUDIT_RETENTION_MONTHS)
+    return datetime(cutoff.year, cutoff.month, 1)
+
+
+class AuditPartitionService:
+    """Service for creating, detaching and archiving audit_logs partitions."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def is_partitioned(self) -> bool:
+        """Whether audit_logs is a partitioned PostgreSQL table."""
+        if self.db.get_bind().dialect.name != 'postgresql':
+            return False
+
+        return bool(self.db.execute(text(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = :table AND c.relnamespace = current_schema()::regnamespace"
+        ), {'table': AUDIT_TABLE}).scalar())
+
+    def list_partitions(self) -> Dict[date, str]:
+        """Attached monthly partitions keyed by the first day of their month."""
+        rows = self.db.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table AND p.relnamespace = current_schema()::regnamespace"
+        ), {'table': AUDIT_TABLE}).scalars().all()
+
+        partitions = {}
+        for name in rows:
+            match = _PARTITION_NAME.match(name)
+            if match:
+                partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+        return partitions
+
+    # =========================================================================
+    # ELŐRE LÉTREHOZÁS - PRE-CREATE
+    # =========================================================================
+
+    def ensure_partitions(self, months_ahead: Optional[int] = None, today: Optional[date] = None) -> List[str]:
+        """
+        Create missing partitions for the current and upcoming months
+        Hiányzó partíciók létrehozása az aktuális és következő hónapokra
+
+        Each partition is created detached, filled with the rows of its range
+        that landed in the default partition, then attached, so creation also
+        works after the task was not running for a while.
+        """
+        months_ahead = settings.AUDIT_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+        current = add_months(today or datetime.utcnow().date(), 0)
+        existing = self.list_partitions()
+
+        created = []
+        for offset in range(months_ahead + 1):
+            month_start = add_months(current, offset)
+            if month_start in existing:
+                continue
+            self._create_partition(month_start)
+            self.db.commit()
+            created.append(partition_name(month_start))
+            logger.info("Created audit log partition", partition=created[-1])
+
+        return created
+
+    def _create_partition(self, month_start: date) -> None:
+        """Create and attach the partition for one month."""
+        name = partition_name(month_start)
+        bounds = {'start': month_start, 'end': add_months(month_start, 1)}
+
+        self.db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} (LIKE {AUDIT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        self.db.execute(text(
+            f"WITH moved AS ("
+            f"  DELETE FROM {DEFAULT_PARTITION} WHERE timestamp >= :start AND timestamp < :end RETURNING *"
+            f") INSERT INTO {name} SELECT * FROM moved"
+        ), bounds)
+        self.db.execute(text(
+            f"ALTER TABLE {AUDIT_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+        ))
+
+    # =========================================================================
+    # ARCHIVÁLÁS - DETACH AND ARCHIVE
+    # =========================================================================
+
+    def archive_expired(self, retention_months: Optional[int] = None, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        """
+        Detach, archive and drop partitions older than the retention period
+        Megőrzési időn túli partíciók leválasztása, archiválása és törlése
+
+        The partition is detached first so the archive export does not hold
+        locks on audit_logs; it is only dropped once the archive file is
+        completely written.
+        """
+        retention_months = settings.AUDIT_RETENTION_MONTHS if retention_months is None else retention_months
+        cutoff = add_months(today or datetime.utcnow().date(), -retention_months)
+
+        archived = []
+        for month_start, name in sorted(self.list_partitions().items()):
+            if add_months(month_start, 1) > cutoff:
+                break
+
+            self.db.execute(text(f"ALTER TABLE {AUDIT_TABLE} DETACH PARTITION {name}"))
+            self.db.commit()
+
+            path, rows = self._export_partition(name)
+
+            self.db.execute(text(f"DROP TABLE {name}"))
+            self.db.commit()
+
+            archived.append({'partition': name, 'rows': rows, 'archive': path})
+            logger.info("Archived audit log partition", partition=name, rows=rows, archive=path)
+
+        # Detached partitions left behind by an interrupted run
+        for name in self._detached_leftovers(cutoff):
+            path, rows = self._export_partition(name)
+            self.db.execute(text(f"DROP TABLE {name}"))
+            self.db.commit()
+            archived.append({'partition': name, 'rows': rows, 'archive': path})
+
+        return archived
+
+    def _detached_leftovers(self, cutoff: date) -> List[str]:
+        """Expired audit_logs_pYYYYMM tables that are no longer attached."""
+        attached = set(self.list_partitions().values())
+        names = self.db.execute(text(
+            "SELECT tablename FROM pg_tables WHERE schemaname = current_schema() AND tablename LIKE 'audit\\_logs\\_p%'"
+        )).scalars().all()
+
+        leftovers = []
+        for name in names:
+            match = _PARTITION_NAME.match(name)
+            if not match or name in attached:
+                continue
+            month_start = date(int(match.group(1)), int(match.group(2)), 1)
+            if add_months(month_start, 1) <= cutoff:
+                leftovers.append(name)
+        return sorted(leftovers)
+
+    def _export_partition(self, name: str) -> Tuple[str, int]:
+        """Stream a detached partition to <archive dir>/<name>.jsonl.gz."""
+        os.makedirs(settings.AUDIT_ARCHIVE_DIR, exist_ok=True)
+        path = os.path.join(settings.AUDIT_ARCHIVE_DIR, f"{name}.jsonl.gz")
+        partial_path = f"{path}.partial"
+
+        rows = 0
+        result = self.db.connection().execution_options(stream_results=True, yield_per=1000).execute(
+            text(f"SELECT * FROM {name} ORDER BY timestamp, id")
+        )
+        with gzip.open(partial_path, 'wt', encoding='utf-8') as archive:
+            for row in result.mappings():
+                archive.write(json.dumps(dict(row), default=_json_default) + '\n')
+                rows += 1
+        self.db.commit()
+
+        os.replace(partial_path, path)
+        return path, rows
+
+
+def _json_default(value: Any) -> Any:
+    """JSON encoder for values that may appear in audit rows."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+@maintenance_task(name="maintenance.manage_audit_partitions")
+def manage_audit_partitions(self):
+    """Celery task to pre-create upcoming and archive expired audit_logs partitions."""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        service = AuditPartitionService(db)
+        if not service.is_partitioned():
+            return {"partitioned": False}
+
+        created = service.ensure_partitions()
+        archived = service.archive_expired()
+        return {"partitioned": True, "created": created, "archived": archived}
+    finally:
+        db.close()
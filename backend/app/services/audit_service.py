@@ -4,19 +4,31 @@ Audit log rendszer szolgáltatások
 """
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc, asc
-from typing import Optional, Dict, Any, List, Union
+from sqlalchemy import and_, or_, func, desc, asc, select
+from typing import Optional, Dict, Any, Iterator, List, Union
 from datetime import datetime, timedelta
 from fastapi import Request
+import csv
 import json
 import difflib
-import pandas as pd
 import io
+import zlib
 
 from app.models.audit_logs import (
     AuditLog, AuditAction, AuditCategory, AuditSeverity, AuditResourceType
 )
 from app.models.auth import User
+from app.services.audit_partition_service import AuditPartitionService, retention_cutoff
+
+# Columns written by the CSV export
+EXPORT_COLUMNS = (
+    "id", "timestamp", "username", "action", "action_description",
+    "entity_type", "entity_id", "success", "risk_level",
+    "ip_address", "request_method", "request_path"
+)
+
+# Rows fetched per server-side cursor round trip / encoded per chunk
+EXPORT_CHUNK_ROWS = 1000
 
 
 class AuditService:
@@ -27,6 +39,7 @@ class AuditService:
     
     def __init__(self, db: Session):
         self.db = db
+        self._partitioned: Optional[bool] = None
     
     def log_action(
         self,
@@ -52,44 +65,24 @@ class AuditService:
         Audit művelet naplózása
         """
         
-        # Extract info from request if provided
-        request_method = None
-        request_path = None
-        if request:
-            if not ip_address:
-                ip_address = self._get_client_ip(request)
-            if not user_agent:
-                user_agent = request.headers.get("user-agent")
-            request_method = request.method
-            request_path = str(request.url.path)
-        
-        # Calculate changed fields
-        changed_fields = []
-        if old_values and new_values:
-            changed_fields = self._calculate_changed_fields(old_values, new_values)
-        
-        # Create audit log entry
-        audit_log = AuditLog(
-            user_id=user_id,
-            username=username,
-            timestamp=datetime.utcnow(),
+        audit_log = AuditLog(**self.build_audit_record(
             action=action,
-            action_description=description,
             entity_type=entity_type,
-            entity_id=int(entity_id) if str(entity_id).isdigit() else 0,
+            entity_id=entity_id,
+            user_id=user_id,
+            username=username,
+            description=description,
             old_values=old_values,
             new_values=new_values,
-            changed_fields=changed_fields,
             ip_address=ip_address,
             user_agent=user_agent,
             session_id=session_id,
-            request_method=request_method,
-            request_path=request_path,
             organization_id=organization_id,
+            risk_level=risk_level,
             success=success,
             error_message=error_message,
-            risk_level=risk_level
-        )
+            request=request
+        ))
         
         self.db.add(audit_log)
         self.db.commit()
@@ -97,6 +90,71 @@ class AuditService:
         
         return audit_log
     
+    @classmethod
+    def build_audit_record(
+        cls,
+        action: str,
+        entity_type: str,
+        entity_id: Union[str, int, None],
+        user_id: Optional[int] = None,
+        username: Optional[str] = None,
+        description: Optional[str] = None,
+        old_values: Optional[Dict[str, Any]] = None,
+        new_values: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        session_id: Optional[str] = None,
+        organization_id: Optional[int] = None,
+        risk_level: str = "LOW",
+        success: bool = True,
+        error_message: Optional[str] = None,
+        duration_ms: Optional[int] = None,
+        request: Optional[Request] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the column values of an audit log row without touching the database
+        Audit sor oszlopértékeinek összeállítása adatbázis művelet nélkül
+        """
+        
+        # Extract info from request if provided
+        request_method = None
+        request_path = None
+        if request:
+            if not ip_address:
+                ip_address = cls._get_client_ip(request)
+            if not user_agent:
+                user_agent = request.headers.get("user-agent")
+            request_method = request.method
+            request_path = str(request.url.path)
+        
+        # Calculate changed fields
+        changed_fields = []
+        if old_values and new_values:
+            changed_fields = cls._calculate_changed_fields(old_values, new_values)
+        
+        return {
+            'user_id': user_id,
+            'username': username,
+            'timestamp': datetime.utcnow(),
+            'action': action,
+            'action_description': description,
+            'entity_type': entity_type,
+            'entity_id': int(entity_id) if str(entity_id).isdigit() else 0,
+            'old_values': old_values,
+            'new_values': new_values,
+            'changed_fields': changed_fields,
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            'session_id': session_id,
+            'request_method': request_method,
+            'request_path': request_path,
+            'organization_id': organization_id,
+            'success': success,
+            'error_message': error_message,
+            'duration_ms': duration_ms,
+            'risk_level': risk_level
+        }
+    
     def log_create(
         self,
         entity_type: str,
@@ -222,45 +280,18 @@ class AuditService:
         Szűrt audit logok lekérdezése lapozással
         """
         
-        query = self.db.query(AuditLog)
-        
-        # Apply filters
-        if organization_id:
-            query = query.filter(AuditLog.organization_id == organization_id)
-        
-        if user_id:
-            query = query.filter(AuditLog.user_id == user_id)
-        
-        if entity_type:
-            query = query.filter(AuditLog.entity_type == entity_type)
-        
-        if entity_id:
-            query = query.filter(AuditLog.entity_id == entity_id)
-        
-        if action:
-            query = query.filter(AuditLog.action == action)
-        
-        if risk_level:
-            query = query.filter(AuditLog.risk_level == risk_level)
-        
-        if success is not None:
-            query = query.filter(AuditLog.success == success)
-        
-        if start_date:
-            query = query.filter(AuditLog.timestamp >= start_date)
-        
-        if end_date:
-            query = query.filter(AuditLog.timestamp <= end_date)
-        
-        if search_term:
-            search_filter = or_(
-                AuditLog.action_description.ilike(f"%{search_term}%"),
-                AuditLog.username.ilike(f"%{search_term}%"),
-                AuditLog.entity_type.ilike(f"%{search_term}%"),
-                AuditLog.ip_address.ilike(f"%{search_term}%"),
-                AuditLog.request_path.ilike(f"%{search_term}%")
-            )
-            query = query.filter(search_filter)
+        query = self.db.query(AuditLog).filter(*self._build_filters(
+            organization_id=organization_id,
+            user_id=user_id,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            action=action,
+            risk_level=risk_level,
+            success=success,
+            start_date=start_date,
+            end_date=end_date,
+            search_term=search_term
+        ))
         
         # Get total count before pagination
         total = query.count()
@@ -299,25 +330,18 @@ class AuditService:
         Audit statisztikák dashboard-hoz
         """
         
-        query = self.db.query(AuditLog)
-        
+        filters = self._timestamp_filters(start_date, end_date)
         if organization_id:
-            query = query.filter(AuditLog.organization_id == organization_id)
-        
-        if start_date:
-            query = query.filter(AuditLog.timestamp >= start_date)
-        
-        if end_date:
-            query = query.filter(AuditLog.timestamp <= end_date)
+            filters.append(AuditLog.organization_id == organization_id)
         
         # Total logs
-        total_logs = query.count()
+        total_logs = self.db.query(func.count(AuditLog.id)).filter(*filters).scalar()
         
         # By action
         by_action = self.db.query(
             AuditLog.action,
             func.count(AuditLog.id).label('count')
-        ).filter(query.whereclause if hasattr(query, 'whereclause') else True)\
+        ).filter(*filters)\
          .group_by(AuditLog.action)\
          .all()
         
@@ -325,7 +349,7 @@ class AuditService:
         by_entity_type = self.db.query(
             AuditLog.entity_type,
             func.count(AuditLog.id).label('count')
-        ).filter(query.whereclause if hasattr(query, 'whereclause') else True)\
+        ).filter(*filters)\
          .group_by(AuditLog.entity_type)\
          .all()
         
@@ -333,7 +357,7 @@ class AuditService:
         by_risk_level = self.db.query(
             AuditLog.risk_level,
             func.count(AuditLog.id).label('count')
-        ).filter(query.whereclause if hasattr(query, 'whereclause') else True)\
+        ).filter(*filters)\
          .group_by(AuditLog.risk_level)\
          .all()
         
@@ -341,7 +365,7 @@ class AuditService:
         by_success = self.db.query(
             AuditLog.success,
             func.count(AuditLog.id).label('count')
-        ).filter(query.whereclause if hasattr(query, 'whereclause') else True)\
+        ).filter(*filters)\
          .group_by(AuditLog.success)\
          .all()
         
@@ -349,7 +373,7 @@ class AuditService:
         top_users = self.db.query(
             AuditLog.username,
             func.count(AuditLog.id).label('count')
-        ).filter(query.whereclause if hasattr(query, 'whereclause') else True)\
+        ).filter(*filters)\
          .filter(AuditLog.username.isnot(None))\
          .group_by(AuditLog.username)\
          .order_by(desc('count'))\
@@ -371,6 +395,63 @@ class AuditService:
             ]
         }
     
+    def iter_audit_logs_csv(
+        self,
+        organization_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        compress: bool = False,
+        **filters
+    ) -> Iterator[bytes]:
+        """
+        Stream audit logs as CSV chunks
+        Audit logok CSV export folyamatosan, darabokban
+        
+        Rows are read through a server-side cursor and encoded every
+        EXPORT_CHUNK_ROWS rows, so memory use does not depend on the size of
+        the export. With compress=True the chunks form a gzip stream.
+        """
+        
+        conditions = self._build_filters(
+            organization_id=organization_id,
+            start_date=start_date,
+            end_date=end_date,
+            **filters
+        )
+        stmt = select(*[getattr(AuditLog, column) for column in EXPORT_COLUMNS])\
+            .where(*conditions)\
+            .order_by(AuditLog.timestamp, AuditLog.id)\
+            .execution_options(yield_per=EXPORT_CHUNK_ROWS)
+        
+        compressor = zlib.compressobj(wbits=31) if compress else None  # 31 = gzip container
+        
+        def encode(text: str) -> bytes:
+            data = text.encode('utf-8')
+            return compressor.compress(data) if compressor else data
+        
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        buffer.write('\ufeff')  # BOM for Excel compatibility
+        writer.writerow(EXPORT_COLUMNS)
+        
+        for partition in self.db.execute(stmt).partitions():
+            for row in partition:
+                writer.writerow([
+                    value.isoformat() if isinstance(value, datetime) else value
+                    for value in row
+                ])
+            chunk = encode(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+            if chunk:
+                yield chunk
+        
+        tail = encode(buffer.getvalue())
+        if compressor:
+            tail += compressor.flush()
+        if tail:
+            yield tail
+    
     def export_audit_logs_csv(
         self,
         organization_id: Optional[int] = None,
@@ -382,41 +463,96 @@ class AuditService:
         Export audit logs as CSV
         Audit logok CSV export
         """
-        
-        # Get all logs without pagination
-        logs_data = self.get_audit_logs(
+        return b"".join(self.iter_audit_logs_csv(
             organization_id=organization_id,
             start_date=start_date,
             end_date=end_date,
-            per_page=10000,  # Large number to get all
             **filters
-        )
+        ))
+    
+    def _build_filters(
+        self,
+        organization_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        action: Optional[str] = None,
+        risk_level: Optional[str] = None,
+        success: Optional[bool] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        search_term: Optional[str] = None
+    ) -> List[Any]:
+        """
+        Filter conditions shared by listing and export
+        Közös szűrőfeltételek listázáshoz és exporthoz
+        """
         
-        # Convert to DataFrame
-        df = pd.DataFrame(logs_data["logs"])
+        filters = self._timestamp_filters(start_date, end_date)
         
-        if df.empty:
-            df = pd.DataFrame(columns=[
-                "id", "timestamp", "username", "action", "action_description",
-                "entity_type", "entity_id", "success", "risk_level", 
-                "ip_address", "request_method", "request_path"
-            ])
-        else:
-            # Select relevant columns for export
-            df = df[[
-                "id", "timestamp", "username", "action", "action_description",
-                "entity_type", "entity_id", "success", "risk_level",
-                "ip_address", "request_method", "request_path"
-            ]]
-        
-        # Convert to CSV
-        output = io.StringIO()
-        df.to_csv(output, index=False, encoding='utf-8')
-        csv_data = output.getvalue().encode('utf-8-sig')  # BOM for Excel compatibility
-        
-        return csv_data
+        if organization_id:
+            filters.append(AuditLog.organization_id == organization_id)
+        
+        if user_id:
+            filters.append(AuditLog.user_id == user_id)
+        
+        if entity_type:
+            filters.append(AuditLog.entity_type == entity_type)
+        
+        if entity_id:
+            filters.append(AuditLog.entity_id == entity_id)
+        
+        if action:
+            filters.append(AuditLog.action == action)
+        
+        if risk_level:
+            filters.append(AuditLog.risk_level == risk_level)
+        
+        if success is not None:
+            filters.append(AuditLog.success == success)
+        
+        if search_term:
+            filters.append(or_(
+                AuditLog.action_description.ilike(f"%{search_term}%"),
+                AuditLog.username.ilike(f"%{search_term}%"),
+                AuditLog.entity_type.ilike(f"%{search_term}%"),
+                AuditLog.ip_address.ilike(f"%{search_term}%"),
+                AuditLog.request_path.ilike(f"%{search_term}%")
+            ))
+        
+        return filters
+    
+    def _timestamp_filters(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[Any]:
+        """
+        Timestamp range conditions for audit queries
+        Időszak feltételek audit lekérdezésekhez
+        
+        When audit_logs is partitioned (and expired partitions are archived),
+        queries without a start date default to the retention cutoff so
+        PostgreSQL prunes partitions. An explicit start date is never changed.
+        """
+        if start_date is None and self._is_partitioned():
+            start_date = retention_cutoff()
+        
+        filters = []
+        if start_date:
+            filters.append(AuditLog.timestamp >= start_date)
+        if end_date:
+            filters.append(AuditLog.timestamp <= end_date)
+        return filters
+    
+    def _is_partitioned(self) -> bool:
+        """Whether audit_logs is partitioned (looked up once per service)"""
+        if self._partitioned is None:
+            self._partitioned = AuditPartitionService(self.db).is_partitioned()
+        return self._partitioned
     
-    def _get_client_ip(self, request: Request) -> Optional[str]:
+    @staticmethod
+    def _get_client_ip(request: Request) -> Optional[str]:
         """Extract client IP from request"""
         # Check for forwarded headers first
         forwarded_for = request.headers.get("x-forwarded-for")
@@ -433,8 +569,8 @@ class AuditService:
         
         return None
     
+    @staticmethod
     def _calculate_changed_fields(
-        self, 
         old_data: Dict[str, Any], 
         new_data: Dict[str, Any]
     ) -> List[str]:
@@ -18,10 +18,11 @@ from app.schemas.auth import (
     APIKeyCreate, APIKeyResponse, UserProfile
 )
 from app.core.security import (
-    hash_password, verify_password, create_access_token, 
-    create_refresh_token, verify_token, generate_secure_random_string,
-    generate_email_verification_token, generate_password_reset_token
+    create_access_token, create_refresh_token, verify_token, generate_secure_random_string,
+    generate_email_verification_token, generate_password_reset_token,
+    hash_password_async, verify_password_async
 )
+from app.core.password_pool import PasswordHashBusy
 from app.core.config import settings
 
 logger = structlog.get_logger(__name__)
@@ -33,6 +34,15 @@ class AuthService:
     def __init__(self, db: Session):
         self.db = db
     
+    @staticmethod
+    def _hashing_busy(error: PasswordHashBusy) -> HTTPException:
+        """Login storm: ask the client to retry instead of queueing without bound."""
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is temporarily busy, please retry",
+            headers={"Retry-After": str(error.retry_after)}
+        )
+    
     async def register_user(self, user_data: UserRegister) -> dict:
         """
         Register a new user.
@@ -66,9 +76,13 @@ class AuthService:
                     detail="Username already taken"
                 )
         
+        try:
+            hashed_password = await hash_password_async(user_data.password)
+        except PasswordHashBusy as e:
+            raise self._hashing_busy(e)
+        
         # Create new user
         try:
-            hashed_password = hash_password(user_data.password)
             email_token = generate_secure_random_string(32)
             
             user = User(
@@ -137,13 +151,30 @@ class AuthService:
             )
         ).first()
         
-        if not user or not verify_password(password, user.password_hash):
+        if not user:
             logger.warning("Authentication failed", username=username)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password"
             )
         
+        try:
+            password_valid, new_hash = await verify_password_async(password, user.password_hash)
+        except PasswordHashBusy as e:
+            raise self._hashing_busy(e)
+        
+        if not password_valid:
+            logger.warning("Authentication failed", username=username)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Incorrect username or password"
+            )
+        
+        # Transparently upgrade hashes made with outdated Argon2 parameters
+        if new_hash:
+            user.password_hash = new_hash
+            logger.info("Password hash upgraded", user_id=user.id)
+        
         if not user.email_verified:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -375,7 +406,10 @@ class AuthService:
         # Generate API key
         api_key = generate_secure_random_string(40)
         key_prefix = api_key[:8]
-        key_hash = hash_password(api_key)
+        try:
+            key_hash = await hash_password_async(api_key)
+        except PasswordHashBusy as e:
+            raise self._hashing_busy(e)
         
         # Calculate expiration
         expires_at = None
@@ -8,13 +8,19 @@ from typing import Dict, Any, List, Optional, Tuple
 import logging
 from sqlalchemy.orm import Session
 from dataclasses import dataclass
+from decimal import Decimal
 
 from ..models.integrations import ERPSyncLog, Integration
-from ..models.inventory import InventoryItem, PartModel
-from ..core.database import get_db
+from ..models.inventory import InventoryItem, PartModel, Warehouse
+from ..models.tickets import Part
+from .inventory_service import InventoryService
+from .stock_posting import StockPosting
 
 logger = logging.getLogger(__name__)
 
+# reference_type of stock movements posted from an ERP feed
+ERP_REFERENCE_TYPE = "erp"
+
 
 @dataclass
 class ERPPartData:
@@ -44,6 +50,25 @@ class ERPPartData:
     is_active: bool = True
 
 
+@dataclass
+class ERPStockMovementData:
+    """
+    Stock receipt / issue line from an ERP feed
+    Készletmozgás sor ERP adatfolyamból
+    """
+    part_number: str
+    warehouse_code: str
+    movement_type: str  # 'receipt' or 'issue'
+    quantity: float
+    unit_cost: Optional[float] = None
+    document_number: Optional[str] = None  # ERP bizonylatszám
+    notes: Optional[str] = None
+    
+    # Metadata
+    erp_id: Optional[str] = None
+    movement_date: Optional[datetime] = None
+
+
 @dataclass
 class ERPSyncResult:
     """
@@ -128,6 +153,115 @@ class BaseERPAdapter(ABC):
         """
         pass
     
+    async def fetch_stock_movements(self,
+                                    modified_since: Optional[datetime] = None) -> List[ERPStockMovementData]:
+        """
+        Get stock receipts / issues booked in the ERP system since ``modified_since``
+        ERP-ben könyvelt készletmozgások lekérése
+        
+        Adapters without a stock feed return nothing.
+        """
+        return []
+    
+    def import_stock_movements(self,
+                               movements: List[ERPStockMovementData],
+                               user_id: Optional[int] = None) -> ERPSyncResult:
+        """
+        Import an ERP stock feed with one bulk posting
+        ERP készletmozgások tömeges könyvelése
+        
+        Part numbers and warehouse codes are resolved to inventory items with
+        one query; unknown or invalid lines are reported, the rest is posted.
+        
+        Every line is identified by its erp_id (or document_number), stored as
+        the movement's document number; lines already posted by an earlier
+        import are skipped, so a feed can be imported more than once.
+        """
+        start_time = datetime.now(timezone.utc)
+        result = ERPSyncResult(success=True, records_processed=len(movements))
+        skipped = 0
+        
+        try:
+            item_ids = self._resolve_inventory_items(movements)
+            
+            postings = []
+            line_numbers = []
+            for line_number, movement in enumerate(movements):
+                reference = movement.erp_id or movement.document_number
+                if reference is None:
+                    result.errors.append(f"Line {line_number}: no erp_id or document_number")
+                    continue
+                
+                item_id = item_ids.get((movement.warehouse_code, movement.part_number))
+                if item_id is None:
+                    result.errors.append(
+                        f"Line {line_number}: no inventory item for part {movement.part_number} "
+                        f"in warehouse {movement.warehouse_code}"
+                    )
+                    continue
+                postings.append(StockPosting(
+                    inventory_item_id=item_id,
+                    movement_type=movement.movement_type,
+                    quantity=Decimal(str(movement.quantity)),
+                    unit_cost=Decimal(str(movement.unit_cost)) if movement.unit_cost is not None else None,
+                    movement_reason="erp_import",
+                    reference_type=ERP_REFERENCE_TYPE,
+                    document_number=reference,
+                    notes=movement.notes
+                ))
+                line_numbers.append(line_number)
+            
+            if postings:
+                posting_result = InventoryService(self.db).bulk_post_movements(
+                    postings, user_id=user_id, skip_posted=True
+                )
+                for index, error in posting_result.rejected:
+                    result.errors.append(f"Line {line_numbers[index]}: {error}")
+                result.records_successful = posting_result.posted
+                skipped = len(posting_result.skipped)
+            
+            result.records_failed = len(movements) - result.records_successful - skipped
+            result.success = result.records_failed == 0
+            result.data = {
+                "posted": result.records_successful,
+                "skipped_duplicates": skipped,
+                "failed": result.records_failed
+            }
+            
+        except Exception as e:
+            self.logger.error(f"ERP stock import failed: {e}")
+            self.db.rollback()
+            result.success = False
+            result.records_successful = 0
+            result.records_failed = len(movements) - skipped
+            result.errors.append(str(e))
+        
+        duration = int((datetime.now(timezone.utc) - start_time).total_seconds())
+        self._log_sync_operation("import", "stock_movements", result, duration_seconds=duration)
+        self.db.commit()
+        
+        return result
+    
+    def _resolve_inventory_items(self, movements: List[ERPStockMovementData]) -> Dict[Tuple[str, str], int]:
+        """Map (warehouse code, part number) pairs to inventory item ids in one query."""
+        part_numbers = {movement.part_number for movement in movements}
+        warehouse_codes = {movement.warehouse_code for movement in movements}
+        if not part_numbers:
+            return {}
+        
+        rows = self.db.query(Warehouse.code, Part.part_number, InventoryItem.id).join(
+            InventoryItem, InventoryItem.warehouse_id == Warehouse.id
+        ).join(
+            Part, Part.id == InventoryItem.part_id
+        ).filter(
+            InventoryItem.org_id == self.integration.org_id,
+            InventoryItem.is_active == True,
+            Warehouse.code.in_(warehouse_codes),
+            Part.part_number.in_(part_numbers)
+        ).all()
+        
+        return {(code, part_number): item_id for code, part_number, item_id in rows}
+    
     def _log_sync_operation(self, 
                            sync_type: str,
                            operation: str,
@@ -141,7 +275,7 @@ class BaseERPAdapter(ABC):
         """
         sync_log = ERPSyncLog(
             integration_id=self.integration.id,
-            organization_id=self.integration.organization_id,
+            org_id=self.integration.org_id,
             sync_type=sync_type,
             operation=operation,
             entity_type="part",
@@ -597,12 +731,22 @@ class ERPSyncScheduler:
             from_erp_result = await adapter.sync_parts_from_erp()
             to_erp_result = await adapter.sync_parts_to_erp()
             
+            # Stock receipts / issues booked in the ERP, posted in bulk. The watermark
+            # only advances after a clean import; re-fetched lines are skipped as duplicates.
+            sync_started = datetime.now(timezone.utc)
+            stock_movements = await adapter.fetch_stock_movements(modified_since=integration.last_sync_at)
+            stock_result = adapter.import_stock_movements(stock_movements) if stock_movements else ERPSyncResult(success=True)
+            if stock_result.success:
+                integration.last_sync_at = sync_started
+                self.db.commit()
+            
             # Combine results
-            total_processed = from_erp_result.records_processed + to_erp_result.records_processed
-            total_successful = from_erp_result.records_successful + to_erp_result.records_successful
-            total_failed = from_erp_result.records_failed + to_erp_result.records_failed
+            results = (from_erp_result, to_erp_result, stock_result)
+            total_processed = sum(result.records_processed for result in results)
+            total_successful = sum(result.records_successful for result in results)
+            total_failed = sum(result.records_failed for result in results)
             
-            all_errors = from_erp_result.errors + to_erp_result.errors
+            all_errors = from_erp_result.errors + to_erp_result.errors + stock_result.errors
             
             return ERPSyncResult(
                 success=total_failed == 0,
@@ -612,7 +756,8 @@ class ERPSyncScheduler:
                 errors=all_errors,
                 data={
                     "from_erp": from_erp_result.data,
-                    "to_erp": to_erp_result.data
+                    "to_erp": to_erp_result.data,
+                    "stock_movements": stock_result.data
                 }
             )
             
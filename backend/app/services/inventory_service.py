@@ -3,22 +3,39 @@ Inventory management service with double-entry bookkeeping
 Raktárkezelési szolgáltatás kettős könyvelés elvvel
 """
 
+import csv
+import io
 import logging
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterator, List, Optional, Tuple, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc
+from sqlalchemy import and_, or_, case, func, select
 
 from app.models.inventory import (
     InventoryItem, Warehouse, StockMovement, StockAlert, 
     StockTake, StockTakeLine
 )
-from app.models.tickets import Part, PartUsage, WorkOrder
+from app.models.tickets import Part, PartUsage
 from app.database import get_db
+from app.services.stock_posting import (
+    StockPosting, StockPostingEngine, PostingResult, BulkStockPoster, BulkPostingResult,
+    allocate_movement_numbers
+)
+from app.services.stock_ledger import StockLedgerService, encode_movement_cursor, movement_keyset_condition
 
 logger = logging.getLogger(__name__)
 
+# Columns of the movement report / CSV export
+MOVEMENT_REPORT_COLUMNS = (
+    'movement_number', 'movement_date', 'movement_type', 'warehouse_code', 'part_code', 'part_name',
+    'debit_quantity', 'credit_quantity', 'net_quantity', 'unit_cost', 'total_cost',
+    'quantity_before', 'quantity_after', 'reference_type', 'reference_id', 'notes'
+)
+
+# Rows fetched per server-side cursor round trip when streaming the movement report
+MOVEMENT_EXPORT_CHUNK_ROWS = 1000
+
 
 class InventoryService:
     """
@@ -31,22 +48,88 @@ class InventoryService:
     
     def generate_movement_number(self) -> str:
         """Generate unique movement number"""
-        today = datetime.now().strftime("%Y%m%d")
-        
-        # Get last movement number for today
-        last_movement = self.db.query(StockMovement)\
-            .filter(StockMovement.movement_number.like(f"MOV{today}%"))\
-            .order_by(desc(StockMovement.movement_number))\
-            .first()
-        
-        if last_movement:
-            # Extract sequence number and increment
-            last_seq = int(last_movement.movement_number[-4:])
-            seq = last_seq + 1
-        else:
-            seq = 1
+        return allocate_movement_numbers(self.db, 1)[0]
+    
+    def post_movements(self, postings: List[StockPosting], user_id: Optional[int] = None) -> PostingResult:
+        """
+        Készletmozgások könyvelése egy tranzakcióban
+        Post a batch of receipts, issues and adjustments atomically
+        
+        Args:
+            postings: Könyvelendő mozgások
+            user_id: Végrehajtó felhasználó
+            
+        Raises:
+            ValueError: Ismeretlen tétel vagy nincs elég készlet (semmi sem könyvelődik)
+        """
+        try:
+            result = StockPostingEngine(self.db).post(postings, user_id=user_id)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        logger.info(f"Stock posted: {len(postings)} movements on {len(result.balances)} items")
+        
+        decreased = set()
+        increased = set()
+        for posting, movement in zip(postings, result.movements):
+            if movement is not None:
+                (decreased if movement.quantity < 0 else increased).add(posting.inventory_item_id)
+        self._evaluate_alerts(result.balances, decreased, increased)
+        return result
+    
+    def bulk_post_movements(
+        self,
+        postings: List[StockPosting],
+        user_id: Optional[int] = None,
+        atomic: bool = False,
+        skip_posted: bool = False
+    ) -> BulkPostingResult:
+        """
+        Tömeges bevételezés / kiadás (raktári bevételezés, ERP import)
+        Post thousands of receipts and issues with a fixed number of statements
+        
+        Args:
+            postings: Bevételezések és kiadások a feldolgozás sorrendjében
+            user_id: Végrehajtó felhasználó
+            atomic: Hibás sor esetén semmi sem könyvelődik
+            skip_posted: Már könyvelt bizonylatszámú sorok kihagyása (ismételt importhoz)
             
-        return f"MOV{today}{seq:04d}"
+        Raises:
+            ValueError: ``atomic`` módban az első hibás sor
+        """
+        try:
+            result = BulkStockPoster(self.db).post(
+                postings, user_id=user_id, atomic=atomic, skip_posted=skip_posted
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        logger.info(
+            f"Bulk stock posting: {result.posted} lines posted, {len(result.rejected)} rejected, "
+            f"{len(result.skipped)} already posted, {len(result.balances)} items"
+        )
+        self._evaluate_alerts(result.balances, result.decreased, result.increased)
+        return result
+    
+    def _evaluate_alerts(self, balances: Dict[int, Any], decreased: set, increased: set) -> None:
+        """Check low stock / resolvable alerts once per affected item"""
+        try:
+            for item_id in sorted(decreased | increased):
+                balance = balances[item_id]
+                threshold = max(balance.minimum_stock or Decimal('0'), balance.reorder_point or Decimal('0'))
+                is_low = balance.quantity_available <= 0 or balance.quantity_available <= threshold
+                if item_id in decreased and is_low:
+                    self._check_low_stock_alerts(self.db.get(InventoryItem, item_id))
+                elif item_id in increased:
+                    self._check_and_resolve_alerts(self.db.get(InventoryItem, item_id))
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Stock alert evaluation failed: {e}")
     
     def receive_stock(
         self,
@@ -70,66 +153,18 @@ class InventoryService:
             notes: Megjegyzések
             user_id: Végrehajtó felhasználó
         """
-        
-        inventory_item = self.db.query(InventoryItem).get(inventory_item_id)
-        if not inventory_item:
-            raise ValueError(f"Inventory item {inventory_item_id} not found")
-        
-        # Create stock movement - DEBIT entry (készlet növekedés)
-        movement = StockMovement(
-            movement_number=self.generate_movement_number(),
-            movement_type="receipt",
-            movement_reason="purchase",
-            warehouse_id=inventory_item.warehouse_id,
+        result = self.post_movements([StockPosting(
             inventory_item_id=inventory_item_id,
-            part_id=inventory_item.part_id,
-            debit_quantity=quantity,  # Tartozik oldal - beáramlás
-            credit_quantity=Decimal('0'),
-            quantity=quantity,  # Legacy compatibility
+            movement_type="receipt",
+            quantity=quantity,
             unit_cost=unit_cost,
-            total_cost=quantity * unit_cost if unit_cost else None,
-            quantity_before=inventory_item.quantity_on_hand,
-            quantity_after=inventory_item.quantity_on_hand + quantity,
             reference_type=reference_type,
             reference_id=reference_id,
-            notes=notes,
-            processed_by_user_id=user_id,
-            movement_date=datetime.utcnow(),
-            status='completed',
-            org_id=inventory_item.org_id  # Required field
-        )
-        
-        self.db.add(movement)
-        
-        # Update inventory levels
-        inventory_item.quantity_on_hand += quantity
-        inventory_item.quantity_available = inventory_item.quantity_on_hand - inventory_item.quantity_reserved
-        inventory_item.last_received_date = datetime.utcnow()
-        
-        # Update cost information
-        if unit_cost:
-            if inventory_item.average_cost:
-                # Calculate weighted average cost
-                total_value = (inventory_item.quantity_on_hand - quantity) * inventory_item.average_cost
-                total_value += quantity * unit_cost
-                inventory_item.average_cost = total_value / inventory_item.quantity_on_hand
-            else:
-                inventory_item.average_cost = unit_cost
-            
-            inventory_item.last_cost = unit_cost
-            inventory_item.total_value = inventory_item.quantity_on_hand * inventory_item.average_cost
+            notes=notes
+        )], user_id=user_id)
         
-        # Update stock status
-        self._update_stock_status(inventory_item)
-        
-        self.db.commit()
-        
-        logger.info(f"Stock received: {quantity} units of part {inventory_item.part_id} to warehouse {inventory_item.warehouse_id}")
-        
-        # Check for stock alerts that might be resolved
-        self._check_and_resolve_alerts(inventory_item)
-        
-        return movement
+        logger.info(f"Stock received: {quantity} units to item {inventory_item_id}")
+        return result.movements[0]
     
     def issue_stock(
         self,
@@ -153,78 +188,18 @@ class InventoryService:
             notes: Megjegyzések
             user_id: Végrehajtó felhasználó
         """
-        
-        inventory_item = self.db.query(InventoryItem).get(inventory_item_id)
-        if not inventory_item:
-            raise ValueError(f"Inventory item {inventory_item_id} not found")
-        
-        # Check available stock
-        if inventory_item.quantity_available < quantity:
-            raise ValueError(f"Insufficient stock. Available: {inventory_item.quantity_available}, Requested: {quantity}")
-        
-        # Get current cost for valuation
-        unit_cost = inventory_item.average_cost or inventory_item.last_cost or Decimal('0')
-        
-        # Create stock movement - CREDIT entry (készlet csökkenés)
-        movement = StockMovement(
-            movement_number=self.generate_movement_number(),
-            movement_type="issue",
-            warehouse_id=inventory_item.warehouse_id,
+        result = self.post_movements([StockPosting(
             inventory_item_id=inventory_item_id,
-            part_id=inventory_item.part_id,
-            debit_quantity=Decimal('0'),
-            credit_quantity=quantity,  # Követel oldal - kiáramlás
-            quantity=-quantity,  # Legacy compatibility (negative for issue)
-            unit_cost=unit_cost,
-            total_cost=quantity * unit_cost,
-            quantity_before=inventory_item.quantity_on_hand,
-            quantity_after=inventory_item.quantity_on_hand - quantity,
-            reference_type=reference_type or ("work_order" if work_order_id else None),
-            reference_id=reference_id or work_order_id,
-            notes=notes,
-            processed_by_user_id=user_id,
-            movement_date=datetime.utcnow(),
-            status='completed',
-            org_id=inventory_item.org_id  # Required field
-        )
-        
-        self.db.add(movement)
-        
-        # Update inventory levels
-        inventory_item.quantity_on_hand -= quantity
-        inventory_item.quantity_available = inventory_item.quantity_on_hand - inventory_item.quantity_reserved
-        inventory_item.last_issued_date = datetime.utcnow()
-        inventory_item.total_value = inventory_item.quantity_on_hand * inventory_item.average_cost if inventory_item.average_cost else None
-        
-        # Create part usage record if this is for a work order
-        part_usage = None
-        if work_order_id:
-            work_order = self.db.query(WorkOrder).get(work_order_id)
-            if work_order:
-                part_usage = PartUsage(
-                    work_order_id=work_order_id,
-                    part_id=inventory_item.part_id,
-                    gate_id=work_order.gate_id,
-                    inventory_item_id=inventory_item_id,
-                    warehouse_id=inventory_item.warehouse_id,
-                    stock_movement_id=movement.id,
-                    quantity_used=quantity,
-                    quantity_issued=quantity,
-                    unit_cost=unit_cost,
-                    total_cost=quantity * unit_cost,
-                    issued_at=datetime.utcnow(),
-                    consumed_at=datetime.utcnow(),
-                    usage_reason="work_order_consumption"
-                )
-                self.db.add(part_usage)
-        
-        self.db.commit()
-        
-        # Check for low stock alerts
-        self._check_low_stock_alerts(inventory_item)
+            movement_type="issue",
+            quantity=quantity,
+            work_order_id=work_order_id,
+            reference_type=reference_type,
+            reference_id=reference_id,
+            notes=notes
+        )], user_id=user_id)
         
         logger.info(f"Stock issued: {quantity} units of item {inventory_item_id}")
-        return movement, part_usage
+        return result.movements[0], result.part_usages[0]
     
     def adjust_stock(
         self,
@@ -233,7 +208,7 @@ class InventoryService:
         reason: str,
         notes: Optional[str] = None,
         user_id: Optional[int] = None
-    ) -> StockMovement:
+    ) -> Optional[StockMovement]:
         """
         Leltári korrekció - Stock adjustment with double-entry bookkeeping
         
@@ -244,63 +219,19 @@ class InventoryService:
             notes: Megjegyzések
             user_id: Végrehajtó felhasználó
         """
-        
-        inventory_item = self.db.query(InventoryItem).get(inventory_item_id)
-        if not inventory_item:
-            raise ValueError(f"Inventory item {inventory_item_id} not found")
-        
-        current_quantity = inventory_item.quantity_on_hand
-        adjustment_quantity = new_quantity - current_quantity
-        
-        if adjustment_quantity == 0:
-            logger.info(f"No adjustment needed for item {inventory_item_id}")
-            return None
-        
-        # Determine debit/credit based on adjustment direction
-        debit_qty = adjustment_quantity if adjustment_quantity > 0 else Decimal('0')
-        credit_qty = abs(adjustment_quantity) if adjustment_quantity < 0 else Decimal('0')
-        
-        # Create stock movement
-        movement = StockMovement(
-            movement_number=self.generate_movement_number(),
-            movement_type="adjustment",
-            warehouse_id=inventory_item.warehouse_id,
+        result = self.post_movements([StockPosting(
             inventory_item_id=inventory_item_id,
-            part_id=inventory_item.part_id,
-            debit_quantity=debit_qty,
-            credit_quantity=credit_qty,
-            quantity=adjustment_quantity,  # Legacy compatibility
-            unit_cost=inventory_item.average_cost,
-            total_cost=abs(adjustment_quantity) * inventory_item.average_cost if inventory_item.average_cost else None,
-            quantity_before=current_quantity,
-            quantity_after=new_quantity,
+            movement_type="adjustment",
+            quantity=new_quantity,
             movement_reason=reason,
-            notes=notes,
-            processed_by_user_id=user_id,
-            movement_date=datetime.utcnow(),
-            status='completed',
-            org_id=inventory_item.org_id  # Required field
-        )
+            notes=notes
+        )], user_id=user_id)
         
-        self.db.add(movement)
-        
-        # Update inventory levels
-        inventory_item.quantity_on_hand = new_quantity
-        inventory_item.quantity_available = inventory_item.quantity_on_hand - inventory_item.quantity_reserved
-        inventory_item.last_counted_date = datetime.utcnow()
-        
-        if inventory_item.average_cost:
-            inventory_item.total_value = inventory_item.quantity_on_hand * inventory_item.average_cost
-        
-        self.db.commit()
-        
-        # Check alerts
-        if adjustment_quantity < 0:
-            self._check_low_stock_alerts(inventory_item)
+        movement = result.movements[0]
+        if movement is None:
+            logger.info(f"No adjustment needed for item {inventory_item_id}")
         else:
-            self._check_and_resolve_alerts(inventory_item)
-        
-        logger.info(f"Stock adjusted: {adjustment_quantity} units for item {inventory_item_id}")
+            logger.info(f"Stock adjusted: {movement.quantity} units for item {inventory_item_id}")
         return movement
     
     def _check_low_stock_alerts(self, inventory_item: InventoryItem):
@@ -431,13 +362,81 @@ class InventoryService:
         
         return report
     
-    def get_stock_movement_report(
+    def _movement_report_query(
         self,
         start_date: datetime,
         end_date: datetime,
         warehouse_id: Optional[int] = None,
         part_id: Optional[int] = None,
         movement_type: Optional[str] = None
+    ):
+        """Column query of the movement report, newest first (movement_date, id)"""
+        query = select(
+            StockMovement.id,
+            StockMovement.movement_number,
+            StockMovement.movement_date,
+            StockMovement.movement_type,
+            Warehouse.code.label('warehouse_code'),
+            Part.part_number,
+            Part.name.label('part_name'),
+            StockMovement.debit_quantity,
+            StockMovement.credit_quantity,
+            StockMovement.unit_cost,
+            StockMovement.total_cost,
+            StockMovement.quantity_before,
+            StockMovement.quantity_after,
+            StockMovement.reference_type,
+            StockMovement.reference_id,
+            StockMovement.notes
+        ).join(Warehouse, Warehouse.id == StockMovement.warehouse_id)\
+            .outerjoin(Part, Part.id == StockMovement.part_id)\
+            .where(
+                StockMovement.movement_date >= start_date,
+                StockMovement.movement_date <= end_date
+            )
+        
+        if warehouse_id:
+            query = query.where(StockMovement.warehouse_id == warehouse_id)
+        
+        if part_id:
+            query = query.where(StockMovement.part_id == part_id)
+        
+        if movement_type:
+            query = query.where(StockMovement.movement_type == movement_type)
+        
+        return query.order_by(StockMovement.movement_date.desc(), StockMovement.id.desc())
+    
+    @staticmethod
+    def _movement_report_row(row) -> Dict[str, Any]:
+        return {
+            'id': row.id,
+            'movement_number': row.movement_number,
+            'movement_date': row.movement_date,
+            'movement_type': row.movement_type,
+            'warehouse_code': row.warehouse_code,
+            'part_code': row.part_number or 'Unknown',
+            'part_name': row.part_name or 'Unknown',
+            'debit_quantity': float(row.debit_quantity),
+            'credit_quantity': float(row.credit_quantity),
+            'net_quantity': float(row.debit_quantity - row.credit_quantity),
+            'unit_cost': float(row.unit_cost) if row.unit_cost else None,
+            'total_cost': float(row.total_cost) if row.total_cost else None,
+            'quantity_before': float(row.quantity_before),
+            'quantity_after': float(row.quantity_after),
+            'reference_type': row.reference_type,
+            'reference_id': row.reference_id,
+            'notes': row.notes
+        }
+    
+    def get_stock_movement_report(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        warehouse_id: Optional[int] = None,
+        part_id: Optional[int] = None,
+        movement_type: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Generate stock movement report - Készletmozgás riport
@@ -448,65 +447,108 @@ class InventoryService:
             warehouse_id: Szűrés raktárra
             part_id: Szűrés alkatrészre
             movement_type: Szűrés mozgástípusra
+            limit: Oldalméret (keyset lapozás)
+            cursor: Az előző oldal next_movement_cursor() értéke
+            
+        Raises:
+            ValueError: Hibás cursor
         """
+        query = self._movement_report_query(start_date, end_date, warehouse_id, part_id, movement_type)
+        if cursor:
+            query = query.where(movement_keyset_condition(cursor))
+        if limit:
+            query = query.limit(limit)
         
-        query = self.db.query(StockMovement)\
-            .join(InventoryItem)\
-            .join(Part)\
-            .join(Warehouse)\
-            .filter(
-                StockMovement.movement_date >= start_date,
-                StockMovement.movement_date <= end_date
-            )
-        
-        if warehouse_id:
-            query = query.filter(StockMovement.warehouse_id == warehouse_id)
-        
-        if part_id:
-            query = query.filter(StockMovement.part_id == part_id)
-        
-        if movement_type:
-            query = query.filter(StockMovement.movement_type == movement_type)
-        
-        movements = query.order_by(StockMovement.movement_date.desc()).all()
+        return [self._movement_report_row(row) for row in self.db.execute(query)]
+    
+    @staticmethod
+    def next_movement_cursor(report: List[Dict[str, Any]], limit: Optional[int]) -> Optional[str]:
+        """Cursor of the page after ``report``, or None on the last page"""
+        if not limit or len(report) < limit:
+            return None
+        return encode_movement_cursor(report[-1]['movement_date'], report[-1]['id'])
+    
+    def iter_stock_movement_report_csv(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        warehouse_id: Optional[int] = None,
+        part_id: Optional[int] = None,
+        movement_type: Optional[str] = None
+    ) -> Iterator[bytes]:
+        """
+        Készletmozgás riport CSV export folyamatosan
+        Stream the movement report as CSV chunks
         
-        report = []
-        for movement in movements:
-            report.append({
-                'movement_number': movement.movement_number,
-                'movement_date': movement.movement_date,
-                'movement_type': movement.movement_type,
-                'warehouse_code': movement.warehouse.code,
-                'part_code': movement.part.part_number if movement.part else 'Unknown',
-                'part_name': movement.part.name if movement.part else 'Unknown',
-                'debit_quantity': float(movement.debit_quantity),
-                'credit_quantity': float(movement.credit_quantity),
-                'net_quantity': float(movement.debit_quantity - movement.credit_quantity),
-                'unit_cost': float(movement.unit_cost) if movement.unit_cost else None,
-                'total_cost': float(movement.total_cost) if movement.total_cost else None,
-                'quantity_before': float(movement.quantity_before),
-                'quantity_after': float(movement.quantity_after),
-                'reference_type': movement.reference_type,
-                'reference_id': movement.reference_id,
-                'notes': movement.notes
-            })
+        Rows are read through a server-side cursor and encoded every
+        MOVEMENT_EXPORT_CHUNK_ROWS rows, so memory use does not depend on the
+        size of the period.
+        """
+        query = self._movement_report_query(start_date, end_date, warehouse_id, part_id, movement_type)\
+            .execution_options(yield_per=MOVEMENT_EXPORT_CHUNK_ROWS)
+        
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        buffer.write('\ufeff')  # BOM for Excel compatibility
+        writer.writerow(MOVEMENT_REPORT_COLUMNS)
+        
+        for partition in self.db.execute(query).partitions():
+            for row in partition:
+                values = self._movement_report_row(row)
+                writer.writerow([
+                    values[column].isoformat() if isinstance(values[column], datetime) else values[column]
+                    for column in MOVEMENT_REPORT_COLUMNS
+                ])
+            chunk = buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            if chunk:
+                yield chunk
+        
+        tail = buffer.getvalue().encode('utf-8')
+        if tail:
+            yield tail
+    
+    def get_stock_balance_as_of(
+        self,
+        as_of: datetime,
+        warehouse_id: Optional[int] = None,
+        part_id: Optional[int] = None,
+        include_zero_stock: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Készletegyenleg adott időpontban - Stock balance at a point in time
         
-        return report
+        Computed from the latest ledger snapshot before ``as_of`` plus the
+        movements after it.
+        """
+        balances = StockLedgerService(self.db).balances_as_of(as_of, warehouse_id=warehouse_id, part_id=part_id)
+        
+        return [
+            {
+                'inventory_item_id': balance['inventory_item_id'],
+                'warehouse_id': balance['warehouse_id'],
+                'part_id': balance['part_id'],
+                'quantity_on_hand': float(balance['quantity']),
+                'total_value': float(balance['value']),
+                'as_of': as_of
+            }
+            for item_id, balance in sorted(balances.items())
+            if include_zero_stock or balance['quantity'] != 0
+        ]
     
     def validate_double_entry_balance(self) -> Dict[str, Any]:
         """
         Validate double-entry bookkeeping balance
         Kettős könyvelés egyenleg ellenőrzése
-        """
         
-        # Calculate totals from stock movements
-        total_debits = self.db.query(func.sum(StockMovement.debit_quantity))\
-            .filter(StockMovement.is_cancelled == False)\
-            .scalar() or Decimal('0')
+        Ledger totals come from the latest snapshots plus the movements after
+        them (see StockLedgerService).
+        """
         
-        total_credits = self.db.query(func.sum(StockMovement.credit_quantity))\
-            .filter(StockMovement.is_cancelled == False)\
-            .scalar() or Decimal('0')
+        totals = StockLedgerService(self.db).ledger_totals()
+        total_debits = totals['total_debits']
+        total_credits = totals['total_credits']
         
         # Calculate current stock levels
         total_stock = self.db.query(func.sum(InventoryItem.quantity_on_hand)).scalar() or Decimal('0')
@@ -522,59 +564,143 @@ class InventoryService:
             'actual_stock': float(total_stock),
             'variance': float(variance),
             'is_balanced': abs(variance) < Decimal('0.01'),  # Allow for rounding differences
+            'snapshot_period_end': totals['snapshot_period_end'],
+            'movements_scanned': totals['movements_scanned'],
             'validation_date': datetime.utcnow()
         }
     
-    def check_minimum_stock_alerts(self) -> List[Dict[str, Any]]:
+    def _alert_item_columns(self):
+        """Item, warehouse and part columns shared by the alert queries"""
+        return (
+            InventoryItem.id.label('inventory_item_id'),
+            Warehouse.code.label('warehouse_code'),
+            Warehouse.name.label('warehouse_name'),
+            InventoryItem.part_id,
+            Part.part_number.label('part_code'),
+            Part.name.label('part_name'),
+            InventoryItem.last_received_date,
+            InventoryItem.last_issued_date,
+        )
+    
+    def _alert_query(self, *columns, org_id: Optional[int] = None, warehouse_id: Optional[int] = None):
+        query = select(*columns)\
+            .select_from(InventoryItem)\
+            .join(Part, Part.id == InventoryItem.part_id)\
+            .join(Warehouse, Warehouse.id == InventoryItem.warehouse_id)\
+            .where(InventoryItem.is_active == True)
+        
+        if org_id:
+            query = query.where(InventoryItem.org_id == org_id)
+        
+        if warehouse_id:
+            query = query.where(InventoryItem.warehouse_id == warehouse_id)
+        
+        return query
+    
+    @staticmethod
+    def _below_minimum_condition():
+        """Matches the predicate of the idx_inventory_below_minimum partial index"""
+        return and_(
+            InventoryItem.minimum_stock > 0,
+            InventoryItem.quantity_available <= InventoryItem.minimum_stock
+        )
+    
+    @staticmethod
+    def _alert_level_expressions():
+        """SQL alert level and its sort rank: CRITICAL (0), HIGH (1), MEDIUM (2)"""
+        available = InventoryItem.quantity_available
+        half_minimum = InventoryItem.minimum_stock * Decimal('0.5')
+        level = case((available <= 0, 'CRITICAL'), (available <= half_minimum, 'HIGH'), else_='MEDIUM')
+        rank = case((available <= 0, 0), (available <= half_minimum, 1), else_=2)
+        return level, rank
+    
+    @staticmethod
+    def _last_movement_expression():
+        """The later of last_received_date / last_issued_date (NULL if neither)"""
+        received = InventoryItem.last_received_date
+        issued = InventoryItem.last_issued_date
+        return case(
+            (received.is_(None), issued),
+            (issued.is_(None), received),
+            (received > issued, received),
+            else_=issued
+        )
+    
+    def check_minimum_stock_alerts(
+        self,
+        org_id: Optional[int] = None,
+        warehouse_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
         """
         Minimumkészlet riasztások ellenőrzése
         Check for items below minimum stock levels
+        
+        Level, shortage and suggested order quantity are computed in the
+        query, which is sorted (level, shortage % desc) and paginated in SQL;
+        only items matching the idx_inventory_below_minimum partial index
+        are read.
+        
+        Args:
+            org_id: Szűrés szervezetre
+            warehouse_id: Szűrés raktárra
+            limit: Oldalméret (None = összes)
+            offset: Kihagyott sorok száma
         """
         
-        low_stock_items = self.db.query(InventoryItem)\
-            .join(Part)\
-            .join(Warehouse)\
-            .filter(
-                InventoryItem.is_active == True,
-                InventoryItem.minimum_stock > 0,
-                InventoryItem.quantity_available <= InventoryItem.minimum_stock
-            ).all()
+        minimum = InventoryItem.minimum_stock
+        available = InventoryItem.quantity_available
+        shortage = minimum - available
+        shortage_percentage = shortage * 100 / minimum
+        level, rank = self._alert_level_expressions()
+        target_shortage = minimum * Decimal('1.5') - available
+        suggested = case(
+            (and_(InventoryItem.reorder_quantity.isnot(None), InventoryItem.reorder_quantity != 0),
+             InventoryItem.reorder_quantity),
+            (target_shortage > minimum, target_shortage),
+            else_=minimum
+        )
+        
+        query = self._alert_query(
+            *self._alert_item_columns(),
+            available.label('current_stock'),
+            minimum.label('minimum_stock'),
+            shortage.label('shortage'),
+            shortage_percentage.label('shortage_percentage'),
+            level.label('alert_level'),
+            InventoryItem.reorder_quantity,
+            suggested.label('suggested_order_quantity'),
+            org_id=org_id,
+            warehouse_id=warehouse_id
+        ).where(self._below_minimum_condition())\
+            .order_by(rank, shortage_percentage.desc(), InventoryItem.id)\
+            .offset(offset)
+        
+        if limit:
+            query = query.limit(limit)
         
         alerts = []
-        for item in low_stock_items:
-            # Calculate shortage and urgency
-            shortage = item.minimum_stock - item.quantity_available
-            shortage_percentage = (shortage / item.minimum_stock) * 100 if item.minimum_stock > 0 else 0
-            
-            # Determine alert level
-            if item.quantity_available <= 0:
-                alert_level = "CRITICAL"
-            elif item.quantity_available <= (item.minimum_stock * Decimal('0.5')):
-                alert_level = "HIGH"
-            else:
-                alert_level = "MEDIUM"
-            
-            alert = {
-                'inventory_item_id': item.id,
-                'warehouse_code': item.warehouse.code,
-                'warehouse_name': item.warehouse.name,
-                'part_id': item.part_id,
-                'part_code': item.part.part_number,
-                'part_name': item.part.name,
-                'current_stock': float(item.quantity_available),
-                'minimum_stock': float(item.minimum_stock),
-                'shortage': float(shortage),
-                'shortage_percentage': float(shortage_percentage),
-                'alert_level': alert_level,
-                'reorder_quantity': float(item.reorder_quantity) if item.reorder_quantity else None,
-                'last_movement_date': item.last_issued_date or item.last_received_date,
-                'days_since_last_movement': self._calculate_days_since_movement(item),
-                'suggested_order_quantity': self._calculate_suggested_order_quantity(item)
-            }
-            
-            alerts.append(alert)
+        for row in self.db.execute(query):
+            alerts.append({
+                'inventory_item_id': row.inventory_item_id,
+                'warehouse_code': row.warehouse_code,
+                'warehouse_name': row.warehouse_name,
+                'part_id': row.part_id,
+                'part_code': row.part_code,
+                'part_name': row.part_name,
+                'current_stock': float(row.current_stock),
+                'minimum_stock': float(row.minimum_stock),
+                'shortage': float(row.shortage),
+                'shortage_percentage': float(row.shortage_percentage),
+                'alert_level': row.alert_level,
+                'reorder_quantity': float(row.reorder_quantity) if row.reorder_quantity else None,
+                'last_movement_date': row.last_issued_date or row.last_received_date,
+                'days_since_last_movement': self._calculate_days_since_movement(row),
+                'suggested_order_quantity': float(row.suggested_order_quantity)
+            })
         
-        return sorted(alerts, key=lambda x: (x['alert_level'], -x['shortage_percentage']))
+        return alerts
     
     def _calculate_days_since_movement(self, item: InventoryItem) -> Optional[int]:
         """Calculate days since last stock movement"""
@@ -586,90 +712,156 @@ class InventoryService:
             return (datetime.utcnow() - last_movement).days
         return None
     
-    def _calculate_suggested_order_quantity(self, item: InventoryItem) -> float:
-        """Calculate suggested order quantity based on reorder rules"""
-        if item.reorder_quantity:
-            return float(item.reorder_quantity)
-        
-        # Default to bringing stock to 150% of minimum
-        target_stock = item.minimum_stock * Decimal('1.5')
-        suggested = target_stock - item.quantity_available
+    def get_overstock_alerts(
+        self,
+        org_id: Optional[int] = None,
+        warehouse_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Túlkészlet riasztások - items at or above maximum stock, largest excess first
+        """
+        excess = InventoryItem.quantity_on_hand - InventoryItem.maximum_stock
+        excess_percentage = excess * 100 / InventoryItem.maximum_stock
+        
+        query = self._alert_query(
+            *self._alert_item_columns(),
+            InventoryItem.quantity_on_hand.label('current_stock'),
+            InventoryItem.maximum_stock,
+            excess.label('excess_quantity'),
+            excess_percentage.label('excess_percentage'),
+            InventoryItem.total_value,
+            org_id=org_id,
+            warehouse_id=warehouse_id
+        ).where(
+            InventoryItem.maximum_stock > 0,
+            InventoryItem.quantity_on_hand >= InventoryItem.maximum_stock
+        ).order_by(excess_percentage.desc(), InventoryItem.id).offset(offset)
+        
+        if limit:
+            query = query.limit(limit)
+        
+        return [
+            {
+                'inventory_item_id': row.inventory_item_id,
+                'warehouse_code': row.warehouse_code,
+                'part_code': row.part_code,
+                'part_name': row.part_name,
+                'current_stock': float(row.current_stock),
+                'maximum_stock': float(row.maximum_stock),
+                'excess_quantity': float(row.excess_quantity),
+                'excess_percentage': float(row.excess_percentage),
+                'total_value': float(row.total_value) if row.total_value else 0
+            }
+            for row in self.db.execute(query)
+        ]
+    
+    def get_slow_moving_alerts(
+        self,
+        org_id: Optional[int] = None,
+        warehouse_id: Optional[int] = None,
+        days: int = 90,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Lassan mozgó készlet - stocked items not issued for ``days`` days, longest idle first
+        """
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        last_movement = self._last_movement_expression()
+        
+        query = self._alert_query(
+            *self._alert_item_columns(),
+            InventoryItem.quantity_on_hand.label('current_stock'),
+            InventoryItem.total_value,
+            org_id=org_id,
+            warehouse_id=warehouse_id
+        ).where(
+            InventoryItem.quantity_on_hand > 0,
+            or_(
+                InventoryItem.last_issued_date < cutoff_date,
+                InventoryItem.last_issued_date.is_(None)
+            )
+        ).order_by(
+            case((last_movement.is_(None), 0), else_=1),  # never moved first
+            last_movement,
+            InventoryItem.id
+        ).offset(offset)
+        
+        if limit:
+            query = query.limit(limit)
+        
+        return [
+            {
+                'inventory_item_id': row.inventory_item_id,
+                'warehouse_code': row.warehouse_code,
+                'part_code': row.part_code,
+                'part_name': row.part_name,
+                'current_stock': float(row.current_stock),
+                'days_since_movement': self._calculate_days_since_movement(row) or 999,
+                'total_value': float(row.total_value) if row.total_value else 0
+            }
+            for row in self.db.execute(query)
+        ]
+    
+    def _alert_summary(self, org_id: Optional[int] = None, warehouse_id: Optional[int] = None) -> Dict[str, int]:
+        """Alert counts: low stock per level from the partial index, overstock / slow-moving in one pass"""
+        level, _ = self._alert_level_expressions()
+        low = self.db.execute(
+            self._alert_query(level.label('alert_level'), func.count(), org_id=org_id, warehouse_id=warehouse_id)
+            .where(self._below_minimum_condition())
+            .group_by(level)
+        ).all()
+        levels = {alert_level: count for alert_level, count in low}
+        
+        cutoff_date = datetime.utcnow() - timedelta(days=90)
+        overstock, slow_moving = self.db.execute(
+            self._alert_query(
+                func.sum(case((and_(
+                    InventoryItem.maximum_stock > 0,
+                    InventoryItem.quantity_on_hand >= InventoryItem.maximum_stock
+                ), 1), else_=0)),
+                func.sum(case((and_(
+                    InventoryItem.quantity_on_hand > 0,
+                    or_(InventoryItem.last_issued_date < cutoff_date, InventoryItem.last_issued_date.is_(None))
+                ), 1), else_=0)),
+                org_id=org_id,
+                warehouse_id=warehouse_id
+            )
+        ).one()
         
-        return max(float(suggested), float(item.minimum_stock))
+        minimum_total = sum(levels.values())
+        return {
+            'total_alerts': minimum_total + (overstock or 0) + (slow_moving or 0),
+            'minimum_stock_alerts': minimum_total,
+            'critical_alerts': levels.get('CRITICAL', 0),
+            'high_alerts': levels.get('HIGH', 0),
+            'medium_alerts': levels.get('MEDIUM', 0),
+            'overstock_items': overstock or 0,
+            'slow_moving_items': slow_moving or 0
+        }
     
-    def generate_stock_alerts(self) -> Dict[str, Any]:
+    def generate_stock_alerts(
+        self,
+        org_id: Optional[int] = None,
+        warehouse_id: Optional[int] = None,
+        limit: Optional[int] = 100,
+        offset: int = 0
+    ) -> Dict[str, Any]:
         """
         Generate comprehensive stock alerts
         Átfogó készletriasztások generálása
-        """
-        
-        # Get minimum stock alerts
-        minimum_stock_alerts = self.check_minimum_stock_alerts()
-        
-        # Get overstock items
-        overstock_items = self.db.query(InventoryItem)\
-            .join(Part)\
-            .join(Warehouse)\
-            .filter(
-                InventoryItem.is_active == True,
-                InventoryItem.maximum_stock.isnot(None),
-                InventoryItem.quantity_on_hand >= InventoryItem.maximum_stock
-            ).all()
-        
-        overstock_alerts = []
-        for item in overstock_items:
-            excess = item.quantity_on_hand - item.maximum_stock
-            overstock_alerts.append({
-                'inventory_item_id': item.id,
-                'warehouse_code': item.warehouse.code,
-                'part_code': item.part.part_number,
-                'part_name': item.part.name,
-                'current_stock': float(item.quantity_on_hand),
-                'maximum_stock': float(item.maximum_stock),
-                'excess_quantity': float(excess),
-                'excess_percentage': float((excess / item.maximum_stock) * 100),
-                'total_value': float(item.total_value) if item.total_value else 0
-            })
         
-        # Get items without movement for long periods (slow-moving)
-        cutoff_date = datetime.utcnow() - timedelta(days=90)  # 90 days
-        slow_moving_items = self.db.query(InventoryItem)\
-            .join(Part)\
-            .join(Warehouse)\
-            .filter(
-                InventoryItem.is_active == True,
-                InventoryItem.quantity_on_hand > 0,
-                or_(
-                    InventoryItem.last_issued_date < cutoff_date,
-                    InventoryItem.last_issued_date.is_(None)
-                )
-            ).all()
-        
-        slow_moving_alerts = []
-        for item in slow_moving_items:
-            days_since_movement = self._calculate_days_since_movement(item) or 999
-            slow_moving_alerts.append({
-                'inventory_item_id': item.id,
-                'warehouse_code': item.warehouse.code,
-                'part_code': item.part.part_number,
-                'part_name': item.part.name,
-                'current_stock': float(item.quantity_on_hand),
-                'days_since_movement': days_since_movement,
-                'total_value': float(item.total_value) if item.total_value else 0
-            })
+        Each list is one sorted page (``limit`` / ``offset``); the summary
+        counts every alert.
+        """
         
         return {
-            'minimum_stock_alerts': minimum_stock_alerts,
-            'overstock_alerts': sorted(overstock_alerts, key=lambda x: -x['excess_percentage']),
-            'slow_moving_alerts': sorted(slow_moving_alerts, key=lambda x: -x['days_since_movement']),
-            'summary': {
-                'total_alerts': len(minimum_stock_alerts) + len(overstock_alerts) + len(slow_moving_alerts),
-                'critical_alerts': len([a for a in minimum_stock_alerts if a['alert_level'] == 'CRITICAL']),
-                'high_alerts': len([a for a in minimum_stock_alerts if a['alert_level'] == 'HIGH']),
-                'medium_alerts': len([a for a in minimum_stock_alerts if a['alert_level'] == 'MEDIUM']),
-                'overstock_items': len(overstock_alerts),
-                'slow_moving_items': len(slow_moving_alerts)
-            },
+            'minimum_stock_alerts': self.check_minimum_stock_alerts(org_id, warehouse_id, limit, offset),
+            'overstock_alerts': self.get_overstock_alerts(org_id, warehouse_id, limit, offset),
+            'slow_moving_alerts': self.get_slow_moving_alerts(org_id, warehouse_id, limit=limit, offset=offset),
+            'summary': self._alert_summary(org_id, warehouse_id),
             'generated_at': datetime.utcnow()
         }
 
@@ -687,11 +879,3 @@ class InventoryService:
             inventory_item.stock_status = 'overstock'
         else:
             inventory_item.stock_status = 'normal'
-
-    def _check_and_resolve_alerts(self, inventory_item: InventoryItem) -> None:
-        """
-        Check if any alerts should be resolved based on current stock levels
-        """
-        # This is a placeholder for alert resolution logic
-        # In a full implementation, this would update alert status
-        pass
\ No newline at end of file
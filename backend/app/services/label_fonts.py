@@ -0,0 +1,36 @@
+"""
+Címke betűtípusok
+Embedded TrueType fonts for vector labels
+
+The PDF base-14 fonts (Helvetica) only cover WinAnsi, so Hungarian ő / ű
+would print as blank boxes. Vector labels therefore use a TrueType font
+(DejaVu Sans by default, LABEL_FONT_PATH / LABEL_FONT_BOLD_PATH) that
+ReportLab embeds as a subset. If the font files are missing, labels fall
+back to Helvetica with a warning.
+"""
+from functools import lru_cache
+from typing import Tuple
+
+import structlog
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont, TTFError
+
+from app.core.config import settings
+
+logger = structlog.get_logger(__name__)
+
+LABEL_FONT = 'LabelSans'
+LABEL_FONT_BOLD = 'LabelSans-Bold'
+
+
+@lru_cache(maxsize=1)
+def label_fonts() -> Tuple[str, str]:
+    """(regular, bold) font names for label text, registered on first use."""
+    try:
+        pdfmetrics.registerFont(TTFont(LABEL_FONT, settings.LABEL_FONT_PATH))
+        pdfmetrics.registerFont(TTFont(LABEL_FONT_BOLD, settings.LABEL_FONT_BOLD_PATH))
+    except (OSError, TTFError) as e:
+        logger.warning("Label font unavailable, falling back to Helvetica (no ő / ű)",
+                       path=settings.LABEL_FONT_PATH, error=str(e))
+        return 'Helvetica', 'Helvetica-Bold'
+    return LABEL_FONT, LABEL_FONT_BOLD
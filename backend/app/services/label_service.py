@@ -6,6 +6,8 @@ import base64
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from PIL import Image, ImageDraw, ImageFont
+from reportlab.lib import colors
+from reportlab.pdfgen import canvas
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 import secrets
@@ -15,6 +17,9 @@ import structlog
 from app.core.config import get_settings
 from app.models.organization import Gate
 from app.core.security import create_field_token, verify_field_token
+from app.core.gate_token_cache import gate_token_cache, register_gate_token_hooks
+from app.services.label_fonts import label_fonts
+from app.services.qr_vector import draw_qr, zpl_qr, zpl_text
 
 logger = structlog.get_logger(__name__)
 settings = get_settings()
@@ -26,7 +31,13 @@ class LabelService:
     def __init__(self, db: Session):
         self.db = db
     
-    def generate_field_token(self, gate_id: int, org_id: int, expires_hours: int = 24) -> str:
+    def generate_field_token(
+        self,
+        gate_id: int,
+        org_id: int,
+        expires_hours: int = 24,
+        token_version: Optional[int] = None
+    ) -> str:
         """
         Generate a signed field token for mobile access.
         
@@ -34,14 +45,21 @@ class LabelService:
             gate_id: Gate ID
             org_id: Organization ID
             expires_hours: Token expiration in hours
+            token_version: Gate token version the token is bound to
+                (looked up if not given)
             
         Returns:
             Signed JWT token for field access
         """
         try:
+            if token_version is None:
+                state = gate_token_cache.get_state(self.db, gate_id)
+                token_version = state.token_version if state else 1
+            
             payload = {
                 "gate_id": gate_id,
                 "org_id": org_id,
+                "tv": token_version,  # Rotating the gate revokes the token
                 "type": "field_access",
                 "iat": datetime.utcnow(),
                 "exp": datetime.utcnow() + timedelta(hours=expires_hours),
@@ -99,15 +117,20 @@ class LabelService:
             if not gate_id or not org_id:
                 raise HTTPException(status_code=401, detail="Invalid token payload")
             
-            gate = self.db.query(Gate).filter(
-                Gate.id == gate_id,
-                Gate.org_id == org_id,
-                Gate.is_active == True
-            ).first()
+            # Revocation state comes from the gate token cache, not the DB
+            state = gate_token_cache.get_state(self.db, gate_id)
             
-            if not gate:
+            if not state or state.org_id != org_id or not state.is_active:
                 raise HTTPException(status_code=404, detail="Gate not found or inactive")
             
+            token_version = payload.get("tv")
+            if token_version is None:
+                # Tokens issued before versioning carry no "tv": valid until the gate's next rotation
+                if state.rotated_at is not None and payload.get("iat", 0) < state.rotated_at:
+                    raise HTTPException(status_code=401, detail="Token revoked")
+            elif token_version != state.token_version:
+                raise HTTPException(status_code=401, detail="Token revoked")
+            
             logger.info(
                 "Field token verified",
                 gate_id=gate_id,
@@ -117,6 +140,8 @@ class LabelService:
             
             return payload
             
+        except HTTPException:
+            raise
         except jwt.ExpiredSignatureError:
             raise HTTPException(status_code=401, detail="Token expired")
         except jwt.InvalidTokenError as e:
@@ -126,6 +151,25 @@ class LabelService:
             logger.error("Token verification failed", error=str(e))
             raise HTTPException(status_code=500, detail="Token verification failed")
     
+    def generate_field_url(self, gate: Gate, expires_hours: int = 24 * 7) -> str:
+        """
+        Generate the field access URL encoded in QR codes.
+        
+        Args:
+            gate: Gate the URL grants access to
+            expires_hours: Token expiration in hours
+            
+        Returns:
+            Field access URL with a fresh token
+        """
+        token = self.generate_field_token(gate.id, gate.org_id, expires_hours, gate.token_version)
+        return self._field_url(token)
+    
+    @staticmethod
+    def _field_url(token: str) -> str:
+        base_url = settings.FRONTEND_URL or "https://garagereg.example.com"
+        return f"{base_url}/field/{token}"
+    
     def generate_qr_code(
         self, 
         gate_id: int, 
@@ -155,12 +199,8 @@ class LabelService:
             if not gate:
                 raise HTTPException(status_code=404, detail="Gate not found")
             
-            # Generate field token
-            token = self.generate_field_token(gate_id, org_id, expires_hours)
-            
             # Create QR code URL
-            base_url = settings.FRONTEND_URL or "https://garagereg.example.com"
-            qr_url = f"{base_url}/field/{token}"
+            qr_url = self.generate_field_url(gate, expires_hours)
             
             # Generate QR code
             qr = qrcode.QRCode(
@@ -317,6 +357,113 @@ class LabelService:
             logger.error("Label generation failed", error=str(e))
             raise HTTPException(status_code=500, detail="Label generation failed")
     
+    def generate_label_pdf(
+        self,
+        gate_id: int,
+        org_id: int,
+        label_type: str = "standard",
+        width: int = 400,
+        height: int = 300
+    ) -> bytes:
+        """
+        Generate the label as a one-page vector PDF.
+        
+        Same layout as generate_label_image, with width and height in points.
+        The QR code is drawn as vector modules, so the label stays sharp at
+        any printer resolution.
+        
+        Args:
+            gate_id: Gate ID
+            org_id: Organization ID
+            label_type: Label type (standard, compact, zebra, brother)
+            width: Label width in points
+            height: Label height in points
+            
+        Returns:
+            PDF document as bytes
+        """
+        try:
+            gate = self.db.query(Gate).filter(
+                Gate.id == gate_id,
+                Gate.org_id == org_id
+            ).first()
+            
+            if not gate:
+                raise HTTPException(status_code=404, detail="Gate not found")
+            
+            pdf_buffer = io.BytesIO()
+            pdf = canvas.Canvas(pdf_buffer, pagesize=(width, height))
+            pdf.setTitle(f"{gate.name} label")
+            
+            # Embedded TrueType font - Helvetica cannot draw ő / ű
+            regular, bold = label_fonts()
+            
+            def draw_text(x: float, top: float, text: str, font: str, size: int, color) -> None:
+                # Positions are measured from the top like in the PNG label
+                pdf.setFillColor(color)
+                pdf.setFont(font, size)
+                pdf.drawString(x, height - top - size * 0.8, text)
+            
+            # QR code on the left, drawn as vector modules
+            qr_size = min(width // 3, height - 40)
+            qr_x = 10
+            qr_y = (height - qr_size) // 2
+            draw_qr(pdf, self.generate_field_url(gate), qr_x, height - qr_y - qr_size, qr_size, colors.black)
+            
+            text_x = qr_x + qr_size + 20
+            text_y = 20
+            
+            draw_text(text_x, text_y, gate.name, bold, 20, colors.black)
+            text_y += 30
+            
+            if gate.gate_code:
+                draw_text(text_x, text_y, f"Code: {gate.gate_code}", regular, 14, colors.black)
+                text_y += 25
+            
+            draw_text(text_x, text_y, f"Type: {gate.gate_type.title()}", regular, 14, colors.black)
+            text_y += 25
+            
+            if gate.manufacturer:
+                manufacturer_text = gate.manufacturer
+                if gate.model:
+                    manufacturer_text += f" {gate.model}"
+                draw_text(text_x, text_y, manufacturer_text, regular, 14, colors.black)
+                text_y += 25
+            
+            if gate.serial_number:
+                draw_text(text_x, text_y, f"S/N: {gate.serial_number}", regular, 10, colors.black)
+                text_y += 20
+            
+            if gate.installation_date:
+                install_date = gate.installation_date.strftime("%Y-%m-%d")
+                draw_text(text_x, text_y, f"Installed: {install_date}", regular, 10, colors.black)
+                text_y += 20
+            
+            footer_y = height - 30
+            draw_text(10, footer_y, "GarageReg - Gate Management System", regular, 10, colors.grey)
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+            draw_text(width - 120, footer_y, f"Generated: {timestamp}", regular, 10, colors.grey)
+            
+            pdf.showPage()
+            pdf.save()
+            
+            logger.info(
+                "Generated label PDF",
+                gate_id=gate_id,
+                org_id=org_id,
+                label_type=label_type,
+                width=width,
+                height=height
+            )
+            
+            return pdf_buffer.getvalue()
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error("Label PDF generation failed", error=str(e))
+            raise HTTPException(status_code=500, detail="Label generation failed")
+    
     def generate_nfc_data(self, gate_id: int, org_id: int, expires_hours: int = 24 * 30) -> Dict[str, str]:
         """
         Generate NFC tag data for gate access.
@@ -340,11 +487,8 @@ class LabelService:
                 raise HTTPException(status_code=404, detail="Gate not found")
             
             # Generate long-lived token for NFC
-            token = self.generate_field_token(gate_id, org_id, expires_hours)
-            
-            # Create NFC URL
-            base_url = settings.FRONTEND_URL or "https://garagereg.example.com"
-            nfc_url = f"{base_url}/field/{token}"
+            token = self.generate_field_token(gate_id, org_id, expires_hours, gate.token_version)
+            nfc_url = self._field_url(token)
             
             nfc_data = {
                 "url": nfc_url,
@@ -401,8 +545,8 @@ class LabelService:
             self.db.commit()
             
             # Generate new tokens
-            qr_token = self.generate_field_token(gate_id, org_id, expires_hours=24 * 7)  # 1 week
-            nfc_token = self.generate_field_token(gate_id, org_id, expires_hours=24 * 30)  # 30 days
+            qr_token = self.generate_field_token(gate_id, org_id, expires_hours=24 * 7, token_version=gate.token_version)  # 1 week
+            nfc_token = self.generate_field_token(gate_id, org_id, expires_hours=24 * 30, token_version=gate.token_version)  # 30 days
             
             result = {
                 "gate_id": gate_id,
@@ -428,23 +572,28 @@ class LabelService:
             raise HTTPException(status_code=500, detail="Token rotation failed")
 
 
-def create_zebra_zpl_template(gate_name: str, gate_code: str, qr_data: str) -> str:
+def create_zebra_zpl_template(gate_name: str, gate_code: str, qr_url: str) -> str:
     """
     Create Zebra ZPL template for label printing.
     
+    The QR code is sent as a native ^BQ barcode field, so the printer encodes
+    and prints it at its own resolution. Text is sent as UTF-8 (^CI28) with
+    ZPL control characters escaped.
+    
     Args:
         gate_name: Gate name
         gate_code: Gate code
-        qr_data: QR code data (base64 encoded)
+        qr_url: Field access URL encoded in the QR code
         
     Returns:
         ZPL template string
     """
     zpl_template = f"""^XA
+^CI28
 ^LH0,0
-^FO50,50^GFA,1024,1024,16,{qr_data}^FS
-^FO200,50^A0N,28,28^FD{gate_name}^FS
-^FO200,90^A0N,20,20^FDCode: {gate_code}^FS
+{zpl_qr(qr_url, 50, 50, magnification=4)}
+^FO200,50^A0N,28,28^FH_^FD{zpl_text(gate_name)}^FS
+^FO200,90^A0N,20,20^FH_^FDCode: {zpl_text(gate_code)}^FS
 ^FO200,120^A0N,16,16^FDGarageReg System^FS
 ^FO50,200^A0N,12,12^FDGenerated: {datetime.now().strftime('%Y-%m-%d %H:%M')}^FS
 ^XZ"""
@@ -483,4 +632,8 @@ POSITION=5,10
 TEXT=GarageReg System
 """
     
-    return template
\ No newline at end of file
+    return template
+
+
+# Keep cached gate token state in step with rotations and deactivations
+register_gate_token_hooks()
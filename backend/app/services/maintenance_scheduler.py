@@ -4,16 +4,21 @@ import uuid
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from dateutil.rrule import rrulestr
 import structlog
 
 from app.models.maintenance_advanced import AdvancedMaintenancePlan, ScheduledMaintenanceJob, MaintenanceCalendar, MaintenanceNotification
-from app.models.organization import Gate
+from app.models.organization import Building, Gate
 from app.core.celery_app import celery_app, maintenance_task
 
 logger = structlog.get_logger(__name__)
 
+# Rows per multi-row INSERT when generating jobs
+JOB_INSERT_BATCH_SIZE = 1000
+
 
 class MaintenanceSchedulerService:
     """Service for generating and managing scheduled maintenance jobs."""
@@ -77,7 +82,7 @@ class MaintenanceSchedulerService:
         logger.info("Generating jobs for plan", plan_id=plan_id, plan_name=plan.name)
         
         # Get applicable gates
-        gates = self._get_applicable_gates(plan)
+        gate_ids = self._get_applicable_gate_ids(plan)
         
         # Generate occurrences for the next period
         end_date = datetime.utcnow() + timedelta(days=days_ahead)
@@ -85,53 +90,102 @@ class MaintenanceSchedulerService:
         
         jobs_created = 0
         
-        for occurrence in occurrences:
-            for gate in gates:
-                # Check if job already exists for this occurrence and gate
-                occurrence_id = self._generate_occurrence_id(plan.id, gate.id, occurrence)
-                
-                existing_job = self.db.query(ScheduledMaintenanceJob).filter(
-                    and_(
-                        ScheduledMaintenanceJob.plan_id == plan_id,
-                        ScheduledMaintenanceJob.gate_id == gate.id,
-                        ScheduledMaintenanceJob.plan_occurrence_id == occurrence_id
-                    )
-                ).first()
-                
-                if existing_job:
-                    continue  # Job already exists
-                
-                # Create new job
-                job = self._create_maintenance_job(plan, gate, occurrence, occurrence_id)
-                self.db.add(job)
-                jobs_created += 1
+        if gate_ids and occurrences:
+            # Existing occurrence IDs of the window in one query
+            existing_ids = set(self.db.scalars(
+                select(ScheduledMaintenanceJob.plan_occurrence_id).where(
+                    ScheduledMaintenanceJob.plan_id == plan.id,
+                    ScheduledMaintenanceJob.scheduled_date >= min(occurrences),
+                    ScheduledMaintenanceJob.scheduled_date <= max(occurrences)
+                )
+            ))
+            
+            rows = []
+            for occurrence in occurrences:
+                for gate_id in gate_ids:
+                    occurrence_id = self._generate_occurrence_id(plan.id, gate_id, occurrence)
+                    if occurrence_id not in existing_ids:
+                        rows.append(self._build_job_row(plan, gate_id, occurrence, occurrence_id))
+            
+            jobs_created = self._insert_jobs(rows)
         
         self.db.commit()
         
         logger.info("Jobs generated for plan", 
                    plan_id=plan_id, 
                    jobs_created=jobs_created,
-                   gates_count=len(gates),
+                   gates_count=len(gate_ids),
                    occurrences_count=len(occurrences))
         
         return {
             "jobs_created": jobs_created,
-            "gates_processed": len(gates),
+            "gates_processed": len(gate_ids),
             "occurrences_generated": len(occurrences)
         }
     
-    def _get_applicable_gates(self, plan: AdvancedMaintenancePlan) -> List[Gate]:
-        """Get all gates that this maintenance plan applies to."""
-        query = self.db.query(Gate).filter(Gate.org_id == plan.org_id)
-        
-        gates = query.all()
-        applicable_gates = []
+    def _get_applicable_gate_ids(self, plan: AdvancedMaintenancePlan) -> List[int]:
+        """Get the IDs of the gates this maintenance plan applies to."""
+        return list(self.db.scalars(
+            select(Gate.id).where(*self._gate_applicability_filters(plan)).order_by(Gate.id)
+        ))
+    
+    def _gate_applicability_filters(self, plan: AdvancedMaintenancePlan) -> List[Any]:
+        """SQL equivalent of AdvancedMaintenancePlan.is_applicable_to_gate."""
+        filters = [Gate.org_id == plan.org_id]
+        
+        if plan.applies_to_gate_types:
+            filters.append(Gate.gate_type.in_(plan.applies_to_gate_types))
+        
+        # Gates without manufacturer / model information are not excluded
+        if plan.applies_to_manufacturers:
+            filters.append(or_(
+                Gate.manufacturer.is_(None),
+                Gate.manufacturer == "",
+                Gate.manufacturer.in_(plan.applies_to_manufacturers)
+            ))
+        
+        if plan.applies_to_models:
+            filters.append(or_(
+                Gate.model.is_(None),
+                Gate.model == "",
+                Gate.model.in_(plan.applies_to_models)
+            ))
+        
+        # Location IDs may name the gate's building or its site
+        if plan.applies_to_locations:
+            filters.append(Gate.building_id.in_(
+                select(Building.id).where(or_(
+                    Building.id.in_(plan.applies_to_locations),
+                    Building.site_id.in_(plan.applies_to_locations)
+                ))
+            ))
+        
+        return filters
+    
+    def _insert_jobs(self, rows: List[Dict[str, Any]]) -> int:
+        """Bulk insert job rows, skipping occurrences created concurrently."""
+        if not rows:
+            return 0
+        
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql_insert(ScheduledMaintenanceJob).on_conflict_do_nothing(
+                index_elements=["plan_id", "plan_occurrence_id"]
+            )
+        elif dialect == "sqlite":
+            stmt = sqlite_insert(ScheduledMaintenanceJob).on_conflict_do_nothing(
+                index_elements=["plan_id", "plan_occurrence_id"]
+            )
+        else:
+            stmt = insert(ScheduledMaintenanceJob)
         
-        for gate in gates:
-            if plan.is_applicable_to_gate(gate):
-                applicable_gates.append(gate)
+        # Skipped conflicts return no row: count what was actually inserted
+        stmt = stmt.returning(ScheduledMaintenanceJob.id)
+        inserted = 0
+        for start in range(0, len(rows), JOB_INSERT_BATCH_SIZE):
+            inserted += len(self.db.execute(stmt, rows[start:start + JOB_INSERT_BATCH_SIZE]).all())
         
-        return applicable_gates
+        return inserted
     
     def _get_plan_occurrences(self, plan: AdvancedMaintenancePlan, end_date: datetime) -> List[datetime]:
         """Get scheduled occurrences for a plan using RRULE."""
@@ -173,14 +227,14 @@ class MaintenanceSchedulerService:
         timestamp = occurrence.strftime("%Y%m%d-%H%M%S")
         return f"{plan_id}-{gate_id}-{timestamp}"
     
-    def _create_maintenance_job(
-        self, 
-        plan: AdvancedMaintenancePlan, 
-        gate: Gate, 
+    def _build_job_row(
+        self,
+        plan: AdvancedMaintenancePlan,
+        gate_id: int,
         scheduled_date: datetime,
         occurrence_id: str
-    ) -> ScheduledMaintenanceJob:
-        """Create a new scheduled maintenance job."""
+    ) -> Dict[str, Any]:
+        """Column values for a new scheduled maintenance job."""
         
         # Calculate due date (scheduled date + buffer)
         due_date = scheduled_date + timedelta(days=plan.deadline_buffer_days or 3)
@@ -190,19 +244,17 @@ class MaintenanceSchedulerService:
         if plan.auto_assign and plan.default_assignee_id:
             assignee_id = plan.default_assignee_id
         
-        job = ScheduledMaintenanceJob(
-            org_id=plan.org_id,
-            plan_id=plan.id,
-            plan_occurrence_id=occurrence_id,
-            gate_id=gate.id,
-            scheduled_date=scheduled_date,
-            due_date=due_date,
-            assigned_to_id=assignee_id,
-            assigned_at=datetime.utcnow() if assignee_id else None,
-            status="scheduled"
-        )
-        
-        return job
+        return {
+            "org_id": plan.org_id,
+            "plan_id": plan.id,
+            "plan_occurrence_id": occurrence_id,
+            "gate_id": gate_id,
+            "scheduled_date": scheduled_date,
+            "due_date": due_date,
+            "assigned_to_id": assignee_id,
+            "assigned_at": datetime.utcnow() if assignee_id else None,
+            "status": "scheduled"
+        }
     
     def check_overdue_jobs(self, org_id: Optional[int] = None) -> Dict[str, Any]:
         """Check for overdue jobs and update their status."""
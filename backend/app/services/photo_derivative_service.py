@@ -0,0 +1,209 @@
+"""
+Inspection photo derivatives
+Ellenőrzési fotók előnézeti képei
+
+After an upload is confirmed a media task streams the original from S3 and
+writes downscaled WebP and JPEG renditions next to it:
+
+    inspections/12/photos/20251009_101500_ab12cd34_door.jpg
+    inspections/12/photos/20251009_101500_ab12cd34_door.thumb.webp
+    inspections/12/photos/20251009_101500_ab12cd34_door.thumb.jpg
+    ...
+
+The derivative keys are recorded in ``InspectionPhoto.derivatives`` so photo
+listings can hand out size-appropriate URLs. Derivatives never carry EXIF;
+the GPS position is kept on the photo record instead.
+"""
+
+import io
+import math
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from PIL import Image, ImageOps
+from sqlalchemy.orm import Session
+
+from app.core.celery_app import media_task
+from app.core.config import settings
+from app.models.inspections import InspectionPhoto
+from app.services.s3_photo_service import S3PhotoService, get_s3_photo_service
+
+logger = structlog.get_logger(__name__)
+
+# Longest edge in pixels, largest first so each size is scaled from the previous
+DERIVATIVE_SIZES: Tuple[Tuple[str, int], ...] = (
+    ('large', 1600),
+    ('medium', 800),
+    ('thumb', 256),
+)
+
+DERIVATIVE_FORMATS: Dict[str, Dict[str, Any]] = {
+    'webp': {'format': 'WEBP', 'extension': 'webp', 'content_type': 'image/webp',
+             'options': {'quality': 80, 'method': 4}},
+    'jpeg': {'format': 'JPEG', 'extension': 'jpg', 'content_type': 'image/jpeg',
+             'options': {'quality': 82, 'optimize': True, 'progressive': True}},
+}
+
+# Originals larger than this are spooled to disk while downloading
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
+# Derivatives are immutable: a re-upload gets a new original key
+DERIVATIVE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+_GPS_IFD = 0x8825
+
+
+def derivative_key(s3_key: str, size: str, extension: str) -> str:
+    """Object key of a derivative stored next to the original."""
+    root, _ = os.path.splitext(s3_key)
+    return f"{root}.{size}.{extension}"
+
+
+def derivative_keys(photo: InspectionPhoto) -> List[str]:
+    """All derivative object keys recorded for a photo."""
+    keys = []
+    for rendition in (photo.derivatives or {}).values():
+        keys.extend(rendition[fmt] for fmt in DERIVATIVE_FORMATS if rendition.get(fmt))
+    return keys
+
+
+class PhotoDerivativeService:
+    """Service for generating thumbnail renditions of inspection photos."""
+
+    def __init__(self, db: Session, s3_service: Optional[S3PhotoService] = None):
+        self.db = db
+        self.s3_service = s3_service or get_s3_photo_service()
+
+    def generate_for_photo(self, photo_id: int) -> Dict[str, Any]:
+        """
+        Generate and store derivatives for one photo
+        Előnézeti képek létrehozása egy fotóhoz
+        """
+        photo = self.db.query(InspectionPhoto).filter(InspectionPhoto.id == photo_id).first()
+        if not photo or photo.upload_status != 'completed':
+            return {"photo_id": photo_id, "skipped": "not_uploaded"}
+        if not self.s3_service.s3_client:
+            return {"photo_id": photo_id, "skipped": "local_storage"}
+
+        with self._download_original(photo.s3_key) as original:
+            image = Image.open(original)
+            gps = _exif_gps(image)
+            original_size = image.size
+
+            # Let the JPEG decoder scale down by up to 1/8 while decoding
+            largest = DERIVATIVE_SIZES[0][1]
+            image.draft('RGB', (largest, largest))
+            image = ImageOps.exif_transpose(image)
+            # A CMYK or grey profile does not describe the RGB output
+            icc_profile = image.info.get('icc_profile') if image.mode == 'RGB' else None
+            image = _to_rgb(image)
+
+            derivatives = {}
+            for size, max_edge in DERIVATIVE_SIZES:
+                image.thumbnail((max_edge, max_edge), Image.LANCZOS, reducing_gap=3.0)
+                rendition = {'width': image.width, 'height': image.height}
+                for fmt, spec in DERIVATIVE_FORMATS.items():
+                    key = derivative_key(photo.s3_key, size, spec['extension'])
+                    self._upload(key, _encode(image, spec, icc_profile), spec['content_type'])
+                    rendition[fmt] = key
+                derivatives[size] = rendition
+
+        photo.derivatives = derivatives
+        if photo.width_pixels is None or photo.height_pixels is None:
+            photo.width_pixels, photo.height_pixels = original_size
+        if gps and photo.gps_latitude is None and photo.gps_longitude is None:
+            photo.gps_latitude, photo.gps_longitude = gps
+        self.db.commit()
+
+        logger.info("Generated photo derivatives", photo_id=photo_id, sizes=list(derivatives))
+        return {"photo_id": photo_id, "derivatives": derivatives}
+
+    def _download_original(self, s3_key: str) -> tempfile.SpooledTemporaryFile:
+        """Stream the original into memory, spilling large files to disk."""
+        response = self.s3_service.s3_client.get_object(
+            Bucket=self.s3_service.bucket_name,
+            Key=s3_key
+        )
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        for chunk in response['Body'].iter_chunks(DOWNLOAD_CHUNK_BYTES):
+            spool.write(chunk)
+        spool.seek(0)
+        return spool
+
+    def _upload(self, key: str, body: bytes, content_type: str) -> None:
+        self.s3_service.s3_client.put_object(
+            Bucket=self.s3_service.bucket_name,
+            Key=key,
+            Body=body,
+            ContentType=content_type,
+            CacheControl=DERIVATIVE_CACHE_CONTROL
+        )
+
+
+def _to_rgb(image: Image.Image) -> Image.Image:
+    """Flatten transparency onto white; JPEG has no alpha channel."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
+
+
+def _encode(image: Image.Image, spec: Dict[str, Any], icc_profile: Optional[bytes]) -> bytes:
+    """Encode without EXIF; only the colour profile is carried over."""
+    buffer = io.BytesIO()
+    options = dict(spec['options'])
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    image.save(buffer, format=spec['format'], **options)
+    return buffer.getvalue()
+
+
+def _exif_gps(image: Image.Image) -> Optional[Tuple[float, float]]:
+    """GPS position from the original's EXIF, if present."""
+    try:
+        gps = image.getexif().get_ifd(_GPS_IFD)
+    except Exception:
+        return None
+    if not gps or 2 not in gps or 4 not in gps:
+        return None
+
+    def degrees(value, ref: str) -> float:
+        d, m, s = (float(part) for part in value)
+        result = d + m / 60 + s / 3600
+        if not math.isfinite(result):
+            raise ValueError("invalid GPS rational")
+        return -result if ref in ('S', 'W') else result
+
+    try:
+        return degrees(gps[2], gps.get(1, 'N')), degrees(gps[4], gps.get(3, 'E'))
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+
+
+@media_task(name="media.generate_photo_derivatives")
+def generate_photo_derivatives(self, photo_id: int):
+    """Celery task to generate thumbnails for an uploaded inspection photo."""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return PhotoDerivativeService(db).generate_for_photo(photo_id)
+    finally:
+        db.close()
+
+
+def schedule_photo_derivatives(photo_id: int) -> None:
+    """Queue derivative generation; a broker outage must not fail the upload."""
+    if not settings.PHOTO_DERIVATIVES_ENABLED:
+        return
+    try:
+        generate_photo_derivatives.delay(photo_id)
+    except Exception as e:
+        logger.warning("Failed to queue photo derivatives", photo_id=photo_id, error=str(e))
@@ -0,0 +1,605 @@
+"""
+QR címkék párhuzamos, gyorsítótárazott renderelése
+Parallel, cached QR label rendering for bulk label PDFs
+
+By default labels are drawn straight onto the PDF canvas: text as PDF text
+and the QR code as a vector path (see app.services.qr_vector), so no image is
+rasterized, PNG-encoded and re-embedded per gate.
+
+The raster path (LABEL_VECTOR_QR=False) renders label images in a process pool
+and writes them to an on-disk cache keyed by a hash of the label fields (gate
+data + QR URL), so re-printing a site only renders gates whose data or token
+changed. The PDF is assembled page by page while the pool keeps rendering; the
+generation date is drawn onto the page as text so cached images stay valid
+across days.
+"""
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+import qrcode
+import redis
+import structlog
+from botocore.exceptions import ClientError
+from qrcode.image.styledpil import StyledPilImage
+from qrcode.image.styles.moduledrawers import RoundedModuleDrawer
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle
+
+from app.core.celery_app import media_task
+from app.core.config import settings
+from app.services.label_fonts import label_fonts
+from app.services.qr_vector import draw_qr
+from app.services.s3_photo_service import get_shared_s3_client
+
+logger = structlog.get_logger(__name__)
+
+# Címke mérete (70x30mm @ 300dpi)
+LABEL_WIDTH_PX = int(70 * 300 / 25.4)  # ~827px
+LABEL_HEIGHT_PX = int(30 * 300 / 25.4)  # ~354px
+LABEL_WIDTH = 70 * mm
+LABEL_HEIGHT = 30 * mm
+LABEL_ROW_GAP = 4 * mm
+
+QR_FRONT_COLOR = (0, 100, 200)
+QR_BACK_COLOR = (255, 255, 255)
+
+# Raster pixel (300 dpi) -> PDF point, so both paths share one layout
+PX = 72 / 300
+
+# Bump when the label layout changes so cached images are re-rendered
+LABEL_RENDER_VERSION = 1
+
+# Below this many labels the process pool costs more than it saves
+PARALLEL_MIN_LABELS = 24
+POOL_CHUNK_SIZE = 8
+
+INFO_ROWS_PER_PAGE = 40
+
+
+# =============================================================================
+# CÍMKE RAJZOLÁS - LABEL DRAWING
+# =============================================================================
+
+def make_qr_image(data: str, size: int = 200) -> Image.Image:
+    """QR kód kép generálása"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    # Fekete-fehér QR, majd színezés: azonos eredmény, mint a SolidFillColorMask,
+    # de az nem pixelenként Pythonban fut (~80x gyorsabb)
+    img = qr.make_image(
+        image_factory=StyledPilImage,
+        module_drawer=RoundedModuleDrawer()
+    ).get_image()
+    img = ImageOps.colorize(img.convert('L'), black=QR_FRONT_COLOR, white=QR_BACK_COLOR)
+
+    # Méretezés
+    return img.resize((size, size), Image.Resampling.LANCZOS)
+
+
+def render_label_image(fields: Dict[str, Any], qr_size: int = 150, include_date: bool = True) -> Image.Image:
+    """
+    Egyetlen címke kép létrehozása a címke mezőkből
+    Render one label from plain label fields (see QRLabelService.label_fields)
+    """
+    img = Image.new('RGB', (LABEL_WIDTH_PX, LABEL_HEIGHT_PX), 'white')
+    draw = ImageDraw.Draw(img)
+
+    try:
+        # Betűtípusok
+        title_font = ImageFont.truetype("arial.ttf", 28)
+        text_font = ImageFont.truetype("arial.ttf", 18)
+        small_font = ImageFont.truetype("arial.ttf", 14)
+    except OSError:
+        # Fallback alapértelmezett betűtípusokra
+        title_font = ImageFont.load_default()
+        text_font = ImageFont.load_default()
+        small_font = ImageFont.load_default()
+
+    # QR kód elhelyezése jobb oldalon
+    qr_img = make_qr_image(fields['qr_url'], qr_size)
+    qr_x = LABEL_WIDTH_PX - qr_size - 20
+    qr_y = (LABEL_HEIGHT_PX - qr_size) // 2
+    img.paste(qr_img, (qr_x, qr_y))
+
+    # Szöveges információk bal oldalon
+    text_x = 20
+    y_pos = 30
+
+    gate_name = fields['name']
+    if len(gate_name) > 20:
+        gate_name = gate_name[:20] + "..."
+    draw.text((text_x, y_pos), gate_name, fill='black', font=title_font)
+    y_pos += 40
+
+    if fields.get('gate_code'):
+        draw.text((text_x, y_pos), f"Kód: {fields['gate_code']}", fill='black', font=text_font)
+        y_pos += 25
+
+    draw.text((text_x, y_pos), f"Típus: {fields['gate_type']}", fill='black', font=text_font)
+    y_pos += 25
+
+    mfg_model = fields.get('manufacturer_model')
+    if mfg_model:
+        if len(mfg_model) > 25:
+            mfg_model = mfg_model[:25] + "..."
+        draw.text((text_x, y_pos), mfg_model, fill='black', font=text_font)
+        y_pos += 25
+
+    building_info = fields.get('location')
+    if building_info:
+        if len(building_info) > 30:
+            building_info = building_info[:30] + "..."
+        draw.text((text_x, y_pos), building_info, fill='grey', font=small_font)
+        y_pos += 20
+
+    # Factory QR jelölés, ha van
+    if fields.get('factory_qr_token'):
+        draw.text((text_x, LABEL_HEIGHT_PX - 40), f"Gyári QR: {fields['factory_qr_token'][:8]}...",
+                  fill='blue', font=small_font)
+
+    # Generálás dátuma (bulk PDF-ben a lapra rajzolva)
+    if include_date:
+        gen_date = datetime.now().strftime('%Y.%m.%d')
+        draw.text((text_x, LABEL_HEIGHT_PX - 20), f"Generálva: {gen_date}",
+                  fill='grey', font=small_font)
+
+    return img
+
+
+def draw_label(
+    pdf: canvas.Canvas,
+    fields: Dict[str, Any],
+    x: float,
+    y: float,
+    scale: float = 1.0,
+    qr_size: int = 150
+) -> None:
+    """
+    Címke rajzolása közvetlenül a PDF vászonra
+    Draw one label as vector graphics with its lower-left corner at (x, y)
+
+    Same layout as render_label_image; the generation date is drawn by the caller.
+    """
+    unit = PX * scale
+    regular, bold = label_fonts()
+
+    def text(px_x: float, px_top: float, value: str, font: str, px_size: int, color) -> None:
+        # PIL positions the top of the text, ReportLab the baseline
+        pdf.setFillColor(color)
+        pdf.setFont(font, px_size * unit)
+        pdf.drawString(x + px_x * unit, y + (LABEL_HEIGHT_PX - px_top - px_size * 0.8) * unit, value)
+
+    # QR kód jobb oldalon
+    qr_x = LABEL_WIDTH_PX - qr_size - 20
+    qr_y = (LABEL_HEIGHT_PX - qr_size) // 2
+    draw_qr(
+        pdf,
+        fields['qr_url'],
+        x + qr_x * unit,
+        y + (LABEL_HEIGHT_PX - qr_y - qr_size) * unit,
+        qr_size * unit,
+        colors.Color(*(channel / 255 for channel in QR_FRONT_COLOR))
+    )
+
+    # Szöveges információk bal oldalon
+    text_x = 20
+    y_pos = 30
+
+    gate_name = fields['name']
+    if len(gate_name) > 20:
+        gate_name = gate_name[:20] + "..."
+    text(text_x, y_pos, gate_name, bold, 28, colors.black)
+    y_pos += 40
+
+    if fields.get('gate_code'):
+        text(text_x, y_pos, f"Kód: {fields['gate_code']}", regular, 18, colors.black)
+        y_pos += 25
+
+    text(text_x, y_pos, f"Típus: {fields['gate_type']}", regular, 18, colors.black)
+    y_pos += 25
+
+    mfg_model = fields.get('manufacturer_model')
+    if mfg_model:
+        if len(mfg_model) > 25:
+            mfg_model = mfg_model[:25] + "..."
+        text(text_x, y_pos, mfg_model, regular, 18, colors.black)
+        y_pos += 25
+
+    building_info = fields.get('location')
+    if building_info:
+        if len(building_info) > 30:
+            building_info = building_info[:30] + "..."
+        text(text_x, y_pos, building_info, regular, 14, colors.grey)
+
+    if fields.get('factory_qr_token'):
+        text(text_x, LABEL_HEIGHT_PX - 40, f"Gyári QR: {fields['factory_qr_token'][:8]}...",
+             regular, 14, colors.blue)
+
+
+# =============================================================================
+# GYORSÍTÓTÁR - CACHE
+# =============================================================================
+
+def label_cache_key(fields: Dict[str, Any], qr_size: int) -> str:
+    """Hash of everything that ends up in a cached label image."""
+    payload = json.dumps(
+        {'fields': fields, 'qr_size': qr_size, 'version': LABEL_RENDER_VERSION},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _render_to_cache(job: Tuple[Dict[str, Any], int, str]) -> Tuple[str, bool]:
+    """Pool worker: render one label PNG unless cached; returns (path, cache hit)."""
+    fields, qr_size, cache_dir = job
+    key = label_cache_key(fields, qr_size)
+    path = os.path.join(cache_dir, key[:2], f"{key}.png")
+
+    if os.path.exists(path):
+        # Keep recently used entries out of the age-based pruning
+        os.utime(path)
+        return path, True
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial_path = f"{path}.{os.getpid()}.partial"
+    render_label_image(fields, qr_size, include_date=False).save(partial_path, format='PNG', optimize=False)
+    os.replace(partial_path, path)
+    return path, False
+
+
+def prune_label_files(directory: str, max_age_seconds: float) -> int:
+    """Delete cached labels / job PDFs not used within ``max_age_seconds``."""
+    if not os.path.isdir(directory):
+        return 0
+
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                continue
+    return removed
+
+
+# =============================================================================
+# PDF ÖSSZEÁLLÍTÁS - PDF ASSEMBLY
+# =============================================================================
+
+class BulkLabelRenderer:
+    """Tömeges címke PDF renderelő: vektoros, vagy process pool-lal és lemez gyorsítótárral"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        qr_size: int = 150,
+        vector: Optional[bool] = None
+    ):
+        self.workers = workers if workers is not None else (settings.LABEL_RENDER_WORKERS or os.cpu_count() or 1)
+        self.cache_dir = cache_dir or settings.LABEL_CACHE_DIR
+        self.qr_size = qr_size
+        self.vector = settings.LABEL_VECTOR_QR if vector is None else vector
+
+    def render_pdf(
+        self,
+        labels: List[Dict[str, Any]],
+        output: BinaryIO,
+        labels_per_row: int = 3,
+        labels_per_page: int = 9,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Tömeges címke PDF írása
+        Write the bulk label PDF for ``labels`` (label field dicts) to ``output``
+
+        Returns:
+            Render statistics (labels, pages, cache hits)
+        """
+        total = len(labels)
+        rows_per_page = max(1, math.ceil(labels_per_page / labels_per_row))
+        per_page = rows_per_page * labels_per_row
+
+        pdf = canvas.Canvas(output, pagesize=A4)
+        pdf.setTitle(f"QR Címkék - {total} kapu")
+        page_width, page_height = A4
+
+        # Címkék méretezése, ha nem férnek el a lapon
+        scale = min(
+            1.0,
+            page_width / (labels_per_row * LABEL_WIDTH),
+            (page_height - 30 * mm) / (rows_per_page * (LABEL_HEIGHT + LABEL_ROW_GAP))
+        )
+        label_width = LABEL_WIDTH * scale
+        label_height = LABEL_HEIGHT * scale
+        row_pitch = (LABEL_HEIGHT + LABEL_ROW_GAP) * scale
+        left = (page_width - labels_per_row * label_width) / 2
+        top = page_height - 20 * mm
+        gen_date = datetime.now().strftime('%Y.%m.%d')
+
+        stats = {'labels': total, 'pages': 0, 'cache_hits': 0}
+        page_count = max(1, math.ceil(total / per_page))
+
+        rendered = ((fields, None) for fields in labels) if self.vector else self._render_labels(labels)
+        for index, (item, cached) in enumerate(rendered):
+            slot = index % per_page
+            if slot == 0:
+                if index:
+                    pdf.showPage()
+                self._draw_page_header(pdf, total, index // per_page + 1, page_count)
+                stats['pages'] += 1
+
+            row, column = divmod(slot, labels_per_row)
+            x = left + column * label_width
+            y = top - row * row_pitch - label_height
+            if self.vector:
+                draw_label(pdf, item, x, y, scale, self.qr_size)
+            else:
+                pdf.drawImage(item, x, y, width=label_width, height=label_height)
+            pdf.setStrokeColor(colors.grey)
+            pdf.setLineWidth(0.5)
+            pdf.rect(x, y, label_width, label_height)
+
+            # Generálás dátuma a képen kívül, hogy a gyorsítótár napokon át érvényes maradjon
+            pdf.setFillColor(colors.grey)
+            pdf.setFont(label_fonts()[0], 4 * scale)
+            pdf.drawString(x + 1.7 * mm * scale, y + 0.8 * mm * scale, f"Generálva: {gen_date}")
+
+            stats['cache_hits'] += int(bool(cached))
+            if progress:
+                progress(index + 1, total)
+
+        if total:
+            pdf.showPage()
+        self._draw_info_pages(pdf, labels)
+        pdf.save()
+
+        stats['pages'] += math.ceil(total / INFO_ROWS_PER_PAGE) if total else 0
+        logger.info("Rendered bulk label PDF", **stats)
+        return stats
+
+    def _render_labels(self, labels: List[Dict[str, Any]]) -> Iterator[Tuple[str, bool]]:
+        """Label image paths in input order, rendered in parallel when worthwhile."""
+        jobs = [(fields, self.qr_size, self.cache_dir) for fields in labels]
+
+        # Daemonic processes (e.g. Celery prefork workers) may not have children
+        if self.workers > 1 and len(jobs) >= PARALLEL_MIN_LABELS and not multiprocessing.current_process().daemon:
+            executor = None
+            try:
+                executor = ProcessPoolExecutor(max_workers=self.workers)
+                # map() submits every job up front, so spawn failures surface here
+                results = executor.map(_render_to_cache, jobs, chunksize=POOL_CHUNK_SIZE)
+            except (OSError, AssertionError) as e:
+                logger.warning("Label render pool unavailable, rendering serially", error=str(e))
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+            else:
+                with executor:
+                    yield from results
+                return
+
+        for job in jobs:
+            yield _render_to_cache(job)
+
+    def _draw_page_header(self, pdf: canvas.Canvas, total: int, page: int, page_count: int) -> None:
+        page_width, page_height = A4
+        pdf.setFillColor(colors.black)
+        pdf.setFont('Helvetica-Bold', 12)
+        pdf.drawCentredString(page_width / 2, page_height - 12 * mm, f"QR Címkék - {total} kapu")
+        pdf.setFont('Helvetica', 8)
+        pdf.drawRightString(page_width - 10 * mm, page_height - 12 * mm, f"{page} / {page_count}")
+
+    def _draw_info_pages(self, pdf: canvas.Canvas, labels: List[Dict[str, Any]]) -> None:
+        """Információs táblázat a végén, laponként darabolva"""
+        page_width, page_height = A4
+        regular, bold = label_fonts()
+
+        for start in range(0, len(labels), INFO_ROWS_PER_PAGE):
+            info_data = [['Kapu név', 'Kód', 'Típus', 'QR URL']]
+            for fields in labels[start:start + INFO_ROWS_PER_PAGE]:
+                qr_url = fields['qr_url']
+                short_url = qr_url if len(qr_url) <= 40 else qr_url[:37] + "..."
+                info_data.append([fields['name'], fields.get('gate_code') or '-', fields['gate_type'], short_url])
+
+            info_table = Table(info_data, colWidths=[50*mm, 30*mm, 30*mm, 70*mm])
+            info_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, 0), bold),
+                ('FONTNAME', (0, 1), (-1, -1), regular),
+                ('FONTSIZE', (0, 0), (-1, 0), 10),
+                ('FONTSIZE', (0, 1), (-1, -1), 8),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]))
+
+            pdf.setFillColor(colors.black)
+            pdf.setFont('Helvetica-Bold', 12)
+            pdf.drawString(15 * mm, page_height - 15 * mm, "Címke információk")
+            _, table_height = info_table.wrapOn(pdf, page_width - 30 * mm, page_height - 40 * mm)
+            info_table.drawOn(pdf, 15 * mm, page_height - 22 * mm - table_height)
+            pdf.showPage()
+
+
+# =============================================================================
+# HÁTTÉRFELADAT - BACKGROUND JOB
+# =============================================================================
+
+# The API process records the owner and serves the PDF, a media worker renders
+# it: both live in shared storage, never on either host's local disk
+LABEL_JOB_OWNER_KEY = "label_job:{job_id}:owner"
+PDF_CHUNK_SIZE = 64 * 1024
+
+_job_redis: Optional[redis.Redis] = None
+
+
+def _label_job_redis() -> redis.Redis:
+    """Shared Redis client for bulk label job owner records."""
+    global _job_redis
+    if _job_redis is None:
+        _job_redis = redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=1,
+            socket_timeout=1
+        )
+    return _job_redis
+
+
+def label_job_pdf_key(job_id: str) -> str:
+    """S3 key of the PDF of a bulk label job."""
+    return f"{settings.LABEL_JOB_S3_PREFIX}{job_id}.pdf"
+
+
+def record_label_job_owner(job_id: str, org_id: Optional[int]) -> None:
+    """Remember which organization started a bulk label job (expires with the job)."""
+    _label_job_redis().setex(
+        LABEL_JOB_OWNER_KEY.format(job_id=job_id),
+        settings.LABEL_JOB_RETENTION_HOURS * 3600,
+        json.dumps({'org_id': org_id})
+    )
+
+
+def label_job_owner(job_id: str) -> Optional[Dict[str, Any]]:
+    """Owner record of a bulk label job, or None for unknown (or expired) jobs."""
+    value = _label_job_redis().get(LABEL_JOB_OWNER_KEY.format(job_id=job_id))
+    try:
+        return json.loads(value) if value else None
+    except ValueError:
+        return None
+
+
+def store_label_job_pdf(job_id: str, path: str) -> None:
+    """
+    Move a rendered job PDF into shared storage.
+
+    Without S3 credentials (development) the PDF stays in LABEL_JOB_DIR, which
+    then has to be shared between the API and the media workers.
+    """
+    s3_client, bucket = get_shared_s3_client()
+    if s3_client is None:
+        os.replace(path, os.path.join(settings.LABEL_JOB_DIR, f"{job_id}.pdf"))
+        return
+
+    s3_client.upload_file(path, bucket, label_job_pdf_key(job_id), ExtraArgs={'ContentType': 'application/pdf'})
+    os.remove(path)
+
+
+def open_label_job_pdf(job_id: str) -> Optional[Iterator[bytes]]:
+    """Chunks of a finished job PDF, or None if it is not (or no longer) stored."""
+    s3_client, bucket = get_shared_s3_client()
+    if s3_client is None:
+        try:
+            pdf_file = open(os.path.join(settings.LABEL_JOB_DIR, f"{job_id}.pdf"), 'rb')
+        except OSError:
+            return None
+        return _read_chunks(pdf_file)
+
+    try:
+        body = s3_client.get_object(Bucket=bucket, Key=label_job_pdf_key(job_id))['Body']
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+            return None
+        raise
+    return body.iter_chunks(PDF_CHUNK_SIZE)
+
+
+def _read_chunks(pdf_file: BinaryIO) -> Iterator[bytes]:
+    with pdf_file:
+        while True:
+            chunk = pdf_file.read(PDF_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def prune_label_job_pdfs(max_age_seconds: float) -> int:
+    """Delete job PDFs older than ``max_age_seconds`` from shared storage."""
+    s3_client, bucket = get_shared_s3_client()
+    if s3_client is None:
+        return prune_label_files(settings.LABEL_JOB_DIR, max_age_seconds)
+
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=settings.LABEL_JOB_S3_PREFIX):
+        expired = [
+            {'Key': item['Key']} for item in page.get('Contents', [])
+            if item['LastModified'].timestamp() < cutoff
+        ]
+        if expired:
+            s3_client.delete_objects(Bucket=bucket, Delete={'Objects': expired, 'Quiet': True})
+            removed += len(expired)
+    return removed
+
+
+@media_task(name="media.render_bulk_labels_pdf")
+def render_bulk_labels_pdf(
+    self,
+    gate_ids: List[int],
+    labels_per_row: int = 3,
+    labels_per_page: int = 9,
+    org_id: Optional[int] = None
+):
+    """Celery task rendering a bulk label PDF with progress reporting."""
+    from app.database import SessionLocal
+    from app.services.qr_labels import QRLabelService
+
+    if not settings.LABEL_VECTOR_QR:
+        prune_label_files(settings.LABEL_CACHE_DIR, settings.LABEL_CACHE_MAX_AGE_DAYS * 86400)
+    # Owner records expire in Redis; the PDFs are pruned here, where they are written
+    prune_label_job_pdfs(settings.LABEL_JOB_RETENTION_HOURS * 3600)
+
+    db = SessionLocal()
+    try:
+        qr_service = QRLabelService()
+        gates = qr_service.get_gates_for_labels(db=db, gate_ids=gate_ids, include_inactive=True, org_id=org_id)
+        labels = [qr_service.label_fields(gate) for gate in gates]
+    finally:
+        db.close()
+
+    last_report = [0.0]
+
+    def report(done: int, total: int) -> None:
+        now = time.monotonic()
+        if done == total or now - last_report[0] >= 1.0:
+            last_report[0] = now
+            self.update_state(state='PROGRESS', meta={'done': done, 'total': total})
+
+    os.makedirs(settings.LABEL_JOB_DIR, exist_ok=True)
+    partial_path = os.path.join(settings.LABEL_JOB_DIR, f"{self.request.id}.pdf.partial")
+    with open(partial_path, 'wb') as output:
+        stats = BulkLabelRenderer().render_pdf(
+            labels,
+            output,
+            labels_per_row=labels_per_row,
+            labels_per_page=labels_per_page,
+            progress=report
+        )
+    store_label_job_pdf(self.request.id, partial_path)
+
+    return {**stats, 'done': len(labels), 'total': len(labels)}
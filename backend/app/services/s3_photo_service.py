@@ -1,10 +1,16 @@
 """S3 service for photo documentation in field forms."""
 
 import boto3
+import math
+import threading
+import time
 import uuid
-from typing import Optional, Dict, Any, List
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Iterable, Tuple
 from datetime import datetime, timedelta
-from botocore.exceptions import ClientError, NoCredentialsError
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError, NoCredentialsError
 from fastapi import HTTPException
 import os
 
@@ -13,56 +19,151 @@ from app.models.inspections import InspectionPhoto
 from app.schemas.field_forms import PhotoUploadRequest, PhotoUploadResponse
 
 
+class PresignedUrlCache:
+    """
+    Thread-safe LRU of presigned download URLs keyed by S3 key.
+
+    A cached URL is reused while it stays valid for at least the requested
+    lifetime minus S3_PRESIGN_CACHE_TTL_SECONDS, so repeated listings of the
+    same inspection do not re-sign every photo.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, s3_key: str, expires_in: int) -> Optional[str]:
+        """Cached URL that is still valid for ``expires_in - ttl`` seconds."""
+        min_valid_until = time.time() + max(expires_in - self.ttl_seconds, 0)
+        with self._lock:
+            entry = self._entries.get(s3_key)
+            if entry is None:
+                return None
+            url, valid_until = entry
+            if valid_until < min_valid_until:
+                del self._entries[s3_key]
+                return None
+            self._entries.move_to_end(s3_key)
+            return url
+
+    def put(self, s3_key: str, url: str, valid_until: float) -> None:
+        with self._lock:
+            self._entries[s3_key] = (url, valid_until)
+            self._entries.move_to_end(s3_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, s3_key: str) -> None:
+        with self._lock:
+            self._entries.pop(s3_key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide S3 state: one pooled client per process, the bucket checked once
+_client_lock = threading.Lock()
+_shared_client = None
+_shared_bucket: Optional[str] = None
+_client_ready = False
+
+
+def _build_s3_client(settings):
+    """Create the pooled S3 client (botocore clients are thread-safe)."""
+    session = boto3.session.Session(
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_REGION or 'us-east-1'
+    )
+    return session.client(
+        's3',
+        endpoint_url=settings.S3_ENDPOINT_URL,
+        config=Config(
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            signature_version='s3v4',
+            retries={'max_attempts': 3, 'mode': 'standard'}
+        )
+    )
+
+
+def get_shared_s3_client() -> Tuple[Any, Optional[str]]:
+    """
+    Get the process-wide S3 client and bucket name.
+
+    The client is built and the bucket verified on first use only; if no
+    credentials are available ``(None, None)`` is returned and photos fall
+    back to local file storage.
+    """
+    global _shared_client, _shared_bucket, _client_ready
+
+    if _client_ready:
+        return _shared_client, _shared_bucket
+
+    with _client_lock:
+        if not _client_ready:
+            settings = get_settings()
+            bucket_name = settings.S3_PHOTOS_BUCKET or 'garagereg-inspection-photos'
+            try:
+                client = _build_s3_client(settings)
+                _verify_bucket(client, bucket_name, settings)
+                _shared_client, _shared_bucket = client, bucket_name
+            except NoCredentialsError:
+                # Fallback to local file storage for development
+                _shared_client, _shared_bucket = None, None
+                print("⚠️  AWS credentials not found, using local file storage for photos")
+            _client_ready = True
+
+    return _shared_client, _shared_bucket
+
+
+def _verify_bucket(client, bucket_name: str, settings) -> None:
+    """Check the bucket exists and create it in development."""
+    try:
+        client.head_bucket(Bucket=bucket_name)
+    except ClientError as e:
+        error_code = e.response['Error']['Code']
+        if error_code in ('404', 'NoSuchBucket'):
+            # Bucket doesn't exist, create it (for development)
+            if settings.ENVIRONMENT == 'development':
+                try:
+                    client.create_bucket(Bucket=bucket_name)
+                    print(f"✅ Created S3 bucket: {bucket_name}")
+                except ClientError as create_error:
+                    print(f"❌ Failed to create S3 bucket: {create_error}")
+        else:
+            print(f"❌ S3 connection error: {e}")
+    except BotoCoreError as e:
+        if isinstance(e, NoCredentialsError):
+            raise
+        print(f"❌ S3 connection error: {e}")
+
+
+def reset_shared_s3_client() -> None:
+    """Drop the shared client (tests, credential rotation)."""
+    global _shared_client, _shared_bucket, _client_ready
+
+    with _client_lock:
+        _shared_client, _shared_bucket, _client_ready = None, None, False
+    _presigned_urls.clear()
+
+
+_presigned_urls = PresignedUrlCache(
+    max_size=get_settings().S3_PRESIGN_CACHE_SIZE,
+    ttl_seconds=get_settings().S3_PRESIGN_CACHE_TTL_SECONDS
+)
+
+
 class S3PhotoService:
     """Service for managing inspection photos in S3 storage."""
     
     def __init__(self):
         self.settings = get_settings()
-        self._setup_s3_client()
-    
-    def _setup_s3_client(self):
-        """Setup S3 client with configuration."""
-        try:
-            # Use environment variables or AWS credentials file
-            self.s3_client = boto3.client(
-                's3',
-                aws_access_key_id=self.settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=self.settings.AWS_SECRET_ACCESS_KEY,
-                region_name=self.settings.AWS_REGION or 'us-east-1'
-            )
-            
-            # Default bucket configuration
-            self.bucket_name = self.settings.S3_PHOTOS_BUCKET or 'garagereg-inspection-photos'
-            
-            # Test connection
-            self._test_s3_connection()
-            
-        except NoCredentialsError:
-            # Fallback to local file storage for development
-            self.s3_client = None
-            self.bucket_name = None
-            print("⚠️  AWS credentials not found, using local file storage for photos")
-    
-    def _test_s3_connection(self):
-        """Test S3 connection and create bucket if needed."""
-        if not self.s3_client:
-            return
-        
-        try:
-            # Check if bucket exists
-            self.s3_client.head_bucket(Bucket=self.bucket_name)
-        except ClientError as e:
-            error_code = int(e.response['Error']['Code'])
-            if error_code == 404:
-                # Bucket doesn't exist, create it (for development)
-                if self.settings.ENVIRONMENT == 'development':
-                    try:
-                        self.s3_client.create_bucket(Bucket=self.bucket_name)
-                        print(f"✅ Created S3 bucket: {self.bucket_name}")
-                    except ClientError as create_error:
-                        print(f"❌ Failed to create S3 bucket: {create_error}")
-            else:
-                print(f"❌ S3 connection error: {e}")
+        # Shared across instances: constructing the service is free
+        self.s3_client, self.bucket_name = get_shared_s3_client()
+        self.url_cache = _presigned_urls
     
     def generate_upload_url(
         self, 
@@ -129,26 +230,194 @@ class S3PhotoService:
         Returns:
             Pre-signed download URL
         """
+        return self.generate_download_urls([s3_key], expires_in)[s3_key]
+    
+    def generate_download_urls(
+        self,
+        s3_keys: Iterable[str],
+        expires_in: int = 3600
+    ) -> Dict[str, str]:
+        """
+        Generate pre-signed download URLs for many photos.
+        
+        Presigning is a local signing operation; URLs still valid long
+        enough are served from the process-wide cache.
+        
+        Args:
+            s3_keys: S3 object keys
+            expires_in: URL expiration time in seconds
+            
+        Returns:
+            Mapping of S3 key to pre-signed download URL
+        """
         if not self.s3_client:
-            # Return local file URL
-            return f"/api/v1/photos/local/{s3_key}"
+            # Return local file URLs
+            return {s3_key: f"/api/v1/photos/local/{s3_key}" for s3_key in s3_keys}
+        
+        urls = {}
+        for s3_key in s3_keys:
+            if s3_key in urls:
+                continue
+            cached = self.url_cache.get(s3_key, expires_in)
+            if cached is not None:
+                urls[s3_key] = cached
+                continue
+            
+            try:
+                signed_at = time.time()
+                download_url = self.s3_client.generate_presigned_url(
+                    'get_object',
+                    Params={
+                        'Bucket': self.bucket_name,
+                        'Key': s3_key
+                    },
+                    ExpiresIn=expires_in
+                )
+            except ClientError as e:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"S3 download URL generation failed: {e}"
+                )
+            
+            self.url_cache.put(s3_key, download_url, signed_at + expires_in)
+            urls[s3_key] = download_url
+        
+        return urls
+    
+    def generate_upload_target(
+        self,
+        photo_request: PhotoUploadRequest,
+        expires_in: int = 3600
+    ) -> Dict[str, Any]:
+        """
+        Reserve an S3 key and pre-sign its upload.
+        
+        Photos above S3_MULTIPART_THRESHOLD_BYTES get a multipart upload
+        with one URL per part, smaller ones a single PUT URL.
+        
+        Args:
+            photo_request: Photo upload request data
+            expires_in: URL expiration time in seconds
+            
+        Returns:
+            s3_key, expires_at and either upload_url or
+            upload_id / part_size_bytes / parts
+        """
+        if not self.is_multipart_size(photo_request.metadata.file_size_bytes):
+            upload = self.generate_upload_url(photo_request, expires_in)
+            return {"s3_key": upload.s3_key, "upload_url": upload.upload_url, "expires_at": upload.expires_at}
+        
+        s3_key = self._generate_s3_key(photo_request)
+        return {
+            "s3_key": s3_key,
+            "expires_at": datetime.utcnow() + timedelta(seconds=expires_in),
+            **self.generate_multipart_upload(photo_request, s3_key, expires_in)
+        }
+    
+    def generate_multipart_upload(
+        self,
+        photo_request: PhotoUploadRequest,
+        s3_key: str,
+        expires_in: int = 3600
+    ) -> Dict[str, Any]:
+        """
+        Start an S3 multipart upload and pre-sign every part.
+        
+        Args:
+            photo_request: Photo upload request data (file size required)
+            s3_key: S3 object key reserved for the photo
+            expires_in: URL expiration time in seconds
+            
+        Returns:
+            Upload ID, part size and pre-signed URL per part
+        """
+        part_size = self.settings.S3_MULTIPART_PART_SIZE_BYTES
+        part_count = math.ceil(photo_request.metadata.file_size_bytes / part_size)
         
         try:
-            download_url = self.s3_client.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': self.bucket_name,
-                    'Key': s3_key
-                },
-                ExpiresIn=expires_in
+            upload = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                ContentType=photo_request.metadata.mime_type or 'image/jpeg'
             )
-            return download_url
-            
+            parts = [
+                {
+                    "part_number": part_number,
+                    "upload_url": self.s3_client.generate_presigned_url(
+                        'upload_part',
+                        Params={
+                            'Bucket': self.bucket_name,
+                            'Key': s3_key,
+                            'UploadId': upload['UploadId'],
+                            'PartNumber': part_number
+                        },
+                        ExpiresIn=expires_in
+                    )
+                }
+                for part_number in range(1, part_count + 1)
+            ]
         except ClientError as e:
             raise HTTPException(
                 status_code=500,
-                detail=f"S3 download URL generation failed: {e}"
+                detail=f"S3 multipart upload initiation failed: {e}"
             )
+        
+        return {"upload_id": upload['UploadId'], "part_size_bytes": part_size, "parts": parts}
+    
+    def is_multipart_size(self, file_size_bytes: Optional[int]) -> bool:
+        """Whether a file of this size is uploaded in parts."""
+        return bool(
+            self.s3_client
+            and file_size_bytes
+            and file_size_bytes > self.settings.S3_MULTIPART_THRESHOLD_BYTES
+        )
+    
+    def complete_multipart_upload(
+        self,
+        s3_key: str,
+        upload_id: str,
+        parts: List[Dict[str, Any]]
+    ) -> None:
+        """Assemble the uploaded parts (part_number, etag) into the object."""
+        self.s3_client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            UploadId=upload_id,
+            MultipartUpload={
+                'Parts': [
+                    {'PartNumber': part['part_number'], 'ETag': part['etag']}
+                    for part in sorted(parts, key=lambda part: part['part_number'])
+                ]
+            }
+        )
+    
+    def finalize_uploads(self, uploads: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Complete multipart uploads and validate many photos concurrently.
+        
+        Args:
+            uploads: Items with s3_key and, for multipart uploads,
+                upload_id and parts
+            
+        Returns:
+            Validation result per S3 key (see validate_upload_completion);
+            failures carry an "error" message instead of raising
+        """
+        def finalize(upload: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                if upload.get('upload_id') and self.s3_client:
+                    self.complete_multipart_upload(upload['s3_key'], upload['upload_id'], upload.get('parts') or [])
+                return self.validate_upload_completion(upload['s3_key'])
+            except (ClientError, BotoCoreError, HTTPException) as e:
+                return {"exists": False, "error": str(getattr(e, 'detail', e))}
+        
+        if not uploads:
+            return {}
+        
+        workers = min(self.settings.S3_CONFIRM_CONCURRENCY, len(uploads))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-confirm") as executor:
+            results = executor.map(finalize, uploads)
+            return {upload['s3_key']: result for upload, result in zip(uploads, results)}
     
     def validate_upload_completion(self, s3_key: str) -> Dict[str, Any]:
         """
@@ -185,8 +454,8 @@ class S3PhotoService:
             }
             
         except ClientError as e:
-            error_code = int(e.response['Error']['Code'])
-            if error_code == 404:
+            error_code = e.response['Error']['Code']
+            if error_code in ('404', 'NoSuchKey'):
                 return {"exists": False}
             else:
                 raise HTTPException(
@@ -208,6 +477,8 @@ class S3PhotoService:
             # Mock deletion for local storage
             return True
         
+        self.url_cache.invalidate(s3_key)
+        
         try:
             self.s3_client.delete_object(
                 Bucket=self.bucket_name,
@@ -278,6 +549,11 @@ class S3PhotoService:
             return None
 
 
+def get_s3_photo_service() -> S3PhotoService:
+    """Get an S3 photo service backed by the process-wide client."""
+    return S3PhotoService()
+
+
 class PhotoValidationService:
     """Service for validating photo requirements and enforcing mandatory photos."""
     
@@ -0,0 +1,382 @@
+"""
+Készletfőkönyv pillanatképek
+Incremental stock ledger snapshots
+
+The stock ledger (stock_movements) only grows, so questions like "is the
+ledger in balance" or "what was on hand on 31 March" are answered from
+stock_ledger_snapshots plus the movements after the latest snapshot instead
+of summing the whole table.
+
+maintenance.build_stock_ledger_snapshots closes every day that ended at
+least STOCK_LEDGER_CLOSE_LAG_MINUTES ago: for each item that moved on the day
+it writes the closing quantity, value and cumulative debits / credits
+(previous snapshot + the day's movements). Days are closed in order, so every
+movement before the newest period_end is covered by some snapshot.
+
+Movements booked later into an already closed day (backdated entries, ERP
+feeds) are found by created_at; the snapshots from that day on are dropped
+and the days are closed again.
+"""
+
+import base64
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import and_, case, delete, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.celery_app import maintenance_task
+from app.core.config import settings
+from app.models.inventory import StockLedgerSnapshot, StockMovement
+
+logger = structlog.get_logger(__name__)
+
+# Movements that are part of the ledger; a reversed movement stays, its reversal is booked separately
+LEDGER_STATUSES = ('completed', 'reversed')
+
+# Items per IN (...) list when reading previous snapshots
+SNAPSHOT_CHUNK_SIZE = 1000
+
+ZERO = Decimal('0')
+
+
+def encode_movement_cursor(movement_date: datetime, movement_id: int) -> str:
+    """Opaque URL-safe keyset token for the movement report (last row returned)."""
+    payload = json.dumps({'t': movement_date.isoformat(), 'i': movement_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_movement_cursor(token: str) -> Tuple[datetime, int]:
+    """Parse a token produced by encode_movement_cursor(); raises ValueError if malformed."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload['t']), int(payload['i'])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid movement cursor: {token}") from e
+
+
+def movement_keyset_condition(token: str):
+    """Rows after the cursor in ORDER BY movement_date DESC, id DESC."""
+    movement_date, movement_id = decode_movement_cursor(token)
+    return or_(
+        StockMovement.movement_date < movement_date,
+        and_(StockMovement.movement_date == movement_date, StockMovement.id < movement_id)
+    )
+
+
+def _value_delta():
+    """Signed stock value change of a movement (receipts add, issues remove their cost)."""
+    total_cost = func.coalesce(StockMovement.total_cost, 0)
+    return case((StockMovement.quantity < 0, -total_cost), else_=total_cost)
+
+
+class StockLedgerService:
+    """Service for building and reading stock ledger snapshots."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # =========================================================================
+    # BUILD - ÉPÍTÉS
+    # =========================================================================
+
+    def build_snapshots(self, up_to: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Close every day before ``up_to`` (default: today) that is not yet snapshotted
+
+        Days that ended less than STOCK_LEDGER_CLOSE_LAG_MINUTES ago stay open,
+        and closed days that received backdated movements are closed again.
+        Only days with movements are visited; each day is committed on its own,
+        so an interrupted run resumes where it stopped.
+        """
+        close_lag = timedelta(minutes=settings.STOCK_LEDGER_CLOSE_LAG_MINUTES)
+        closable = datetime.combine((datetime.utcnow() - close_lag).date(), time.min)
+        up_to_start = min(datetime.combine(up_to, time.min), closable) if up_to else closable
+
+        reopened = self._reopen_backdated(close_lag)
+        cursor = self.latest_period_end()
+
+        days = 0
+        rows = 0
+        while True:
+            next_movement = self.db.execute(
+                select(func.min(StockMovement.movement_date)).where(
+                    StockMovement.movement_date < up_to_start,
+                    StockMovement.status.in_(LEDGER_STATUSES),
+                    *([StockMovement.movement_date >= cursor] if cursor else [])
+                )
+            ).scalar()
+            if next_movement is None:
+                break
+
+            period_start = datetime.combine(next_movement.date(), time.min)
+            period_end = period_start + timedelta(days=1)
+            rows += self._close_period(period_start, period_end)
+            self.db.commit()
+            days += 1
+            cursor = period_end
+
+        logger.info("Stock ledger snapshots built", days=days, rows=rows, up_to=str(up_to_start.date()))
+        return {
+            "days_closed": days,
+            "rows": rows,
+            "period_end": cursor.isoformat() if cursor else None,
+            "reopened_from": reopened.isoformat() if reopened else None,
+        }
+
+    def _reopen_backdated(self, close_lag: timedelta) -> Optional[datetime]:
+        """
+        Drop the snapshots of closed days that received movements after closing
+
+        Candidates are movements created since the last build (less the close
+        lag, for transactions still open during it) but dated before the newest
+        period_end. A day is stale if its snapshot of the item is missing or
+        counts fewer movements. Returns the start of the earliest reopened day.
+        """
+        cutoff = self.latest_period_end()
+        if cutoff is None:
+            return None
+        last_build = self.db.execute(select(func.max(StockLedgerSnapshot.created_at))).scalar()
+
+        candidates = self.db.execute(
+            select(StockMovement.inventory_item_id, StockMovement.movement_date)
+            .where(
+                StockMovement.created_at >= last_build - close_lag,
+                StockMovement.movement_date < cutoff,
+                StockMovement.status.in_(LEDGER_STATUSES)
+            )
+        ).all()
+        days = sorted({(datetime.combine(row.movement_date.date(), time.min), row.inventory_item_id)
+                       for row in candidates})
+
+        for period_start, item_id in days:
+            if self._is_closed(item_id, period_start):
+                continue
+            removed = self.db.execute(
+                delete(StockLedgerSnapshot).where(StockLedgerSnapshot.period_end > period_start)
+            ).rowcount
+            self.db.commit()
+            logger.warning("Stock ledger reopened for backdated movements",
+                           period_start=period_start.isoformat(), inventory_item_id=item_id, rows=removed)
+            return period_start
+        return None
+
+    def _is_closed(self, item_id: int, period_start: datetime) -> bool:
+        """Whether the item's snapshot of the day covers all of its movements on that day."""
+        period_end = period_start + timedelta(days=1)
+        snapshot_count = self.db.execute(
+            select(StockLedgerSnapshot.movement_count).where(
+                StockLedgerSnapshot.inventory_item_id == item_id,
+                StockLedgerSnapshot.period_end == period_end
+            )
+        ).scalar()
+        if snapshot_count is None:
+            return False
+
+        movement_count = self.db.execute(
+            select(func.count(StockMovement.id)).where(
+                StockMovement.inventory_item_id == item_id,
+                StockMovement.movement_date >= period_start,
+                StockMovement.movement_date < period_end,
+                StockMovement.status.in_(LEDGER_STATUSES)
+            )
+        ).scalar()
+        return movement_count == snapshot_count
+
+    def _close_period(self, period_start: datetime, period_end: datetime) -> int:
+        """Write the closing rows of one day for every item that moved on it."""
+        day_totals = self.db.execute(
+            select(
+                StockMovement.inventory_item_id,
+                StockMovement.org_id,
+                StockMovement.warehouse_id,
+                StockMovement.part_id,
+                func.sum(StockMovement.debit_quantity).label('debits'),
+                func.sum(StockMovement.credit_quantity).label('credits'),
+                func.sum(_value_delta()).label('value'),
+                func.count(StockMovement.id).label('movements'),
+            )
+            .where(
+                StockMovement.movement_date >= period_start,
+                StockMovement.movement_date < period_end,
+                StockMovement.status.in_(LEDGER_STATUSES)
+            )
+            .group_by(
+                StockMovement.inventory_item_id,
+                StockMovement.org_id,
+                StockMovement.warehouse_id,
+                StockMovement.part_id
+            )
+        ).all()
+
+        previous = self._latest_snapshots([row.inventory_item_id for row in day_totals], before=period_start)
+
+        snapshots = []
+        for row in day_totals:
+            base = previous.get(row.inventory_item_id)
+            total_debits = (base.total_debits if base else ZERO) + (row.debits or ZERO)
+            total_credits = (base.total_credits if base else ZERO) + (row.credits or ZERO)
+            snapshots.append(dict(
+                org_id=row.org_id,
+                inventory_item_id=row.inventory_item_id,
+                warehouse_id=row.warehouse_id,
+                part_id=row.part_id,
+                period_end=period_end,
+                closing_quantity=total_debits - total_credits,
+                closing_value=(base.closing_value if base else ZERO) + Decimal(str(row.value or 0)),
+                total_debits=total_debits,
+                total_credits=total_credits,
+                movement_count=row.movements,
+                created_at=datetime.utcnow()
+            ))
+
+        if snapshots:
+            self.db.execute(StockLedgerSnapshot.__table__.insert(), snapshots)
+        return len(snapshots)
+
+    # =========================================================================
+    # READ - OLVASÁS
+    # =========================================================================
+
+    def latest_period_end(self, as_of: Optional[datetime] = None) -> Optional[datetime]:
+        """End of the newest closed day (at or before ``as_of``)."""
+        query = select(func.max(StockLedgerSnapshot.period_end))
+        if as_of is not None:
+            query = query.where(StockLedgerSnapshot.period_end <= as_of)
+        return self.db.execute(query).scalar()
+
+    def _latest_snapshot_query(self, before: Optional[datetime] = None):
+        """Newest snapshot row of every item (ending at or before ``before``)."""
+        latest = select(
+            StockLedgerSnapshot.inventory_item_id,
+            func.max(StockLedgerSnapshot.period_end).label('period_end')
+        )
+        if before is not None:
+            latest = latest.where(StockLedgerSnapshot.period_end <= before)
+        latest = latest.group_by(StockLedgerSnapshot.inventory_item_id).subquery()
+
+        return select(StockLedgerSnapshot).join(latest, and_(
+            StockLedgerSnapshot.inventory_item_id == latest.c.inventory_item_id,
+            StockLedgerSnapshot.period_end == latest.c.period_end
+        ))
+
+    def _latest_snapshots(self, item_ids: List[int], before: datetime) -> Dict[int, StockLedgerSnapshot]:
+        snapshots = {}
+        for start in range(0, len(item_ids), SNAPSHOT_CHUNK_SIZE):
+            chunk = item_ids[start:start + SNAPSHOT_CHUNK_SIZE]
+            query = self._latest_snapshot_query(before).where(StockLedgerSnapshot.inventory_item_id.in_(chunk))
+            for snapshot in self.db.execute(query).scalars():
+                snapshots[snapshot.inventory_item_id] = snapshot
+        return snapshots
+
+    def ledger_totals(self) -> Dict[str, Any]:
+        """
+        Total debits / credits of the whole ledger
+
+        Snapshot totals up to the newest period_end plus the movements after it.
+        """
+        cutoff = self.latest_period_end()
+
+        snapshot_debits, snapshot_credits = ZERO, ZERO
+        if cutoff is not None:
+            latest = self._latest_snapshot_query().subquery()
+            snapshot_debits, snapshot_credits = self.db.execute(
+                select(func.sum(latest.c.total_debits), func.sum(latest.c.total_credits))
+            ).one()
+
+        tail = select(
+            func.sum(StockMovement.debit_quantity),
+            func.sum(StockMovement.credit_quantity),
+            func.count(StockMovement.id)
+        ).where(StockMovement.status.in_(LEDGER_STATUSES))
+        if cutoff is not None:
+            tail = tail.where(StockMovement.movement_date >= cutoff)
+        tail_debits, tail_credits, tail_count = self.db.execute(tail).one()
+
+        return {
+            'total_debits': (snapshot_debits or ZERO) + (tail_debits or ZERO),
+            'total_credits': (snapshot_credits or ZERO) + (tail_credits or ZERO),
+            'snapshot_period_end': cutoff,
+            'movements_scanned': tail_count,
+        }
+
+    def balances_as_of(
+        self,
+        as_of: datetime,
+        warehouse_id: Optional[int] = None,
+        part_id: Optional[int] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Quantity and value of every item at ``as_of``
+
+        Starts from the newest snapshot at or before ``as_of`` and adds the
+        movements between its period_end and ``as_of``.
+        """
+        cutoff = self.latest_period_end(as_of)
+        balances: Dict[int, Dict[str, Any]] = {}
+
+        if cutoff is not None:
+            query = self._latest_snapshot_query(as_of)
+            if warehouse_id:
+                query = query.where(StockLedgerSnapshot.warehouse_id == warehouse_id)
+            if part_id:
+                query = query.where(StockLedgerSnapshot.part_id == part_id)
+            for snapshot in self.db.execute(query).scalars():
+                balances[snapshot.inventory_item_id] = {
+                    'inventory_item_id': snapshot.inventory_item_id,
+                    'warehouse_id': snapshot.warehouse_id,
+                    'part_id': snapshot.part_id,
+                    'quantity': snapshot.closing_quantity,
+                    'value': snapshot.closing_value,
+                }
+
+        tail = select(
+            StockMovement.inventory_item_id,
+            StockMovement.warehouse_id,
+            StockMovement.part_id,
+            func.sum(StockMovement.debit_quantity - StockMovement.credit_quantity).label('quantity'),
+            func.sum(_value_delta()).label('value'),
+        ).where(
+            StockMovement.movement_date < as_of,
+            StockMovement.status.in_(LEDGER_STATUSES)
+        )
+        if cutoff is not None:
+            tail = tail.where(StockMovement.movement_date >= cutoff)
+        if warehouse_id:
+            tail = tail.where(StockMovement.warehouse_id == warehouse_id)
+        if part_id:
+            tail = tail.where(StockMovement.part_id == part_id)
+        tail = tail.group_by(StockMovement.inventory_item_id, StockMovement.warehouse_id, StockMovement.part_id)
+
+        for row in self.db.execute(tail):
+            balance = balances.setdefault(row.inventory_item_id, {
+                'inventory_item_id': row.inventory_item_id,
+                'warehouse_id': row.warehouse_id,
+                'part_id': row.part_id,
+                'quantity': ZERO,
+                'value': ZERO,
+            })
+            balance['quantity'] += row.quantity or ZERO
+            balance['value'] += Decimal(str(row.value or 0))
+
+        return balances
+
+
+# =============================================================================
+# CELERY TASKS - HÁTTÉRFELADATOK
+# =============================================================================
+
+@maintenance_task(name="maintenance.build_stock_ledger_snapshots")
+def build_stock_ledger_snapshots(self, up_to: Optional[str] = None):
+    """Celery task to close every finished day of the stock ledger."""
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return StockLedgerService(db).build_snapshots(date.fromisoformat(up_to) if up_to else None)
+    finally:
+        db.close()
@@ -0,0 +1,786 @@
+"""
+Készletkönyvelő motor
+Stock posting engine for InventoryService
+
+Quantity changes are applied as deltas in the database instead of being
+read, changed in Python and written back:
+
+    UPDATE inventory_items
+       SET quantity_on_hand = quantity_on_hand + :delta, ...
+     WHERE id = :id [AND quantity_available + :delta >= 0]
+ RETURNING quantity_on_hand, average_cost, ...
+
+so concurrent issues of the same part never lose an update, and the stock
+check for issues is part of the same statement. A batch of movements (e.g.
+a work order consuming 30 parts) is posted in one transaction with one
+UPDATE per distinct item, taken in item id order so concurrent batches
+cannot deadlock. Movement numbers are allocated in one statement from the
+stock_movement_number_seq sequence (PostgreSQL) or the per-day
+stock_movement_counters table (SQLite).
+
+Bulk feeds (warehouse receipts, nightly ERP imports) with thousands of lines
+go through BulkStockPoster instead: the affected rows are locked once, all
+balances and weighted average costs are computed in one pass, movements
+are written with one bulk INSERT per chunk and balances with a single
+executemany UPDATE.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, case, insert, or_, select, text, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.inventory import InventoryItem, StockMovement, StockMovementCounter
+from app.models.tickets import PartUsage, WorkOrder
+
+POSTING_TYPES = ('receipt', 'issue', 'adjustment')
+
+BULK_POSTING_TYPES = ('receipt', 'issue')
+
+BULK_CHUNK_SIZE = 1000
+
+MOVEMENT_NUMBER_SEQUENCE = 'stock_movement_number_seq'
+
+ZERO = Decimal('0')
+
+
+@dataclass
+class StockPosting:
+    """
+    Egy könyvelendő készletmozgás - one movement to post
+
+    ``quantity`` is the received / issued amount for receipts and issues and
+    the counted quantity for adjustments.
+    """
+    inventory_item_id: int
+    movement_type: str
+    quantity: Decimal
+    unit_cost: Optional[Decimal] = None
+    work_order_id: Optional[int] = None
+    movement_reason: Optional[str] = None
+    reference_type: Optional[str] = None
+    reference_id: Optional[int] = None
+    notes: Optional[str] = None
+    document_number: Optional[str] = None
+
+
+@dataclass
+class PostingResult:
+    """Movements and part usages in posting order (None where nothing was posted)."""
+    movements: List[Optional[StockMovement]]
+    part_usages: List[Optional[PartUsage]]
+    balances: Dict[int, Any] = field(default_factory=dict)  # item id -> row returned by the UPDATE
+
+
+@dataclass
+class BulkPostingResult:
+    """
+    Outcome of a bulk posting
+
+    ``movement_numbers`` follows the input order (None for rejected and
+    skipped lines); ``rejected`` lists (line index, reason) pairs and
+    ``skipped`` the indexes of lines whose reference was already posted.
+    """
+    movement_numbers: List[Optional[str]]
+    rejected: List[Tuple[int, str]]
+    balances: Dict[int, '_ItemBalance'] = field(default_factory=dict)
+    decreased: Set[int] = field(default_factory=set)
+    increased: Set[int] = field(default_factory=set)
+    skipped: List[int] = field(default_factory=list)
+
+    @property
+    def posted(self) -> int:
+        return len(self.movement_numbers) - len(self.rejected) - len(self.skipped)
+
+
+@dataclass
+class _ItemBalance:
+    """Locked inventory row, updated line by line during a bulk posting."""
+    id: int
+    org_id: int
+    warehouse_id: int
+    part_id: int
+    quantity_on_hand: Decimal
+    quantity_reserved: Decimal
+    minimum_stock: Optional[Decimal]
+    maximum_stock: Optional[Decimal]
+    reorder_point: Optional[Decimal]
+    average_cost: Optional[Decimal]
+    last_cost: Optional[Decimal]
+    last_received_date: Optional[datetime]
+    last_issued_date: Optional[datetime]
+    last_movement_type: Optional[str]
+
+    @property
+    def quantity_available(self) -> Decimal:
+        return self.quantity_on_hand - self.quantity_reserved
+
+    @property
+    def stock_status(self) -> str:
+        """Python version of stock_status_expression."""
+        if self.quantity_on_hand <= 0:
+            return 'out_of_stock'
+        if self.minimum_stock and self.quantity_on_hand < self.minimum_stock * Decimal('0.5'):
+            return 'critical'
+        if self.minimum_stock and self.quantity_on_hand < self.minimum_stock:
+            return 'low'
+        if self.maximum_stock is not None and self.quantity_on_hand > self.maximum_stock:
+            return 'overstock'
+        return 'normal'
+
+
+@dataclass
+class _ItemPlan:
+    """Aggregated changes of one inventory item within a batch."""
+    delta: Decimal = ZERO
+    deltas: List[Decimal] = field(default_factory=list)
+    cost_quantity: Decimal = ZERO
+    cost_value: Decimal = ZERO
+    last_cost: Optional[Decimal] = None
+    last_type: Optional[str] = None
+    received: bool = False
+    issued: bool = False
+    counted: bool = False
+
+
+def allocate_movement_numbers(db: Session, count: int, day: Optional[str] = None) -> List[str]:
+    """
+    Allocate ``count`` unique MOV{YYYYMMDD}{seq} movement numbers in one statement
+
+    PostgreSQL draws from a sequence, which never blocks concurrent postings;
+    other databases bump a per-day counter row.
+    """
+    if count <= 0:
+        return []
+
+    day = day or datetime.now().strftime("%Y%m%d")
+    if db.get_bind().dialect.name == 'postgresql':
+        values = sorted(db.execute(
+            text(f"SELECT nextval('{MOVEMENT_NUMBER_SEQUENCE}') FROM generate_series(1, :count)"),
+            {'count': count}
+        ).scalars().all())
+    else:
+        last_value = _bump_day_counter(db, day, count)
+        values = range(last_value - count + 1, last_value + 1)
+
+    return [f"MOV{day}{value:04d}" for value in values]
+
+
+def _bump_day_counter(db: Session, day: str, count: int) -> int:
+    """Reserve ``count`` numbers of ``day``; returns the last reserved value."""
+    if db.get_bind().dialect.name == 'sqlite':
+        stmt = sqlite_insert(StockMovementCounter).values(day=day, last_value=count)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['day'],
+            set_={'last_value': StockMovementCounter.last_value + count}
+        ).returning(StockMovementCounter.last_value)
+        return db.execute(stmt).scalar_one()
+
+    updated = db.execute(
+        update(StockMovementCounter)
+        .where(StockMovementCounter.day == day)
+        .values(last_value=StockMovementCounter.last_value + count)
+    )
+    if not updated.rowcount:
+        db.add(StockMovementCounter(day=day, last_value=count))
+        db.flush()
+        return count
+    return db.execute(
+        select(StockMovementCounter.last_value).where(StockMovementCounter.day == day)
+    ).scalar_one()
+
+
+def stock_status_expression(quantity_on_hand):
+    """SQL version of InventoryService._update_stock_status for a new on-hand quantity."""
+    return case(
+        (quantity_on_hand <= 0, 'out_of_stock'),
+        (and_(InventoryItem.minimum_stock > 0, quantity_on_hand < InventoryItem.minimum_stock * Decimal('0.5')), 'critical'),
+        (and_(InventoryItem.minimum_stock > 0, quantity_on_hand < InventoryItem.minimum_stock), 'low'),
+        (quantity_on_hand > InventoryItem.maximum_stock, 'overstock'),
+        else_='normal'
+    )
+
+
+class StockPostingEngine:
+    """
+    Atomikus készletkönyvelés
+    Posts batches of stock movements with atomic balance updates
+
+    The engine flushes but does not commit; InventoryService owns the transaction.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def post(self, postings: List[StockPosting], user_id: Optional[int] = None) -> PostingResult:
+        """
+        Könyvelés egy tranzakcióban
+        Apply ``postings`` and write their StockMovement / PartUsage rows
+
+        Raises:
+            ValueError: Unknown item, invalid posting or insufficient stock
+        """
+        self._validate(postings)
+        now = datetime.utcnow()
+
+        # Adjustments set an absolute quantity: lock the batch's rows (id order) to read the base
+        counted = {}
+        if any(p.movement_type == 'adjustment' for p in postings):
+            counted = self._lock_quantities(sorted({p.inventory_item_id for p in postings}))
+
+        plans: Dict[int, _ItemPlan] = {}
+        for posting in postings:
+            plan = plans.setdefault(posting.inventory_item_id, _ItemPlan())
+            if posting.movement_type == 'adjustment':
+                delta = posting.quantity - (counted[posting.inventory_item_id] + plan.delta)
+                plan.counted = True
+            elif posting.movement_type == 'issue':
+                delta = -posting.quantity
+                plan.issued = True
+            else:
+                delta = posting.quantity
+                plan.received = True
+                if posting.unit_cost:
+                    plan.cost_quantity += posting.quantity
+                    plan.cost_value += posting.quantity * posting.unit_cost
+                    plan.last_cost = posting.unit_cost
+            plan.delta += delta
+            plan.deltas.append(delta)
+            if delta != 0:
+                plan.last_type = posting.movement_type
+
+        # One UPDATE ... RETURNING per item, in id order to avoid deadlocks
+        balances = {}
+        for item_id in sorted(plans):
+            balances[item_id] = self._apply(item_id, plans[item_id], postings, now)
+
+        movements = self._build_movements(postings, plans, balances, user_id, now)
+        self.db.add_all([movement for movement in movements if movement is not None])
+        self.db.flush()
+
+        part_usages = self._build_part_usages(postings, movements, balances, now)
+        self.db.add_all([usage for usage in part_usages if usage is not None])
+        self.db.flush()
+
+        return PostingResult(movements=movements, part_usages=part_usages, balances=balances)
+
+    @staticmethod
+    def _validate(postings: List[StockPosting]) -> None:
+        for posting in postings:
+            if posting.movement_type not in POSTING_TYPES:
+                raise ValueError(f"Movement type must be one of: {list(POSTING_TYPES)}")
+            if posting.movement_type == 'adjustment':
+                if posting.quantity < 0:
+                    raise ValueError("Adjusted quantity cannot be negative")
+            elif posting.quantity <= 0:
+                raise ValueError(f"Quantity must be positive, got {posting.quantity}")
+
+    def _lock_quantities(self, item_ids: List[int]) -> Dict[int, Decimal]:
+        rows = self.db.execute(
+            select(InventoryItem.id, InventoryItem.quantity_on_hand)
+            .where(InventoryItem.id.in_(item_ids))
+            .order_by(InventoryItem.id)
+            .with_for_update()
+        ).all()
+        quantities = {row.id: row.quantity_on_hand for row in rows}
+        for item_id in item_ids:
+            if item_id not in quantities:
+                raise ValueError(f"Inventory item {item_id} not found")
+        return quantities
+
+    def _apply(self, item_id: int, plan: _ItemPlan, postings: List[StockPosting], now: datetime):
+        """Apply the net delta of one item; the stock check is part of the UPDATE."""
+        new_on_hand = InventoryItem.quantity_on_hand + plan.delta
+        values = {
+            'quantity_on_hand': new_on_hand,
+            'quantity_available': new_on_hand - InventoryItem.quantity_reserved,
+            'stock_status': stock_status_expression(new_on_hand),
+        }
+        if plan.last_type:
+            values['last_movement_type'] = plan.last_type
+        if plan.received:
+            values['last_received_date'] = now
+        if plan.issued:
+            values['last_issued_date'] = now
+        if plan.counted:
+            values['last_counted_date'] = now
+
+        if plan.cost_quantity:
+            # Weighted average cost over the stock before the batch and the costed receipts
+            new_average = case(
+                (or_(
+                    InventoryItem.average_cost.is_(None),
+                    InventoryItem.average_cost == 0,
+                    InventoryItem.quantity_on_hand + plan.cost_quantity <= 0
+                ), plan.cost_value / plan.cost_quantity),
+                else_=(InventoryItem.quantity_on_hand * InventoryItem.average_cost + plan.cost_value)
+                / (InventoryItem.quantity_on_hand + plan.cost_quantity)
+            )
+            values['average_cost'] = new_average
+            values['last_cost'] = plan.last_cost
+            values['total_value'] = new_on_hand * new_average
+        elif plan.delta:
+            values['total_value'] = new_on_hand * InventoryItem.average_cost
+
+        stmt = update(InventoryItem).where(InventoryItem.id == item_id)
+        if plan.issued:
+            stmt = stmt.where(InventoryItem.quantity_available + plan.delta >= 0)
+        stmt = stmt.values(**values).returning(
+            InventoryItem.id,
+            InventoryItem.org_id,
+            InventoryItem.warehouse_id,
+            InventoryItem.part_id,
+            InventoryItem.quantity_on_hand,
+            InventoryItem.quantity_available,
+            InventoryItem.minimum_stock,
+            InventoryItem.reorder_point,
+            InventoryItem.average_cost,
+            InventoryItem.last_cost,
+        ).execution_options(synchronize_session=False)
+
+        row = self.db.execute(stmt).first()
+        if row is not None:
+            return row
+
+        available = self.db.execute(
+            select(InventoryItem.quantity_available).where(InventoryItem.id == item_id)
+        ).scalar_one_or_none()
+        if available is None:
+            raise ValueError(f"Inventory item {item_id} not found")
+        requested = sum(
+            (p.quantity for p in postings if p.inventory_item_id == item_id and p.movement_type == 'issue'),
+            ZERO
+        )
+        raise ValueError(f"Insufficient stock. Available: {available}, Requested: {requested}")
+
+    def _build_movements(
+        self,
+        postings: List[StockPosting],
+        plans: Dict[int, _ItemPlan],
+        balances: Dict[int, Any],
+        user_id: Optional[int],
+        now: datetime
+    ) -> List[Optional[StockMovement]]:
+        """Ledger rows with running before/after quantities per item."""
+        running = {item_id: balances[item_id].quantity_on_hand - plan.delta for item_id, plan in plans.items()}
+        positions = {item_id: 0 for item_id in plans}
+        deltas = []
+        for posting in postings:
+            item_id = posting.inventory_item_id
+            deltas.append(plans[item_id].deltas[positions[item_id]])
+            positions[item_id] += 1
+
+        numbers = iter(allocate_movement_numbers(self.db, sum(1 for delta in deltas if delta != 0)))
+        movements = []
+        for posting, delta in zip(postings, deltas):
+            item_id = posting.inventory_item_id
+            balance = balances[item_id]
+            before = running[item_id]
+            running[item_id] = before + delta
+
+            if delta == 0:
+                # Counted quantity already matches
+                movements.append(None)
+                continue
+
+            common = dict(
+                movement_number=next(numbers),
+                movement_type=posting.movement_type,
+                warehouse_id=balance.warehouse_id,
+                inventory_item_id=item_id,
+                part_id=balance.part_id,
+                quantity_before=before,
+                quantity_after=before + delta,
+                notes=posting.notes,
+                document_number=posting.document_number,
+                processed_by_user_id=user_id,
+                movement_date=now,
+                status='completed',
+                org_id=balance.org_id
+            )
+
+            if posting.movement_type == 'receipt':
+                movement = StockMovement(
+                    movement_reason=posting.movement_reason or 'purchase',
+                    debit_quantity=delta,  # Tartozik oldal - beáramlás
+                    credit_quantity=ZERO,
+                    quantity=delta,
+                    unit_cost=posting.unit_cost,
+                    total_cost=delta * posting.unit_cost if posting.unit_cost else None,
+                    reference_type=posting.reference_type,
+                    reference_id=posting.reference_id,
+                    **common
+                )
+            elif posting.movement_type == 'issue':
+                unit_cost = balance.average_cost or balance.last_cost or ZERO
+                movement = StockMovement(
+                    movement_reason=posting.movement_reason,
+                    debit_quantity=ZERO,
+                    credit_quantity=-delta,  # Követel oldal - kiáramlás
+                    quantity=delta,
+                    unit_cost=unit_cost,
+                    total_cost=-delta * unit_cost,
+                    reference_type=posting.reference_type or ("work_order" if posting.work_order_id else None),
+                    reference_id=posting.reference_id or posting.work_order_id,
+                    **common
+                )
+            else:
+                movement = StockMovement(
+                    movement_reason=posting.movement_reason,
+                    debit_quantity=delta if delta > 0 else ZERO,
+                    credit_quantity=-delta if delta < 0 else ZERO,
+                    quantity=delta,
+                    unit_cost=balance.average_cost,
+                    total_cost=abs(delta) * balance.average_cost if balance.average_cost else None,
+                    reference_type=posting.reference_type,
+                    reference_id=posting.reference_id,
+                    **common
+                )
+            movements.append(movement)
+
+        return movements
+
+    def _build_part_usages(
+        self,
+        postings: List[StockPosting],
+        movements: List[Optional[StockMovement]],
+        balances: Dict[int, Any],
+        now: datetime
+    ) -> List[Optional[PartUsage]]:
+        """Work order consumption records for issues, with one work order lookup."""
+        work_order_ids = {p.work_order_id for p in postings if p.movement_type == 'issue' and p.work_order_id}
+        if not work_order_ids:
+            return [None] * len(postings)
+
+        gate_ids = dict(self.db.execute(
+            select(WorkOrder.id, WorkOrder.gate_id).where(WorkOrder.id.in_(work_order_ids))
+        ).all())
+
+        part_usages = []
+        for posting, movement in zip(postings, movements):
+            if posting.movement_type != 'issue' or posting.work_order_id not in gate_ids:
+                part_usages.append(None)
+                continue
+            balance = balances[posting.inventory_item_id]
+            part_usages.append(PartUsage(
+                work_order_id=posting.work_order_id,
+                part_id=balance.part_id,
+                gate_id=gate_ids[posting.work_order_id],
+                inventory_item_id=posting.inventory_item_id,
+                warehouse_id=balance.warehouse_id,
+                stock_movement_id=movement.id,
+                quantity_used=posting.quantity,
+                quantity_issued=posting.quantity,
+                unit_cost=movement.unit_cost,
+                total_cost=movement.total_cost,
+                issued_at=now,
+                consumed_at=now,
+                usage_reason="work_order_consumption",
+                org_id=balance.org_id
+            ))
+        return part_usages
+
+
+class BulkStockPoster:
+    """
+    Tömeges készletkönyvelés (raktári bevételezés, ERP import)
+    Posts thousands of receipts / issues with a fixed number of statements
+
+    All affected rows are locked in id order with one SELECT ... FOR UPDATE
+    per chunk, every line is validated and priced in one pass over the
+    locked balances (receipts update the weighted average cost line by
+    line, issues are valued at the running average), then the ledger rows
+    are bulk inserted and the balances written with one executemany UPDATE.
+
+    With ``atomic=False`` invalid lines (unknown item, bad quantity,
+    insufficient stock) are rejected and reported while the rest is posted;
+    with ``atomic=True`` the first invalid line raises ValueError and
+    nothing is written. Like StockPostingEngine, the poster does not commit.
+
+    With ``skip_posted=True`` (feeds that may be delivered again) every line
+    needs a reference_type and document_number; a line whose reference is
+    already in the item organization's ledger, or repeats an earlier line of
+    the batch, is skipped. The check runs after the item rows are locked, so
+    two imports of the same feed cannot both post it.
+    """
+
+    def __init__(self, db: Session, chunk_size: int = BULK_CHUNK_SIZE):
+        self.db = db
+        self.chunk_size = chunk_size
+
+    def post(
+        self,
+        postings: List[StockPosting],
+        user_id: Optional[int] = None,
+        atomic: bool = False,
+        skip_posted: bool = False
+    ) -> BulkPostingResult:
+        """
+        Tömeges könyvelés
+        Apply ``postings`` in input order
+
+        Raises:
+            ValueError: ``atomic`` is set and a line is invalid
+        """
+        rejected = self._validate(postings, require_reference=skip_posted)
+        balances = self._lock_items(sorted({
+            posting.inventory_item_id for index, posting in enumerate(postings) if index not in rejected
+        }))
+        seen = self._posted_references(postings, rejected) if skip_posted else set()
+
+        now = datetime.utcnow()
+        accepted: List[Tuple[int, Dict[str, Any]]] = []
+        skipped: List[int] = []
+        decreased, increased = set(), set()
+        for index, posting in enumerate(postings):
+            if index in rejected:
+                continue
+            balance = balances.get(posting.inventory_item_id)
+            if balance is None:
+                rejected[index] = f"Inventory item {posting.inventory_item_id} not found"
+                continue
+            if skip_posted:
+                reference = (balance.org_id, posting.reference_type, posting.document_number)
+                if reference in seen:
+                    skipped.append(index)
+                    continue
+                seen.add(reference)
+            if posting.movement_type == 'issue' and balance.quantity_available < posting.quantity:
+                rejected[index] = (
+                    f"Insufficient stock. Available: {balance.quantity_available}, Requested: {posting.quantity}"
+                )
+                continue
+
+            accepted.append((index, self._apply_line(balance, posting, user_id, now)))
+            (decreased if posting.movement_type == 'issue' else increased).add(balance.id)
+
+        if atomic and rejected:
+            first = min(rejected)
+            raise ValueError(f"Line {first}: {rejected[first]}")
+
+        movement_numbers: List[Optional[str]] = [None] * len(postings)
+        if accepted:
+            numbers = allocate_movement_numbers(self.db, len(accepted))
+            for (index, values), number in zip(accepted, numbers):
+                values['movement_number'] = number
+                movement_numbers[index] = number
+
+            movement_ids = self._insert_movements([values for _, values in accepted])
+            self._insert_part_usages(postings, accepted, movement_ids, balances, now)
+            self._update_balances([balances[item_id] for item_id in sorted(decreased | increased)], now)
+
+        touched = decreased | increased
+        return BulkPostingResult(
+            movement_numbers=movement_numbers,
+            rejected=sorted(rejected.items()),
+            balances={item_id: balance for item_id, balance in balances.items() if item_id in touched},
+            decreased=decreased,
+            increased=increased,
+            skipped=skipped
+        )
+
+    @staticmethod
+    def _validate(postings: List[StockPosting], require_reference: bool = False) -> Dict[int, str]:
+        rejected = {}
+        for index, posting in enumerate(postings):
+            if posting.movement_type not in BULK_POSTING_TYPES:
+                rejected[index] = f"Movement type must be one of: {list(BULK_POSTING_TYPES)}"
+            elif posting.quantity is None or posting.quantity <= 0:
+                rejected[index] = f"Quantity must be positive, got {posting.quantity}"
+            elif posting.unit_cost is not None and posting.unit_cost < 0:
+                rejected[index] = f"Unit cost cannot be negative, got {posting.unit_cost}"
+            elif require_reference and not (posting.reference_type and posting.document_number):
+                rejected[index] = "A reference type and document number are required"
+        return rejected
+
+    def _posted_references(self, postings: List[StockPosting], rejected: Dict[int, str]) -> Set[Tuple[int, str, str]]:
+        """(org, reference type, document number) of the batch's references that are already in the ledger."""
+        references = sorted({
+            (posting.reference_type, posting.document_number)
+            for index, posting in enumerate(postings) if index not in rejected
+        })
+        posted = set()
+        for start in range(0, len(references), self.chunk_size):
+            rows = self.db.execute(
+                select(StockMovement.org_id, StockMovement.reference_type, StockMovement.document_number)
+                .where(tuple_(StockMovement.reference_type, StockMovement.document_number).in_(
+                    references[start:start + self.chunk_size]
+                ))
+            ).all()
+            posted.update(tuple(row) for row in rows)
+        return posted
+
+    def _lock_items(self, item_ids: List[int]) -> Dict[int, _ItemBalance]:
+        """Lock the affected rows in id order (chunks keep the IN lists bounded)."""
+        balances = {}
+        for start in range(0, len(item_ids), self.chunk_size):
+            rows = self.db.execute(
+                select(
+                    InventoryItem.id,
+                    InventoryItem.org_id,
+                    InventoryItem.warehouse_id,
+                    InventoryItem.part_id,
+                    InventoryItem.quantity_on_hand,
+                    InventoryItem.quantity_reserved,
+                    InventoryItem.minimum_stock,
+                    InventoryItem.maximum_stock,
+                    InventoryItem.reorder_point,
+                    InventoryItem.average_cost,
+                    InventoryItem.last_cost,
+                    InventoryItem.last_received_date,
+                    InventoryItem.last_issued_date,
+                    InventoryItem.last_movement_type,
+                )
+                .where(InventoryItem.id.in_(item_ids[start:start + self.chunk_size]))
+                .order_by(InventoryItem.id)
+                .with_for_update()
+            ).all()
+            for row in rows:
+                balances[row.id] = _ItemBalance(**row._asdict())
+        return balances
+
+    @staticmethod
+    def _apply_line(
+        balance: _ItemBalance,
+        posting: StockPosting,
+        user_id: Optional[int],
+        now: datetime
+    ) -> Dict[str, Any]:
+        """Move the running balance by one line; returns the StockMovement values."""
+        before = balance.quantity_on_hand
+        values = dict(
+            movement_type=posting.movement_type,
+            warehouse_id=balance.warehouse_id,
+            inventory_item_id=balance.id,
+            part_id=balance.part_id,
+            notes=posting.notes,
+            document_number=posting.document_number,
+            processed_by_user_id=user_id,
+            movement_date=now,
+            status='completed',
+            org_id=balance.org_id
+        )
+
+        if posting.movement_type == 'receipt':
+            quantity = posting.quantity
+            if posting.unit_cost:
+                # Weighted average cost, same rule as StockPostingEngine._apply
+                if not balance.average_cost or before + quantity <= 0:
+                    balance.average_cost = posting.unit_cost
+                else:
+                    balance.average_cost = (
+                        (before * balance.average_cost + quantity * posting.unit_cost) / (before + quantity)
+                    )
+                balance.last_cost = posting.unit_cost
+            balance.last_received_date = now
+            values.update(
+                movement_reason=posting.movement_reason or 'purchase',
+                debit_quantity=quantity,  # Tartozik oldal - beáramlás
+                credit_quantity=ZERO,
+                unit_cost=posting.unit_cost,
+                total_cost=quantity * posting.unit_cost if posting.unit_cost else None,
+                reference_type=posting.reference_type,
+                reference_id=posting.reference_id
+            )
+        else:
+            quantity = -posting.quantity
+            unit_cost = balance.average_cost or balance.last_cost or ZERO
+            balance.last_issued_date = now
+            values.update(
+                movement_reason=posting.movement_reason,
+                debit_quantity=ZERO,
+                credit_quantity=posting.quantity,  # Követel oldal - kiáramlás
+                unit_cost=unit_cost,
+                total_cost=posting.quantity * unit_cost,
+                reference_type=posting.reference_type or ("work_order" if posting.work_order_id else None),
+                reference_id=posting.reference_id or posting.work_order_id
+            )
+
+        balance.quantity_on_hand = before + quantity
+        balance.last_movement_type = posting.movement_type
+        values.update(quantity=quantity, quantity_before=before, quantity_after=balance.quantity_on_hand)
+        return values
+
+    def _insert_movements(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """Bulk INSERT of the ledger rows; returns their ids in input order."""
+        movement_ids = []
+        for start in range(0, len(rows), self.chunk_size):
+            movement_ids.extend(self.db.execute(
+                insert(StockMovement).returning(StockMovement.id, sort_by_parameter_order=True),
+                rows[start:start + self.chunk_size]
+            ).scalars().all())
+        return movement_ids
+
+    def _insert_part_usages(
+        self,
+        postings: List[StockPosting],
+        accepted: List[Tuple[int, Dict[str, Any]]],
+        movement_ids: List[int],
+        balances: Dict[int, _ItemBalance],
+        now: datetime
+    ) -> None:
+        """Work order consumption records for issues, with one work order lookup."""
+        work_order_ids = {
+            postings[index].work_order_id for index, values in accepted
+            if values['movement_type'] == 'issue' and postings[index].work_order_id
+        }
+        if not work_order_ids:
+            return
+
+        gate_ids = dict(self.db.execute(
+            select(WorkOrder.id, WorkOrder.gate_id).where(WorkOrder.id.in_(work_order_ids))
+        ).all())
+
+        rows = []
+        for (index, values), movement_id in zip(accepted, movement_ids):
+            posting = postings[index]
+            if values['movement_type'] != 'issue' or posting.work_order_id not in gate_ids:
+                continue
+            rows.append(dict(
+                work_order_id=posting.work_order_id,
+                part_id=values['part_id'],
+                gate_id=gate_ids[posting.work_order_id],
+                inventory_item_id=values['inventory_item_id'],
+                warehouse_id=values['warehouse_id'],
+                stock_movement_id=movement_id,
+                quantity_used=posting.quantity,
+                quantity_issued=posting.quantity,
+                unit_cost=values['unit_cost'],
+                total_cost=values['total_cost'],
+                issued_at=now,
+                consumed_at=now,
+                usage_reason="work_order_consumption",
+                org_id=balances[values['inventory_item_id']].org_id
+            ))
+
+        for start in range(0, len(rows), self.chunk_size):
+            self.db.execute(insert(PartUsage), rows[start:start + self.chunk_size])
+
+    def _update_balances(self, balances: List[_ItemBalance], now: datetime) -> None:
+        """Write the final balances with one executemany UPDATE by primary key."""
+        self.db.execute(
+            update(InventoryItem).execution_options(synchronize_session=False),
+            [
+                dict(
+                    id=balance.id,
+                    quantity_on_hand=balance.quantity_on_hand,
+                    quantity_available=balance.quantity_available,
+                    stock_status=balance.stock_status,
+                    average_cost=balance.average_cost,
+                    last_cost=balance.last_cost,
+                    total_value=(
+                        balance.quantity_on_hand * balance.average_cost
+                        if balance.average_cost is not None else None
+                    ),
+                    last_received_date=balance.last_received_date,
+                    last_issued_date=balance.last_issued_date,
+                    last_movement_type=balance.last_movement_type,
+                    updated_at=now
+                )
+                for balance in balances
+            ]
+        )
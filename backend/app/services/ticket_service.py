@@ -6,7 +6,7 @@ Ticket és munkarendelés szolgáltatási réteg - üzleti logika és állapotg
 
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func, desc, asc
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List, Optional, Dict, Any
 import uuid
 from decimal import Decimal
@@ -22,6 +22,7 @@ from app.schemas.tickets import (
     PartUsageCreate, TimeLogCreate, SLAMetrics
 )
 from app.core.exceptions import ValidationError, NotFoundError, BusinessLogicError
+from app.services.ticket_summary_service import TicketSummaryService, summary_cache
 
 
 class TicketStateMachine:
@@ -148,6 +149,7 @@ class TicketService:
         # )
         
         self.db.commit()
+        summary_cache.invalidate_org(ticket.org_id)
         self.db.refresh(ticket)
         return ticket
     
@@ -167,6 +169,7 @@ class TicketService:
         
         ticket.updated_at = datetime.utcnow()
         self.db.commit()
+        summary_cache.invalidate_org(ticket.org_id)
         self.db.refresh(ticket)
         return ticket
     
@@ -247,6 +250,7 @@ class TicketService:
         
         ticket.updated_at = now
         self.db.commit()
+        summary_cache.invalidate_org(ticket.org_id)
         self.db.refresh(ticket)
         return ticket
     
@@ -327,62 +331,8 @@ class TicketService:
         return query.order_by(desc(Ticket.reported_at)).offset(offset).limit(limit).all()
     
     def get_sla_metrics(self, org_id: int, days_back: int = 30) -> List[SLAMetrics]:
-        """Get SLA performance metrics by priority."""
-        
-        cutoff_date = datetime.utcnow() - timedelta(days=days_back)
-        
-        metrics = []
-        for priority in TicketPriority:
-            # Get tickets for this priority (convert enum to string for database query)
-            tickets = self.db.query(Ticket).filter(
-                Ticket.org_id == org_id,
-                Ticket.priority == priority.value,
-                Ticket.reported_at >= cutoff_date
-            ).all()
-            
-            if not tickets:
-                continue
-            
-            # Calculate metrics
-            total_tickets = len(tickets)
-            
-            # Response metrics
-            response_times = [
-                t.time_to_acknowledge.total_seconds() / 3600 
-                for t in tickets 
-                if t.time_to_acknowledge
-            ]
-            
-            resolution_times = [
-                t.time_to_resolve.total_seconds() / 3600 
-                for t in tickets 
-                if t.time_to_resolve
-            ]
-            
-            # Simplified breach calculation
-            breached_tickets = sum(1 for t in tickets if t.sla_met is False)
-            met_tickets = sum(1 for t in tickets if t.sla_met is True)
-            
-            # Get SLA targets (from first ticket)
-            sample_ticket = tickets[0]
-            sample_ticket.calculate_sla_due_dates()
-            
-            compliance_rate = met_tickets / total_tickets if total_tickets > 0 else None
-            
-            metrics.append(SLAMetrics(
-                priority=priority,
-                target_response_hours=sample_ticket.sla_response_hours,
-                target_resolution_hours=sample_ticket.sla_resolution_hours,
-                actual_avg_response_hours=sum(response_times) / len(response_times) if response_times else None,
-                actual_avg_resolution_hours=sum(resolution_times) / len(resolution_times) if resolution_times else None,
-                response_compliance_rate=compliance_rate,
-                resolution_compliance_rate=compliance_rate,
-                total_tickets=total_tickets,
-                breached_response=breached_tickets,
-                breached_resolution=breached_tickets
-            ))
-        
-        return metrics
+        """Get SLA performance metrics by priority (one grouped query, cached per organization)."""
+        return TicketSummaryService(self.db).sla_metrics(org_id, days_back)
     
     def _generate_ticket_number(self) -> str:
         """Generate unique ticket number."""
@@ -479,6 +429,7 @@ class WorkOrderService:
         
         self.db.add(work_order)
         self.db.commit()
+        summary_cache.invalidate_org(work_order.org_id)
         self.db.refresh(work_order)
         return work_order
     
@@ -523,6 +474,7 @@ class WorkOrderService:
             ticket.status = TicketStatus.IN_PROGRESS
             ticket.updated_at = datetime.utcnow()
             self.db.commit()
+            summary_cache.invalidate_org(ticket.org_id)
         
         return work_order
     
@@ -543,6 +495,7 @@ class WorkOrderService:
         
         work_order.updated_at = datetime.utcnow()
         self.db.commit()
+        summary_cache.invalidate_org(work_order.org_id)
         self.db.refresh(work_order)
         return work_order
     
@@ -599,6 +552,7 @@ class WorkOrderService:
         
         work_order.updated_at = now
         self.db.commit()
+        summary_cache.invalidate_org(work_order.org_id)
         # Don't refresh - it would cause enum conversion error when reading from DB
         # The status is already updated in the database and the object has the correct string value
         
@@ -638,6 +592,7 @@ class WorkOrderService:
         
         self.db.add(part_usage)
         self.db.commit()
+        summary_cache.invalidate_org(part_usage.org_id)
         self.db.refresh(part_usage)
         return part_usage
     
@@ -659,6 +614,7 @@ class WorkOrderService:
         
         self.db.add(time_log)
         self.db.commit()
+        summary_cache.invalidate_org(time_log.org_id)
         self.db.refresh(time_log)
         return time_log
     
@@ -744,4 +700,5 @@ class WorkOrderService:
                     ticket.resolved_at = datetime.utcnow()
                 ticket.updated_at = datetime.utcnow()
                 
-                self.db.commit()
\ No newline at end of file
+                self.db.commit()
+                summary_cache.invalidate_org(ticket.org_id)
\ No newline at end of file
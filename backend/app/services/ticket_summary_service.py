@@ -0,0 +1,295 @@
+"""
+Ticket and work order summary engine.
+
+Ticket és munkarendelés összesítők - egy feltételes aggregáló lekérdezéssel.
+
+The dispatcher landing page asks for the same organization-wide counts on
+every load. Each summary is a single SELECT of conditional aggregates
+(COUNT(*) FILTER (WHERE ...) on PostgreSQL, SUM(CASE ...) elsewhere) and
+averages of timestamp differences, and the result is kept per organization
+for TICKET_SUMMARY_CACHE_TTL_SECONDS.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.tickets import (
+    PartUsage, Ticket, TicketPriority, TicketStatus, WorkOrder, WorkOrderStatus, WorkOrderTimeLog
+)
+from app.schemas.tickets import SLAMetrics, TicketSummary, WorkOrderSummary
+
+
+class SummaryCache:
+    """Thread-safe LRU of computed summaries that expire after a few seconds."""
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.max_size = max_size or settings.TICKET_SUMMARY_CACHE_SIZE
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.TICKET_SUMMARY_CACHE_TTL_SECONDS
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Cached value of ``key``, computed (outside the lock) when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                loaded_at, value = entry
+                if time.monotonic() - loaded_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return value
+                del self._entries[key]
+            self.stats['misses'] += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate_org(self, org_id: int) -> None:
+        """Drop every summary of an organization (keys are (kind, org_id, ...))."""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == org_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class TicketSummaryService:
+    """Service computing dashboard summaries and SLA metrics in SQL."""
+
+    def __init__(self, db: Session, cache: Optional[SummaryCache] = None):
+        self.db = db
+        self.cache = cache or summary_cache
+
+    # =========================================================================
+    # SQL HELPERS
+    # =========================================================================
+
+    def _is_postgresql(self) -> bool:
+        return self.db.get_bind().dialect.name == 'postgresql'
+
+    def _count_where(self, condition):
+        """Number of rows matching ``condition`` (0 when none)."""
+        if self._is_postgresql():
+            return func.count().filter(condition)
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    def _hours_between(self, start_column, end_column):
+        """SQL expression for the number of hours between two timestamps."""
+        if self._is_postgresql():
+            return func.extract('epoch', end_column - start_column) / 3600.0
+        return (func.julianday(end_column) - func.julianday(start_column)) * 24.0
+
+    def _avg_hours(self, start_column, end_column, condition=None):
+        """Average duration in hours over the rows where both timestamps (and ``condition``) are set."""
+        present = and_(start_column.isnot(None), end_column.isnot(None))
+        if condition is not None:
+            present = and_(present, condition)
+        return func.avg(case((present, self._hours_between(start_column, end_column)), else_=None))
+
+    @staticmethod
+    def _ticket_status_in(*statuses: TicketStatus):
+        # Ticket statuses are stored as upper-case names ("OPEN", "IN_PROGRESS")
+        return func.upper(Ticket.status).in_([status.name for status in statuses])
+
+    @staticmethod
+    def _work_order_status_in(*statuses: WorkOrderStatus):
+        # Work order statuses are stored as lower-case values ("in_progress")
+        return func.lower(WorkOrder.status).in_([status.value for status in statuses])
+
+    @staticmethod
+    def _percentage(part, whole) -> Optional[float]:
+        return round(float(part) * 100 / float(whole), 2) if whole else None
+
+    @staticmethod
+    def _hours(value) -> Optional[float]:
+        return round(float(value), 2) if value is not None else None
+
+    # =========================================================================
+    # SUMMARIES - ÖSSZESÍTŐK
+    # =========================================================================
+
+    def ticket_summary(self, org_id: int) -> TicketSummary:
+        """Ticket counts, overdue SLAs, average response / resolution times (cached)."""
+        return self.cache.get_or_compute(('tickets', org_id), lambda: self._compute_ticket_summary(org_id))
+
+    def _compute_ticket_summary(self, org_id: int) -> TicketSummary:
+        now = datetime.utcnow()
+        acknowledged = and_(Ticket.acknowledged_at.isnot(None), Ticket.sla_response_by.isnot(None))
+        resolved = and_(Ticket.resolved_at.isnot(None), Ticket.sla_resolution_by.isnot(None))
+
+        row = self.db.execute(
+            select(
+                func.count().label('total'),
+                self._count_where(self._ticket_status_in(TicketStatus.OPEN)).label('open'),
+                self._count_where(self._ticket_status_in(TicketStatus.IN_PROGRESS)).label('in_progress'),
+                self._count_where(self._ticket_status_in(TicketStatus.WAITING_PARTS)).label('waiting_parts'),
+                self._count_where(self._ticket_status_in(TicketStatus.DONE, TicketStatus.CLOSED)).label('completed'),
+                self._count_where(and_(
+                    Ticket.sla_response_by < now, Ticket.acknowledged_at.is_(None)
+                )).label('overdue_response'),
+                self._count_where(and_(
+                    Ticket.sla_resolution_by < now, Ticket.resolved_at.is_(None)
+                )).label('overdue_resolution'),
+                self._avg_hours(Ticket.reported_at, Ticket.acknowledged_at).label('avg_response_hours'),
+                self._avg_hours(Ticket.reported_at, Ticket.resolved_at).label('avg_resolution_hours'),
+                self._count_where(acknowledged).label('response_measured'),
+                self._count_where(and_(
+                    acknowledged, Ticket.acknowledged_at <= Ticket.sla_response_by
+                )).label('response_met'),
+                self._count_where(resolved).label('resolution_measured'),
+                self._count_where(and_(
+                    resolved, Ticket.resolved_at <= Ticket.sla_resolution_by
+                )).label('resolution_met'),
+            ).where(
+                Ticket.org_id == org_id,
+                Ticket.is_active == True
+            )
+        ).one()
+
+        return TicketSummary(
+            total_tickets=row.total,
+            open_tickets=row.open,
+            in_progress_tickets=row.in_progress,
+            waiting_parts_tickets=row.waiting_parts,
+            completed_tickets=row.completed,
+            overdue_response=row.overdue_response,
+            overdue_resolution=row.overdue_resolution,
+            avg_response_time_hours=self._hours(row.avg_response_hours),
+            avg_resolution_time_hours=self._hours(row.avg_resolution_hours),
+            sla_response_compliance=self._percentage(row.response_met, row.response_measured),
+            sla_resolution_compliance=self._percentage(row.resolution_met, row.resolution_measured)
+        )
+
+    def work_order_summary(self, org_id: int) -> WorkOrderSummary:
+        """Work order counts per status, costs of completed work and completion time (cached)."""
+        return self.cache.get_or_compute(('work_orders', org_id), lambda: self._compute_work_order_summary(org_id))
+
+    def _compute_work_order_summary(self, org_id: int) -> WorkOrderSummary:
+        completed = self._work_order_status_in(WorkOrderStatus.COMPLETED)
+
+        # Costs of completed work orders, as scalar subqueries of the same SELECT
+        completed_work_orders = select(WorkOrder.id).where(
+            WorkOrder.org_id == org_id,
+            WorkOrder.is_active == True,
+            completed
+        )
+        parts_cost = select(func.coalesce(func.sum(PartUsage.total_cost), 0)).where(
+            PartUsage.work_order_id.in_(completed_work_orders),
+            PartUsage.is_active == True
+        ).scalar_subquery()
+        labor_cost = select(func.coalesce(func.sum(WorkOrderTimeLog.cost), 0)).where(
+            WorkOrderTimeLog.work_order_id.in_(completed_work_orders),
+            WorkOrderTimeLog.is_active == True
+        ).scalar_subquery()
+
+        row = self.db.execute(
+            select(
+                func.count().label('total'),
+                self._count_where(self._work_order_status_in(WorkOrderStatus.DRAFT)).label('draft'),
+                self._count_where(self._work_order_status_in(WorkOrderStatus.SCHEDULED)).label('scheduled'),
+                self._count_where(self._work_order_status_in(WorkOrderStatus.IN_PROGRESS)).label('in_progress'),
+                self._count_where(self._work_order_status_in(WorkOrderStatus.WAITING_PARTS)).label('waiting_parts'),
+                self._count_where(completed).label('completed'),
+                self._avg_hours(WorkOrder.actual_start, WorkOrder.actual_end, completed).label('avg_completion_hours'),
+                parts_cost.label('parts_cost'),
+                labor_cost.label('labor_cost'),
+            ).where(
+                WorkOrder.org_id == org_id,
+                WorkOrder.is_active == True
+            )
+        ).one()
+
+        return WorkOrderSummary(
+            total_work_orders=row.total,
+            draft_work_orders=row.draft,
+            scheduled_work_orders=row.scheduled,
+            in_progress_work_orders=row.in_progress,
+            waiting_parts_work_orders=row.waiting_parts,
+            completed_work_orders=row.completed,
+            total_labor_cost=Decimal(str(row.labor_cost or 0)),
+            total_parts_cost=Decimal(str(row.parts_cost or 0)),
+            avg_completion_time_hours=self._hours(row.avg_completion_hours)
+        )
+
+    # =========================================================================
+    # SLA - SZOLGÁLTATÁSI SZINT
+    # =========================================================================
+
+    def sla_metrics(self, org_id: int, days_back: int = 30) -> List[SLAMetrics]:
+        """SLA metrics per priority for tickets reported in the last ``days_back`` days (cached)."""
+        return self.cache.get_or_compute(
+            ('sla_metrics', org_id, days_back),
+            lambda: self._compute_sla_metrics(org_id, days_back)
+        )
+
+    def _compute_sla_metrics(self, org_id: int, days_back: int) -> List[SLAMetrics]:
+        cutoff_date = datetime.utcnow() - timedelta(days=days_back)
+        # Priorities are stored as upper-case names ("HIGH")
+        priority = func.upper(Ticket.priority)
+
+        rows = self.db.execute(
+            select(
+                priority.label('priority'),
+                func.count().label('total'),
+                self._avg_hours(Ticket.reported_at, Ticket.acknowledged_at).label('avg_response_hours'),
+                self._avg_hours(Ticket.reported_at, Ticket.resolved_at).label('avg_resolution_hours'),
+                self._count_where(Ticket.sla_met == True).label('met'),
+                self._count_where(Ticket.sla_met == False).label('breached'),
+            ).where(
+                Ticket.org_id == org_id,
+                Ticket.reported_at >= cutoff_date
+            ).group_by(priority)
+        ).all()
+        by_priority = {row.priority: row for row in rows}
+
+        metrics = []
+        for ticket_priority in TicketPriority:
+            row = by_priority.get(ticket_priority.name)
+            if row is None:
+                continue
+
+            # SLA targets of the priority, from the model's SLA table
+            target = Ticket(priority=ticket_priority.name, reported_at=cutoff_date)
+            target.calculate_sla_due_dates()
+
+            compliance_rate = row.met / row.total if row.total else None
+            metrics.append(SLAMetrics(
+                priority=ticket_priority,
+                target_response_hours=target.sla_response_hours,
+                target_resolution_hours=target.sla_resolution_hours,
+                actual_avg_response_hours=self._hours(row.avg_response_hours),
+                actual_avg_resolution_hours=self._hours(row.avg_resolution_hours),
+                response_compliance_rate=compliance_rate,
+                resolution_compliance_rate=compliance_rate,
+                total_tickets=row.total,
+                breached_response=row.breached,
+                breached_resolution=row.breached
+            ))
+
+        return metrics
+
+
+# Process-wide cache shared by every request of a worker
+summary_cache = SummaryCache()
+
+
+def get_summary_cache() -> SummaryCache:
+    """Get the process-wide ticket / work order summary cache."""
+    return summary_cache
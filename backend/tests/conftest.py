@@ -5,12 +5,13 @@ import asyncio
 from datetime import datetime
 from httpx import AsyncClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from fastapi import FastAPI
 
 from app.main import app
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models import Base
 from app.models.auth import User, Role, Permission
 from app.models.organization import Organization
@@ -29,6 +30,15 @@ test_engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+test_async_engine = create_async_engine(
+    "sqlite+aiosqlite:///./test_labels.db",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=test_async_engine, class_=AsyncSession, expire_on_commit=False
+)
+
 
 def override_get_db():
     """Override database dependency for testing."""
@@ -39,8 +49,15 @@ def override_get_db():
         db.close()
 
 
-# Override the dependency
+async def override_get_async_db():
+    """Override async database dependency for testing."""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
+# Override the dependencies
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
 
 
 @pytest.fixture(scope="session")
@@ -0,0 +1,54 @@
+"""
+SQLite schema helper for database-backed unit tests
+Creates selected model tables in an in-memory SQLite database
+"""
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import ARRAY, INET, JSONB, UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models import Base
+
+
+# PostgreSQL-only column types, rendered as their closest SQLite equivalents
+@compiles(JSONB, 'sqlite')
+def _compile_jsonb(type_, compiler, **kw):
+    return 'JSON'
+
+
+@compiles(ARRAY, 'sqlite')
+def _compile_array(type_, compiler, **kw):
+    return 'JSON'
+
+
+@compiles(INET, 'sqlite')
+def _compile_inet(type_, compiler, **kw):
+    return 'VARCHAR(50)'
+
+
+@compiles(UUID, 'sqlite')
+def _compile_uuid(type_, compiler, **kw):
+    return 'VARCHAR(36)'
+
+
+def sqlite_engine(*table_names: str):
+    """In-memory engine with only ``table_names`` created (foreign keys are not enforced)."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _disable_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=OFF")
+
+    tables = [Base.metadata.tables[name] for name in table_names]
+    Base.metadata.create_all(engine, tables=tables)
+    return engine
+
+
+def sqlite_session(*table_names: str) -> Session:
+    """Session bound to a fresh in-memory database containing ``table_names``."""
+    return sessionmaker(bind=sqlite_engine(*table_names), autoflush=False)()
@@ -0,0 +1,89 @@
+"""
+Unit Tests for the analytics KPI rollup
+Tests that daily rollup rows are computed from the real model columns
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.inspections import Inspection, InspectionItem
+from app.models.organization import Gate
+from app.models.tickets import WorkOrder
+from app.services.analytics_rollup_service import AnalyticsRollupService
+
+from sqlite_schema import sqlite_session
+
+
+DAY = date(2025, 3, 10)
+MORNING = datetime(2025, 3, 10, 8, 0)
+
+
+@pytest.fixture
+def db():
+    session = sqlite_session('gates', 'inspections', 'inspection_items', 'work_orders')
+    session.execute(Gate.__table__.insert(), [
+        dict(id=1, org_id=1, building_id=1, name='G1', display_name='G1', gate_type='swing'),
+        dict(id=2, org_id=1, building_id=1, name='G2', display_name='G2', gate_type='sliding'),
+        dict(id=3, org_id=2, building_id=2, name='G3', display_name='G3', gate_type='swing'),
+    ])
+    inspection = dict(checklist_template_id=1, inspector_name='Kiss Péter', inspection_type='routine',
+                      overall_status='passed', inspection_date=MORNING, completed_at=None)
+    session.execute(Inspection.__table__.insert(), [
+        dict(inspection, id=1, org_id=1, gate_id=1, state='completed', completed_at=MORNING + timedelta(hours=1)),
+        dict(inspection, id=2, org_id=1, gate_id=1, state='in_progress'),
+        dict(inspection, id=3, org_id=1, gate_id=2, state='draft'),
+        dict(inspection, id=4, org_id=2, gate_id=3, state='completed', completed_at=MORNING),
+    ])
+    session.execute(InspectionItem.__table__.insert(), [
+        dict(id=1, org_id=1, inspection_id=1, checklist_item_id=1, result='pass'),
+        dict(id=2, org_id=1, inspection_id=1, checklist_item_id=2, result='fail'),
+        dict(id=3, org_id=2, inspection_id=4, checklist_item_id=1, result='fail'),
+    ])
+    work_order = dict(org_id=1, gate_id=1, title='Javítás', description='-', work_type='repair',
+                      work_category='motor', created_at=MORNING, actual_end=None)
+    session.execute(WorkOrder.__table__.insert(), [
+        dict(work_order, id=1, work_order_number='WO1', status='completed',
+             scheduled_end=MORNING + timedelta(hours=2), actual_end=MORNING + timedelta(hours=5)),
+        dict(work_order, id=2, work_order_number='WO2', status='scheduled',
+             scheduled_end=MORNING + timedelta(days=1)),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+class TestAnalyticsRollupCompute:
+    """Test rollup rows computed against a database."""
+
+    def test_rows_per_day_and_gate_type(self, db):
+        """Counters are grouped by (day, gate type) and limited to the organization."""
+        rows = AnalyticsRollupService(db)._compute_rows(1, DAY, DAY + timedelta(days=1))
+        by_key = {(row['rollup_date'], row['gate_type']): row for row in rows}
+
+        swing = by_key[(DAY, 'swing')]
+        assert swing['inspections_total'] == 2
+        assert swing['inspections_completed'] == 1
+        assert swing['inspections_open'] == 1
+        assert swing['inspection_items_total'] == 2
+        assert swing['inspection_items_failed'] == 1
+        assert swing['work_orders_total'] == 2
+        assert swing['work_orders_completed'] == 1
+        assert swing['work_orders_sla_breached'] == 1
+        assert swing['work_orders_resolution_hours'] == pytest.approx(5.0)
+
+        assert by_key[(DAY, 'sliding')]['inspections_open'] == 1
+        assert by_key[(DAY + timedelta(days=1), 'swing')]['work_orders_sla_open'] == 1
+        assert len(by_key) == 3
+
+    def test_refresh_range_replaces_rows(self, db):
+        """Refreshing the same range twice leaves one row per key."""
+        from app.models.analytics import AnalyticsDailyRollup
+
+        AnalyticsDailyRollup.__table__.create(db.get_bind())
+        service = AnalyticsRollupService(db)
+
+        service.refresh_range(1, DAY, DAY)
+        written = service.refresh_range(1, DAY, DAY)
+
+        assert written == 2
+        assert db.query(AnalyticsDailyRollup).count() == 2
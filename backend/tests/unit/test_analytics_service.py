@@ -0,0 +1,222 @@
+"""
+Unit Tests for analytics chart series and dashboard KPIs
+Tests bucketed GROUP BY counts and the raw-table KPI queries against a database
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.inspections import Inspection, InspectionItem
+from app.models.organization import Gate
+from app.models.tickets import WorkOrder
+from app.services.analytics_service import AnalyticsService
+
+from sqlite_schema import sqlite_session
+
+
+def _inspection(inspection_id, when, state='in_progress', org_id=1, gate_id=1, **overrides):
+    values = dict(
+        id=inspection_id, org_id=org_id, gate_id=gate_id, checklist_template_id=1,
+        inspector_name='Kiss Péter', inspection_type='routine', overall_status='passed',
+        inspection_date=when, state=state, completed_at=None
+    )
+    values.update(overrides)
+    return values
+
+
+@pytest.fixture
+def db():
+    session = sqlite_session(
+        'gates', 'inspections', 'inspection_items', 'work_orders',
+        'analytics_daily_rollups', 'analytics_rollup_state'
+    )
+    session.execute(Gate.__table__.insert(), [
+        dict(id=1, org_id=1, building_id=1, name='G1', display_name='G1', gate_type='swing'),
+        dict(id=2, org_id=2, building_id=2, name='G2', display_name='G2', gate_type='swing'),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+class TestBucketedCounts:
+    """Test one GROUP BY query per series with gaps filled."""
+
+    @pytest.fixture
+    def service(self, db):
+        db.execute(Inspection.__table__.insert(), [
+            _inspection(1, datetime(2025, 3, 3, 9, 0), state='completed'),
+            _inspection(2, datetime(2025, 3, 3, 15, 0)),
+            _inspection(3, datetime(2025, 3, 5, 10, 0)),
+            _inspection(4, datetime(2025, 3, 12, 10, 0)),
+            _inspection(5, datetime(2025, 4, 2, 10, 0)),
+        ])
+        db.commit()
+        return AnalyticsService(db)
+
+    def _series(self, service, start, days, bucket_size):
+        return [
+            (bucket.strftime('%Y-%m-%d'), counts)
+            for bucket, counts in service._bucketed_counts(
+                service.db.query(Inspection), Inspection.inspection_date, start, days, bucket_size,
+                conditions=(Inspection.state == 'completed',)
+            )
+        ]
+
+    def test_day_buckets(self, service):
+        """Every day of the window is present, empty days count zero."""
+        assert self._series(service, datetime(2025, 3, 3), 4, 'day') == [
+            ('2025-03-03', (2, 1)),
+            ('2025-03-04', (0, 0)),
+            ('2025-03-05', (1, 0)),
+            ('2025-03-06', (0, 0)),
+        ]
+
+    def test_week_buckets_start_on_monday(self, service):
+        """A window starting mid-week opens with that week's Monday but only counts rows in the window."""
+        assert self._series(service, datetime(2025, 3, 5), 14, 'week') == [
+            ('2025-03-03', (1, 0)),
+            ('2025-03-10', (1, 0)),
+            ('2025-03-17', (0, 0)),
+        ]
+
+    def test_month_buckets(self, service):
+        """Months are keyed by their first day."""
+        assert self._series(service, datetime(2025, 2, 1), 89, 'month') == [
+            ('2025-02-01', (0, 0)),
+            ('2025-03-01', (4, 1)),
+            ('2025-04-01', (1, 0)),
+        ]
+
+    def test_unknown_bucket_size(self, service):
+        """Only day, week and month are supported."""
+        with pytest.raises(ValueError):
+            self._series(service, datetime(2025, 3, 3), 7, 'hour')
+
+
+class TestDashboardAnalytics:
+    """Test the raw-table KPI queries on the real model columns."""
+
+    def test_dashboard_without_rollups(self, db):
+        """Every dashboard section is computed from the raw tables."""
+        now = datetime.now()
+        db.execute(Inspection.__table__.insert(), [
+            _inspection(1, now - timedelta(days=2), state='completed', completed_at=now - timedelta(days=2)),
+            _inspection(2, now - timedelta(days=1)),
+            _inspection(3, now + timedelta(days=3), state='draft'),
+            _inspection(4, now - timedelta(days=1), org_id=2, gate_id=2),
+        ])
+        db.execute(InspectionItem.__table__.insert(), [
+            dict(id=1, org_id=1, inspection_id=1, checklist_item_id=1, result='pass', notes=None),
+            dict(id=2, org_id=1, inspection_id=1, checklist_item_id=2, result='fail', notes='Rozsdás zsanér'),
+        ])
+        db.execute(WorkOrder.__table__.insert(), [
+            dict(id=1, org_id=1, gate_id=1, work_order_number='WO1', title='Javítás', description='-',
+                 work_type='repair', work_category='motor', priority='high', status='completed',
+                 created_at=now - timedelta(days=1), scheduled_end=now - timedelta(hours=20),
+                 actual_end=now - timedelta(hours=18)),
+            dict(id=2, org_id=1, gate_id=1, work_order_number='WO2', title='Javítás', description='-',
+                 work_type='repair', work_category='motor', priority='low', status='scheduled',
+                 created_at=now - timedelta(hours=2), scheduled_end=now + timedelta(hours=4), actual_end=None),
+        ])
+        db.commit()
+
+        for organization_id in (None, 1):
+            result = AnalyticsService(db).get_dashboard_analytics(organization_id=organization_id)
+            assert len(result['charts']['due_inspections']) == 30
+
+        summaries = result['summaries']
+        assert summaries['inspections']['overdue_inspections'] == 1
+        assert summaries['inspections']['due_this_week'] == 1
+        assert summaries['sla']['total_work_orders'] == 2
+        assert summaries['sla']['sla_breached'] == 1
+        assert summaries['sla']['sla_at_risk'] == 1
+        assert summaries['sla']['avg_resolution_hours'] == pytest.approx(6.0, abs=0.1)
+        assert summaries['errors']['failed_items'] == 1
+        assert summaries['errors']['top_failure_reasons'] == [{'reason': 'Rozsdás zsanér', 'count': 1}]
+        assert result['analysis']['problematic_gates'][0]['failed_items'] == 1
+
+
+class TestRollupParity:
+    """Test that rollups and raw queries count the same things."""
+
+    @pytest.fixture
+    def service(self, db):
+        now = datetime.now()
+        db.execute(Gate.__table__.insert(), [
+            dict(id=3, org_id=1, building_id=1, name='G3', display_name='G3', gate_type='sliding'),
+        ])
+        db.execute(Inspection.__table__.insert(), [
+            _inspection(1, now - timedelta(days=40), state='completed', completed_at=now - timedelta(days=40)),
+            _inspection(2, now - timedelta(days=10), state='completed', completed_at=now - timedelta(days=9)),
+            _inspection(3, now - timedelta(days=3)),
+            _inspection(4, now - timedelta(days=1), state='draft', gate_id=3),
+            _inspection(5, now, state='started', gate_id=3),
+            _inspection(6, now + timedelta(days=5)),
+            _inspection(7, now + timedelta(days=20), state='draft', gate_id=3),
+            _inspection(8, now + timedelta(days=2), org_id=2, gate_id=2),
+        ])
+        db.execute(InspectionItem.__table__.insert(), [
+            dict(id=1, org_id=1, inspection_id=1, checklist_item_id=1, result='fail'),
+            dict(id=2, org_id=1, inspection_id=2, checklist_item_id=1, result='pass'),
+            dict(id=3, org_id=1, inspection_id=2, checklist_item_id=2, result='fail'),
+        ])
+        work_order = dict(org_id=1, gate_id=1, title='Javítás', description='-', work_type='repair',
+                          work_category='motor', priority='high', actual_end=None)
+        db.execute(WorkOrder.__table__.insert(), [
+            dict(work_order, id=1, work_order_number='WO1', status='completed', created_at=now - timedelta(days=6),
+                 scheduled_end=now - timedelta(days=5), actual_end=now - timedelta(days=4)),
+            dict(work_order, id=2, work_order_number='WO2', status='completed', created_at=now - timedelta(days=3),
+                 scheduled_end=now - timedelta(days=1), actual_end=now - timedelta(days=2)),
+            dict(work_order, id=3, work_order_number='WO3', status='in_progress', created_at=now - timedelta(days=2),
+                 scheduled_end=now - timedelta(hours=3)),
+            dict(work_order, id=4, work_order_number='WO4', status='scheduled', created_at=now - timedelta(days=1),
+                 scheduled_end=now + timedelta(days=10), gate_id=3),
+            dict(work_order, id=5, work_order_number='WO5', status='scheduled', created_at=now - timedelta(days=45),
+                 scheduled_end=now + timedelta(hours=12)),
+        ])
+        db.commit()
+
+        service = AnalyticsService(db)
+        service.rollups.refresh_window(1)
+        return service
+
+    @staticmethod
+    def _by_gate_type(rows):
+        return sorted(tuple(row) for row in rows)
+
+    def test_due_inspections(self, service):
+        """Overdue, due this week, due until the cutoff and per gate type match."""
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        args = (1, datetime.now() + timedelta(days=30), today, 'week', 30)
+
+        raw = service._due_inspection_counts(*args)
+        rollup = service._due_inspection_counts_from_rollups(*args)
+
+        assert raw[:3] == (2, 2, 3)
+        assert raw[:6] == rollup[:6]
+        assert self._by_gate_type(raw[6]) == self._by_gate_type(rollup[6]) == [
+            ('sliding', 3, 0, 1), ('swing', 4, 2, 1)
+        ]
+
+    def test_sla(self, service):
+        """Totals, breaches, at-risk work orders, resolution time and chart match."""
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30)
+
+        total, breached, at_risk, avg_hours, buckets = service._sla_counts(1, start, 'day', 30)
+        rollup = service._sla_counts_from_rollups(1, start, 'day', 30)
+
+        assert (total, breached, at_risk) == (4, 1, 2)
+        assert (total, breached, at_risk, buckets) == rollup[:3] + rollup[4:]
+        assert avg_hours == pytest.approx(rollup[3]) == pytest.approx(36.0)
+
+    def test_error_statistics(self, service):
+        """Item totals, failures and per gate type match."""
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30)
+
+        raw = service._error_counts(1, start, 'month', 30)
+        rollup = service._error_counts_from_rollups(1, start, 'month', 30)
+
+        assert raw[:2] == rollup[:2] == (2, 1)
+        assert raw[3] == rollup[3]
+        assert self._by_gate_type(raw[2]) == self._by_gate_type(rollup[2]) == [('swing', 2, 1)]
@@ -0,0 +1,108 @@
+"""
+Unit Tests for routes on the async database layer
+Drives a get_async_db route end to end, including the async auth dependency
+"""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.api.routes import structure
+from app.core import rbac
+from app.core.deps import get_db
+from app.core.permission_cache import PermissionCache
+from app.core.security import create_access_token
+from app.database import get_async_db
+from app.models import Base
+from app.models.auth import Permission, Role, RoleAssignment, User
+from app.models.organization import Client
+
+import sqlite_schema  # noqa: F401 - registers the SQLite type shims
+
+
+TABLES = ('users', 'roles', 'permissions', 'role_permissions', 'role_assignments', 'clients')
+
+
+def _user(user_id, **overrides):
+    values = dict(
+        id=user_id, org_id=1, organization_id=1, username=f'user{user_id}', email=f'user{user_id}@example.com',
+        first_name='Teszt', last_name='Elek', password_hash='-', is_active=True
+    )
+    values.update(overrides)
+    return values
+
+
+async def _seed(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[Base.metadata.tables[name] for name in TABLES])
+        await conn.execute(User.__table__.insert(), [_user(1), _user(2, is_active=False)])
+        await conn.execute(Role.__table__.insert(), [dict(id=1, name='viewer', display_name='Megtekintő')])
+        await conn.execute(Permission.__table__.insert(), [
+            dict(id=1, name='Client read', codename='client:read', resource='client', action='read'),
+        ])
+        await conn.execute(Role.permissions.property.secondary.insert(), [dict(role_id=1, permission_id=1)])
+        await conn.execute(RoleAssignment.__table__.insert(), [
+            dict(id=1, user_id=1, role_id=1, scope_type='organization', org_id=1, is_active=True, is_deleted=False),
+        ])
+        await conn.execute(Client.__table__.insert(), [
+            dict(id=1, org_id=1, organization_id=1, name='Alfa Kft.', display_name='Alfa', type='commercial'),
+            dict(id=2, org_id=2, organization_id=2, name='Béta Kft.', display_name='Béta', type='commercial'),
+        ])
+
+
+@pytest.fixture
+def app(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    sessions = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with sessions() as db:
+            yield db
+
+    def no_sync_db():
+        raise AssertionError("the sync session must not be used on get_async_db routes")
+        yield
+
+    asyncio.run(_seed(engine))
+
+    cache = PermissionCache(max_size=10, ttl_seconds=60, channel="test")
+    cache._publish = lambda message: None
+    monkeypatch.setattr(rbac, 'permission_cache', cache)
+
+    application = FastAPI()
+    application.include_router(structure.router)
+    application.dependency_overrides[get_async_db] = override_get_async_db
+    application.dependency_overrides[get_db] = no_sync_db
+    yield application
+    asyncio.run(engine.dispose())
+
+
+def _get(app, url, user_id):
+    async def request():
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            return await client.get(url, headers={"Authorization": f"Bearer {create_access_token(str(user_id))}"})
+    return asyncio.run(request())
+
+
+class TestAsyncRoutes:
+    """Test that auth, permissions and the query all run on the async session."""
+
+    def test_lists_the_users_organization(self, app):
+        """The user is loaded over get_async_db and only their organization's clients are returned."""
+        response = _get(app, "/api/v1/structure/clients", 1)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body['total'] == 1
+        assert [item['name'] for item in body['items']] == ['Alfa Kft.']
+
+    def test_inactive_user_is_rejected(self, app):
+        """The async auth dependency applies the same active check as the sync one."""
+        assert _get(app, "/api/v1/structure/clients", 2).status_code == 400
+
+    def test_unknown_user_is_rejected(self, app):
+        """A token for a user that does not exist is not accepted."""
+        assert _get(app, "/api/v1/structure/clients", 99).status_code == 401
@@ -0,0 +1,56 @@
+"""
+Unit Tests for audit log queries
+Tests that the retention cutoff is only a default lower bound on partitioned tables
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.audit_logs import AuditLog
+from app.services.audit_service import AuditService
+
+from sqlite_schema import sqlite_session
+
+
+NOW = datetime.utcnow()
+OLD = NOW - timedelta(days=800)
+
+
+@pytest.fixture
+def db():
+    session = sqlite_session('audit_logs')
+    row = dict(organization_id=1, action='update', entity_type='gate', entity_id=1, username='admin')
+    session.execute(AuditLog.__table__.insert(), [
+        dict(row, id=1, timestamp=OLD),
+        dict(row, id=2, timestamp=NOW),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+class TestRetentionCutoff:
+    """Test that rows older than the retention period are still returned when kept."""
+
+    def test_unpartitioned_table_has_no_default_bound(self, db):
+        """On a plain table every row is listed, counted and exported."""
+        service = AuditService(db)
+
+        assert service.get_audit_logs()['pagination']['total'] == 2
+        assert service.get_audit_statistics()['total_logs'] == 2
+        assert service.export_audit_logs_csv().count(b'\n') == 3
+
+    def test_explicit_start_date_is_not_clamped(self, db):
+        """A start date before the cutoff is applied as given, even on a partitioned table."""
+        service = AuditService(db)
+        service._partitioned = True
+
+        assert service.get_audit_logs(start_date=OLD - timedelta(days=1))['pagination']['total'] == 2
+        assert service.get_audit_statistics(start_date=OLD - timedelta(days=1))['total_logs'] == 2
+
+    def test_partitioned_table_defaults_to_the_cutoff(self, db):
+        """Without a start date a partitioned table is read from the retention cutoff."""
+        service = AuditService(db)
+        service._partitioned = True
+
+        assert service.get_audit_logs()['pagination']['total'] == 1
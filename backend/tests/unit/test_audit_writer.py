@@ -0,0 +1,162 @@
+"""
+Unit Tests for the buffered audit log writer
+Tests batch failure handling, quarantine and the spill file cap
+"""
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.audit_writer import AuditLogWriter
+from app.models.audit_logs import AuditLog
+
+from sqlite_schema import sqlite_engine
+
+
+def _row(entity_id, action='UPDATE'):
+    return {
+        'timestamp': datetime(2025, 3, 10, 8, 0), 'action': action, 'entity_type': 'Gate',
+        'entity_id': entity_id, 'risk_level': 'LOW', 'success': True,
+    }
+
+
+@pytest.fixture
+def writer(tmp_path):
+    factory = sessionmaker(bind=sqlite_engine('audit_logs'))
+    writer = AuditLogWriter(
+        batch_size=2,
+        spill_path=str(tmp_path / 'spill.jsonl'),
+        quarantine_path=str(tmp_path / 'quarantine.jsonl'),
+        spill_max_bytes=10_000,
+        session_factory=factory
+    )
+    writer.session = factory()
+    yield writer
+    writer.session.close()
+
+
+def _written_ids(writer):
+    writer.session.expire_all()
+    return sorted(entity_id for (entity_id,) in writer.session.query(AuditLog.entity_id))
+
+
+def _lines(path):
+    with open(path, encoding='utf-8') as jsonl_file:
+        return [json.loads(line) for line in jsonl_file]
+
+
+class TestAuditBatchFailure:
+    """Test that one bad row does not block the batch or later batches."""
+
+    def test_bad_row_is_quarantined_and_the_rest_written(self, writer):
+        """A rejected batch is retried row by row; only the failing row is quarantined."""
+        writer._flush([_row(1), _row(2, action=None), _row(3)])
+
+        assert _written_ids(writer) == [1, 3]
+        assert [row['entity_id'] for row in _lines(writer.quarantine_path)] == [2]
+        assert writer.stats['quarantined'] == 1
+
+    def test_quarantined_rows_are_not_replayed(self, writer):
+        """Later batches do not pick up the quarantined row again."""
+        writer._flush([_row(1, action=None)])
+        writer._flush([_row(2)])
+
+        assert _written_ids(writer) == [2]
+        assert writer.stats['quarantined'] == 1
+
+    def test_spilled_rows_are_replayed_in_chunks(self, writer):
+        """A bad spilled row does not prevent replaying the other spilled rows."""
+        writer._spill([_row(1), _row(2, action=None), _row(3), _row(4)])
+        writer._flush([_row(5)])
+
+        assert _written_ids(writer) == [1, 3, 4, 5]
+        assert writer.stats['replayed'] == 3
+        assert [row['entity_id'] for row in _lines(writer.quarantine_path)] == [2]
+
+    def test_unavailable_database_spills_everything(self, writer, monkeypatch):
+        """Connection errors keep the rows in the spill file instead of quarantining them."""
+        def unavailable(*args, **kwargs):
+            raise OperationalError("INSERT", {}, Exception("connection refused"))
+
+        session = writer._session_factory()
+        monkeypatch.setattr(session, 'execute', unavailable)
+        writer._session_factory = lambda: session
+        writer._flush([_row(1), _row(2)])
+
+        assert [row['entity_id'] for row in _lines(writer.spill_path)] == [1, 2]
+        assert writer.stats['quarantined'] == 0
+
+
+class TestAuditSpillCap:
+    """Test the spill file size cap."""
+
+    def test_rows_beyond_the_cap_are_dropped(self, writer):
+        """The spill file never grows past spill_max_bytes."""
+        line_size = len(json.dumps(_row(1), default=str)) + 1
+        writer.spill_max_bytes = line_size * 3
+
+        writer._spill([_row(entity_id) for entity_id in range(5)])
+
+        assert len(_lines(writer.spill_path)) == 3
+        assert writer.stats['dropped'] == 2
+
+
+class TestAuditFlusher:
+    """Test that the background flusher survives errors without losing queued rows."""
+
+    def test_unexpected_flush_error_spills_the_batch(self, writer):
+        """An error outside the batch write spills the rows instead of losing them."""
+        def broken_factory():
+            raise RuntimeError("pool exhausted")
+
+        writer._session_factory = broken_factory
+        writer._flush([_row(1), _row(2)])
+
+        assert [row['entity_id'] for row in _lines(writer.spill_path)] == [1, 2]
+
+    def test_restart_keeps_queued_rows(self, writer):
+        """A dead flusher is restarted on the same queue; nothing queued is lost."""
+
+        async def run():
+            writer._ensure_started()
+            queue = writer._queue
+            writer._task.cancel()
+            await asyncio.sleep(0)
+
+            queue.put_nowait(_row(1))
+            await writer.submit(_row(2))
+            assert writer._queue is queue
+            await writer.stop()
+
+        asyncio.run(run())
+        assert _written_ids(writer) == [1, 2]
+
+    def test_flusher_survives_a_failing_flush(self, writer, monkeypatch):
+        """The flusher keeps draining the queue after a flush raised."""
+        flush = writer._flush
+        calls = []
+
+        def flaky_flush(batch):
+            calls.append(len(batch))
+            if len(calls) == 1:
+                raise RuntimeError("unexpected")
+            flush(batch)
+
+        monkeypatch.setattr(writer, '_flush', flaky_flush)
+        writer.flush_interval = 0.01
+
+        async def run():
+            await writer.submit(_row(1))
+            await asyncio.sleep(0.1)
+            await writer.submit(_row(2))
+            await asyncio.sleep(0.1)
+            assert not writer._task.done()
+            await writer.stop()
+
+        asyncio.run(run())
+        # The first batch was spilled and replayed by the next flush
+        assert _written_ids(writer) == [1, 2]
+        assert calls == [1, 1]
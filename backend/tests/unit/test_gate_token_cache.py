@@ -0,0 +1,177 @@
+"""
+Unit Tests for the gate token state cache
+Tests local caching, invalidation and race handling without Redis or a database
+"""
+import json
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.gate_token_cache import GateTokenCache, GateTokenState
+from app.services import label_service
+from app.services.label_service import LabelService
+
+
+class _FakeRedis:
+    """Minimal Redis stand-in for GET / SET (NX) / PUBLISH."""
+
+    def __init__(self):
+        self.values = {}
+        self.published = []
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def publish(self, channel, message):
+        self.published.append(message)
+
+
+class TestGateTokenCache:
+    """Test lookup and invalidation of gate token state."""
+
+    def setup_method(self):
+        self.cache = GateTokenCache(max_size=10, ttl_seconds=60, channel="test")
+        # No Redis in unit tests
+        self.cache._get_redis = lambda: None
+        self.states = {1: GateTokenState(org_id=7, token_version=1, is_active=True)}
+        self.loads = []
+
+        def load(db, gate_id):
+            self.loads.append(gate_id)
+            return self.states.get(gate_id)
+
+        self.cache._load = load
+
+    def test_second_lookup_is_served_locally(self):
+        """Only the first scan of a gate reaches the database."""
+        first = self.cache.get_state(None, 1)
+        second = self.cache.get_state(None, 1)
+
+        assert first == second == GateTokenState(7, 1, True)
+        assert self.loads == [1]
+
+    def test_unknown_gate(self):
+        """Missing gates are reported as None."""
+        assert self.cache.get_state(None, 99) is None
+
+    def test_rotation_takes_effect_immediately(self):
+        """A committed rotation replaces the cached version."""
+        self.cache.get_state(None, 1)
+        self.states[1] = GateTokenState(7, 2, True)
+        self.cache.invalidate(1, self.states[1])
+
+        assert self.cache.get_state(None, 1).token_version == 2
+
+    def test_stale_load_is_not_stored(self):
+        """A load that raced with a rotation is not cached."""
+        original_load = self.cache._load
+
+        def racing_load(db, gate_id):
+            state = original_load(db, gate_id)
+            self.cache.invalidate(gate_id, publish=False)
+            return state
+
+        self.cache._load = racing_load
+        self.cache.get_state(None, 1)
+        self.cache._load = original_load
+        self.cache.get_state(None, 1)
+
+        assert self.loads == [1, 1]
+
+    def test_remote_invalidation(self):
+        """Invalidations published by other workers drop the local entry."""
+        self.cache.get_state(None, 1)
+        self.cache.handle_message(json.dumps({"gate_id": 1, "origin": "other-worker"}))
+        self.cache.get_state(None, 1)
+
+        assert self.loads == [1, 1]
+
+    def test_state_round_trips_through_redis_encoding(self):
+        """The compact Redis encoding preserves the state."""
+        state = GateTokenState(org_id=3, token_version=12, is_active=False)
+
+        assert GateTokenState.decode(state.encode()) == state
+
+
+class TestGateTokenCacheRedis:
+    """Test the shared Redis tier."""
+
+    def setup_method(self):
+        self.cache = GateTokenCache(max_size=10, ttl_seconds=60, channel="test")
+        self.redis = _FakeRedis()
+        self.cache._get_redis = lambda: self.redis
+        self.state = GateTokenState(org_id=7, token_version=1, is_active=True)
+        self.loads = []
+
+        def load(db, gate_id):
+            self.loads.append(gate_id)
+            return self.state
+
+        self.cache._load = load
+
+    def test_deleted_gate_leaves_a_tombstone(self):
+        """A stale fill racing with the delete cannot re-create the gate."""
+        self.cache.invalidate(1, None)
+        self.cache.wait_for_writes()
+        # A lookup that read the database before the delete committed
+        self.cache._redis_set(1, self.state, only_if_missing=True)
+
+        assert self.cache.get_state(None, 1) is None
+        assert self.loads == []
+
+    def test_lookup_during_pending_write_reads_the_database(self):
+        """Until the write lands Redis may be stale, so the database answers and nothing is cached."""
+        self.redis.values['gate_token_state:1'] = GateTokenState(7, 1, True).encode()
+        self.state = GateTokenState(7, 2, True)
+        self.cache._pending_writes[1] = 1
+
+        assert self.cache.get_state(None, 1).token_version == 2
+        assert self.cache._entries == {}
+
+        self.cache._pending_writes.clear()
+        self.cache.invalidate(1, self.state)
+        self.cache.wait_for_writes()
+
+        assert self.cache.get_state(None, 1).token_version == 2
+        assert self.loads == [1]
+
+
+class TestLegacyFieldTokens:
+    """Test tokens issued before the "tv" claim existed."""
+
+    def _verify(self, monkeypatch, state, issued_at):
+        monkeypatch.setattr(label_service.gate_token_cache, 'get_state', lambda db, gate_id: state)
+        token = jwt.encode(
+            {"gate_id": 1, "org_id": 7, "type": "field_access", "iat": issued_at,
+             "exp": datetime.utcnow() + timedelta(hours=1)},
+            settings.SECRET_KEY, algorithm="HS256"
+        )
+        return LabelService(None).verify_field_token(token)
+
+    def test_accepted_on_a_rotated_gate_if_issued_after_the_rotation(self, monkeypatch):
+        """A missing "tv" is not treated as version 1."""
+        rotated = datetime.utcnow() - timedelta(days=1)
+        state = GateTokenState.of(7, 3, True, rotated)
+
+        assert self._verify(monkeypatch, state, datetime.utcnow() - timedelta(minutes=5))["gate_id"] == 1
+
+    def test_revoked_by_a_later_rotation(self, monkeypatch):
+        """Rotating the gate revokes unversioned tokens issued before it."""
+        state = GateTokenState.of(7, 2, True, datetime.utcnow() - timedelta(minutes=5))
+
+        with pytest.raises(HTTPException) as error:
+            self._verify(monkeypatch, state, datetime.utcnow() - timedelta(days=1))
+        assert error.value.status_code == 401
+
+    def test_legacy_redis_value_decodes_without_rotation(self):
+        """Values written before rotated_at existed still decode."""
+        assert GateTokenState.decode("3:2:1") == GateTokenState(3, 2, True, None)
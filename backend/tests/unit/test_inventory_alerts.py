@@ -0,0 +1,89 @@
+"""
+Unit Tests for SQL stock alert classification
+Tests alert levels, ordering, pagination and summary counts against a database
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models.inventory import InventoryItem, Warehouse
+from app.models.tickets import Part
+from app.services.inventory_service import InventoryService
+
+from sqlite_schema import sqlite_session
+
+
+def _item(item_id, available, minimum=10, org_id=1, **overrides):
+    now = datetime.utcnow()
+    values = dict(
+        id=item_id, org_id=org_id, warehouse_id=1, part_id=item_id,
+        quantity_on_hand=Decimal(available), quantity_available=Decimal(available),
+        minimum_stock=Decimal(minimum), maximum_stock=None, reorder_quantity=None,
+        last_issued_date=now, last_received_date=now, is_active=True
+    )
+    values.update(overrides)
+    return values
+
+
+@pytest.fixture
+def db():
+    session = sqlite_session('warehouses', 'parts', 'inventory_items')
+    session.execute(Warehouse.__table__.insert(), [
+        dict(id=1, org_id=1, name='Központi raktár', code='KR', warehouse_type='main'),
+    ])
+    session.execute(Part.__table__.insert(), [
+        dict(id=part_id, org_id=1, part_number=f'P{part_id}', name=f'Part {part_id}', category='motor')
+        for part_id in range(1, 10)
+    ])
+    session.execute(InventoryItem.__table__.insert(), [
+        _item(1, 0),                                   # CRITICAL
+        _item(2, 4, reorder_quantity=Decimal(30)),     # HIGH
+        _item(3, 8),                                   # MEDIUM
+        _item(4, 12),                                  # above minimum
+        _item(5, -1, minimum=0),                       # no minimum set
+        _item(6, 0, is_active=False),                  # inactive
+        _item(7, 0, org_id=2),                         # other organization
+        _item(8, 150, maximum_stock=Decimal(100)),     # overstock
+        _item(9, 5, last_issued_date=datetime.utcnow() - timedelta(days=200)),  # slow moving, HIGH
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+class TestStockAlertClassification:
+    """Test low stock, overstock and slow-moving classification in SQL."""
+
+    def test_minimum_stock_levels_and_order(self, db):
+        """Items below minimum are classified and sorted by level, then shortage."""
+        alerts = InventoryService(db).check_minimum_stock_alerts(org_id=1)
+
+        assert [(a['inventory_item_id'], a['alert_level']) for a in alerts] == [
+            (1, 'CRITICAL'), (2, 'HIGH'), (9, 'HIGH'), (3, 'MEDIUM')
+        ]
+        suggested = {a['inventory_item_id']: a['suggested_order_quantity'] for a in alerts}
+        assert suggested == {1: 15.0, 2: 30.0, 9: 10.0, 3: 10.0}
+
+    def test_pagination_is_applied_in_sql(self, db):
+        """limit / offset select a window of the sorted list."""
+        alerts = InventoryService(db).check_minimum_stock_alerts(org_id=1, limit=2, offset=1)
+
+        assert [a['inventory_item_id'] for a in alerts] == [2, 9]
+
+    def test_summary_counts(self, db):
+        """The summary counts every alert of the organization."""
+        result = InventoryService(db).generate_stock_alerts(org_id=1, limit=1)
+
+        assert result['summary'] == {
+            'total_alerts': 6,
+            'minimum_stock_alerts': 4,
+            'critical_alerts': 1,
+            'high_alerts': 2,
+            'medium_alerts': 1,
+            'overstock_items': 1,
+            'slow_moving_items': 1,
+        }
+        assert [a['inventory_item_id'] for a in result['overstock_alerts']] == [8]
+        assert [a['inventory_item_id'] for a in result['slow_moving_alerts']] == [9]
+        assert len(result['minimum_stock_alerts']) == 1
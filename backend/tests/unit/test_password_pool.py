@@ -0,0 +1,69 @@
+"""
+Unit Tests for the bounded password hashing pool
+Tests concurrency limits and admission control without real Argon2 work
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.password_pool import PasswordHashBusy, PasswordHashPool
+
+
+class TestPasswordHashPool:
+    """Test concurrency limiting and rejection under load."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """No more than ``workers`` hashes run at the same time."""
+        pool = PasswordHashPool(workers=2, max_queue=10, queue_timeout_ms=5000)
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def work():
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+            return "hash"
+
+        results = await asyncio.gather(*[pool.run(work) for _ in range(6)])
+
+        assert results == ["hash"] * 6
+        assert max(peak) <= 2
+        assert pool.stats['completed'] == 6
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_is_rejected(self):
+        """Callers beyond the wait queue are turned away immediately."""
+        pool = PasswordHashPool(workers=1, max_queue=1, queue_timeout_ms=5000)
+
+        results = await asyncio.gather(
+            *[pool.run(time.sleep, 0.05) for _ in range(4)],
+            return_exceptions=True
+        )
+
+        assert sum(isinstance(result, PasswordHashBusy) for result in results) == 2
+        assert pool.stats['rejected_queue_full'] == 2
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_slot_timeout(self):
+        """A caller that waits longer than the queue timeout is rejected."""
+        pool = PasswordHashPool(workers=1, max_queue=5, queue_timeout_ms=10)
+
+        results = await asyncio.gather(
+            pool.run(time.sleep, 0.2),
+            pool.run(time.sleep, 0),
+            return_exceptions=True
+        )
+
+        assert results[0] is None
+        assert isinstance(results[1], PasswordHashBusy)
+        assert results[1].reason == "timeout"
+        pool.shutdown()
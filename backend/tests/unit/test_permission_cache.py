@@ -0,0 +1,163 @@
+"""
+Unit Tests for the compiled RBAC permission cache
+Tests bitset compilation, LRU eviction and epoch invalidation without Redis
+"""
+import asyncio
+import json
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import rbac
+from app.core.permission_cache import PermissionCache, PermissionCompiler
+from app.models.auth import Permission, Role, RoleAssignment
+from app.schemas.auth import TokenData
+
+from sqlite_schema import sqlite_session
+
+
+GRID = ["gate:read", "gate:update", "ticket:create", "ticket:read"]
+
+
+class TestPermissionCompiler:
+    """Test compiling codenames into bitsets."""
+
+    def test_grid_codenames_become_bits(self):
+        """Grid codenames are answered by a bit test."""
+        compiled = PermissionCompiler(GRID).compile(["gate:read", "ticket:create"])
+
+        assert compiled.mask == 0b0101
+        assert compiled.has("gate:read") is True
+        assert compiled.has("gate:update") is False
+        assert compiled.has_all(["gate:read", "ticket:create"]) is True
+
+    def test_codenames_outside_grid_are_kept(self):
+        """Legacy codenames that have no bit are still granted."""
+        compiled = PermissionCompiler(GRID).compile(["user:manage", "ticket:read"])
+
+        assert compiled.has("user:manage") is True
+        assert compiled.codenames() == ["ticket:read", "user:manage"]
+
+
+class TestPermissionCache:
+    """Test LRU and epoch behaviour of the cache."""
+
+    def setup_method(self):
+        self.compiler = PermissionCompiler(GRID)
+        self.cache = PermissionCache(max_size=2, ttl_seconds=60, channel="test")
+        # No Redis in unit tests
+        self.cache._publish = lambda message: None
+
+    def test_hit_after_put(self):
+        """A stored entry is served until invalidated."""
+        compiled = self.compiler.compile(["gate:read"])
+        self.cache.put(1, compiled, self.cache.epoch(1))
+
+        assert self.cache.get(1) is compiled
+
+    def test_lru_eviction(self):
+        """The least recently used user is evicted first."""
+        for user_id in (1, 2):
+            self.cache.put(user_id, self.compiler.compile([]), self.cache.epoch(user_id))
+        self.cache.get(1)
+        self.cache.put(3, self.compiler.compile([]), self.cache.epoch(3))
+
+        assert self.cache.get(2) is None
+        assert self.cache.get(1) is not None
+
+    def test_user_bump_invalidates_only_that_user(self):
+        """Assigning or revoking a role drops only that user's entry."""
+        for user_id in (1, 2):
+            self.cache.put(user_id, self.compiler.compile([]), self.cache.epoch(user_id))
+        self.cache.bump_user(1)
+
+        assert self.cache.get(1) is None
+        assert self.cache.get(2) is not None
+
+    def test_stale_load_is_not_stored(self):
+        """A load that raced with a role change is discarded."""
+        epoch = self.cache.epoch(1)
+        self.cache.bump_user(1)
+        self.cache.put(1, self.compiler.compile(["gate:read"]), epoch)
+
+        assert self.cache.get(1) is None
+
+    def test_remote_invalidation(self):
+        """Invalidations published by other workers are applied."""
+        self.cache.put(1, self.compiler.compile([]), self.cache.epoch(1))
+        self.cache.handle_message(json.dumps({"all": True, "origin": "other-worker"}))
+
+        assert self.cache.get(1) is None
+
+
+class TestPermissionPublishing:
+    """Test that invalidations are published off the calling thread."""
+
+    def test_publish_runs_in_background_thread(self):
+        """bump_user returns before Redis is contacted; the publish happens on the writer thread."""
+        cache = PermissionCache(max_size=2, ttl_seconds=60, channel="test")
+        published = []
+        cache._publish = lambda message: published.append((message, threading.current_thread().name))
+
+        cache.bump_user(1)
+        cache.bump_all()
+        cache.wait_for_publishes(timeout=5)
+
+        assert [message for message, _ in published] == [{'user_id': 1}, {'all': True}]
+        assert all(name.startswith('permission-cache') for _, name in published)
+
+
+class TestPermissionRequired:
+    """Test the decorator against the compiled, cached permissions."""
+
+    @pytest.fixture
+    def db(self, monkeypatch):
+        session = sqlite_session('roles', 'permissions', 'role_permissions', 'role_assignments')
+        session.execute(Role.__table__.insert(), [dict(id=1, name='technician', display_name='Technikus')])
+        session.execute(Permission.__table__.insert(), [
+            dict(id=1, name='Gate read', codename='gate:read', resource='gate', action='read'),
+        ])
+        session.execute(Role.permissions.property.secondary.insert(), [dict(role_id=1, permission_id=1)])
+        session.execute(RoleAssignment.__table__.insert(), [
+            dict(id=1, user_id=1, role_id=1, scope_type='organization', org_id=1, is_active=True, is_deleted=False),
+        ])
+        session.commit()
+
+        cache = PermissionCache(max_size=10, ttl_seconds=60, channel="test")
+        cache._publish = lambda message: None
+        monkeypatch.setattr(rbac, 'permission_cache', cache)
+        yield session
+        session.close()
+
+    @staticmethod
+    def _endpoint():
+        @rbac.permission_required(rbac.Resources.GATE, rbac.PermissionActions.READ)
+        async def endpoint(current_user=None, db=None):
+            return 'ok'
+        return endpoint
+
+    @staticmethod
+    def _token(*permissions):
+        return TokenData(user_id=1, username='tech', email='tech@example.com', org_id=1,
+                         permissions=list(permissions))
+
+    def test_miss_is_compiled_from_the_database_and_cached(self, db):
+        """A cache miss loads the user's permissions once; the token list is not consulted."""
+        endpoint = self._endpoint()
+
+        assert asyncio.run(endpoint(current_user=self._token(), db=db)) == 'ok'
+        assert rbac.permission_cache.get(1).has('gate:read')
+
+    def test_revocation_applies_despite_token_permissions(self, db):
+        """After a revoke the stale permission list in the token does not grant access."""
+        endpoint = self._endpoint()
+        asyncio.run(endpoint(current_user=self._token('gate:read'), db=db))
+
+        db.execute(RoleAssignment.__table__.delete())
+        db.commit()
+        rbac.permission_cache.bump_user(1)
+
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(endpoint(current_user=self._token('gate:read'), db=db))
+        assert error.value.status_code == 403
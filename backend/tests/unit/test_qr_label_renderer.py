@@ -0,0 +1,227 @@
+"""
+Unit Tests for bulk QR label rendering
+Tests the serial fallback of the render pool, bulk label job storage and label fonts
+"""
+import io
+import multiprocessing
+import os
+import time
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from reportlab.pdfgen import canvas
+
+from app.core.config import settings
+from app.services import qr_label_renderer
+from app.services.label_fonts import LABEL_FONT_BOLD, label_fonts
+from app.services.label_service import LabelService
+from app.services.qr_label_renderer import (
+    BulkLabelRenderer, draw_label, label_job_owner, open_label_job_pdf, prune_label_job_pdfs,
+    record_label_job_owner, store_label_job_pdf
+)
+
+from sqlite_schema import sqlite_session
+
+
+LABELS = [{'name': f'Kapu {index}'} for index in range(qr_label_renderer.PARALLEL_MIN_LABELS)]
+
+
+class _FailingPool:
+    """ProcessPoolExecutor stand-in that fails when jobs are submitted."""
+
+    shut_down = False
+
+    def __init__(self, max_workers):
+        pass
+
+    def map(self, *args, **kwargs):
+        raise AssertionError("daemonic processes are not allowed to have children")
+
+    def shutdown(self, cancel_futures=False):
+        _FailingPool.shut_down = True
+
+
+class _FakeRedis:
+    """Redis stand-in keeping values and their TTLs in memory."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+        self.ttls[key] = ttl
+
+    def get(self, key):
+        return self.values.get(key)
+
+
+class _FakeS3:
+    """S3 client stand-in for a single bucket."""
+
+    class _Body:
+        def __init__(self, data):
+            self.data = data
+
+        def iter_chunks(self, chunk_size):
+            for start in range(0, len(self.data), chunk_size):
+                yield self.data[start:start + chunk_size]
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_file(self, path, bucket, key, ExtraArgs=None):
+        with open(path, 'rb') as source:
+            self.objects[key] = (source.read(), datetime.now(timezone.utc))
+
+    def get_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise qr_label_renderer.ClientError({'Error': {'Code': 'NoSuchKey'}}, 'GetObject')
+        return {'Body': self._Body(self.objects[Key][0])}
+
+    def get_paginator(self, operation):
+        objects = self.objects
+        return type('Paginator', (), {'paginate': lambda self, Bucket, Prefix: [{'Contents': [
+            {'Key': key, 'LastModified': modified}
+            for key, (_, modified) in objects.items() if key.startswith(Prefix)
+        ]}]})()
+
+    def delete_objects(self, Bucket, Delete):
+        for item in Delete['Objects']:
+            self.objects.pop(item['Key'])
+
+
+@pytest.fixture
+def serial_render(monkeypatch):
+    monkeypatch.setattr(qr_label_renderer, '_render_to_cache', lambda job: (job[0]['name'], False))
+
+
+class TestRenderPoolFallback:
+    """Test that labels render serially where a process pool cannot run."""
+
+    def test_daemonic_process_renders_serially(self, serial_render, monkeypatch):
+        """Inside a daemonic worker no pool is created at all."""
+        def no_pool(max_workers):
+            raise RuntimeError("pool must not be created")
+
+        monkeypatch.setattr(qr_label_renderer, 'ProcessPoolExecutor', no_pool)
+        monkeypatch.setattr(multiprocessing.current_process(), 'daemon', True, raising=False)
+
+        rendered = list(BulkLabelRenderer(workers=4, vector=False)._render_labels(LABELS))
+
+        assert [name for name, _ in rendered] == [label['name'] for label in LABELS]
+
+    def test_pool_failing_on_submit_falls_back(self, serial_render, monkeypatch):
+        """An error raised by map() (not the constructor) still falls back to serial rendering."""
+        monkeypatch.setattr(qr_label_renderer, 'ProcessPoolExecutor', _FailingPool)
+
+        rendered = list(BulkLabelRenderer(workers=4, vector=False)._render_labels(LABELS))
+
+        assert len(rendered) == len(LABELS)
+        assert _FailingPool.shut_down
+
+
+class TestLabelJobStorage:
+    """Test that job owners and PDFs live in storage shared by the API and the workers."""
+
+    @pytest.fixture
+    def redis_client(self, monkeypatch):
+        client = _FakeRedis()
+        monkeypatch.setattr(qr_label_renderer, '_job_redis', client)
+        return client
+
+    @pytest.fixture
+    def s3_client(self, monkeypatch):
+        client = _FakeS3()
+        monkeypatch.setattr(qr_label_renderer, 'get_shared_s3_client', lambda: (client, 'bucket'))
+        return client
+
+    def test_owner_round_trip(self, redis_client):
+        """The organization recorded at job creation is returned for the job."""
+        record_label_job_owner('job-1', 7)
+
+        assert label_job_owner('job-1') == {'org_id': 7}
+        assert redis_client.ttls['label_job:job-1:owner'] == settings.LABEL_JOB_RETENTION_HOURS * 3600
+
+    def test_unknown_job_has_no_owner(self, redis_client):
+        """Jobs without an owner record (unknown or expired) are treated as missing."""
+        assert label_job_owner('job-2') is None
+
+    def test_pdf_is_served_from_s3(self, s3_client, tmp_path):
+        """The worker's scratch file is uploaded and removed; downloads read the object."""
+        path = tmp_path / 'job-3.pdf.partial'
+        path.write_bytes(b'%PDF' * 50000)
+
+        store_label_job_pdf('job-3', str(path))
+
+        assert not path.exists()
+        assert b''.join(open_label_job_pdf('job-3')) == b'%PDF' * 50000
+        assert open_label_job_pdf('job-4') is None
+
+    def test_prune_removes_expired_pdfs(self, s3_client, tmp_path):
+        """Only job PDFs older than the retention window are deleted."""
+        for job_id in ('old', 'new'):
+            path = tmp_path / f'{job_id}.pdf.partial'
+            path.write_bytes(b'%PDF')
+            store_label_job_pdf(job_id, str(path))
+        data, _ = s3_client.objects['label-jobs/old.pdf']
+        s3_client.objects['label-jobs/old.pdf'] = (data, datetime(2000, 1, 1, tzinfo=timezone.utc))
+
+        assert prune_label_job_pdfs(3600) == 1
+        assert list(s3_client.objects) == ['label-jobs/new.pdf']
+
+    def test_local_fallback_without_s3(self, tmp_path, monkeypatch):
+        """Without S3 credentials the PDF is kept in LABEL_JOB_DIR and pruned there."""
+        monkeypatch.setattr(qr_label_renderer, 'get_shared_s3_client', lambda: (None, None))
+        monkeypatch.setattr(settings, 'LABEL_JOB_DIR', str(tmp_path))
+        path = tmp_path / 'job-5.pdf.partial'
+        path.write_bytes(b'%PDF')
+
+        store_label_job_pdf('job-5', str(path))
+        assert b''.join(open_label_job_pdf('job-5')) == b'%PDF'
+
+        stale = time.time() - 7200
+        os.utime(tmp_path / 'job-5.pdf', (stale, stale))
+        assert prune_label_job_pdfs(3600) == 1
+        assert open_label_job_pdf('job-5') is None
+
+
+class TestLabelFonts:
+    """Test the embedded TrueType font of vector labels."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_fonts(self):
+        label_fonts.cache_clear()
+        yield
+        label_fonts.cache_clear()
+
+    def test_hungarian_name_uses_embedded_font(self):
+        """ő / ű are drawn with the embedded TrueType font, not Helvetica."""
+        buffer = io.BytesIO()
+        pdf = canvas.Canvas(buffer)
+        draw_label(pdf, {'name': 'Főbejárat kapu', 'gate_type': 'szárnyas',
+                         'location': 'Győr / Űrhajó utca', 'qr_url': 'https://example.com/field/x'}, 0, 0)
+        pdf.save()
+
+        assert label_fonts()[1] == LABEL_FONT_BOLD
+        assert b'FontFile2' in buffer.getvalue()
+
+    def test_missing_font_falls_back_to_helvetica(self, monkeypatch, tmp_path):
+        """Without the font files labels still render."""
+        monkeypatch.setattr(settings, 'LABEL_FONT_PATH', str(tmp_path / 'missing.ttf'))
+
+        assert label_fonts() == ('Helvetica', 'Helvetica-Bold')
+
+
+class TestLabelPdfErrors:
+    """Test error reporting of the single label PDF."""
+
+    def test_unknown_gate_is_404(self):
+        """A missing gate is reported as 404, not turned into a 500."""
+        db = sqlite_session('gates')
+        with pytest.raises(HTTPException) as error:
+            LabelService(db).generate_label_pdf(99, 1)
+        db.close()
+
+        assert error.value.status_code == 404
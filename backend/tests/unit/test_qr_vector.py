@@ -0,0 +1,29 @@
+"""
+Unit Tests for vector QR drawing and ZPL QR commands
+"""
+from app.services.qr_vector import _dark_runs, qr_matrix, zpl_qr, zpl_text
+
+
+class TestQRVector:
+    """Test the QR module geometry and ZPL encoding."""
+
+    def test_runs_cover_exactly_the_dark_modules(self):
+        """Drawing the runs reproduces the QR matrix module for module."""
+        matrix = qr_matrix("https://garagereg.example.com/field/eyJhbGciOiJIUzI1NiJ9.test_token")
+        drawn = [[False] * len(row) for row in matrix]
+        for row, column, length in _dark_runs(matrix):
+            for offset in range(length):
+                assert not drawn[row][column + offset]
+                drawn[row][column + offset] = True
+
+        assert drawn == matrix
+
+    def test_zpl_control_characters_are_escaped(self):
+        """Caret, tilde and the escape character itself never reach ^FD raw."""
+        assert zpl_text("a_b^c~d") == "a_5Fb_5Ec_7Ed"
+
+    def test_zpl_qr_command(self):
+        """The printer gets a native QR barcode field with the URL as data."""
+        command = zpl_qr("https://example.com/field/a_b", 50, 60, magnification=5)
+
+        assert command == "^FO50,60^BQN,2,5^FH_^FDLA,https://example.com/field/a_5Fb^FS"
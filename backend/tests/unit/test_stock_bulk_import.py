@@ -0,0 +1,115 @@
+"""
+Unit Tests for idempotent bulk stock posting
+Tests that a re-delivered feed (ERP import) does not post its lines twice
+"""
+from decimal import Decimal
+
+import pytest
+
+from app.models.inventory import InventoryItem, StockAlert, StockMovement, Warehouse
+from app.models.tickets import Part
+from app.services.inventory_service import InventoryService
+from app.services.stock_posting import StockPosting
+
+from sqlite_schema import sqlite_session
+
+
+@pytest.fixture
+def db():
+    session = sqlite_session(
+        'warehouses', 'parts', 'inventory_items', 'stock_movements', 'stock_movement_counters',
+        'stock_alerts', 'part_usages'
+    )
+    session.execute(Warehouse.__table__.insert(), [
+        dict(id=1, org_id=1, name='Központi raktár', code='KR', warehouse_type='main'),
+        dict(id=2, org_id=2, name='Másik raktár', code='MR', warehouse_type='main'),
+    ])
+    session.execute(Part.__table__.insert(), [
+        dict(id=1, org_id=1, part_number='MOT-100', name='Motor', category='motor'),
+    ])
+    item = dict(part_id=1, quantity_on_hand=Decimal(10), quantity_available=Decimal(10),
+                quantity_reserved=Decimal(0), minimum_stock=Decimal(0), average_cost=Decimal(5),
+                total_value=Decimal(50), is_active=True)
+    session.execute(InventoryItem.__table__.insert(), [
+        dict(item, id=1, org_id=1, warehouse_id=1),
+        dict(item, id=2, org_id=2, warehouse_id=2),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def _feed(item_id=1):
+    return [
+        StockPosting(inventory_item_id=item_id, movement_type='receipt', quantity=Decimal(5),
+                     unit_cost=Decimal(5), reference_type='erp', document_number='L-1'),
+        StockPosting(inventory_item_id=item_id, movement_type='issue', quantity=Decimal(2),
+                     reference_type='erp', document_number='L-2'),
+    ]
+
+
+def _on_hand(db, item_id=1):
+    db.expire_all()
+    return db.get(InventoryItem, item_id).quantity_on_hand
+
+
+class TestIdempotentBulkPosting:
+    """Test skipping references that are already in the ledger."""
+
+    def test_reimport_skips_posted_lines(self, db):
+        """Posting the same feed twice changes stock only once."""
+        service = InventoryService(db)
+        first = service.bulk_post_movements(_feed(), skip_posted=True)
+        second = service.bulk_post_movements(_feed(), skip_posted=True)
+
+        assert first.posted == 2 and first.skipped == []
+        assert second.posted == 0 and second.skipped == [0, 1]
+        assert second.movement_numbers == [None, None]
+        assert _on_hand(db) == Decimal(13)
+        assert db.query(StockMovement).count() == 2
+
+    def test_duplicates_within_a_feed_are_posted_once(self, db):
+        """A line repeated in the same feed is posted once."""
+        feed = _feed()
+        result = InventoryService(db).bulk_post_movements(feed + feed[:1], skip_posted=True)
+
+        assert result.posted == 2
+        assert result.skipped == [2]
+        assert _on_hand(db) == Decimal(13)
+
+    def test_references_are_scoped_to_the_organization(self, db):
+        """The same document number of another organization is not a duplicate."""
+        service = InventoryService(db)
+        service.bulk_post_movements(_feed(), skip_posted=True)
+        result = service.bulk_post_movements(_feed(item_id=2), skip_posted=True)
+
+        assert result.posted == 2
+        assert _on_hand(db, item_id=2) == Decimal(13)
+
+    def test_lines_without_reference_are_rejected(self, db):
+        """Lines that cannot be identified are not posted."""
+        line = StockPosting(inventory_item_id=1, movement_type='receipt', quantity=Decimal(1))
+        result = InventoryService(db).bulk_post_movements([line], skip_posted=True)
+
+        assert result.posted == 0
+        assert result.rejected == [(0, "A reference type and document number are required")]
+        assert _on_hand(db) == Decimal(10)
+
+
+class TestAlertResolution:
+    """Test that receipts resolve the alerts they fix."""
+
+    def test_receipt_resolves_out_of_stock_alert(self, db):
+        """An active out-of-stock alert is resolved once stock is available again."""
+        db.execute(StockAlert.__table__.insert(), [
+            dict(id=1, org_id=1, alert_type='out_of_stock', status='active', inventory_item_id=1,
+                 warehouse_id=1, part_id=1, current_quantity=Decimal(0), threshold_quantity=Decimal(0)),
+        ])
+        db.commit()
+
+        InventoryService(db).bulk_post_movements(_feed()[:1], skip_posted=True)
+
+        db.expire_all()
+        alert = db.get(StockAlert, 1)
+        assert alert.status == 'resolved'
+        assert alert.current_quantity == Decimal(15)
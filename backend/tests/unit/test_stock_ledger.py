@@ -0,0 +1,119 @@
+"""
+Unit Tests for incremental stock ledger snapshots
+Tests that snapshot based balances equal a full scan of the movements
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import count
+
+import pytest
+
+from app.core.config import settings
+from app.models.inventory import StockLedgerSnapshot, StockMovement
+from app.services.stock_ledger import LEDGER_STATUSES, StockLedgerService
+
+from sqlite_schema import sqlite_session
+
+
+START = datetime(2025, 3, 1)
+_numbers = count(1)
+
+
+def _movement(item_id, movement_date, quantity, cost=10, status='completed', created_at=None):
+    quantity = Decimal(quantity)
+    return dict(
+        movement_number=f'MOV{next(_numbers):06d}', org_id=1, warehouse_id=1,
+        inventory_item_id=item_id, part_id=item_id, movement_type='receipt' if quantity > 0 else 'issue',
+        debit_quantity=max(quantity, Decimal(0)), credit_quantity=max(-quantity, Decimal(0)),
+        quantity=quantity, total_cost=Decimal(cost), quantity_before=Decimal(0), quantity_after=Decimal(0),
+        movement_date=movement_date, status=status, created_at=created_at or movement_date
+    )
+
+
+@pytest.fixture
+def db():
+    session = sqlite_session('stock_movements', 'stock_ledger_snapshots')
+    session.execute(StockMovement.__table__.insert(), [
+        _movement(1, START + timedelta(hours=9), 10),
+        _movement(1, START + timedelta(days=1, hours=10), -3),
+        _movement(2, START + timedelta(days=1, hours=11), 5, cost=7),
+        _movement(1, START + timedelta(days=2, hours=8), 4, status='cancelled'),
+        _movement(2, START + timedelta(days=3, hours=15), -2, cost=3),
+        _movement(1, START + timedelta(days=4, hours=12), 6),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def _full_scan(db, as_of=None):
+    """Per item quantity from every ledger movement - what the snapshots must reproduce."""
+    balances = {}
+    for movement in db.query(StockMovement).filter(StockMovement.status.in_(LEDGER_STATUSES)):
+        if as_of is None or movement.movement_date < as_of:
+            balances[movement.inventory_item_id] = balances.get(movement.inventory_item_id, 0) + \
+                movement.debit_quantity - movement.credit_quantity
+    return balances
+
+
+def _assert_matches_full_scan(db):
+    service = StockLedgerService(db)
+    for days in range(7):
+        as_of = START + timedelta(days=days, hours=12)
+        snapshot_based = {item_id: row['quantity'] for item_id, row in service.balances_as_of(as_of).items()}
+        assert snapshot_based == _full_scan(db, as_of), as_of
+
+    totals = service.ledger_totals()
+    assert totals['total_debits'] - totals['total_credits'] == sum(_full_scan(db).values())
+
+
+class TestStockLedgerSnapshots:
+    """Test snapshot + tail reads against a full scan."""
+
+    def test_snapshot_reads_equal_full_scan(self, db):
+        """Balances and totals read via snapshots equal the full scan."""
+        result = StockLedgerService(db).build_snapshots(up_to=date(2025, 3, 4))
+
+        # 03-03 has only a cancelled movement and is skipped
+        assert result['days_closed'] == 2
+        assert result['period_end'] == '2025-03-03T00:00:00'
+        _assert_matches_full_scan(db)
+
+    def test_backdated_movement_reopens_closed_days(self, db):
+        """A movement booked into a closed day is picked up by the next build."""
+        service = StockLedgerService(db)
+        service.build_snapshots(up_to=date(2025, 3, 4))
+
+        db.execute(StockMovement.__table__.insert(), [
+            _movement(2, START + timedelta(days=1, hours=16), 9, created_at=datetime.utcnow())
+        ])
+        db.commit()
+        result = service.build_snapshots(up_to=date(2025, 3, 4))
+
+        assert result['reopened_from'] == '2025-03-02T00:00:00'
+        assert result['days_closed'] == 1
+        _assert_matches_full_scan(db)
+
+    def test_unchanged_ledger_is_not_reopened(self, db):
+        """Rebuilding without new movements closes nothing again."""
+        service = StockLedgerService(db)
+        service.build_snapshots(up_to=date(2025, 3, 4))
+        result = service.build_snapshots(up_to=date(2025, 3, 4))
+
+        assert result['reopened_from'] is None
+        assert result['days_closed'] == 0
+
+    def test_recent_days_stay_open(self, db, monkeypatch):
+        """Days that ended within the close lag are not snapshotted."""
+        yesterday = datetime.combine(datetime.utcnow().date() - timedelta(days=1), datetime.min.time())
+        db.execute(StockMovement.__table__.insert(), [_movement(1, yesterday + timedelta(hours=8), 1)])
+        db.commit()
+
+        monkeypatch.setattr(settings, 'STOCK_LEDGER_CLOSE_LAG_MINUTES', 3 * 24 * 60)
+        StockLedgerService(db).build_snapshots()
+        assert db.query(StockLedgerSnapshot).filter(StockLedgerSnapshot.period_end > yesterday).count() == 0
+
+        monkeypatch.setattr(settings, 'STOCK_LEDGER_CLOSE_LAG_MINUTES', 0)
+        StockLedgerService(db).build_snapshots()
+        assert db.query(StockLedgerSnapshot).filter(StockLedgerSnapshot.period_end > yesterday).count() == 1
+        _assert_matches_full_scan(db)
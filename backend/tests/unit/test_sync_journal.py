@@ -0,0 +1,115 @@
+"""
+Unit Tests for the sync change journal
+Tests that journal rows become visible in sequence order
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.sync.journal import JOURNAL_LOCK_KEY, journal_entries, write_journal
+from app.core.sync.service import SyncService
+from app.models import Base
+from app.models.sync_journal import SyncJournalEntry
+
+import sqlite_schema  # noqa: F401 - SQLite renderings of PostgreSQL types
+
+
+class _RecordingConnection:
+    """Connection stand-in that records executed statements."""
+
+    def __init__(self, dialect_name):
+        self.dialect = type('Dialect', (), {'name': dialect_name})()
+        self.statements = []
+
+    def execute(self, statement, parameters=None):
+        self.statements.append((str(statement), parameters))
+
+
+def _rows(*entity_ids, org_id=1):
+    return journal_entries('gate', [(entity_id, org_id, 'update') for entity_id in entity_ids])
+
+
+class TestJournalWriteOrdering:
+    """Test that journal writers draw sequence numbers in commit order."""
+
+    def test_postgres_writer_takes_lock_before_insert(self):
+        """The organization's advisory lock is taken before a sequence number is drawn."""
+        connection = _RecordingConnection('postgresql')
+        write_journal(connection, _rows(1))
+
+        (lock_sql, lock_params), (insert_sql, _) = connection.statements
+        assert 'pg_advisory_xact_lock' in lock_sql
+        assert lock_params == {'key': JOURNAL_LOCK_KEY, 'org_id': 1}
+        assert insert_sql.startswith('INSERT INTO sync_change_journal')
+
+    def test_locks_are_per_organization_in_order(self):
+        """Each organization written for is locked once, lowest org_id first."""
+        connection = _RecordingConnection('postgresql')
+        write_journal(connection, _rows(1, org_id=7) + _rows(2, org_id=3) + _rows(3, org_id=7))
+
+        locks = [params for sql, params in connection.statements if 'pg_advisory_xact_lock' in sql]
+        assert locks == [{'key': JOURNAL_LOCK_KEY, 'org_id': 3}, {'key': JOURNAL_LOCK_KEY, 'org_id': 7}]
+
+    def test_empty_write_does_not_lock(self):
+        """Flushes without journaled changes do not serialize on the lock."""
+        connection = _RecordingConnection('postgresql')
+        write_journal(connection, [])
+
+        assert connection.statements == []
+
+    def test_second_writer_waits_for_first_commit(self, tmp_path):
+        """A concurrent writer cannot draw a sequence number before the first commits."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'journal.db'}", connect_args={'timeout': 0})
+        Base.metadata.create_all(engine, tables=[SyncJournalEntry.__table__])
+
+        with engine.connect() as first, engine.connect() as second, engine.connect() as reader:
+            write_journal(first, _rows(1))
+            with pytest.raises(OperationalError):
+                write_journal(second, _rows(2))
+            second.rollback()
+            assert reader.execute(select(SyncJournalEntry.seq)).all() == []
+
+            first.commit()
+            write_journal(second, _rows(2))
+            second.commit()
+
+            rows = reader.execute(
+                select(SyncJournalEntry.entity_id).order_by(SyncJournalEntry.seq)
+            ).scalars().all()
+            assert rows == [1, 2]
+
+
+class TestJournalPull:
+    """Test paging through the journal by sequence watermark."""
+
+    def test_pages_follow_sequence_order(self, tmp_path):
+        """Each page resumes after the previous watermark without skipping rows."""
+
+        async def run():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pull.db'}")
+            async with engine.begin() as connection:
+                await connection.run_sync(
+                    lambda sync: Base.metadata.create_all(
+                        sync, tables=[SyncJournalEntry.__table__, Base.metadata.tables['gates']]
+                    )
+                )
+            async with AsyncSession(engine) as session:
+                await session.run_sync(lambda sync: write_journal(sync.connection(), _rows(1, 2, 3)))
+                await session.run_sync(lambda sync: write_journal(sync.connection(), _rows(4, org_id=2)))
+                await session.run_sync(lambda sync: write_journal(sync.connection(), _rows(5)))
+                await session.commit()
+
+                service = SyncService(session)
+                pages, watermark, has_more = [], 0, True
+                while has_more:
+                    deltas, watermark, has_more = await service._get_journal_changes(
+                        watermark, None, 2, True, org_id=1
+                    )
+                    pages.append(([delta.entity_id for delta in deltas], watermark))
+            await engine.dispose()
+            return pages
+
+        assert asyncio.run(run()) == [(['1', '2'], 2), (['3', '5'], 5)]
@@ -0,0 +1,115 @@
+"""
+Unit Tests for batched sync pushes
+Tests that the bulk UPDATE only applies on the row version the push was planned against
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text, create_engine, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.core.sync.models import SyncDelta, SyncOperation, SyncPushRequest
+from app.core.sync.service import SyncService
+from app.models.sync_journal import SyncJournalEntry
+
+import sqlite_schema  # noqa: F401 - SQLite renderings of PostgreSQL types
+
+
+SyncBase = declarative_base()
+
+
+class SyncedGate(SyncBase):
+    """Minimal entity carrying the sync metadata columns the service writes."""
+    __tablename__ = 'synced_gates'
+
+    id = Column(Integer, primary_key=True)
+    org_id = Column(Integer, nullable=False)
+    name = Column(String(100), nullable=False)
+    etag = Column(String(36), nullable=False)
+    row_version = Column(Integer, nullable=False)
+    last_modified_at = Column(DateTime(timezone=True), nullable=True)
+    last_modified_by = Column(String(100), nullable=True)
+    sync_status = Column(String(20), nullable=True)
+    conflict_data = Column(Text, nullable=True)
+    is_deleted = Column(Boolean, default=False, nullable=False)
+
+
+@pytest.fixture(autouse=True)
+def synced_models(monkeypatch):
+    monkeypatch.setattr(SyncService, 'ENTITY_MODELS', {'gate': SyncedGate})
+
+
+def _push(path, deltas, between=None):
+    """Push ``deltas``; ``between`` runs on another connection right after the prefetch."""
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with AsyncSession(engine) as session:
+            service = SyncService(session)
+            if between is not None:
+                prefetch = service._prefetch_entities
+
+                async def prefetch_then_race(model_class, group):
+                    existing = await prefetch(model_class, group)
+                    between()
+                    return existing
+                service._prefetch_entities = prefetch_then_race
+            response = await service.push_changes(SyncPushRequest(client_id='tablet', deltas=deltas))
+        await engine.dispose()
+        return response
+
+    return asyncio.run(run())
+
+
+def _setup(tmp_path):
+    path = tmp_path / 'push.db'
+    engine = create_engine(f"sqlite:///{path}")
+    SyncBase.metadata.create_all(engine)
+    SyncJournalEntry.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(SyncedGate.__table__.insert(), [
+            dict(id=1, org_id=1, name='G1', etag='etag-1', row_version=1, is_deleted=False),
+        ])
+    return path, engine
+
+
+def _gate(engine):
+    with engine.connect() as connection:
+        return connection.execute(
+            select(SyncedGate.name, SyncedGate.etag, SyncedGate.row_version, SyncedGate.is_deleted).where(SyncedGate.id == 1)
+        ).one()
+
+
+class TestVersionedBulkUpdate:
+    """Test optimistic locking on the executemany UPDATE."""
+
+    def test_uncontended_update_is_applied(self, tmp_path):
+        """The planned row version still matches, so the update is accepted once."""
+        path, engine = _setup(tmp_path)
+        delta = SyncDelta(entity_type='gate', entity_id='1', operation=SyncOperation.UPDATE,
+                          etag='etag-1', data={'name': 'Tablet'})
+
+        response = _push(path, [delta])
+
+        assert response.accepted_deltas == ['etag-1']
+        name, etag, row_version, _ = _gate(engine)
+        assert (name, row_version) == ('Tablet', 2)
+        assert etag != 'etag-1'
+
+    def test_concurrent_change_is_reported_as_conflict(self, tmp_path):
+        """A row changed after the prefetch matches nothing and is not overwritten."""
+        path, engine = _setup(tmp_path)
+        delta = SyncDelta(entity_type='gate', entity_id='1', operation=SyncOperation.DELETE, etag='etag-1')
+
+        def concurrent_push():
+            with engine.begin() as connection:
+                connection.execute(
+                    update(SyncedGate.__table__).where(SyncedGate.id == 1).values(name='Web', etag='etag-2', row_version=2)
+                )
+
+        response = _push(path, [delta], between=concurrent_push)
+
+        assert response.accepted_deltas == []
+        assert [(conflict.etag, conflict.row_version) for conflict in response.conflicts] == [('etag-2', 2)]
+        assert tuple(_gate(engine)) == ('Web', 'etag-2', 2, False)
@@ -0,0 +1,173 @@
+"""
+Unit Tests for the ticket / work order summary cache and its queries
+Tests expiry, LRU eviction, per-organization invalidation and the conditional-aggregate SQL
+"""
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models.tickets import PartUsage, Ticket, TicketPriority, WorkOrder, WorkOrderTimeLog
+from app.services.ticket_summary_service import SummaryCache, TicketSummaryService
+
+from sqlite_schema import sqlite_session
+
+
+BASE = datetime.utcnow() - timedelta(days=10)
+
+
+def _hours(hours):
+    return BASE + timedelta(hours=hours)
+
+
+def _ticket(ticket_id, status, priority, org_id=1, is_active=True, reported_at=BASE, **timestamps):
+    values = dict(
+        id=ticket_id, org_id=org_id, gate_id=1, ticket_number=f'T{ticket_id}', title='Hiba', description='-',
+        category='mechanical', issue_type='malfunction', status=status, priority=priority,
+        is_active=is_active, reported_at=reported_at, acknowledged_at=None, resolved_at=None,
+        sla_response_by=None, sla_resolution_by=None, sla_met=None
+    )
+    values.update(timestamps)
+    return values
+
+
+def _work_order(work_order_id, status, org_id=1, is_active=True, actual_start=None, actual_end=None):
+    return dict(
+        id=work_order_id, org_id=org_id, gate_id=1, work_order_number=f'WO{work_order_id}', title='Javítás',
+        description='-', work_type='repair', work_category='motor', status=status, is_active=is_active,
+        actual_start=actual_start, actual_end=actual_end
+    )
+
+
+class TestSummaryCache:
+    """Test that summaries are reused within the TTL and isolated per organization."""
+
+    def test_value_is_reused_until_expiry(self):
+        """A summary is computed once per TTL window."""
+        cache = SummaryCache(max_size=10, ttl_seconds=0.05)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        assert cache.get_or_compute(('tickets', 1), compute) == 1
+        assert cache.get_or_compute(('tickets', 1), compute) == 1
+        time.sleep(0.06)
+        assert cache.get_or_compute(('tickets', 1), compute) == 2
+        assert cache.stats == {'hits': 1, 'misses': 2}
+
+    def test_least_recently_used_is_evicted(self):
+        """The cache never holds more than ``max_size`` summaries."""
+        cache = SummaryCache(max_size=2, ttl_seconds=60)
+
+        cache.get_or_compute(('tickets', 1), lambda: 'a')
+        cache.get_or_compute(('tickets', 2), lambda: 'b')
+        cache.get_or_compute(('tickets', 1), lambda: 'stale')
+        cache.get_or_compute(('tickets', 3), lambda: 'c')
+
+        assert cache.get_or_compute(('tickets', 1), lambda: 'new') == 'a'
+        assert cache.get_or_compute(('tickets', 2), lambda: 'new') == 'new'
+
+    def test_invalidate_org_only_drops_that_org(self):
+        """Invalidating one organization keeps the summaries of the others."""
+        cache = SummaryCache(max_size=10, ttl_seconds=60)
+        cache.get_or_compute(('tickets', 1), lambda: 'org1')
+        cache.get_or_compute(('sla_metrics', 1, 30), lambda: 'org1-sla')
+        cache.get_or_compute(('tickets', 2), lambda: 'org2')
+
+        cache.invalidate_org(1)
+
+        assert cache.get_or_compute(('tickets', 1), lambda: 'fresh') == 'fresh'
+        assert cache.get_or_compute(('sla_metrics', 1, 30), lambda: 'fresh') == 'fresh'
+        assert cache.get_or_compute(('tickets', 2), lambda: 'fresh') == 'org2'
+
+
+class TestSummaryQueries:
+    """Test the conditional aggregates against known rows in SQLite."""
+
+    @pytest.fixture
+    def service(self):
+        db = sqlite_session('tickets', 'work_orders', 'part_usages', 'work_order_time_logs')
+        db.execute(Ticket.__table__.insert(), [
+            _ticket(1, 'OPEN', 'HIGH', sla_response_by=_hours(4), sla_resolution_by=_hours(24), sla_met=False),
+            _ticket(2, 'in_progress', 'high', acknowledged_at=_hours(2), sla_response_by=_hours(4),
+                    sla_resolution_by=datetime.utcnow() + timedelta(days=1)),
+            _ticket(3, 'DONE', 'LOW', acknowledged_at=_hours(6), sla_response_by=_hours(4),
+                    resolved_at=_hours(12), sla_resolution_by=_hours(24), sla_met=True),
+            _ticket(4, 'closed', 'low', acknowledged_at=_hours(1), sla_response_by=_hours(24),
+                    resolved_at=_hours(30), sla_resolution_by=_hours(24), sla_met=False),
+            _ticket(5, 'WAITING_PARTS', 'Medium'),
+            _ticket(6, 'OPEN', 'HIGH', is_active=False, reported_at=BASE - timedelta(days=50)),
+            _ticket(7, 'OPEN', 'HIGH', org_id=2, sla_response_by=_hours(4)),
+        ])
+        db.execute(WorkOrder.__table__.insert(), [
+            _work_order(1, 'completed', actual_start=BASE, actual_end=_hours(5)),
+            _work_order(2, 'COMPLETED', actual_start=BASE, actual_end=_hours(3)),
+            _work_order(3, 'IN_PROGRESS', actual_start=BASE),
+            _work_order(4, 'draft'),
+            _work_order(5, 'Scheduled'),
+            _work_order(6, 'completed', is_active=False, actual_start=BASE, actual_end=_hours(100)),
+            _work_order(7, 'completed', org_id=2, actual_start=BASE, actual_end=_hours(50)),
+        ])
+        usage = dict(org_id=1, part_id=1, gate_id=1, quantity_used=1, is_active=True)
+        db.execute(PartUsage.__table__.insert(), [
+            dict(usage, id=1, work_order_id=1, total_cost=Decimal('100.50')),
+            dict(usage, id=2, work_order_id=2, total_cost=Decimal('49.50')),
+            dict(usage, id=3, work_order_id=3, total_cost=Decimal('999')),
+            dict(usage, id=4, work_order_id=1, total_cost=Decimal('1000'), is_active=False),
+            dict(usage, id=5, work_order_id=6, total_cost=Decimal('500')),
+        ])
+        log = dict(org_id=1, technician_id=1, start_time=BASE, activity_type='repair', is_active=True)
+        db.execute(WorkOrderTimeLog.__table__.insert(), [
+            dict(log, id=1, work_order_id=1, cost=Decimal('80')),
+            dict(log, id=2, work_order_id=3, cost=Decimal('300')),
+        ])
+        db.commit()
+        yield TicketSummaryService(db, cache=SummaryCache(max_size=10, ttl_seconds=60))
+        db.close()
+
+    def test_ticket_summary(self, service):
+        """Statuses match regardless of case; averages only cover rows with both timestamps."""
+        summary = service._compute_ticket_summary(1)
+
+        assert (summary.total_tickets, summary.open_tickets, summary.in_progress_tickets) == (5, 1, 1)
+        assert (summary.waiting_parts_tickets, summary.completed_tickets) == (1, 2)
+        assert (summary.overdue_response, summary.overdue_resolution) == (1, 1)
+        assert summary.avg_response_time_hours == pytest.approx(3.0)
+        assert summary.avg_resolution_time_hours == pytest.approx(21.0)
+        assert summary.sla_response_compliance == pytest.approx(66.67)
+        assert summary.sla_resolution_compliance == pytest.approx(50.0)
+
+    def test_work_order_summary(self, service):
+        """Counts, completion time and costs only include the organization's active, completed work."""
+        summary = service._compute_work_order_summary(1)
+
+        assert (summary.total_work_orders, summary.draft_work_orders, summary.scheduled_work_orders) == (5, 1, 1)
+        assert (summary.in_progress_work_orders, summary.waiting_parts_work_orders) == (1, 0)
+        assert summary.completed_work_orders == 2
+        assert summary.avg_completion_time_hours == pytest.approx(4.0)
+        assert summary.total_parts_cost == Decimal('150')
+        assert summary.total_labor_cost == Decimal('80')
+
+    def test_sla_metrics(self, service):
+        """Tickets in the window are grouped by case-folded priority, in priority order."""
+        metrics = {TicketPriority(metric.priority): metric for metric in service._compute_sla_metrics(1, 30)}
+
+        assert list(metrics) == [TicketPriority.LOW, TicketPriority.MEDIUM, TicketPriority.HIGH]
+
+        low = metrics[TicketPriority.LOW]
+        assert (low.total_tickets, low.breached_response, low.response_compliance_rate) == (2, 1, 0.5)
+        assert low.actual_avg_response_hours == pytest.approx(3.5)
+        assert low.actual_avg_resolution_hours == pytest.approx(21.0)
+        assert (low.target_response_hours, low.target_resolution_hours) == (24, 168)
+
+        high = metrics[TicketPriority.HIGH]
+        assert (high.total_tickets, high.breached_response, high.response_compliance_rate) == (2, 1, 0.0)
+        assert high.actual_avg_response_hours == pytest.approx(2.0)
+        assert high.actual_avg_resolution_hours is None
+
+        medium = metrics[TicketPriority.MEDIUM]
+        assert (medium.total_tickets, medium.breached_response) == (1, 0)
+        assert medium.actual_avg_response_hours is None